@@ -1,12 +1,25 @@
+import fnmatch
+import json
 import os
+import queue
+import shutil
 import subprocess
 import sys
+import threading
+import time
 import webbrowser
 import xml.etree.ElementTree as Et
 import tkinter as tk
 from pathlib import Path
 from tkinter import ttk, messagebox
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
 from enum import Enum
+from typing import Callable
+
+# The Python helpers shared with the sync script live next to it in Source
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), "Source"))
+from p4_session import P4Error, P4Session
 
 # The tool cannot run without these files
 REQUIRED_SOURCE_FILES = [
@@ -25,11 +38,58 @@ P4_COMMON_PATHS = [
     os.path.join("Program Files (x86)", "Perforce", "p4.exe")
 ]
 
+# Folders that never contain the Perforce executables and are expensive to walk
+SEARCH_SKIP_DIRS = {
+    "windows",
+    "$recycle.bin",
+    "system volume information",
+    "intermediate",
+    "deriveddatacache",
+    "node_modules"
+}
+
+SEARCH_MAX_DEPTH = 6
+SEARCH_WORKERS = 8
+
+# Unreal folders that can hold millions of entries and never contain project level files
+PROJECT_PRUNE_DIRS = {
+    "saved",
+    "intermediate",
+    "deriveddatacache",
+    "binaries",
+    "content",
+    ".git",
+    ".vs",
+    "node_modules"
+}
+
+# Same depth the PowerShell script uses when looking for the .uproject (SearchRecursionDepth)
+PROJECT_SEARCH_DEPTH = 5
+
+UPROJECT_PATTERN = "*.uproject"
+P4CONFIG_PATTERN = "*.p4config"
+
+# Installer steps are mostly waiting on disk scans and p4, so a few threads are enough
+STEP_WORKERS = 4
+
+# The UI drains queued log lines on a timer instead of redrawing after every line
+LOG_PUMP_INTERVAL_MS = 50
+LOG_BATCH_SIZE = 200
+MAX_LOG_LINES = 2000
+
+DISCOVERY_CACHE_FILE_NAME = "discovery_cache.json"
+DISCOVERY_CACHE_VERSION = 1
+
 P4_USER = "P4USER"
 P4_PORT = "P4PORT"
 P4_CLIENT = "P4CLIENT"
 P4_TIME_OUT = 15
 
+# Validation results are reused for the same credentials for this many seconds
+P4_VALIDATION_CACHE_TTL = 30
+P4_VALIDATION_POLL_MS = 100
+P4_VALIDATION_CLOSE_DELAY_MS = 800
+
 def get_root_path()-> Path:
     """Return the path to the root folder of the project"""
     return Path("C:\\")
@@ -56,88 +116,307 @@ def get_project_path(app_path: Path)-> Path | None:
     """Return the path to the project folder"""
     return app_path.parent.parent
 
-def get_uproject_path(project_path: Path)-> Path | None:
+def get_uproject_path(project_path: Path, cache=None)-> Path | None:
     """Search for an uproject file and return the path to it, if not found, then return None"""
     
     if not project_path.is_dir():
         return None
-    
-    files_found = project_path.rglob("*.uproject")
 
-    return next(files_found, None)
+    return _find_project_file(project_path, UPROJECT_PATTERN, cache)
 
-def get_p4_path()-> Path | None:
+def get_p4_path(on_search=None, cache=None)-> Path | None:
     """Search for a p4 executable and return the path to it, if not found, then return None"""
-    
-    return _search_for_file(P4_COMMON_PATHS, "p4.exe")
 
-def get_p4v_path()-> Path | None:
+    def search():
+        return _search_for_file(P4_COMMON_PATHS, "p4.exe", on_search)
+
+    return _cached_lookup(cache, "p4", None, search)
+
+def get_p4v_path(on_search=None, cache=None)-> Path | None:
     """Search for a p4v executable and return the path to it, if not found, then return None"""
 
-    return _search_for_file(P4V_COMMON_PATHS, "p4v.exe")
+    def search():
+        return _search_for_file(P4V_COMMON_PATHS, "p4v.exe", on_search)
+
+    return _cached_lookup(cache, "p4v", None, search)
+
+class DiscoveryCache:
+    """On-disk cache of discovered paths, each one validated with a single stat on the next run"""
+
+    def __init__(self, cache_file: Path):
+        self._cache_file = Path(cache_file)
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._entries = self._load()
+
+    @staticmethod
+    def _key(kind: str, project_root)-> str:
+        return f"{kind}|{project_root or ''}"
+
+    @staticmethod
+    def _fingerprint(path: Path)-> dict | None:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+    def _load(self)-> dict:
+        if not self._cache_file.is_file():
+            return {}
+
+        try:
+            with open(self._cache_file, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+        if not isinstance(data, dict) or data.get("version") != DISCOVERY_CACHE_VERSION:
+            return {}
+
+        entries = data.get("entries", {})
+        return entries if isinstance(entries, dict) else {}
+
+    def get(self, kind: str, project_root=None)-> Path | None:
+        """Return the cached path if it still matches its fingerprint, otherwise None"""
+
+        with self._lock:
+            entry = self._entries.get(self._key(kind, project_root))
+
+        if not isinstance(entry, dict) or "path" not in entry:
+            return None
+
+        path = Path(entry["path"])
+        fingerprint = self._fingerprint(path)
+        if fingerprint is None or fingerprint["mtime_ns"] != entry.get("mtime_ns") or fingerprint["size"] != entry.get("size"):
+            self.invalidate(kind, project_root)
+            return None
+
+        return path
+
+    def put(self, kind: str, project_root, path: Path)-> None:
+        """Remember a found path together with its fingerprint"""
+
+        fingerprint = self._fingerprint(path)
+        if fingerprint is None:
+            return
+
+        with self._lock:
+            self._entries[self._key(kind, project_root)] = {"path": str(path), **fingerprint}
+            self._dirty = True
+
+    def invalidate(self, kind: str, project_root=None)-> None:
+        with self._lock:
+            if self._entries.pop(self._key(kind, project_root), None) is not None:
+                self._dirty = True
+
+    def save(self)-> None:
+        """Write the cache to disk if anything changed"""
+
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {"version": DISCOVERY_CACHE_VERSION, "entries": dict(self._entries)}
+            self._dirty = False
+
+        try:
+            self._cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self._cache_file, "w", encoding="utf-8") as file:
+                json.dump(data, file, indent=2)
+        except OSError:
+            pass
+
+def _cached_lookup(cache: DiscoveryCache | None, kind: str, project_root, search)-> Path | None:
+    """Return a path from the cache when still valid, otherwise run the full search and cache its result"""
+
+    if cache is not None:
+        cached_path = cache.get(kind, project_root)
+        if cached_path is not None:
+            return cached_path
+
+    path = search()
+
+    if cache is not None and path is not None:
+        cache.put(kind, project_root, path)
+
+    return path
 
-def _search_for_file(common_paths: list, file_name='')-> Path | None:
+@dataclass
+class LocatorResult:
+    """Outcome of an executable search, with the cost of finding it"""
+    path: Path | None
+    scanned_dirs: int = 0
+    elapsed: float = 0.0
+    source: str = ""
+
+def _search_for_file(common_paths: list, file_name='', on_search=None)-> Path | None:
     """Search for a file in common paths and return the path to it, if not found, then return None"""
 
-    root = get_root_path()
+    result = locate_executable(file_name, common_paths)
+
+    if on_search is not None:
+        on_search(result)
+
+    return result.path
+
+def locate_executable(file_name: str, common_paths: list, root: Path=None, max_depth=SEARCH_MAX_DEPTH,
+                      skip_dirs=None, workers=SEARCH_WORKERS)-> LocatorResult:
+    """Find an executable checking PATH, then the common paths, then a bounded walk of the root folder"""
+
+    start_time = time.perf_counter()
+
+    on_path = shutil.which(file_name) or shutil.which(Path(file_name).stem)
+    if on_path is not None:
+        return LocatorResult(Path(on_path), 0, time.perf_counter() - start_time, "PATH")
+
+    if root is None:
+        root = get_root_path()
+
     for path in common_paths:
         potential_path = root / path
         if potential_path.exists():
-            return potential_path
-        
-    files_found = root.rglob(file_name) # In case the file is not in the common paths
-    first_file = next(files_found, None)
-    if first_file is not None:
-        return first_file
-    
-    return None
-      
-def get_p4_config_path(project_path=None)-> Path | None:
+            return LocatorResult(potential_path, 0, time.perf_counter() - start_time, "common path")
+
+    if skip_dirs is None:
+        skip_dirs = SEARCH_SKIP_DIRS
+
+    found, scanned_dirs = _walk_for_file(root, file_name, max_depth, skip_dirs, workers)
+
+    return LocatorResult(found, scanned_dirs, time.perf_counter() - start_time, "disk scan" if found else "")
+
+def _walk_for_file(root: Path, file_name: str, max_depth: int, skip_dirs, workers: int)-> tuple[Path | None, int]:
+    """Walk the root folder level by level in a thread pool, stopping at the first level with a match"""
+
+    target = file_name.lower()
+    skip = {name.lower() for name in skip_dirs}
+    cancel = threading.Event()
+    scanned_dirs = 0
+    level = [str(root)]
+
+    def scan(directory):
+        return _scan_directory(directory, target, skip, cancel)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for depth in range(max_depth + 1):
+            if not level:
+                break
+
+            matches = []
+            next_level = []
+
+            for match, sub_dirs in pool.map(scan, level):
+                scanned_dirs += 1
+                if match is not None:
+                    matches.append(match)
+                    cancel.set()
+                next_level.extend(sub_dirs)
+
+            # Sorting keeps the answer stable no matter which thread finished first
+            if matches:
+                return Path(sorted(matches, key=str.lower)[0]), scanned_dirs
+
+            level = sorted(next_level) if depth < max_depth else []
+
+    return None, scanned_dirs
+
+def _scan_directory(directory: str, target: str, skip_dirs: set, cancel: threading.Event)-> tuple[str | None, list]:
+    """List one directory, returning a matching file and the sub folders worth visiting"""
+
+    if cancel.is_set():
+        return None, []
+
+    sub_dirs = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name.lower() not in skip_dirs:
+                            sub_dirs.append(entry.path)
+                    elif entry.name.lower() == target:
+                        return entry.path, []
+                except OSError:
+                    continue
+    except OSError:
+        return None, []
+
+    return None, sub_dirs
+
+def get_p4_config_path(project_path=None, cache=None)-> Path | None:
     """Search for a p4 config file and return the path to it, if not found, then return None"""
     
     if project_path is None:
         project_path = get_project_path(get_app_path())
-        
-    for file in project_path.rglob("*.p4config"):
-        if file.is_file():
-            return file
-    
-    return None
-
-def _get_p4_env_var(var_name: str)-> list[str] | None:
-    """Return the value of a p4 environment variable"""
-    
-    env = os.environ.copy()
-
-    result = subprocess.run(
-        ["p4", "set", var_name],
-        env=env,
-        capture_output=True,
-        text=True,
-        timeout=P4_TIME_OUT)
-    
-    if result.returncode != 0:
-        return None
-    
-    result = result.stdout
 
-    keyword, value = result.split("=")
-    value = value.split()[0].strip()
-    return [keyword, value]
-
-def get_p4_env_vars()-> dict:
+    return _find_project_file(project_path, P4CONFIG_PATTERN, cache)
+
+def find_project_files(root: Path, patterns=(UPROJECT_PATTERN, P4CONFIG_PATTERN), max_depth=PROJECT_SEARCH_DEPTH,
+                       prune_dirs=None)-> dict:
+    """Walk the project once and return the shallowest file matching each pattern, or None for each one missing"""
+
+    if prune_dirs is None:
+        prune_dirs = PROJECT_PRUNE_DIRS
+
+    prune = {name.lower() for name in prune_dirs}
+    pending = {pattern: pattern.lower() for pattern in patterns}
+    found = {pattern: None for pattern in patterns}
+    level = [str(root)]
+
+    for depth in range(max_depth + 1):
+        if not level or not pending:
+            break
+
+        candidates = {pattern: [] for pattern in pending}
+        next_level = []
+
+        for directory in level:
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        name = entry.name.lower()
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if name not in prune:
+                                    next_level.append(entry.path)
+                            elif entry.is_file():
+                                for pattern, lowered in pending.items():
+                                    if fnmatch.fnmatchcase(name, lowered):
+                                        candidates[pattern].append(entry.path)
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+
+        # Shallowest level wins, ties are broken alphabetically so the result never depends on disk order
+        for pattern, paths in candidates.items():
+            if paths:
+                found[pattern] = Path(min(paths, key=lambda path: (path.lower(), path)))
+                del pending[pattern]
+
+        level = sorted(next_level)
+
+    return found
+
+def _find_project_file(project_path: Path, pattern: str, cache=None)-> Path | None:
+    """Look up one kind of project file, caching every kind the shared walk finds along the way"""
+
+    kinds = {UPROJECT_PATTERN: "uproject", P4CONFIG_PATTERN: "p4config"}
+
+    def search():
+        found = find_project_files(project_path)
+        if cache is not None:
+            for other_pattern, path in found.items():
+                if other_pattern != pattern and path is not None:
+                    cache.put(kinds[other_pattern], project_path, path)
+        return found[pattern]
+
+    return _cached_lookup(cache, kinds[pattern], project_path, search)
+
+def get_p4_env_vars(session: P4Session=None)-> dict:
     """Return a dictionary with the p4 environment variables"""
 
-    dict_to_return = {}
-    
-    vars_to_get = [P4_USER, P4_PORT, P4_CLIENT]
-    
-    for var in vars_to_get:
-        result = _get_p4_env_var(var)
-        if result is not None:
-            dict_to_return[result[0]] = result[1]
-    
-    return dict_to_return
+    session = session or P4Session(timeout=P4_TIME_OUT)
+    return session.get_env_vars((P4_USER, P4_PORT, P4_CLIENT))
 
 def get_p4_config_file_vars(config_path=None)-> dict:
     """Return a dictionary with the p4 config file variables"""
@@ -240,18 +519,104 @@ def check_p4_connection(credentials: dict=None)-> bool:
     if len(credentials) < 3:
         return False
 
-    user = credentials.get(P4_USER, "")
-    client = credentials.get(P4_CLIENT, "")
-    port = credentials.get(P4_PORT, "")
+    session = P4Session.from_credentials(credentials, timeout=P4_TIME_OUT)
+    return session.check_connection()
+
+@dataclass
+class ValidationResult:
+    """Answer of a credentials check, latency is None when the server never answered"""
+    valid: bool
+    latency: float | None = None
+    cancelled: bool = False
+
+class CredentialValidator:
+    """Check Perforce credentials on a background thread, one p4 process at a time.
+
+    Asking again for credentials already being checked returns the same pending answer,
+    and answers are reused for P4_VALIDATION_CACHE_TTL seconds.
+    """
+
+    def __init__(self, ttl=P4_VALIDATION_CACHE_TTL, runner_factory=None):
+        self._ttl = ttl
+        self._runner_factory = runner_factory
+        self._lock = threading.Lock()
+        self._cache = {}
+        self._pending = None
+
+    @staticmethod
+    def _key(credentials: dict)-> tuple:
+        return tuple(credentials.get(name, "") for name in (P4_PORT, P4_USER, P4_CLIENT))
+
+    def cached(self, credentials: dict)-> ValidationResult | None:
+        """Return a recent answer for these credentials, if there is one"""
+        with self._lock:
+            entry = self._cache.get(self._key(credentials))
+        if entry is None or time.monotonic() - entry[0] > self._ttl:
+            return None
+        return entry[1]
+
+    def validate_async(self, credentials: dict)-> Future:
+        """Start checking the credentials and return a future with the ValidationResult"""
+        key = self._key(credentials)
+
+        cached = self.cached(credentials)
+        if cached is not None:
+            future = Future()
+            future.set_result(cached)
+            return future
+
+        with self._lock:
+            if self._pending is not None and self._pending["key"] == key and not self._pending["future"].done():
+                return self._pending["future"]
+
+        self.cancel()
+
+        port, user, client = key
+        runner = self._runner_factory() if self._runner_factory else None
+        session = P4Session(port, user, client, timeout=P4_TIME_OUT, runner=runner)
+        pending = {"key": key, "future": Future(), "session": session, "cancelled": False}
+        with self._lock:
+            self._pending = pending
+
+        threading.Thread(target=self._run, args=(pending,), daemon=True).start()
+        return pending["future"]
+
+    def validate(self, credentials: dict)-> ValidationResult:
+        """Check the credentials and wait for the answer"""
+        return self.validate_async(credentials).result()
+
+    def cancel(self)-> None:
+        """Stop the check in progress, killing its p4 process"""
+        with self._lock:
+            pending = self._pending
+            if pending is None or pending["future"].done():
+                return
+            pending["cancelled"] = True
+
+        pending["session"].cancel()
+
+    def _run(self, pending: dict):
+        if not all(pending["key"]):
+            pending["future"].set_result(ValidationResult(False))
+            return
+
+        session = pending["session"]
+        start_time = time.perf_counter()
+        try:
+            valid = session.run("client", "-o").ok
+            latency = time.perf_counter() - start_time
+        except P4Error:
+            valid, latency = False, None
+
+        with self._lock:
+            cancelled = pending["cancelled"]
 
-    result = subprocess.run(
-        ["p4", "-p", port, "-u", user, "-c", client, "client", "-o"],
-        capture_output=True,
-        timeout=P4_TIME_OUT,
-        creationflags=subprocess.CREATE_NO_WINDOW
-    )
+        result = ValidationResult(valid and not cancelled, None if cancelled else latency, cancelled)
+        if not cancelled:
+            with self._lock:
+                self._cache[pending["key"]] = (time.monotonic(), result)
 
-    return result.returncode == 0
+        pending["future"].set_result(result)
 
 def is_custom_tool_defined(custom_tool_file: Path, custom_tool_name: str)-> bool:
     """Check if a custom tool is defined in p4v"""
@@ -321,12 +686,15 @@ def fix_existing_custom_tool(custom_tool_file: Path, custom_tool_name: str, bat_
     return define_custom_tool(custom_tool_file, custom_tool_name, bat_path, starting_folder)
 
 class P4ConfigUI(tk.Toplevel):
-    def __init__(self, parent, existing):
+    def __init__(self, parent, existing, validator=None):
         super().__init__(parent)
 
         self.title = "Perforce Credentials"
         self.resizable(False, False)
         self.result = None
+        self.latency = None
+        self._validator = validator or CredentialValidator()
+        self._pending = None
         existing = existing or {}
 
         self.transient(parent)
@@ -398,8 +766,25 @@ class P4ConfigUI(tk.Toplevel):
             foreground="gray"
         ).grid(column=1, row=5, sticky=tk.W)
 
+        status_frame = ttk.Frame(frame)
+        status_frame.grid(column=0, row=6, columnspan=2, pady=(15, 0), sticky=tk.W)
+
+        self.spinner = ttk.Progressbar(
+            status_frame,
+            mode="indeterminate",
+            length=80
+        )
+
+        self.status_var = tk.StringVar(value="")
+
+        ttk.Label(
+            status_frame,
+            textvariable=self.status_var,
+            foreground="gray"
+        ).pack(side=tk.RIGHT)
+
         btn_frame = ttk.Frame(frame)
-        btn_frame.grid(column=0, row=6, columnspan=2, pady=(20, 0))
+        btn_frame.grid(column=0, row=7, columnspan=2, pady=(20, 0))
 
         self.btn_accept = (ttk.Button(
             btn_frame,
@@ -447,22 +832,156 @@ class P4ConfigUI(tk.Toplevel):
                 parent=self
             )
             self.btn_accept.config(state=tk.NORMAL)
+            return
+
+        self.status_var.set("Validating credentials...")
+        self.spinner.pack(side=tk.LEFT, padx=(0, 10))
+        self.spinner.start(10)
+
+        self._pending = (test_credentials, self._validator.validate_async(test_credentials))
+        self._poll_validation()
+
+    def _poll_validation(self):
+        credentials, future = self._pending
+
+        if not future.done():
+            self.after(P4_VALIDATION_POLL_MS, self._poll_validation)
+            return
+
+        self._pending = None
+        self.spinner.stop()
+        self.spinner.pack_forget()
+        result = future.result()
+
+        if result.cancelled:
+            self.status_var.set("Validation cancelled")
+            self.btn_accept.config(state=tk.NORMAL)
+            return
+
+        if result.latency is None:
+            self.status_var.set(f"No answer from the server after {P4_TIME_OUT}s")
         else:
-            if not check_p4_connection(test_credentials):
-                messagebox.showerror(
-                    "Error",
-                    "Invalid credentials",
-                    parent=self
-                )
-                self.btn_accept.config(state=tk.NORMAL)
-            else:
-                self.result = test_credentials
-                self.destroy()
+            self.status_var.set(f"Server round-trip: {result.latency * 1000:.0f} ms")
+
+        if not result.valid:
+            messagebox.showerror(
+                "Error",
+                "Invalid credentials",
+                parent=self
+            )
+            self.btn_accept.config(state=tk.NORMAL)
+            return
+
+        self.result = credentials
+        self.latency = result.latency
+        self.after(P4_VALIDATION_CLOSE_DELAY_MS, self.destroy)
 
     def _on_cancel(self):
+        # While validating, Cancel stops the check instead of closing the dialog
+        if self._pending is not None:
+            self._validator.cancel()
+            return
+
         self.result = None
         self.destroy()
             
+@dataclass
+class InstallStep:
+    """An installer step and the names of the steps that have to succeed before it can run"""
+    name: str
+    run: Callable[[], bool]
+    depends_on: tuple = ()
+    inline: bool = False
+
+class StepScheduler:
+    """Run installer steps in a thread pool as soon as their dependencies succeed.
+
+    Steps must be declared after the steps they depend on. Their results are committed in
+    declaration order, so the log reads the same no matter which step finished first.
+    Steps flagged inline (the ones that ask the user for input) run on the calling thread
+    with their logs written live. A step whose dependencies did not all succeed is skipped,
+    on_skip gets the step and the names of those dependencies.
+    """
+
+    def __init__(self, steps: list, run_captured, replay, on_commit=None, on_skip=None, workers=STEP_WORKERS):
+        self._steps = list(steps)
+        self._run_captured = run_captured
+        self._replay = replay
+        self._on_commit = on_commit
+        self._on_skip = on_skip
+        self._workers = workers
+        self._lock = threading.RLock()
+        self._results = {}
+        self._futures = {}
+        self._pool = None
+
+    def run(self)-> bool:
+        """Run every step, returning True only if all of them succeeded"""
+
+        success = True
+        with ThreadPoolExecutor(max_workers=self._workers) as pool:
+            self._pool = pool
+            self._launch_ready()
+
+            for step in self._steps:
+                succeeded = self._commit(step)
+                success = success and succeeded
+                if self._on_commit is not None:
+                    self._on_commit(step, succeeded)
+
+        return success
+
+    def _is_ready(self, step: InstallStep)-> bool:
+        return all(self._results.get(name) is True for name in step.depends_on)
+
+    def _launch_ready(self):
+        with self._lock:
+            for step in self._steps:
+                if step.inline or step.name in self._futures or step.name in self._results:
+                    continue
+                if self._is_ready(step):
+                    self._submit(step)
+
+    def _submit(self, step: InstallStep):
+        with self._lock:
+            future = self._futures.get(step.name)
+            if future is None:
+                future = self._pool.submit(self._run_captured, step.run)
+                self._futures[step.name] = future
+                future.add_done_callback(lambda done, finished=step: self._on_done(finished, done))
+            return future
+
+    def _on_done(self, step: InstallStep, future):
+        succeeded = future.exception() is None and bool(future.result()[0])
+        self._set_result(step, succeeded)
+
+    def _set_result(self, step: InstallStep, succeeded):
+        with self._lock:
+            self._results[step.name] = succeeded
+        self._launch_ready()
+
+    def _commit(self, step: InstallStep)-> bool:
+        with self._lock:
+            ready = self._is_ready(step)
+            unmet = [name for name in step.depends_on if self._results.get(name) is not True]
+
+        if not ready:
+            self._set_result(step, None)
+            if self._on_skip is not None:
+                self._on_skip(step, unmet)
+            return False
+
+        if step.inline:
+            succeeded = bool(step.run())
+            self._set_result(step, succeeded)
+            return succeeded
+
+        succeeded, records = self._submit(step).result()
+        # The done callback may still be on its way, a later inline step reads this result now
+        self._set_result(step, bool(succeeded))
+        self._replay(records)
+        return bool(succeeded)
+
 class LogType(Enum):
     INFO = 0
     WARNING = 1
@@ -482,14 +1001,19 @@ class ToolInstaller:
     def __init__(self):
         self._app_path = get_app_path()
         self._project_path = get_project_path(self._app_path)
-        self._uproject_path = get_uproject_path(self._project_path)
+        self._discovery_cache = DiscoveryCache(self._app_path.joinpath("Config", DISCOVERY_CACHE_FILE_NAME))
+        self._credential_validator = CredentialValidator()
+        self._uproject_path = get_uproject_path(self._project_path, cache=self._discovery_cache)
         self._log_file_path = self._app_path.joinpath("Logs", "installer.log")
 
         if not self._log_file_path.exists():
             self._log_file_path.parent.mkdir(parents=True, exist_ok=True)
             self._log_file_path.touch(exist_ok=True)
 
-        self._buffered_log = ""
+        self._log_buffer = []
+        self._log_capture = threading.local()
+        self._ui_queue = queue.Queue()
+        self._ui_thread = threading.current_thread()
 
         self.root = tk.Tk()
         self._configure_styles()
@@ -638,6 +1162,13 @@ class ToolInstaller:
         self.install_btn.pack(side=tk.RIGHT, padx=5)
 
     def _add_link(self, text: str, url: str):
+        self._emit(self._write_link, text, url)
+
+    def _write_link(self, text: str, url: str):
+        self._log_buffer.append(f"LINK: {text.strip()} -> {url}\n")
+        self._ui_queue.put(("link", text, url))
+
+    def _insert_link(self, text: str, url: str):
         tag_name = f"link_{id(url)}"
 
         self.status_text.tag_configure(
@@ -653,8 +1184,6 @@ class ToolInstaller:
         self.status_text.configure(state=tk.NORMAL)
         self.status_text.insert(tk.END, text, tag_name)
         self.status_text.configure(state=tk.DISABLED)
-
-        self._buffered_log += f"LINK: {text.strip()} -> {url}\n"
         
     def _check_project_structure(self)-> bool:
         """Check if the project structure is correct"""
@@ -684,7 +1213,7 @@ class ToolInstaller:
         self._header_log("Step 3: Checking for correct P4, and P4V installation...")
         
         self._info_log("Checking for p4 CLI...")
-        p4_path = get_p4_path()
+        p4_path = get_p4_path(on_search=self._log_search, cache=self._discovery_cache)
         if p4_path is None:
             self._error_log("p4 CLI not found.")
             self._warning_log("p4 CLI is required to run the installer. Please install it and try again.")
@@ -693,7 +1222,7 @@ class ToolInstaller:
         self._success_log("p4 CLI found at: " + str(p4_path))
 
         self._info_log("Checking for p4v...")
-        p4v_path = get_p4v_path()
+        p4v_path = get_p4v_path(on_search=self._log_search, cache=self._discovery_cache)
         if p4v_path is None:
             self._error_log("p4v not found.")
             self._warning_log("p4v is required to run the installer. Please install it and try again.")
@@ -702,6 +1231,18 @@ class ToolInstaller:
         self._success_log("p4v found at: " + str(p4v_path))
 
         return True
+
+    def _log_latency(self, validation: ValidationResult):
+        """Report how long the server took to answer, a slow answer usually means a remote or wrong port"""
+        if validation.latency is None:
+            return
+        self._dim_log(f"Server round-trip: {validation.latency * 1000:.0f} ms")
+
+    def _log_search(self, result: LocatorResult):
+        """Report where an executable search ended and what it cost"""
+        if result.scanned_dirs == 0:
+            return
+        self._dim_log(f"Scanned {result.scanned_dirs} directories in {result.elapsed:.2f}s")
         
     def _setup_p4_config(self)-> bool:
         """Check if the p4 config file exists"""
@@ -709,7 +1250,7 @@ class ToolInstaller:
         self._header_log("Step 2: Setting up p4config credentials")
         self._info_log("Searching for p4 config file...")
 
-        config_path = get_p4_config_path(self._project_path)
+        config_path = get_p4_config_path(self._project_path, cache=self._discovery_cache)
 
         if config_path is None or not config_path.is_file():
             self._warning_log("No .p4config file found, creating one...")
@@ -719,7 +1260,9 @@ class ToolInstaller:
         else:
             self._success_log("Found .p4config file")
             self._info_log("Validating credentials in .p4config file...")
-            if check_p4_connection():
+            validation = self._credential_validator.validate(get_p4_config_file_vars(config_path))
+            self._log_latency(validation)
+            if validation.valid:
                 self._success_log(".p4config credentials are valid.")
                 return True
             else:
@@ -729,12 +1272,14 @@ class ToolInstaller:
 
         self._warning_log("Credentials are still needed, user input required.")
 
-        result = P4ConfigUI(self.root, file_variables).result
+        dialog = self._call_on_ui_thread(lambda: P4ConfigUI(self.root, file_variables, self._credential_validator))
+        result = dialog.result
 
         if result is None or len(result) != 3:
             self._error_log("Failed to obtain credentials from user input, aborting installation.")
             return False
 
+        self._log_latency(ValidationResult(True, dialog.latency))
         self._info_log("Setting config file with credentials.")
         set_config_file(config_path, result)
         self._success_log(".p4config credentials set successfully.")
@@ -782,12 +1327,12 @@ class ToolInstaller:
             log_file.write("")
             
     def _flush_to_log_file(self):
-        if self._buffered_log == "":
+        if not self._log_buffer:
             return
-        
+
+        lines, self._log_buffer = self._log_buffer, []
         with open(self._log_file_path, "a") as log_file:
-            log_file.write(self._buffered_log)
-            self._buffered_log = ""
+            log_file.write("".join(lines))
 
     def _header_log(self, message: str):
         self._log(f"  ▶ {message}", log_type=LogType.HEADER)
@@ -808,14 +1353,90 @@ class ToolInstaller:
         self._log(f"  - {message}", log_type=LogType.DIM)
 
     def _log(self, message: str, log_type: LogType):
-        
+        self._emit(self._write_log, message, log_type)
+
+    def _emit(self, writer, *args):
+        """Write now, or hold the write back while a step runs with its logs captured"""
+        records = getattr(self._log_capture, "records", None)
+        if records is not None:
+            records.append((writer, args))
+            return
+        writer(*args)
+
+    def _run_captured(self, step)-> tuple[bool, list]:
+        """Run a step on a worker thread, collecting its log writes instead of touching the UI"""
+        self._log_capture.records = []
+        try:
+            succeeded = step()
+        finally:
+            records = self._log_capture.records
+            self._log_capture.records = None
+        return succeeded, records
+
+    @staticmethod
+    def _replay(records: list):
+        for writer, args in records:
+            writer(*args)
+
+    def _write_log(self, message: str, log_type: LogType):
+        self._log_buffer.append(f"{log_type.name}: {message[4:]}\n")
+        self._ui_queue.put(("log", message, log_type))
+
+    def _call_on_ui_thread(self, func):
+        """Run func on the Tk thread and wait for its result, Tk widgets can only be used from there"""
+        if threading.current_thread() is self._ui_thread:
+            return func()
+
+        future = Future()
+        self._ui_queue.put(("call", func, future))
+        return future.result()
+
+    def _pump_ui_queue(self):
+        """Drain queued UI work in batches, rescheduling first so dialogs opened from here keep the pump alive"""
+        self.root.after(LOG_PUMP_INTERVAL_MS, self._pump_ui_queue)
+
+        lines = []
+        for _ in range(LOG_BATCH_SIZE):
+            try:
+                record = self._ui_queue.get_nowait()
+            except queue.Empty:
+                break
+
+            kind = record[0]
+            if kind == "log":
+                lines.extend((f"{record[1]}\n", record[2].name))
+                continue
+
+            self._insert_lines(lines)
+            lines = []
+            if kind == "link":
+                self._insert_link(record[1], record[2])
+            elif kind == "call":
+                self._run_ui_call(record[1], record[2])
+
+        self._insert_lines(lines)
+
+    @staticmethod
+    def _run_ui_call(func, future: Future):
+        try:
+            future.set_result(func())
+        except Exception as e:
+            future.set_exception(e)
+
+    def _insert_lines(self, lines: list):
+        """Insert a batch of (text, tag) pairs with one widget update, dropping the oldest lines past the cap"""
+        if not lines:
+            return
+
         self.status_text.configure(state=tk.NORMAL)
-        self.status_text.insert(tk.END, f"{message}\n", log_type.name)
+        self.status_text.insert(tk.END, *lines)
+
+        line_count = int(self.status_text.index("end-1c").split(".")[0])
+        if line_count > MAX_LOG_LINES:
+            self.status_text.delete("1.0", f"{line_count - MAX_LOG_LINES + 1}.0")
+
         self.status_text.see(tk.END)
         self.status_text.configure(state=tk.DISABLED)
-
-        self._buffered_log += f"{log_type.name}: {message[4:]}\n"
-        self.root.update_idletasks()
     
     def _finish(self, success=True):
         self._log("", log_type=LogType.INFO)
@@ -831,16 +1452,17 @@ class ToolInstaller:
 
         self._log("="*48, log_type=LogType.INFO)
         self._flush_to_log_file()
+        self._discovery_cache.save()
 
     def _on_install_clicked(self):
         self.install_btn.configure(state=tk.DISABLED)
         self.status_text.configure(state=tk.NORMAL)
         self.status_text.delete(1.0, tk.END)
         self.status_text.configure(state=tk.DISABLED)
-        self.install()
+        threading.Thread(target=self.install, daemon=True).start()
 
     def install(self):
-        """Install the tool"""
+        """Install the tool, called from a worker thread so the window stays responsive"""
 
         try:
             self._clean_log_file()
@@ -850,17 +1472,24 @@ class ToolInstaller:
             self._log("=" * 48, log_type=LogType.INFO)
             self._log("", log_type=LogType.INFO)
 
+            # The p4config step can ask for credentials, so its logs are written live.
+            # The custom tool is only written once the credentials were accepted
             installation_steps = [
-                self._check_project_structure,
-                self._setup_p4_config,
-                self._check_p4,
-                self._setup_custom_tool]
-
-            for step in installation_steps:
-                self._flush_to_log_file()
-                if not step():
-                    self._finish(success=False)
-                    return
+                InstallStep("structure", self._check_project_structure),
+                InstallStep("p4config", self._setup_p4_config, ("structure",), inline=True),
+                InstallStep("p4", self._check_p4),
+                InstallStep("custom_tool", self._setup_custom_tool, ("structure", "p4config", "p4"))]
+
+            scheduler = StepScheduler(
+                installation_steps,
+                self._run_captured,
+                self._replay,
+                on_commit=lambda step, succeeded: self._flush_to_log_file(),
+                on_skip=lambda step, unmet: self._warning_log(f"Skipped {step.name}: {', '.join(unmet)} did not succeed"))
+
+            if not scheduler.run():
+                self._finish(success=False)
+                return
 
             self._finish(success=True)
 
@@ -869,6 +1498,7 @@ class ToolInstaller:
             self._finish(success=False)
     
     def run(self):
+        self.root.after(LOG_PUMP_INTERVAL_MS, self._pump_ui_queue)
         self.root.mainloop()
 
 if __name__ == "__main__":
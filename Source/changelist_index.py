@@ -0,0 +1,280 @@
+"""Local index of submitted changelists.
+
+Submitted changelists never change, so once a changelist and its files are known they are
+kept in a SQLite database and the server is only asked about changelists newer (or older)
+than the range already indexed. The sync script calls the command line below and reads
+the JSON it prints.
+
+    python changelist_index.py --db Config/changelists.db files --from 100 --to 250 --ext .cpp .h
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+
+from p4_session import P4Error, P4Session
+
+INDEX_SCHEMA_VERSION = 2
+INDEX_TIME_OUT = 120
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS changelists (
+    change INTEGER PRIMARY KEY,
+    user TEXT,
+    client TEXT,
+    time INTEGER,
+    description TEXT
+);
+CREATE TABLE IF NOT EXISTS files (
+    change INTEGER NOT NULL,
+    depot_file TEXT NOT NULL,
+    revision INTEGER,
+    action TEXT,
+    PRIMARY KEY (change, depot_file)
+);
+CREATE INDEX IF NOT EXISTS files_by_change ON files (change);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+class ChangelistIndex:
+    """Changelists and their files between the low and high water marks, for one path"""
+
+    def __init__(self, db_path, session: P4Session, path="//..."):
+        self._session = session
+        self._path = path
+        self._db = sqlite3.connect(str(db_path))
+        self._db.executescript(SCHEMA)
+
+        if self._meta("schema") != str(INDEX_SCHEMA_VERSION) or self._meta("path") != path:
+            self._reset()
+
+    def close(self):
+        self._db.close()
+
+    def _meta(self, key: str, default=None):
+        row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set_meta(self, key: str, value):
+        self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def _reset(self):
+        with self._db:
+            self._db.execute("DELETE FROM files")
+            self._db.execute("DELETE FROM changelists")
+            self._db.execute("DELETE FROM meta")
+            self._set_meta("schema", INDEX_SCHEMA_VERSION)
+            self._set_meta("path", self._path)
+
+    @property
+    def low_water(self)-> int:
+        """First changelist number covered by the index, 0 when empty"""
+        return int(self._meta("low_water", 0))
+
+    @property
+    def high_water(self)-> int:
+        """Last changelist number covered by the index, 0 when empty"""
+        return int(self._meta("high_water", 0))
+
+    def covers(self, from_change: int, to_change: int)-> bool:
+        """True if every changelist after from_change up to to_change is indexed"""
+        return self.high_water > 0 and self.low_water <= from_change + 1 and to_change <= self.high_water
+
+    def update(self, to_change: int | None=None, since: int=0)-> int:
+        """Fetch the changelists after since up to to_change that are not indexed yet.
+
+        Returns how many changelists were added.
+        """
+
+        low, high = self.low_water, self.high_water
+        ranges = []
+
+        if high == 0:
+            # Without a starting point only the newest changelist is indexed, never the whole history
+            if not since and to_change is None:
+                to_change = max(self._latest_change(), 1)
+            start = since + 1 if since else to_change
+            ranges.append((start, to_change))
+        else:
+            if since + 1 < low:
+                ranges.append((since + 1, low - 1))
+            if to_change is None or to_change > high:
+                ranges.append((high + 1, to_change))
+
+        added = 0
+        for start, end in ranges:
+            if end is not None and start > end:
+                continue
+
+            changes = self._submitted_changes(start, end)
+            added += self._store(changes, start, end)
+
+            found_high = max((int(record["change"]) for record in changes), default=start - 1)
+            low = start if low == 0 else min(low, start)
+            high = max(high, end if end is not None else found_high)
+
+        if high > 0:
+            with self._db:
+                self._set_meta("low_water", low)
+                self._set_meta("high_water", high)
+        return added
+
+    def _latest_change(self)-> int:
+        result = self._session.run("changes", "-m1", "-s", "submitted", self._path)
+        return max((int(change) for change in result.values("change")), default=0)
+
+    def _range(self, start: int, end: int | None)-> str:
+        upper = f"@{end}" if end is not None else "#head"
+        return f"{self._path}@{start},{upper}"
+
+    def _submitted_changes(self, start: int, end: int | None)-> list[dict]:
+        """p4 changes -l records of the range, oldest first"""
+
+        result = self._session.run("changes", "-l", "-s", "submitted", self._range(start, end))
+        if not result.ok and not _only_no_such_file(result.errors):
+            raise P4Error("; ".join(result.errors) or "p4 changes failed")
+        records = [record for record in result.records if "change" in record]
+        return sorted(records, key=lambda record: int(record["change"]))
+
+    def _store(self, changes: list[dict], start: int, end: int | None)-> int:
+        if not changes:
+            return 0
+
+        # p4 files -a only lists revisions under the path and in the client view, p4 describe
+        # would list every file of the changelist, other streams included
+        result = self._session.run("files", "-a", self._range(start, end))
+        if not result.ok and not _only_no_such_file(result.errors):
+            raise P4Error("; ".join(result.errors) or "p4 files failed")
+
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO changelists (change, user, client, time, description) VALUES (?, ?, ?, ?, ?)",
+                [(int(record["change"]), record.get("user", ""), record.get("client", ""),
+                  int(record.get("time", 0) or 0), record.get("desc", "").strip()) for record in changes])
+            self._db.executemany(
+                "INSERT OR REPLACE INTO files (change, depot_file, revision, action) VALUES (?, ?, ?, ?)",
+                [(int(record["change"]), record["depotFile"], int(record.get("rev", 0) or 0), record.get("action", ""))
+                 for record in result.records if "depotFile" in record and "change" in record])
+        return len(changes)
+
+    def files(self, from_change: int, to_change: int, extensions=())-> list[dict]:
+        """Files submitted after from_change up to to_change, optionally only some extensions"""
+
+        query = (
+            "SELECT f.depot_file, f.revision, f.action, f.change, c.user, c.description "
+            "FROM files f JOIN changelists c ON c.change = f.change "
+            "WHERE f.change > ? AND f.change <= ?")
+        parameters = [from_change, to_change]
+
+        if extensions:
+            query += " AND (" + " OR ".join("lower(f.depot_file) LIKE ?" for _ in extensions) + ")"
+            parameters += [f"%{extension.lower()}" for extension in extensions]
+
+        query += " ORDER BY f.change DESC, f.depot_file"
+        return [
+            {
+                "depotFile": depot_file,
+                "revision": revision,
+                "action": action,
+                "change": change,
+                "user": user,
+                "description": _first_line(description),
+            }
+            for depot_file, revision, action, change, user, description in self._db.execute(query, parameters)
+        ]
+
+    def summary(self, from_change: int, to_change: int)-> dict:
+        """Counts of what landed after from_change up to to_change"""
+
+        changelists, users = self._db.execute(
+            "SELECT count(*), count(DISTINCT user) FROM changelists WHERE change > ? AND change <= ?",
+            (from_change, to_change)).fetchone()
+        actions = dict(self._db.execute(
+            "SELECT action, count(*) FROM files WHERE change > ? AND change <= ? GROUP BY action ORDER BY action",
+            (from_change, to_change)).fetchall())
+        return {
+            "changelists": changelists,
+            "users": users,
+            "files": sum(actions.values()),
+            "actions": actions,
+        }
+
+    def trigger(self, from_change: int, to_change: int, extensions=())-> list[dict]:
+        """The changelists in the range that touched files with the extensions, newest first"""
+
+        triggers = {}
+        for file in self.files(from_change, to_change, extensions):
+            entry = triggers.setdefault(file["change"], {
+                "change": file["change"],
+                "user": file["user"],
+                "description": file["description"],
+                "files": 0,
+            })
+            entry["files"] += 1
+        return list(triggers.values())
+
+def _first_line(text: str)-> str:
+    return text.strip().splitlines()[0] if text and text.strip() else ""
+
+def _only_no_such_file(errors: list[str])-> bool:
+    return all("no such file" in error or "no file(s)" in error for error in errors)
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description="Local index of submitted Perforce changelists")
+    parser.add_argument("--db", required=True, help="SQLite database file")
+    parser.add_argument("--path", default="//...", help="Depot or local path the index covers")
+    parser.add_argument("--timeout", type=float, default=INDEX_TIME_OUT)
+
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    update = commands.add_parser("update", help="Fetch changelists that are not indexed yet")
+    update.add_argument("--since", type=int, default=0)
+    update.add_argument("--to", type=int, default=None)
+
+    for name in ("files", "summary", "trigger"):
+        command = commands.add_parser(name)
+        command.add_argument("--from", dest="from_change", type=int, required=True)
+        command.add_argument("--to", dest="to_change", type=int, required=True)
+        command.add_argument("--update", action="store_true", help="Fetch the range first if needed")
+        if name != "summary":
+            command.add_argument("--ext", nargs="*", default=[])
+
+    return parser.parse_args(argv)
+
+def main(argv=None, session=None)-> int:
+    args = _parse_args(argv)
+    session = session or P4Session(cwd=os.getcwd(), timeout=args.timeout)
+
+    index = ChangelistIndex(args.db, session, args.path)
+    try:
+        if args.command == "update":
+            added = index.update(args.to, args.since)
+            output = {"added": added, "lowWater": index.low_water, "highWater": index.high_water}
+        else:
+            added = 0
+            if args.update and not index.covers(args.from_change, args.to_change):
+                added = index.update(args.to_change, args.from_change)
+
+            if args.command == "files":
+                output = index.files(args.from_change, args.to_change, args.ext)
+            elif args.command == "trigger":
+                output = index.trigger(args.from_change, args.to_change, args.ext)
+            else:
+                output = index.summary(args.from_change, args.to_change)
+                output["added"] = added
+    except P4Error as error:
+        print(json.dumps({"error": str(error)}), file=sys.stderr)
+        return 1
+    finally:
+        index.close()
+
+    print(json.dumps(output))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
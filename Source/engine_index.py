@@ -0,0 +1,291 @@
+"""Index of the Unreal Engine installations on this machine and the one a project asks for.
+
+Engines come from the Epic launcher's LauncherInstalled.dat, the source builds registered
+with UnrealVersionSelector (Install.ini on Linux and Mac; on Windows the sync script reads
+them from the registry and passes them with --registered) and the UE_* folders under the
+search roots. Exact versions come from Engine/Build/Build.version. The .uproject
+EngineAssociation is matched against them: a {GUID} names a registered build, "5.3" a
+launcher install or any engine of that version, and an empty one the engine the project
+lives in.
+
+The index is cached with the size and mtime of every file and folder it was read from, so
+while none of them changed the engine is resolved without parsing anything.
+
+    python engine_index.py --index Config/engine_index.json --project C:/P/Game/Game.uproject
+    python engine_index.py --index Config/engine_index.json --project Game.uproject --registered {GUID}=D:/UE5
+"""
+
+import argparse
+import configparser
+import json
+import os
+import re
+import sys
+
+INDEX_VERSION = 1
+
+LAUNCHER_INSTALLED_FILE = os.path.join(os.environ.get("PROGRAMDATA", r"C:\ProgramData"),
+                                       "Epic", "UnrealEngineLauncher", "LauncherInstalled.dat")
+# UnrealVersionSelector keeps source builds here outside Windows
+INSTALL_INI_FILES = (
+    os.path.join(os.path.expanduser("~"), ".config", "Epic", "UnrealEngine", "Install.ini"),
+    os.path.join(os.path.expanduser("~"), "Library", "Application Support", "Epic", "UnrealEngine", "Install.ini"),
+)
+
+BUILD_VERSION_FILE = os.path.join("Engine", "Build", "Build.version")
+# Same folder names the interactive search lists
+ENGINE_FOLDER_PATTERN = re.compile(r"^(UE|UnrealEngine)[_\s-]?[\d.]+", re.IGNORECASE)
+VERSION_ASSOCIATION_PATTERN = re.compile(r"^\d+\.\d+$")
+
+# Preferred source when several engines satisfy the same association
+SOURCE_ORDER = ("config", "launcher", "registered", "search")
+
+def fingerprint(path: str):
+    """[size, mtime_ns] of a file or folder, None when it does not exist"""
+
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+def read_build_version(engine_root: str)-> dict | None:
+    """Major, minor, patch, changelist and branch from Engine/Build/Build.version"""
+
+    try:
+        with open(os.path.join(engine_root, BUILD_VERSION_FILE), encoding="utf-8-sig") as version_file:
+            data = json.load(version_file)
+        major, minor, patch = (int(data.get(key, 0)) for key in ("MajorVersion", "MinorVersion", "PatchVersion"))
+    except (OSError, ValueError, TypeError, AttributeError):
+        return None
+    return {
+        "version": f"{major}.{minor}.{patch}",
+        "major": major,
+        "minor": minor,
+        "patch": patch,
+        "changelist": int(data.get("Changelist", 0) or 0),
+        "branch": data.get("BranchName", ""),
+    }
+
+def launcher_installations(path: str)-> list[tuple[str, str]]:
+    """(AppName, InstallLocation) of every engine the Epic launcher installed"""
+
+    try:
+        with open(path, encoding="utf-8-sig") as launcher_file:
+            data = json.load(launcher_file)
+    except (OSError, ValueError):
+        return []
+    installations = []
+    for entry in data.get("InstallationList", []) if isinstance(data, dict) else []:
+        app_name = entry.get("AppName", "")
+        location = entry.get("InstallLocation", "")
+        # The launcher lists plugins and games too, only UE_x.y entries are engines
+        if app_name.startswith("UE_") and location:
+            installations.append((app_name, location))
+    return installations
+
+def registered_builds(path: str)-> list[tuple[str, str]]:
+    """(id, path) of the source builds in an UnrealVersionSelector Install.ini"""
+
+    parser = configparser.ConfigParser(interpolation=None, strict=False)
+    parser.optionxform = str
+    try:
+        parser.read(path, encoding="utf-8-sig")
+    except (OSError, configparser.Error):
+        return []
+    if not parser.has_section("Installations"):
+        return []
+    return [(build_id, location) for build_id, location in parser.items("Installations") if location]
+
+def search_root_engines(root: str)-> list[tuple[str, str]]:
+    """(folder name, path) of the UE_* folders directly under root"""
+
+    try:
+        entries = sorted(os.scandir(root), key=lambda entry: entry.name.lower())
+    except OSError:
+        return []
+    return [(entry.name, entry.path) for entry in entries
+            if entry.is_dir() and ENGINE_FOLDER_PATTERN.match(entry.name)]
+
+def _same_path(left: str, right: str)-> bool:
+    return os.path.normcase(os.path.abspath(left)) == os.path.normcase(os.path.abspath(right))
+
+def build_index(launcher_file: str, install_ini_files, registered, search_roots, preferred=None)-> dict:
+    """Every engine with a readable Build.version, and the fingerprints of what was read"""
+
+    fingerprints = {}
+    candidates = []
+    if preferred:
+        candidates.append(("config", "", preferred))
+
+    fingerprints[launcher_file] = fingerprint(launcher_file)
+    candidates += [("launcher", app_name, location) for app_name, location in launcher_installations(launcher_file)]
+
+    for ini_file in install_ini_files:
+        fingerprints[ini_file] = fingerprint(ini_file)
+        candidates += [("registered", build_id, location) for build_id, location in registered_builds(ini_file)]
+    candidates += [("registered", build_id, location) for build_id, location in registered]
+
+    for root in search_roots:
+        # A new or removed engine folder changes the mtime of its parent
+        fingerprints[root] = fingerprint(root)
+        candidates += [("search", name, location) for name, location in search_root_engines(root)]
+
+    engines = []
+    for source, engine_id, location in candidates:
+        existing = next((engine for engine in engines if _same_path(engine["path"], location)), None)
+        if existing is not None:
+            # Keep the launcher name or the build id when the same engine shows up twice
+            if engine_id and not existing["id"]:
+                existing["id"] = engine_id
+            continue
+        version_file = os.path.join(location, BUILD_VERSION_FILE)
+        fingerprints[version_file] = fingerprint(version_file)
+        version = read_build_version(location)
+        if version is None:
+            continue
+        engines.append({"id": engine_id, "path": location, "source": source, **version})
+
+    return {"engines": engines, "fingerprints": fingerprints}
+
+def _sources_key(launcher_file: str, install_ini_files, registered, search_roots, preferred)-> list:
+    return [launcher_file, list(install_ini_files), [list(pair) for pair in registered], list(search_roots), preferred or ""]
+
+def load_index(path: str, key: list)-> dict | None:
+    """Cached index for the same sources, None when missing or any fingerprint changed"""
+
+    try:
+        with open(path, encoding="utf-8") as index_file:
+            data = json.load(index_file)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("version") != INDEX_VERSION or data.get("key") != key:
+        return None
+    for cached_path, cached_fingerprint in data.get("fingerprints", {}).items():
+        if fingerprint(cached_path) != cached_fingerprint:
+            return None
+    return data
+
+def save_index(path: str, key: list, index: dict):
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as index_file:
+        json.dump({"version": INDEX_VERSION, "key": key, **index}, index_file, separators=(",", ":"))
+    os.replace(temporary, path)
+
+def engine_association(project_file: str)-> str:
+    """EngineAssociation of a .uproject, empty when it is not set"""
+
+    with open(project_file, encoding="utf-8-sig") as project:
+        return str(json.load(project).get("EngineAssociation", "") or "").strip()
+
+def containing_engine(project_file: str)-> str | None:
+    """Engine root the project lives in, for projects inside a source build"""
+
+    directory = os.path.dirname(os.path.abspath(project_file))
+    while True:
+        if os.path.isfile(os.path.join(directory, BUILD_VERSION_FILE)):
+            return directory
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+def match_engine(engines: list[dict], association: str, project_file: str, preferred=None)-> dict | None:
+    """Engine the association asks for; the configured one wins when it satisfies it"""
+
+    if not association:
+        root = containing_engine(project_file)
+        if root is None:
+            return None
+        matches = [engine for engine in engines if _same_path(engine["path"], root)]
+        if not matches:
+            version = read_build_version(root)
+            matches = [{"id": "", "path": root, "source": "project", **version}] if version else []
+        reason = "project is inside the engine"
+    elif VERSION_ASSOCIATION_PATTERN.match(association):
+        matches = [engine for engine in engines
+                   if f"{engine['major']}.{engine['minor']}" == association or engine["id"] == f"UE_{association}"]
+        reason = f"EngineAssociation {association}"
+    else:
+        matches = [engine for engine in engines if engine["id"].lower() == association.lower()]
+        reason = f"registered build {association}"
+
+    if not matches:
+        return None
+
+    configured = [engine for engine in matches if preferred and _same_path(engine["path"], preferred)]
+    if configured:
+        return {**configured[0], "reason": f"{reason}, configured engine"}
+
+    best = max(matches, key=lambda engine: (
+        -SOURCE_ORDER.index(engine["source"]) if engine["source"] in SOURCE_ORDER else -len(SOURCE_ORDER),
+        engine["patch"],
+        engine["changelist"],
+    ))
+    return {**best, "reason": reason}
+
+def resolve(index_path: str, project_file: str, launcher_file: str=LAUNCHER_INSTALLED_FILE,
+            install_ini_files=INSTALL_INI_FILES, registered=(), search_roots=(), preferred=None,
+            refresh: bool=False)-> dict:
+    """Engines on the machine and the one the project needs, from the cache when it is current"""
+
+    key = _sources_key(launcher_file, install_ini_files, registered, search_roots, preferred)
+    index = None if refresh else load_index(index_path, key)
+    cached = index is not None
+    if index is None:
+        index = build_index(launcher_file, install_ini_files, registered, search_roots, preferred)
+        save_index(index_path, key, index)
+
+    association = engine_association(project_file)
+    return {
+        "engines": index["engines"],
+        "association": association,
+        "match": match_engine(index["engines"], association, project_file, preferred),
+        "cached": cached,
+    }
+
+def _registered_pair(value: str)-> tuple[str, str]:
+    build_id, separator, location = value.partition("=")
+    if not separator or not build_id or not location:
+        raise argparse.ArgumentTypeError(f"expected ID=PATH, got {value}")
+    return build_id, location
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description="Find the Unreal Engine a project is associated with")
+    parser.add_argument("--index", required=True, help="Cache file for the engine index")
+    parser.add_argument("--project", required=True, help=".uproject file whose EngineAssociation is matched")
+    parser.add_argument("--launcher-file", dest="launcher_file", default=LAUNCHER_INSTALLED_FILE,
+                        help="Epic launcher LauncherInstalled.dat")
+    parser.add_argument("--install-ini", dest="install_ini", action="append", default=None,
+                        help="UnrealVersionSelector Install.ini, can be repeated")
+    parser.add_argument("--registered", action="append", type=_registered_pair, default=[],
+                        help="Registered source build as ID=PATH, can be repeated")
+    parser.add_argument("--search-root", dest="search_roots", action="append", default=[],
+                        help="Folder holding UE_* engine folders, can be repeated")
+    parser.add_argument("--preferred", default=None, help="Engine already configured, kept when it matches")
+    parser.add_argument("--refresh", action="store_true", help="Ignore the cache and read everything again")
+    return parser.parse_args(argv)
+
+def main(argv=None)-> int:
+    args = _parse_args(argv)
+
+    try:
+        output = resolve(
+            args.index,
+            args.project,
+            launcher_file=args.launcher_file,
+            install_ini_files=args.install_ini if args.install_ini is not None else INSTALL_INI_FILES,
+            registered=args.registered,
+            search_roots=args.search_roots,
+            preferred=args.preferred,
+            refresh=args.refresh,
+        )
+    except (OSError, ValueError) as error:
+        print(json.dumps({"error": str(error)}), file=sys.stderr)
+        return 1
+
+    print(json.dumps(output))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""Which Unreal modules a set of changed files belongs to, and whether they need a build.
+
+Every changed file is classified by extension as compile-affecting, config-only or
+script-only. Compile-affecting files are mapped to the workspace with one batched
+p4 where and owned by the nearest *.Build.cs above them; the nearest .uplugin names the
+plugin. The sync script skips the build when no compiled module is touched. With --local
+the files are workspace paths already (the local edits the source manifest found) and p4
+is not asked.
+
+    python module_resolver.py --root C:/Project --files-from changed_files.txt
+    python module_resolver.py --root C:/Project --local Source/MyGame/Private/Player.cpp
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from p4_session import P4Error, P4Session
+
+RESOLVER_TIME_OUT = 60
+
+# Source, rules and descriptors UBT reads; .cs covers *.Build.cs and *.Target.cs
+COMPILE_EXTENSIONS = (".cpp", ".cc", ".c", ".h", ".hpp", ".inl", ".ispc", ".rc", ".cs", ".uplugin", ".uproject")
+CONFIG_EXTENSIONS = (".ini",)
+SCRIPT_EXTENSIONS = (".py",)
+
+CATEGORIES = ("compile", "config", "script", "other")
+
+BUILD_RULES_SUFFIX = ".build.cs"
+PLUGIN_SUFFIX = ".uplugin"
+
+def classify(path: str)-> str:
+    """compile, config, script or other, from the file extension"""
+
+    name = path.lower()
+    if name.endswith(COMPILE_EXTENSIONS):
+        return "compile"
+    if name.endswith(CONFIG_EXTENSIONS):
+        return "config"
+    if name.endswith(SCRIPT_EXTENSIONS):
+        return "script"
+    return "other"
+
+class ModuleResolver:
+    """Maps depot files to the module and plugin that own them in the workspace"""
+
+    def __init__(self, session: P4Session, root=None):
+        self.session = session
+        self.root = os.path.normcase(os.path.abspath(root)) if root else None
+        # (directory, suffix) -> (name, path) of the nearest match, or None
+        self._nearest = {}
+
+    def local_paths(self, depot_files: list[str])-> dict:
+        """Workspace path of every mapped depot file, one p4 where for all of them"""
+
+        result = self.session.run_batch(("where",), depot_files)
+        paths = {}
+        for record in result.records:
+            if record.get("code") == "stat" and "unmap" not in record and "path" in record:
+                paths[record["depotFile"]] = record["path"]
+        return paths
+
+    def owner(self, local_path: str)-> dict:
+        directory = os.path.dirname(os.path.abspath(local_path))
+        module = self._find_up(directory, BUILD_RULES_SUFFIX)
+        plugin = self._find_up(directory, PLUGIN_SUFFIX)
+        return {
+            "module": module[0] if module else None,
+            "buildFile": module[1] if module else None,
+            "plugin": plugin[0] if plugin else None,
+        }
+
+    def _find_up(self, directory: str, suffix: str):
+        """Nearest file ending in suffix in directory or its parents, up to the root"""
+
+        key = (directory, suffix)
+        if key in self._nearest:
+            return self._nearest[key]
+
+        found = None
+        try:
+            for name in sorted(os.listdir(directory)):
+                if name.lower().endswith(suffix):
+                    found = (name[:-len(suffix)], os.path.join(directory, name))
+                    break
+        except OSError:
+            # Deleted or not synced folders have nothing to list, look further up
+            pass
+
+        parent = os.path.dirname(directory)
+        if found is None and parent != directory and os.path.normcase(directory) != self.root:
+            found = self._find_up(parent, suffix)
+
+        self._nearest[key] = found
+        return found
+
+    def workspace_paths(self, files: list[str])-> dict:
+        """Files that are workspace paths already, relative ones under the root"""
+
+        paths = {}
+        for path in files:
+            if not os.path.isabs(path) and self.root:
+                paths[path] = os.path.join(self.root, *path.split("/"))
+            else:
+                paths[path] = path
+        return paths
+
+    def resolve(self, depot_files: list[str], local: bool=False)-> dict:
+        """Categories, affected modules and plugins, and whether a build is needed"""
+
+        categories = dict.fromkeys(CATEGORIES, 0)
+        compile_files = []
+        for depot_file in depot_files:
+            category = classify(depot_file)
+            categories[category] += 1
+            if category == "compile":
+                compile_files.append(depot_file)
+
+        if local:
+            local = self.workspace_paths(compile_files)
+        else:
+            local = self.local_paths(compile_files) if compile_files else {}
+
+        modules = {}
+        plugins = set()
+        unowned = []
+        for depot_file in compile_files:
+            owner = self.owner(local[depot_file]) if depot_file in local else None
+            if owner and owner["plugin"]:
+                plugins.add(owner["plugin"])
+            if not owner or not owner["module"]:
+                # Target rules, descriptors or files outside any module: build to be safe
+                unowned.append(depot_file)
+                continue
+
+            module = modules.setdefault(owner["module"], {
+                "name": owner["module"],
+                "plugin": owner["plugin"],
+                "buildFile": owner["buildFile"],
+                "files": 0,
+            })
+            module["files"] += 1
+
+        return {
+            "build": bool(modules or unowned),
+            "categories": categories,
+            "modules": sorted(modules.values(), key=lambda module: module["name"].lower()),
+            "plugins": sorted(plugins, key=str.lower),
+            "unowned": unowned,
+        }
+
+def _read_files(path: str)-> list[str]:
+    with open(path, encoding="utf-8-sig") as files:
+        return [line.strip() for line in files if line.strip()]
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description="Map changed depot files to the Unreal modules that own them")
+    parser.add_argument("--root", default=None, help="Project root, the search for Build.cs files stops here")
+    parser.add_argument("--files-from", dest="files_from", help="Text file with one depot path per line")
+    parser.add_argument("--local", action="store_true",
+                        help="Files are workspace paths, absolute or relative to --root, p4 where is not run")
+    parser.add_argument("--timeout", type=float, default=RESOLVER_TIME_OUT)
+    parser.add_argument("files", nargs="*", help="Depot paths")
+    return parser.parse_args(argv)
+
+def main(argv=None, session=None)-> int:
+    args = _parse_args(argv)
+    session = session or P4Session(cwd=args.root or os.getcwd(), timeout=args.timeout)
+
+    try:
+        depot_files = list(args.files) + (_read_files(args.files_from) if args.files_from else [])
+        output = ModuleResolver(session, args.root).resolve(depot_files, local=args.local)
+    except (OSError, P4Error) as error:
+        print(json.dumps({"error": str(error)}), file=sys.stderr)
+        return 1
+
+    print(json.dumps(output))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
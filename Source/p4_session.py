@@ -0,0 +1,303 @@
+"""Perforce session shared by the installer and the Python tools.
+
+Every command runs with -G, so p4 answers with a stream of marshalled dictionaries
+instead of text that has to be split by hand. Commands that take many arguments are
+fed through a single process with -x -, and read-only queries are remembered for the
+life of the session.
+"""
+
+import io
+import marshal
+import subprocess
+import threading
+from dataclasses import dataclass, field
+
+P4_TIME_OUT = 15
+
+# Arguments sent through one -x - process, p4 reads them from stdin
+BATCH_SIZE = 500
+
+# Commands that never change the server or the workspace, their answers can be reused
+READ_ONLY_COMMANDS = frozenset({
+    "changes", "clients", "counter", "counters", "depots", "describe", "dirs", "files",
+    "filelog", "fstat", "have", "info", "opened", "print", "sizes", "streams", "users",
+    "where",
+})
+
+# Spec commands are only read-only when they print the spec
+SPEC_COMMANDS = frozenset({"branch", "change", "client", "label", "stream", "user"})
+
+# Global options that are followed by a value
+_VALUE_OPTIONS = frozenset({"-c", "-C", "-d", "-H", "-p", "-P", "-u", "-x", "-z"})
+
+class P4Error(Exception):
+    """The p4 process could not run or did not finish"""
+
+    def __init__(self, message: str, timed_out=False, cancelled=False):
+        super().__init__(message)
+        self.timed_out = timed_out
+        self.cancelled = cancelled
+
+@dataclass
+class P4Result:
+    """Records returned by one p4 process"""
+    records: list = field(default_factory=list)
+    returncode: int = 0
+
+    @property
+    def errors(self)-> list[str]:
+        return [record.get("data", "").strip() for record in self.records if record.get("code") == "error"]
+
+    @property
+    def ok(self)-> bool:
+        return self.returncode == 0 and not self.errors
+
+    def values(self, name: str)-> list[str]:
+        """Return one field of every record that has it"""
+        return [record[name] for record in self.records if name in record]
+
+class SubprocessRunner:
+    """Run p4 processes, one at a time, with the option to kill the running one"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._process = None
+        self._cancelled = False
+
+    def run(self, argv: list, stdin: bytes | None, timeout: float, cwd=None)-> tuple[int, bytes]:
+        """Run the command line and return its exit code and stdout"""
+
+        try:
+            process = subprocess.Popen(
+                argv,
+                stdin=subprocess.PIPE if stdin is not None else subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                cwd=cwd,
+                creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0))
+        except OSError as error:
+            raise P4Error(f"Could not start p4: {error}") from error
+
+        with self._lock:
+            self._process = process
+            cancelled = self._cancelled
+
+        if cancelled:
+            process.kill()
+
+        try:
+            stdout, _ = process.communicate(stdin, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            raise P4Error(f"p4 did not answer after {timeout}s", timed_out=True)
+        finally:
+            with self._lock:
+                self._process = None
+
+        if self._cancelled:
+            raise P4Error("p4 command cancelled", cancelled=True)
+
+        return process.returncode, stdout
+
+    def cancel(self):
+        """Kill the running process, later commands on this runner fail straight away"""
+
+        with self._lock:
+            self._cancelled = True
+            process = self._process
+
+        if process is not None and process.poll() is None:
+            process.kill()
+
+class P4Session:
+    """Connection settings plus the answers already received from the server"""
+
+    def __init__(self, port="", user="", client="", cwd=None, executable="p4",
+                 timeout=P4_TIME_OUT, runner=None):
+        self.port = port
+        self.user = user
+        self.client = client
+        self.cwd = cwd
+        self.executable = executable
+        self.timeout = timeout
+        self._runner = runner or SubprocessRunner()
+        self._memo = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_credentials(cls, credentials: dict, **kwargs)-> "P4Session":
+        return cls(
+            port=credentials.get("P4PORT", ""),
+            user=credentials.get("P4USER", ""),
+            client=credentials.get("P4CLIENT", ""),
+            **kwargs)
+
+    def _command_line(self, args: tuple, batch=False)-> list:
+        argv = [self.executable, "-G"]
+        for option, value in (("-p", self.port), ("-u", self.user), ("-c", self.client)):
+            if value:
+                argv += [option, value]
+        if batch:
+            argv += ["-x", "-"]
+        return argv + list(args)
+
+    @staticmethod
+    def is_read_only(args: tuple)-> bool:
+        if not args:
+            return False
+        command = args[0]
+        return command in READ_ONLY_COMMANDS or (command in SPEC_COMMANDS and "-o" in args)
+
+    @staticmethod
+    def parse(stdout: bytes)-> list[dict]:
+        """Turn the marshalled output of -G into a list of dictionaries of strings"""
+
+        records = []
+        stream = io.BytesIO(stdout)
+        while True:
+            try:
+                record = marshal.load(stream)
+            except (EOFError, ValueError, TypeError):
+                break
+            records.append({_text(key): _text(value) for key, value in record.items()})
+        return records
+
+    def run(self, *args)-> P4Result:
+        """Run one p4 command, read-only ones are answered from memory after the first time"""
+
+        read_only = self.is_read_only(args)
+        if read_only:
+            with self._lock:
+                cached = self._memo.get(args)
+            if cached is not None:
+                return cached
+
+        returncode, stdout = self._runner.run(self._command_line(args), None, self.timeout, cwd=self.cwd)
+        result = P4Result(self.parse(stdout), returncode)
+
+        if read_only and result.ok:
+            with self._lock:
+                self._memo[args] = result
+        return result
+
+    def run_batch(self, args: tuple, arguments: list, batch_size=BATCH_SIZE)-> P4Result:
+        """Run one command over many arguments, sending them through -x - in chunks"""
+
+        result = P4Result()
+        if not arguments:
+            return result
+
+        for start in range(0, len(arguments), batch_size):
+            chunk = arguments[start:start + batch_size]
+            stdin = "".join(f"{argument}\n" for argument in chunk).encode("utf-8")
+            returncode, stdout = self._runner.run(
+                self._command_line(tuple(args), batch=True), stdin, self.timeout, cwd=self.cwd)
+            result.records.extend(self.parse(stdout))
+            result.returncode = result.returncode or returncode
+        return result
+
+    def get_env_vars(self, names=("P4USER", "P4PORT", "P4CLIENT"))-> dict:
+        """Return the p4 settings that are set, read with a single p4 set"""
+
+        with self._lock:
+            cached = self._memo.get(("set",))
+        if cached is None:
+            returncode, stdout = self._runner.run([self.executable, "set", "-q"], None, self.timeout, cwd=self.cwd)
+            cached = self.parse_set_output(stdout.decode("utf-8", "replace")) if returncode == 0 else {}
+            with self._lock:
+                self._memo[("set",)] = cached
+        return {name: cached[name] for name in names if name in cached}
+
+    @staticmethod
+    def parse_set_output(text: str)-> dict:
+        """Parse NAME=value lines, dropping the (set)/(config) origin suffix p4 may add"""
+
+        variables = {}
+        for line in text.splitlines():
+            name, separator, value = line.partition("=")
+            if not separator or not name.strip():
+                continue
+            value = value.strip()
+            if value.endswith(")") and " (" in value:
+                value = value[:value.rindex(" (")]
+            variables[name.strip()] = value.strip()
+        return variables
+
+    def check_connection(self)-> bool:
+        """Return True if the server accepts these credentials"""
+
+        try:
+            return self.run("client", "-o").ok
+        except P4Error:
+            return False
+
+    def cancel(self):
+        """Kill the running p4 process"""
+        self._runner.cancel()
+
+    def clear(self):
+        """Forget the remembered answers"""
+        with self._lock:
+            self._memo.clear()
+
+def _text(value):
+    if isinstance(value, bytes):
+        return value.decode("utf-8", "replace")
+    return value
+
+class FakeP4Runner:
+    """Stand-in for SubprocessRunner that answers from canned records, no server needed.
+
+    responses maps a command name to a list of records, or to a function that takes the
+    command arguments and the -x - arguments and returns the records. A record with
+    code "error" makes the fake exit with 1, like p4 does.
+    """
+
+    def __init__(self, responses=None, env=None, delay=0.0):
+        self.responses = dict(responses or {})
+        self.env = dict(env or {})
+        self.delay = delay
+        self.calls = []
+        self._cancelled = threading.Event()
+
+    @staticmethod
+    def split(argv: list)-> tuple[list, bool]:
+        """Return the command arguments after the global options, and whether -x - was used"""
+
+        index, batch = 1, False
+        while index < len(argv) and argv[index].startswith("-"):
+            if argv[index] == "-x":
+                batch = True
+            index += 2 if argv[index] in _VALUE_OPTIONS else 1
+        return argv[index:], batch
+
+    def run(self, argv: list, stdin: bytes | None, timeout: float, cwd=None)-> tuple[int, bytes]:
+        self.calls.append(list(argv))
+        args, batch = self.split(argv)
+
+        if self._cancelled.wait(min(self.delay, timeout)):
+            raise P4Error("p4 command cancelled", cancelled=True)
+        if self.delay > timeout:
+            raise P4Error(f"p4 did not answer after {timeout}s", timed_out=True)
+
+        if args and args[0] == "set":
+            text = "".join(f"{name}={value}\n" for name, value in self.env.items())
+            return 0, text.encode("utf-8")
+
+        lines = stdin.decode("utf-8").splitlines() if batch and stdin else []
+        response = self.responses.get(args[0] if args else "", [])
+        records = response(args, lines) if callable(response) else response
+
+        stdout = b"".join(marshal.dumps(_encode(record)) for record in records)
+        failed = any(record.get("code") == "error" for record in records)
+        return (1 if failed else 0), stdout
+
+    def cancel(self):
+        self._cancelled.set()
+
+def _encode(record: dict)-> dict:
+    return {
+        key.encode("utf-8"): value.encode("utf-8") if isinstance(value, str) else value
+        for key, value in record.items()
+    }
@@ -0,0 +1,147 @@
+"""Timing trends from the run history the sync script appends to.
+
+Every run of Main adds one JSON line to Logs/run_history.jsonl with its changelists,
+sync numbers and how long each phase took. The report prints p50, p95 and max per
+phase over the last days, so a slower sync or build shows up without reading logs.
+
+    python run_history.py --history Logs/run_history.jsonl --days 30
+"""
+
+import argparse
+import json
+import math
+import sys
+from datetime import datetime, timedelta, timezone
+
+DEFAULT_DAYS = 30
+
+# Report name and record field of every timed phase, in the order Main runs them; the
+# content sync of a code-first run overlaps the code check and the build
+PHASES = (
+    ("sync", "syncSeconds"),
+    ("content sync", "contentSyncSeconds"),
+    ("code check", "codeCheckSeconds"),
+    ("build", "buildSeconds"),
+    ("ddc prefill", "ddcPrefillSeconds"),
+    ("editor ready", "editorReadySeconds"),
+    ("total", "totalSeconds"),
+)
+
+def load_runs(path, since: datetime | None=None)-> list[dict]:
+    """Read the history, skipping lines that are not valid records and runs before since"""
+
+    runs = []
+    try:
+        with open(path, encoding="utf-8-sig") as history:
+            for line in history:
+                try:
+                    run = json.loads(line)
+                    run["timestamp"] = _parse_timestamp(run["timestamp"])
+                except (ValueError, KeyError, TypeError):
+                    continue
+                if since is None or run["timestamp"] >= since:
+                    runs.append(run)
+    except FileNotFoundError:
+        return []
+    return runs
+
+def _parse_timestamp(text: str)-> datetime:
+    timestamp = datetime.fromisoformat(text)
+    return timestamp if timestamp.tzinfo else timestamp.astimezone()
+
+def percentile(values: list[float], fraction: float)-> float | None:
+    """Nearest-rank percentile, None when there are no values"""
+
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(math.ceil(fraction * len(ordered)), 1)
+    return ordered[rank - 1]
+
+def _timings(runs: list[dict], field: str)-> dict:
+    values = [float(run[field]) for run in runs if isinstance(run.get(field), (int, float))]
+    return {
+        "runs": len(values),
+        "p50": percentile(values, 0.50),
+        "p95": percentile(values, 0.95),
+        "max": max(values, default=None),
+    }
+
+def _synced(run: dict)-> bool:
+    """True when the run brought in new changelists, the only runs a prefill would have helped"""
+
+    from_change, to_change = run.get("fromCL"), run.get("toCL")
+    return isinstance(from_change, int) and isinstance(to_change, int) and to_change > from_change
+
+def summarize(runs: list[dict])-> dict:
+    """p50, p95 and max seconds per phase plus totals for the runs"""
+
+    phases = {name: _timings(runs, field) for name, field in PHASES}
+
+    # Time until the editor was ready after a DDC prefill against runs that synced new
+    # changelists and opened the editor without one; runs that never opened it are left out
+    opened = [run for run in runs if isinstance(run.get("editorReadySeconds"), (int, float))]
+    prefilled = [run for run in opened if isinstance(run.get("ddcPrefillSeconds"), (int, float))]
+    not_prefilled = [run for run in opened if not isinstance(run.get("ddcPrefillSeconds"), (int, float)) and _synced(run)]
+
+    return {
+        "runs": len(runs),
+        "failed": sum(1 for run in runs if not run.get("succeeded")),
+        "builds": sum(1 for run in runs if run.get("buildRan")),
+        # Both phases of a code-first sync count towards what was synced
+        "filesSynced": sum((run.get("filesSynced") or 0) + (run.get("filesContentSynced") or 0) for run in runs),
+        "bytesSynced": sum((run.get("bytesSynced") or 0) + (run.get("bytesContentSynced") or 0) for run in runs),
+        "phases": phases,
+        "editorReady": {
+            "withPrefill": _timings(prefilled, "editorReadySeconds"),
+            "withoutPrefill": _timings(not_prefilled, "editorReadySeconds"),
+        },
+    }
+
+def format_report(summary: dict, days: int)-> str:
+    lines = [
+        f"Runs in the last {days} day(s): {summary['runs']} ({summary['failed']} failed, {summary['builds']} with a build)",
+        f"Synced: {summary['filesSynced']} file(s), {summary['bytesSynced'] / 1024 / 1024:.1f} MB",
+        "",
+        f"{'Phase':<15}{'Runs':>6}{'p50':>10}{'p95':>10}{'Max':>10}",
+    ]
+    for name, _ in PHASES:
+        phase = summary["phases"][name]
+        lines.append(
+            f"{name:<15}{phase['runs']:>6}{_seconds(phase['p50']):>10}{_seconds(phase['p95']):>10}{_seconds(phase['max']):>10}")
+
+    with_prefill = summary["editorReady"]["withPrefill"]
+    if with_prefill["runs"]:
+        without_prefill = summary["editorReady"]["withoutPrefill"]
+        lines += [
+            "",
+            f"Editor ready p50: {_seconds(with_prefill['p50'])} after a DDC prefill ({with_prefill['runs']} run(s)), "
+            f"{_seconds(without_prefill['p50'])} after a sync without one ({without_prefill['runs']} run(s))",
+        ]
+    return "\n".join(lines)
+
+def _seconds(value: float | None)-> str:
+    return "-" if value is None else f"{value:.1f}s"
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description="Phase timings of past sync and build runs")
+    parser.add_argument("--history", required=True, help="run_history.jsonl written by the sync script")
+    parser.add_argument("--days", type=int, default=DEFAULT_DAYS, help="Only runs from the last N days")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    return parser.parse_args(argv)
+
+def main(argv=None, now: datetime | None=None)-> int:
+    args = _parse_args(argv)
+    now = now or datetime.now(timezone.utc)
+
+    runs = load_runs(args.history, since=now - timedelta(days=args.days))
+    summary = summarize(runs)
+
+    if args.json:
+        print(json.dumps(summary))
+    else:
+        print(format_report(summary, args.days))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""Manifest of the compiled source files as they were at the last successful build.
+
+The sync script saves it after every successful build and diffs the tree against it
+before deciding whether to build, so local edits, unshelved and reverted files count
+as well as synced ones. Size and mtime are compared first; only files whose stat
+changed are hashed, so a touched but identical file does not trigger a build; its new
+size and mtime are written back so the next diff does not hash it again.
+
+    python source_manifest.py --root C:/Project --manifest Config/source_manifest.json diff
+    python source_manifest.py --root C:/Project --manifest Config/source_manifest.json save --not-after 1735120000
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+
+from module_resolver import classify
+
+MANIFEST_VERSION = 1
+
+# Folders under the project root whose files are compiled
+SOURCE_FOLDERS = ("Source", "Plugins")
+# Build output and caches that live inside those folders
+SKIPPED_FOLDERS = frozenset({"binaries", "intermediate", "saved", "deriveddatacache", ".vs", "content"})
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+def file_hash(path: str)-> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def scan(root: str)-> dict:
+    """Relative path (with /) -> (size, mtime_ns) of every compile-affecting file under the source folders"""
+
+    files = {}
+    pending = [os.path.join(root, folder) for folder in SOURCE_FOLDERS]
+    while pending:
+        directory = pending.pop()
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name.lower() not in SKIPPED_FOLDERS:
+                    pending.append(entry.path)
+            elif entry.is_file() and classify(entry.name) == "compile":
+                stat = entry.stat()
+                relative = os.path.relpath(entry.path, root).replace(os.sep, "/")
+                files[relative] = (stat.st_size, stat.st_mtime_ns)
+    return files
+
+def load_manifest(path: str)-> dict | None:
+    """Relative path -> [size, mtime_ns, hash], None when there is no usable manifest"""
+
+    try:
+        with open(path, encoding="utf-8") as manifest:
+            data = json.load(manifest)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+        return None
+    return data.get("files", {})
+
+def diff(root: str, manifest: dict)-> dict:
+    """Files added, removed and with different content since the manifest was saved.
+
+    Entries of files that were touched but hash the same are updated in manifest with
+    their new mtime, refreshed counts them.
+    """
+
+    current = scan(root)
+    changed = []
+    hashed = 0
+    refreshed = 0
+
+    for relative, (size, mtime) in current.items():
+        known = manifest.get(relative)
+        if known is None or known[0] != size:
+            if known is not None:
+                changed.append(relative)
+            continue
+        if known[1] == mtime:
+            continue
+        # Same size, new mtime: sync or an editor touched it, only the content can tell
+        hashed += 1
+        try:
+            if file_hash(os.path.join(root, relative)) != known[2]:
+                changed.append(relative)
+            else:
+                manifest[relative] = [size, mtime, known[2]]
+                refreshed += 1
+        except OSError:
+            changed.append(relative)
+
+    return {
+        "changed": sorted(changed),
+        "added": sorted(relative for relative in current if relative not in manifest),
+        "removed": sorted(relative for relative in manifest if relative not in current),
+        "scanned": len(current),
+        "hashed": hashed,
+        "refreshed": refreshed,
+    }
+
+def save(root: str, path: str, previous: dict | None=None, not_after_ns: int | None=None)-> dict:
+    """Write the manifest, reusing the hash of every file whose stat did not change.
+
+    Files modified after not_after_ns (the build start) are left out, so an edit made
+    during the build shows up as added next time.
+    """
+
+    previous = previous or {}
+    files = {}
+    hashed = 0
+    skipped = 0
+
+    for relative, (size, mtime) in scan(root).items():
+        if not_after_ns is not None and mtime > not_after_ns:
+            skipped += 1
+            continue
+        known = previous.get(relative)
+        if known is not None and known[0] == size and known[1] == mtime:
+            files[relative] = known
+            continue
+        try:
+            files[relative] = [size, mtime, file_hash(os.path.join(root, relative))]
+            hashed += 1
+        except OSError:
+            skipped += 1
+
+    write_manifest(path, files)
+    return {"files": len(files), "hashed": hashed, "skipped": skipped}
+
+def write_manifest(path: str, files: dict):
+    # Write next to the target and swap, a crash never leaves half a manifest
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as manifest:
+        json.dump({"version": MANIFEST_VERSION, "files": files}, manifest, separators=(",", ":"))
+    os.replace(temporary, path)
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description="Manifest of compiled source files at the last successful build")
+    parser.add_argument("--root", required=True, help="Project root with the Source and Plugins folders")
+    parser.add_argument("--manifest", required=True, help="Manifest JSON file")
+
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("diff", help="Compare the tree with the manifest")
+    save_command = commands.add_parser("save", help="Record the tree after a successful build")
+    save_command.add_argument("--not-after", dest="not_after", type=float, default=None,
+                              help="Unix time the build started, newer files are left out")
+    return parser.parse_args(argv)
+
+def main(argv=None)-> int:
+    args = _parse_args(argv)
+    manifest = load_manifest(args.manifest)
+
+    try:
+        if args.command == "diff":
+            if manifest is None:
+                output = {"manifest": False}
+            else:
+                output = {"manifest": True, **diff(args.root, manifest)}
+                if output["refreshed"]:
+                    write_manifest(args.manifest, manifest)
+        else:
+            not_after_ns = int(args.not_after * 1_000_000_000) if args.not_after is not None else None
+            output = save(args.root, args.manifest, manifest, not_after_ns)
+    except OSError as error:
+        print(json.dumps({"error": str(error)}), file=sys.stderr)
+        return 1
+
+    print(json.dumps(output))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
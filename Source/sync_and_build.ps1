@@ -13,6 +13,20 @@ $script:CONSTANTS = @{
         ConfigFileName = "config.json"
         RunLogFileName = "last_run.log"
         BuildLogFileName = "last_build.log"
+        ChangelistIndexFileName = "changelists.db"
+        RunHistoryFileName = "run_history.jsonl"
+        SourceManifestFileName = "source_manifest.json"
+        EngineIndexFileName = "engine_index.json"
+        BuildReportFileName = "last_build_report.json"
+        BuildSummaryFileName = "last_build_report.txt"
+    }
+
+    PythonTools = @{
+        ChangelistIndex = "changelist_index.py"
+        UbtLogAnalyzer = "ubt_log_analyzer.py"
+        ModuleResolver = "module_resolver.py"
+        SourceManifest = "source_manifest.py"
+        EngineIndex = "engine_index.py"
     }
     
     ConfigKeys = @{
@@ -20,28 +34,148 @@ $script:CONSTANTS = @{
         ProjectDisplayName = "project.displayName"
         EnginePath = "unrealEngine.path"
         EngineVersion = "unrealEngine.version"
+        UseEngineIndex = "unrealEngine.useIndex"
         EditorAutoLaunch = "editor.autoLaunch"
+        EditorReadyTimeoutMinutes = "editor.readyTimeoutMinutes"
+        DdcPrefill = "editor.ddcPrefill"
+        DdcPrefillMinPackages = "editor.ddcPrefillMinPackages"
+        DdcPrefillProcesses = "editor.ddcPrefillProcesses"
+        DdcPrefillTimeoutMinutes = "editor.ddcPrefillTimeoutMinutes"
         UseUBTLogging = "build.useUBTLogging"
+        UseSourceManifest = "build.useSourceManifest"
         LastBuiltCL = "build.lastBuiltCL"
         PerforceFileExtentions = "perforce.fileExtensions"
+        UseChangelistIndex = "perforce.useChangelistIndex"
+        ParallelSync = "perforce.parallelSync"
+        CodeFirstSync = "perforce.codeFirstSync"
+        ParallelThreads = "perforce.parallelThreads"
+        ParallelBatch = "perforce.parallelBatch"
+        ParallelBatchSize = "perforce.parallelBatchSize"
         LoggingVerbose = "logging.verbose"
+        KeepLogs = "logging.keepLogs"
+        TracingEnabled = "tracing.enabled"
+        WatchPollSeconds = "watch.pollSeconds"
+        WatchMaxPollSeconds = "watch.maxPollSeconds"
+        WatchMaxCpuPercent = "watch.maxCpuPercent"
+        BatchProjects = "batch.projects"
+        BatchMaxProjects = "batch.maxConcurrentProjects"
+        BatchMaxBuilds = "batch.maxConcurrentBuilds"
     }
     
     Paths = @{
         UnrealBuildBat = "Engine\Build\BatchFiles\Build.bat"
         UnrealEditorExe = "Engine\Binaries\Win64\UnrealEditor.exe"
+        UnrealEditorCmdExe = "Engine\Binaries\Win64\UnrealEditor-Cmd.exe"
     }
+
+    # Folders holding UE_* engine folders, searched when the launcher and registry do not list an engine
+    EngineSearchRoots = @(
+        "C:\Program Files\Epic Games",
+        "C:\Epic Games",
+        "C:\Apps\UE_Engines",
+        "C:\UE"
+    )
+
+    # Source builds registered by UnrealVersionSelector, one value per build: {GUID} = engine root
+    EngineRegistryKey = "HKCU:\Software\Epic Games\Unreal Engine\Builds"
+    LauncherInstalledFile = "Epic\UnrealEngineLauncher\LauncherInstalled.dat"
     
     PerforceUpToDate = "file(s) up-to-date."
+    PerforceNoMatch = "no such file\(s\)|not in client view|no file\(s\) at that changelist|no file\(s\) in that range"
+    MaxListedFiles = 20
+    MaxSyncErrors = 50
+    SyncProgressIntervalMs = 250
+    ContentSyncProgressIntervalMs = 10000
+    LogBufferLines = 200
+    LogFlushIntervalMs = 1000
+
+    # Each run and build log (and trace) is also kept as <kind>_<timestamp>.log/.json, the newest stay readable
+    # and the rest are gzipped until logging.keepLogs is reached. The DDC prefill writes <kind>_<timestamp>_<n>.log,
+    # one per commandlet, ranked together as one run
+    LogRetention = @{
+        Kinds = @("run", "build", "trace", "ddc_prefill")
+        UncompressedLogs = 2
+    }
+
+    # Synced first with perforce.codeFirstSync so the build can start while content syncs,
+    # relative to the project root
+    CodeFirstSyncPaths = @(
+        "*.uproject",
+        "Source/...",
+        "Plugins/.../*.uplugin",
+        "Plugins/.../Source/...",
+        ".../*.Build.cs",
+        ".../*.Target.cs"
+    )
+
+    # Watch mode polls the head changelist and syncs and builds only while these are not running
+    # and the CPU is quiet; polls back off up to MaxPollSeconds while nothing new is submitted
+    Watch = @{
+        PollSeconds = 60
+        MaxPollSeconds = 600
+        MaxCpuPercent = 50
+        BusyProcesses = @("UnrealEditor", "UnrealEditor-Cmd", "UE4Editor", "UnrealBuildTool")
+    }
+
+    # The editor counts as ready once its main frame, titled after the project, is shown; the
+    # splash screen before it has no title. editor.readyTimeoutMinutes overrides the timeout
+    EditorReady = @{
+        TimeoutMinutes = 15
+        PollIntervalMs = 1000
+        ProgressIntervalSeconds = 30
+    }
+
+    # The DerivedDataCache commandlet fills the DDC for the packages whose file names are passed
+    # as tokens; a long list is split so no command line gets past MaxCommandLine characters
+    DdcPrefill = @{
+        Extensions = @(".uasset", ".umap")
+        Arguments = @("-run=DerivedDataCache", "-fill", "-unattended", "-nop4", "-nosplash")
+        MinPackages = 50
+        TimeoutMinutes = 20
+        MaxProcesses = 4
+        CoresPerProcess = 8
+        MaxCommandLine = 30000
+        PollIntervalMs = 500
+    }
+
+    # Batch mode runs each project in its own PowerShell with its own Config and Logs folders
+    # under StateFolder. Syncs of all running projects overlap, concurrent UBT runs share a
+    # named semaphore sized by cores and free memory
+    Batch = @{
+        StateFolder = "Batch"
+        StateDirVariable = "SYNC_AND_BUILD_STATE_DIR"
+        BuildSlotsVariable = "SYNC_AND_BUILD_BUILD_SLOTS"
+        ConsoleLogFileName = "batch_console.log"
+        MaxProjects = 4
+        CoresPerBuild = 8
+        MemoryPerBuildGB = 16
+        PollIntervalMs = 1000
+        # P4CONFIG name for children with their own workspace, no file has it so none is read
+        NoP4ConfigName = "SyncAndBuild.nop4config"
+    }
+
+    # Limits for the parallel sync heuristic, config values above 0 override it
+    ParallelSync = @{
+        MinFiles = 50
+        MaxThreads = 8
+        MinBatch = 8
+        MaxBatch = 64
+        MinBatchSize = 8192
+        MaxBatchSize = 536870912
+    }
     JsonConfigDepth = 10
     SearchRecursionDepth = 5
 
 }
 
-# Core Directories used often in the project
+# Core Directories used often in the project, a batch run gives every project its own
 $script:scriptRoot = $PSScriptRoot
-$configDir = Join-Path $script:scriptRoot "..\Config"
-$logsDir = Join-Path $script:scriptRoot "..\Logs"
+$stateRoot = [Environment]::GetEnvironmentVariable($script:CONSTANTS.Batch.StateDirVariable)
+if (-not $stateRoot) {
+    $stateRoot = Join-Path $script:scriptRoot ".."
+}
+$configDir = Join-Path $stateRoot "Config"
+$logsDir = Join-Path $stateRoot "Logs"
 
 # Create directories if they don't exist
 New-Item -ItemType Directory -Force -Path $configDir
@@ -56,6 +190,27 @@ $script:projectRoot = $null
 $script:projectName = $null
 $script:projectFile = $null
 $script:configCache = $null
+$script:pythonCommand = $null
+
+# Run log lines wait here and go out through one open writer, see Write-LogBuffer
+$script:logWriter = $null
+$script:logBuffer = [System.Collections.Generic.List[string]]::new()
+$script:logFlushTimer = [System.Diagnostics.Stopwatch]::StartNew()
+$script:logVerbose = $null
+$script:logStamp = $null
+$script:logRetention = $null
+
+# Spans of this run when tracing.enabled is set, see Start-Trace
+$script:trace = $null
+
+# Content sync running next to the build with perforce.codeFirstSync, see Start-ContentSync
+$script:contentSync = $null
+
+# Numbers gathered during one run (have changelists, sync preview, transfer stats), reset by Main
+$script:runState = @{}
+
+# Set by modes that run without anyone at the console; choices that would prompt fail instead
+$script:unattended = $false
 
 # ==========================================
 # Error Handling Classes
@@ -80,6 +235,10 @@ function Initialize-Log {
     .SYNOPSIS
         Initialize log file with header
     #>
+
+    Close-Log
+    $script:logVerbose = $null
+    $script:logStamp = Get-Date -Format "yyyyMMdd_HHmmss"
     
     $header = @"
 ==========================================
@@ -95,6 +254,11 @@ function Write-Log {
     <#
     .SYNOPSIS
         Write a log message to file and console
+    .DESCRIPTION
+        File lines are buffered and written by Write-LogBuffer once the buffer is full,
+        once a second, on every ERROR and when the log is closed. The timer is only
+        checked here, so callers also flush before every long wait (sync, build slot,
+        build, commandlets, editor, content sync) to keep the file current meanwhile.
     #>
     param(
         [string]$Message,
@@ -104,7 +268,13 @@ function Write-Log {
     $timestamp = Get-Date -Format "yyyy-MM-dd HH:mm:ss"
     $logMessage = "[$timestamp] [$Level] $Message"
     
-    Add-Content -Path $script:logFile -Value $logMessage -Encoding UTF8
+    $script:logBuffer.Add($logMessage)
+
+    if ($Level -eq "ERROR" -or
+        $script:logBuffer.Count -ge $script:CONSTANTS.LogBufferLines -or
+        $script:logFlushTimer.ElapsedMilliseconds -ge $script:CONSTANTS.LogFlushIntervalMs) {
+        Write-LogBuffer
+    }
     
     switch ($Level) {
         "ERROR"   { Write-Host "[ERROR] $Message" -ForegroundColor Red }
@@ -112,7 +282,11 @@ function Write-Log {
         "SUCCESS" { Write-Host "[OK] $Message" -ForegroundColor Green }
         "INFO"    { Write-Host "[INFO] $Message" -ForegroundColor Cyan }
         "VERBOSE" { 
-            if (Get-ConfigValue $script:CONSTANTS.ConfigKeys.LoggingVerbose -DefaultValue $false) {
+            # Read once per run, Initialize-Log clears it
+            if ($null -eq $script:logVerbose) {
+                $script:logVerbose = [bool](Get-ConfigValue $script:CONSTANTS.ConfigKeys.LoggingVerbose -DefaultValue $false)
+            }
+            if ($script:logVerbose) {
                 Write-Host "[VERBOSE] $Message" -ForegroundColor Gray
             }
         }
@@ -120,6 +294,207 @@ function Write-Log {
     }
 }
 
+function Write-LogBuffer {
+    <#
+    .SYNOPSIS
+        Append the buffered log lines to the run log through the open writer
+    .DESCRIPTION
+        The writer is opened on first use and shares the file for reading, so the log
+        can be followed while the script runs. A failed write drops the buffered lines
+        with a warning instead of stopping the run.
+    #>
+
+    try {
+        if ($script:logBuffer.Count -eq 0) {
+            return
+        }
+
+        if (-not $script:logWriter) {
+            $path = $ExecutionContext.SessionState.Path.GetUnresolvedProviderPathFromPSPath($script:logFile)
+            $stream = [System.IO.FileStream]::new($path, [System.IO.FileMode]::Append, [System.IO.FileAccess]::Write, [System.IO.FileShare]::ReadWrite)
+            $script:logWriter = [System.IO.StreamWriter]::new($stream, [System.Text.UTF8Encoding]::new($false))
+        }
+
+        foreach ($line in $script:logBuffer) {
+            $script:logWriter.WriteLine($line)
+        }
+        $script:logWriter.Flush()
+
+    } catch {
+        Write-Host "Could not write to log file $($script:logFile): $($_.Exception.Message)" -ForegroundColor Yellow
+    } finally {
+        $script:logBuffer.Clear()
+        $script:logFlushTimer.Restart()
+    }
+}
+
+function Close-Log {
+    <#
+    .SYNOPSIS
+        Write what is left in the log buffer and release the log file
+    #>
+
+    Write-LogBuffer
+
+    if ($script:logWriter) {
+        $script:logWriter.Dispose()
+        $script:logWriter = $null
+    }
+}
+
+function Save-LogCopy {
+    <#
+    .SYNOPSIS
+        Keep a timestamped copy of a last_*.log file next to it
+    .DESCRIPTION
+        last_run.log and last_build.log keep their names for anyone who opens them
+        directly. The copy is what log retention later compresses and prunes.
+    #>
+    param(
+        [string]$Path,
+        [ValidateSet("run", "build")]
+        [string]$Kind
+    )
+
+    if (-not $Path -or -not (Test-Path -LiteralPath $Path)) {
+        return
+    }
+
+    try {
+        $stamp = if ($script:logStamp) { $script:logStamp } else { Get-Date -Format "yyyyMMdd_HHmmss" }
+        $copy = Join-Path (Split-Path -Parent $Path) "$($Kind)_$stamp.log"
+        Copy-Item -LiteralPath $Path -Destination $copy -Force
+    } catch {
+        Write-Host "Could not keep a copy of $($Path): $($_.Exception.Message)" -ForegroundColor Yellow
+    }
+}
+
+function Get-LogRetentionPlan {
+    <#
+    .SYNOPSIS
+        Work out which kept logs to compress and which to delete
+    .DESCRIPTION
+        Logs are ranked newest first per kind by the timestamp in their name, logs that
+        share a timestamp (the DDC prefill batches of one run) share a rank. The newest
+        stay as they are, the following ones up to KeepLogs are compressed and the rest
+        are deleted. KeepLogs of 0 or less keeps everything.
+    #>
+    param(
+        [string]$Directory,
+        [int]$KeepLogs
+    )
+
+    $plan = @{ Compress = @(); Delete = @() }
+
+    if ($KeepLogs -le 0 -or -not (Test-Path -LiteralPath $Directory)) {
+        return $plan
+    }
+
+    foreach ($kind in $script:CONSTANTS.LogRetention.Kinds) {
+        $pattern = "^$($kind)_(\d{8}_\d{6})(_\d+)?\.(log|json)(\.gz)?$"
+        $logs = Get-ChildItem -LiteralPath $Directory -File |
+            Where-Object { $_.Name -match $pattern } |
+            Sort-Object Name -Descending
+
+        $stamps = [System.Collections.Generic.List[string]]::new()
+        foreach ($log in $logs) {
+            $null = $log.Name -match $pattern
+            if (-not $stamps.Contains($Matches[1])) {
+                $stamps.Add($Matches[1])
+            }
+            $rank = $stamps.Count - 1
+
+            if ($rank -ge $KeepLogs) {
+                $plan.Delete += $log.FullName
+            } elseif ($rank -ge $script:CONSTANTS.LogRetention.UncompressedLogs -and $log.Extension -ne ".gz") {
+                $plan.Compress += $log.FullName
+            }
+        }
+    }
+
+    return $plan
+}
+
+function Start-LogRetention {
+    <#
+    .SYNOPSIS
+        Compress and prune old logs on a background runspace while the run goes on
+    #>
+    param([string]$Directory = $logsDir)
+
+    $keepLogs = [int](Get-ConfigValue $script:CONSTANTS.ConfigKeys.KeepLogs -DefaultValue 0)
+    $plan = Get-LogRetentionPlan -Directory $Directory -KeepLogs $keepLogs
+
+    if ($plan.Compress.Count -eq 0 -and $plan.Delete.Count -eq 0) {
+        return
+    }
+
+    Write-Log "Log retention: compressing $($plan.Compress.Count), deleting $($plan.Delete.Count) old log(s)" "VERBOSE"
+
+    $retention = {
+        param([string[]]$Compress, [string[]]$Delete)
+
+        $failures = @()
+        foreach ($path in $Compress) {
+            try {
+                $source = [System.IO.File]::OpenRead($path)
+                try {
+                    $target = [System.IO.File]::Create("$path.gz")
+                    $gzip = [System.IO.Compression.GZipStream]::new($target, [System.IO.Compression.CompressionMode]::Compress)
+                    try {
+                        $source.CopyTo($gzip)
+                    } finally {
+                        $gzip.Dispose()
+                        $target.Dispose()
+                    }
+                } finally {
+                    $source.Dispose()
+                }
+                [System.IO.File]::Delete($path)
+            } catch {
+                $failures += "$($path): $($_.Exception.Message)"
+            }
+        }
+        foreach ($path in $Delete) {
+            try {
+                [System.IO.File]::Delete($path)
+            } catch {
+                $failures += "$($path): $($_.Exception.Message)"
+            }
+        }
+        return $failures
+    }
+
+    $powershell = [powershell]::Create().AddScript($retention.ToString()).AddArgument($plan.Compress).AddArgument($plan.Delete)
+    $script:logRetention = @{
+        PowerShell = $powershell
+        Handle = $powershell.BeginInvoke()
+    }
+}
+
+function Wait-LogRetention {
+    <#
+    .SYNOPSIS
+        Wait for the background log retention to finish and report what failed
+    #>
+
+    if (-not $script:logRetention) {
+        return
+    }
+
+    try {
+        $failures = $script:logRetention.PowerShell.EndInvoke($script:logRetention.Handle)
+        foreach ($failure in $failures) {
+            Write-Log "Log retention failed for $failure" "WARNING"
+        }
+    } catch {
+        Write-Log "Log retention failed: $($_.Exception.Message)" "WARNING"
+    } finally {
+        $script:logRetention.PowerShell.Dispose()
+        $script:logRetention = $null
+    }
+}
+
 function Write-Header {
     <#
     .SYNOPSIS
@@ -156,6 +531,125 @@ function Write-DetailedError {
     Write-Host ""
 }
 
+# ==========================================
+# Tracing Functions
+# ==========================================
+
+function Start-Trace {
+    <#
+    .SYNOPSIS
+        Start collecting spans for this run when tracing.enabled is set
+    .DESCRIPTION
+        With tracing off every span function returns straight away, so the phases can
+        stay wrapped without costing anything.
+    #>
+
+    $script:trace = $null
+
+    if (Get-ConfigValue $script:CONSTANTS.ConfigKeys.TracingEnabled -DefaultValue $false) {
+        $script:trace = @{
+            Events = [System.Collections.Generic.List[object]]::new()
+            Clock = [System.Diagnostics.Stopwatch]::StartNew()
+        }
+    }
+}
+
+function Start-TraceSpan {
+    <#
+    .SYNOPSIS
+        Open a span, $null when tracing is off
+    #>
+    param(
+        [string]$Name,
+        [string]$Category = "phase"
+    )
+
+    if (-not $script:trace) {
+        return $null
+    }
+
+    return @{
+        Name = $Name
+        Category = $Category
+        Start = $script:trace.Clock.Elapsed.Ticks
+    }
+}
+
+function Stop-TraceSpan {
+    <#
+    .SYNOPSIS
+        Close a span and keep it as a Chrome trace complete event
+    #>
+    param(
+        $Span,
+        [hashtable]$Arguments = @{}
+    )
+
+    if (-not $Span -or -not $script:trace) {
+        return
+    }
+
+    # Trace event times are in microseconds, a tick is 100 ns
+    $end = $script:trace.Clock.Elapsed.Ticks
+    $script:trace.Events.Add([ordered]@{
+        name = $Span.Name
+        cat = $Span.Category
+        ph = "X"
+        ts = [long]($Span.Start / 10)
+        dur = [long](($end - $Span.Start) / 10)
+        pid = $PID
+        tid = 1
+        args = $Arguments
+    })
+}
+
+function Invoke-TraceSpan {
+    <#
+    .SYNOPSIS
+        Run a script block inside a span and pass its output through
+    #>
+    param(
+        [string]$Name,
+        [scriptblock]$ScriptBlock
+    )
+
+    $span = Start-TraceSpan -Name $Name
+    try {
+        & $ScriptBlock
+    } finally {
+        Stop-TraceSpan -Span $span
+    }
+}
+
+function Save-Trace {
+    <#
+    .SYNOPSIS
+        Write the spans of this run as a Chrome Trace Event Format file
+    .DESCRIPTION
+        The file opens in chrome://tracing or ui.perfetto.dev. Nothing is written when
+        tracing is off.
+    #>
+    param([string]$Path = (Join-Path $logsDir "trace_$($script:logStamp).json"))
+
+    if (-not $script:trace) {
+        return
+    }
+
+    try {
+        $document = [ordered]@{
+            traceEvents = $script:trace.Events
+            displayTimeUnit = "ms"
+            otherData = @{ project = $script:projectName }
+        }
+        $document | ConvertTo-Json -Depth $script:CONSTANTS.JsonConfigDepth -Compress | Set-Content -Path $Path -Encoding UTF8
+        Write-Log "Trace written to $Path" "INFO"
+    } catch {
+        Write-Log "Could not write trace: $($_.Exception.Message)" "WARNING"
+    } finally {
+        $script:trace = $null
+    }
+}
+
 # ==========================================
 # Configuration Functions
 # ==========================================
@@ -185,11 +679,17 @@ function Get-Config {
             unrealEngine = @{
                 path = ""
                 version = ""
+                useIndex = $true
             }
             perforce = @{
                 autoSync = $true
                 checkCodeChanges = $true
                 parallelSync = $false
+                codeFirstSync = $false
+                parallelThreads = 0
+                parallelBatch = 0
+                parallelBatchSize = 0
+                useChangelistIndex = $true
                 fileExtensions = @(".cpp", ".h", ".build.cs", ".target.cs", ".cs", ".ini", ".py")
             }
             build = @{
@@ -197,16 +697,34 @@ function Get-Config {
                 autoBuildOnCodeChange = $true
                 showBuildOutput = $true
                 useUBTLogging = $true
+                useSourceManifest = $true
             }
             editor = @{
                 autoLaunch = $false
                 launchTimeout = 30
+                ddcPrefill = $false
+                ddcPrefillMinPackages = 50
+                ddcPrefillProcesses = 0
+                ddcPrefillTimeoutMinutes = 20
             }
             logging = @{
                 enabled = $true
                 verbose = $false
                 keepLogs = 10
             }
+            tracing = @{
+                enabled = $false
+            }
+            batch = @{
+                projects = @()
+                maxConcurrentProjects = 0
+                maxConcurrentBuilds = 0
+            }
+            watch = @{
+                pollSeconds = 60
+                maxPollSeconds = 600
+                maxCpuPercent = 50
+            }
         }
         
         $defaultConfig | ConvertTo-Json -Depth $script:CONSTANTS.SearchRecursionDepth | Out-File -FilePath $script:configFile -Encoding UTF8
@@ -322,8 +840,13 @@ function Find-UnrealProject {
     <#
     .SYNOPSIS
         Auto-detect Unreal project file
+    .DESCRIPTION
+        Asks which one to use when there are several, with -All returns them all instead.
     #>
-    param([string]$SearchPath)
+    param(
+        [string]$SearchPath,
+        [switch]$All
+    )
     
     Write-Log "Searching for .uproject files in: $SearchPath" "VERBOSE"
     
@@ -339,10 +862,23 @@ function Find-UnrealProject {
         )
     }
     
+    if ($All) {
+        Write-Log "Found $($projects.Count) project(s)" "VERBOSE"
+        return ,$projects
+    }
+
     if ($projects.Count -eq 1) {
         Write-Log "Found project: $($projects[0].Name)" "SUCCESS"
         return $projects[0]
     }
+
+    if ($script:unattended) {
+        throw [BuildException]::new(
+            "$($projects.Count) Unreal projects found in $SearchPath, cannot ask which one to use",
+            "Project Detection",
+            "Set project.name in config.json or run the tool once without watch mode"
+        )
+    }
     
     Write-Host ""
     Write-Host "Multiple projects found:" -ForegroundColor Yellow
@@ -370,7 +906,26 @@ function Initialize-ProjectPaths {
     <#
     .SYNOPSIS
         Initialize project paths based on auto-detection or config
+    .DESCRIPTION
+        A ProjectFile (given to each project of a batch run) is used as is.
     #>
+    param([string]$ProjectFile)
+
+    if ($ProjectFile) {
+        if (-not (Test-Path $ProjectFile)) {
+            throw [BuildException]::new(
+                "Project file not found: $ProjectFile",
+                "Project Configuration",
+                "Check the project paths given to the batch run"
+            )
+        }
+
+        $script:projectFile = $ProjectFile
+        $script:projectName = [System.IO.Path]::GetFileNameWithoutExtension($ProjectFile)
+        $script:projectRoot = Split-Path -Parent (Split-Path -Parent $ProjectFile)
+        Write-Log "Project: $script:projectName ($script:projectRoot)" "VERBOSE"
+        return
+    }
     
     $configuredName = Get-ConfigValue $script:CONSTANTS.ConfigKeys.ProjectName
     $scanForProjectDetails = $false
@@ -429,21 +984,33 @@ function Find-UnrealEngine {
     <#
     .SYNOPSIS
         Search for Unreal Engine installations
+    .PARAMETER Indexed
+        Engines from the engine index, listed first with their exact version
     #>
+    param(
+        [object[]]$Indexed = @()
+    )
     
     Write-Host "Searching for Unreal Engine installations..." -ForegroundColor Yellow
     Write-Host ""
     
-    $searchPaths = @(
-        "C:\Program Files\Epic Games",
-        "C:\Epic Games",
-        "C:\Apps\UE_Engines",
-        "C:\UE"
-    )
-    
     $found = @()
+
+    foreach ($engine in $Indexed) {
+        if (-not (Test-Path (Join-Path $engine.path $script:CONSTANTS.Paths.UnrealBuildBat))) {continue}
+        if ($found.Path -contains $engine.path) {continue}
+
+        $found += [PSCustomObject]@{
+            Index = $found.Count + 1
+            Path = $engine.path
+            Version = $engine.version
+            Name = Split-Path $engine.path -Leaf
+        }
+
+        Write-Host "  [$($found.Count)] UE $($engine.version) - $($engine.path)" -ForegroundColor White
+    }
     
-    foreach ($basePath in $searchPaths) {
+    foreach ($basePath in $script:CONSTANTS.EngineSearchRoots) {
         if (Test-Path $basePath) {
             Write-Log "Scanning: $basePath" "VERBOSE"
             
@@ -542,13 +1109,86 @@ function Find-UnrealEngine {
     } while ($true)
 }
 
+function Find-EngineFromIndex {
+    <#
+    .SYNOPSIS
+        Look up the engine the project's EngineAssociation asks for in the engine index
+    .DESCRIPTION
+        The index reads the launcher's LauncherInstalled.dat, the registered source builds and
+        the search roots, and is cached until one of them changes. Returns $null when the index
+        is turned off or Python is not available.
+    #>
+    param(
+        [string]$PreferredPath
+    )
+
+    if (-not (Get-ConfigValue $script:CONSTANTS.ConfigKeys.UseEngineIndex -DefaultValue $true)) {
+        return $null
+    }
+
+    $arguments = @(
+        "--index", (Join-Path $configDir $script:CONSTANTS.FileNames.EngineIndexFileName),
+        "--project", $script:projectFile
+    )
+
+    if ($env:ProgramData) {
+        $arguments += @("--launcher-file", (Join-Path $env:ProgramData $script:CONSTANTS.LauncherInstalledFile))
+    }
+
+    # Windows keeps registered source builds in the registry, the index only reads files
+    $builds = Get-ItemProperty -Path $script:CONSTANTS.EngineRegistryKey -ErrorAction SilentlyContinue
+    if ($builds) {
+        foreach ($property in $builds.PSObject.Properties | Where-Object { $_.Name -notlike "PS*" }) {
+            $arguments += @("--registered", "$($property.Name)=$($property.Value)")
+        }
+    }
+
+    foreach ($root in $script:CONSTANTS.EngineSearchRoots) {
+        $arguments += @("--search-root", $root)
+    }
+
+    if ($PreferredPath) {
+        $arguments += @("--preferred", $PreferredPath)
+    }
+
+    $index = Invoke-PythonTool -Script $script:CONSTANTS.PythonTools.EngineIndex -Arguments $arguments
+
+    if ($null -ne $index) {
+        Write-Log "Engine index: $(@($index.engines).Count) engine(s), EngineAssociation '$($index.association)'$(if ($index.cached) { ' (cached)' })" "VERBOSE"
+    }
+
+    return $index
+}
+
 function Get-UnrealEngineRoot {
     <#
     .SYNOPSIS
         Get Unreal Engine installation path from config or prompt user
+    .DESCRIPTION
+        The engine index answers first: when it matches the project's EngineAssociation that
+        engine is used and saved without asking. The saved path and the interactive search
+        are only needed when nothing matches.
     #>
     
     $savedPath = Get-ConfigValue $script:CONSTANTS.ConfigKeys.EnginePath
+    $index = Find-EngineFromIndex -PreferredPath $savedPath
+
+    if ($index -and $index.match -and (Test-Path (Join-Path $index.match.path $script:CONSTANTS.Paths.UnrealBuildBat))) {
+        $match = $index.match
+
+        if ($match.path -ne $savedPath) {
+            Write-Log "Using UE $($match.version) for the project ($($match.reason)): $($match.path)" "INFO"
+            Set-ConfigValue $script:CONSTANTS.ConfigKeys.EnginePath $match.path
+        } else {
+            Write-Log "Using UE installation: $savedPath ($($match.reason))" "VERBOSE"
+        }
+
+        if ((Get-ConfigValue $script:CONSTANTS.ConfigKeys.EngineVersion) -ne $match.version) {
+            Set-ConfigValue $script:CONSTANTS.ConfigKeys.EngineVersion $match.version
+        }
+
+        return $match.path
+    }
     
     if ($savedPath) {
         $buildBat = Join-Path $savedPath $script:CONSTANTS.Paths.UnrealBuildBat
@@ -561,12 +1201,20 @@ function Get-UnrealEngineRoot {
         }
     }
     
+    if ($script:unattended) {
+        throw [BuildException]::new(
+            "No valid Unreal Engine configured for $script:projectName, cannot ask for one",
+            "Configuration",
+            "Set unrealEngine.path in config.json or run the tool once without watch mode"
+        )
+    }
+
     # First time setup or invalid path
     Write-Header "UNREAL ENGINE SETUP"
     Write-Host "First time setup - please select your Unreal Engine installation." -ForegroundColor Yellow
     Write-Host ""
     
-    $uePath = Find-UnrealEngine
+    $uePath = Find-UnrealEngine -Indexed @(if ($index) { $index.engines })
     
     if (-not $uePath) {
         throw [BuildException]::new(
@@ -576,8 +1224,12 @@ function Get-UnrealEngineRoot {
         )
     }
     
-    # Detect version from path
-    if ($uePath -match "([\d\.]+)") {
+    # Exact version from the index, otherwise detect it from the path
+    $indexed = @(if ($index) { $index.engines }) | Where-Object { $_.path -eq $uePath } | Select-Object -First 1
+    if ($indexed) {
+        Set-ConfigValue $script:CONSTANTS.ConfigKeys.EngineVersion $indexed.version
+        Write-Log "Detected UE version: $($indexed.version)" "INFO"
+    } elseif ($uePath -match "([\d\.]+)") {
         $version = $Matches[1]
         Set-ConfigValue $script:CONSTANTS.ConfigKeys.EngineVersion $version
         Write-Log "Detected UE version: $version" "INFO"
@@ -620,15 +1272,117 @@ function Test-UnrealEngineValid {
 }
 
 # ==========================================
-# Perforce Functions
+# Python Helper Functions
 # ==========================================
 
-function Test-PerforceEnvironment {
+function Invoke-PythonTool {
     <#
     .SYNOPSIS
-        Validate P4 environment and connection
+        Run one of the Python helpers next to this script and return its JSON output
+    .DESCRIPTION
+        Returns $null when Python is not installed or the helper fails, so callers can fall
+        back to asking Perforce directly.
     #>
-    
+    param(
+        [string]$Script,
+        [string[]]$Arguments = @()
+    )
+
+    if (-not $script:pythonCommand) {
+        $script:pythonCommand = Get-Command python, py -CommandType Application -ErrorAction SilentlyContinue | Select-Object -First 1
+    }
+
+    if (-not $script:pythonCommand) {
+        Write-Log "Python not found, skipping $Script" "VERBOSE"
+        return $null
+    }
+
+    $scriptPath = Join-Path $script:scriptRoot $Script
+    Write-Log "Executing: python $Script $($Arguments -join ' ')" "VERBOSE"
+
+    $span = Start-TraceSpan -Name "python $Script $($Arguments | Select-Object -First 1)" -Category "python"
+    $output = & {
+        $ErrorActionPreference = "Continue"
+        & $script:pythonCommand.Source $scriptPath @Arguments 2>&1
+    }
+    $exitCode = $LASTEXITCODE
+    Stop-TraceSpan -Span $span -Arguments @{ arguments = $Arguments -join " "; exitCode = $exitCode }
+
+    $stdout = @($output | Where-Object { $_ -isnot [System.Management.Automation.ErrorRecord] })
+    $stderr = @($output | Where-Object { $_ -is [System.Management.Automation.ErrorRecord] })
+
+    if ($exitCode -ne 0) {
+        Write-Log "$Script failed (Exit code: $exitCode): $($stderr -join '; ')" "VERBOSE"
+        return $null
+    }
+
+    try {
+        $result = ($stdout -join "`n") | ConvertFrom-Json
+    } catch {
+        Write-Log "$Script returned invalid output: $($_.Exception.Message)" "VERBOSE"
+        return $null
+    }
+
+    # Keep arrays (even empty ones) in one piece so callers can tell them from a failure
+    return ,$result
+}
+
+function Invoke-ChangelistIndex {
+    <#
+    .SYNOPSIS
+        Ask the local changelist index about a range, fetching missing changelists first
+    .DESCRIPTION
+        Submitted changelists never change, so they are kept in Config\changelists.db and
+        only changelists the index has not seen are requested from the server.
+        FromCL is excluded and ToCL included, like Get-ChangedFiles.
+    #>
+    param(
+        [ValidateSet("files", "summary", "trigger")]
+        [string]$Command,
+        [int]$FromCL,
+        [int]$ToCL,
+        [string[]]$Extensions = @()
+    )
+
+    if (-not (Get-ConfigValue $script:CONSTANTS.ConfigKeys.UseChangelistIndex -DefaultValue $true)) {
+        return $null
+    }
+
+    $indexFile = Join-Path $configDir $script:CONSTANTS.FileNames.ChangelistIndexFileName
+    $arguments = @(
+        "--db", $indexFile,
+        "--path", (Join-Path $script:projectRoot "..."),
+        $Command,
+        "--from", $FromCL,
+        "--to", $ToCL,
+        "--update"
+    )
+
+    if ($Command -ne "summary" -and $Extensions.Count -gt 0) {
+        $arguments += "--ext"
+        $arguments += $Extensions
+    }
+
+    $result = Invoke-PythonTool -Script $script:CONSTANTS.PythonTools.ChangelistIndex -Arguments $arguments
+
+    # Without Python or when the index fails the caller has to see $null, not @($null)
+    if ($null -eq $result) {
+        return $null
+    }
+
+    return ,$result
+}
+
+# ==========================================
+# Perforce Functions
+# ==========================================
+
+function Test-PerforceEnvironment {
+    <#
+    .SYNOPSIS
+        Validate P4 environment and connection
+    #>
+    
     Write-Log "Validating Perforce environment..." "VERBOSE"
     
     # Check P4 is installed
@@ -645,8 +1399,10 @@ function Test-PerforceEnvironment {
     
     # Check connection
     try {
+        $span = Start-TraceSpan -Name "p4 info" -Category "p4"
         $p4info = p4 info 2>&1
-        
+        Stop-TraceSpan -Span $span -Arguments @{ exitCode = $LASTEXITCODE }
+
         if ($LASTEXITCODE -ne 0) {
             throw "Connection failed"
         }
@@ -671,15 +1427,102 @@ function Test-PerforceEnvironment {
     }
 }
 
+function Get-SyncPreview {
+    <#
+    .SYNOPSIS
+        Ask the server how much a sync would transfer, without syncing
+    .DESCRIPTION
+        Uses p4 sync -N, which only prints the server estimate. Returns $null when the
+        estimate cannot be read, or a preview with the files to transfer, the files to
+        delete and the bytes to transfer.
+    #>
+    param([string[]]$Paths = @("..."))
+
+    Write-Log "Executing: p4 sync -N $Paths" "VERBOSE"
+
+    $span = Start-TraceSpan -Name "p4 sync -N" -Category "p4"
+    $p4Output = & {
+        $ErrorActionPreference = "Continue"
+        & p4 sync -N @Paths 2>&1
+    }
+    Stop-TraceSpan -Span $span -Arguments @{ exitCode = $LASTEXITCODE }
+
+    foreach ($outputObject in $p4Output) {
+        $line = $outputObject.ToString()
+
+        if ($line -match "files added/updated/deleted=(\d+)/(\d+)/(\d+), bytes added/updated=(\d+)/(\d+)") {
+            return [PSCustomObject]@{
+                Files = [int]$Matches[1] + [int]$Matches[2]
+                Deleted = [int]$Matches[3]
+                Bytes = [long]$Matches[4] + [long]$Matches[5]
+            }
+        }
+
+        if ($line -match $script:CONSTANTS.PerforceUpToDate) {
+            return [PSCustomObject]@{ Files = 0; Deleted = 0; Bytes = [long]0 }
+        }
+    }
+
+    Write-Log "Could not read sync estimate (output: $p4Output)" "VERBOSE"
+    return $null
+}
+
+function Get-ParallelSyncSettings {
+    <#
+    .SYNOPSIS
+        Pick threads, batch and batch size for p4 sync --parallel from the pending sync
+    .DESCRIPTION
+        Small syncs are not worth the extra connections and return $null. Each value set
+        above 0 in the config is used as is, the rest come from the file count and the
+        average file size of the preview.
+    #>
+    param($Preview)
+
+    $limits = $script:CONSTANTS.ParallelSync
+
+    if (-not $Preview -or $Preview.Files -lt $limits.MinFiles) {
+        return $null
+    }
+
+    $threads = [int](Get-ConfigValue $script:CONSTANTS.ConfigKeys.ParallelThreads -DefaultValue 0)
+    if ($threads -le 0) {
+        $threads = if ($Preview.Files -ge 2000) { $limits.MaxThreads } else { 4 }
+        $threads = [math]::Max(2, [math]::Min($threads, [Environment]::ProcessorCount))
+    }
+
+    # Several batches per thread so a thread stuck on a big file does not hold up the rest
+    $batch = [int](Get-ConfigValue $script:CONSTANTS.ConfigKeys.ParallelBatch -DefaultValue 0)
+    if ($batch -le 0) {
+        $batch = [math]::Ceiling($Preview.Files / ($threads * 4))
+        $batch = [math]::Max($limits.MinBatch, [math]::Min($batch, $limits.MaxBatch))
+    }
+
+    $batchSize = [long](Get-ConfigValue $script:CONSTANTS.ConfigKeys.ParallelBatchSize -DefaultValue 0)
+    if ($batchSize -le 0) {
+        $averageFileBytes = [math]::Ceiling($Preview.Bytes / $Preview.Files)
+        $batchSize = [long]($averageFileBytes * $batch)
+        $batchSize = [math]::Max($limits.MinBatchSize, [math]::Min($batchSize, $limits.MaxBatchSize))
+    }
+
+    return @{
+        Threads = [int]$threads
+        Batch = [int]$batch
+        BatchSize = [long]$batchSize
+    }
+}
+
 function Sync-FromPerforce {
     <#
     .SYNOPSIS
         Sync project from Perforce with proper error handling
+    .DESCRIPTION
+        Paths are file specs relative to the project root, the whole workspace by default.
     #>
 
     param(
         [switch]$SkipSync = $false,
-        [switch]$Verbose = $false
+        [switch]$Verbose = $false,
+        [string[]]$Paths = @("...")
     )
     
     Write-Header "STEP 1: SYNCING FROM PERFORCE"
@@ -697,50 +1540,115 @@ function Sync-FromPerforce {
         Write-Host ""
         
         # Get current changelist before sync
-        $beforeCL = Get-LatestHaveChangelist
+        $beforeCL = Get-HaveChangelist
+        $script:runState.HaveCLBefore = $beforeCL
         if ($beforeCL) {
             Write-Host "Current changelist: $beforeCL" -ForegroundColor Gray
         }
         
         # Perform sync
         Write-Host "Syncing from Perforce..." -ForegroundColor Cyan
-        Write-Log "Executing: p4 sync ..." "VERBOSE"
+        Write-Log "Executing: p4 -ztag sync $Paths" "VERBOSE"
 
         Push-Location $script:projectRoot
         
         try {
-            $syncOutput = @()
-            $syncError = @()
-             
-            # Perforce might throw an exception for when everything is up-to-date, we need to collect the logs then check for them.
-            $p4Output = & { 
-                $ErrorActionPreference = "Continue"
-                & p4 sync ... 2>&1 
+            $syncArgs = @()
+
+            # The preview gives the byte total the progress bar and ETA are measured against
+            $preview = Get-SyncPreview -Paths $Paths
+            if ($preview) {
+                $script:runState.SyncPreview = $preview
+                Write-Host "Pending: $($preview.Files) file(s), $(Format-Megabytes $preview.Bytes) MB to transfer, $($preview.Deleted) to delete" -ForegroundColor Gray
+                Write-Log "Sync preview: $($preview.Files) file(s), $($preview.Bytes) bytes, $($preview.Deleted) deletion(s)" "INFO"
             }
 
-            $syncExitCode = $LASTEXITCODE
-            
-            foreach ($outputObject in $p4Output) {
-                $line = $outputObject.ToString()
+            if (Get-ConfigValue $script:CONSTANTS.ConfigKeys.ParallelSync -DefaultValue $false) {
+                $parallel = Get-ParallelSyncSettings -Preview $preview
 
-                if ($outputObject -is [System.Management.Automation.ErrorRecord])
-                {
-                    $syncError += $line
+                if ($parallel) {
+                    $syncArgs += "--parallel=threads=$($parallel.Threads),batch=$($parallel.Batch),batchsize=$($parallel.BatchSize)"
+                    Write-Host "Parallel sync: $($parallel.Threads) threads, batch $($parallel.Batch), batch size $($parallel.BatchSize) bytes" -ForegroundColor Gray
+                    Write-Log "Parallel sync settings: threads=$($parallel.Threads), batch=$($parallel.Batch), batchsize=$($parallel.BatchSize) for $($preview.Files) file(s), $(Format-Megabytes $preview.Bytes) MB" "INFO"
+                } elseif ($preview) {
+                    Write-Log "Parallel sync skipped, only $($preview.Files) file(s) to transfer" "VERBOSE"
                 }
-                else
-                {
-                    $syncOutput += $line
-                    
-                    # Show progress to user
-                    if ($line -match "^//") {
-                        Write-Host $line -ForegroundColor DarkGray
+            }
+
+            # Counters and a few sample lines are all that is kept, however many files are synced
+            $syncStats = @{ Updated = 0; Added = 0; Deleted = 0; Other = 0; Errors = 0; UpToDate = $false; NoMatch = 0; Bytes = [long]0; TotalBytes = [long]0; HighestChange = 0 }
+            if ($preview) {
+                $syncStats.TotalBytes = $preview.Bytes
+            }
+            $changedLines = [System.Collections.Generic.List[string]]::new()
+            $errorLines = [System.Collections.Generic.List[string]]::new()
+            $record = @{}
+
+            $syncSpan = Start-TraceSpan -Name "p4 sync" -Category "p4"
+            $syncTimer = [System.Diagnostics.Stopwatch]::StartNew()
+            $progressTimer = [System.Diagnostics.Stopwatch]::StartNew()
+            Write-LogBuffer
+             
+            # -ztag prints one "... field value" line per field and every file record starts with depotFile,
+            # which gives the size of each file as it lands. Perforce reports an up-to-date workspace on
+            # stderr, so both streams are read and each line is handled as it arrives
+            & { 
+                $ErrorActionPreference = "Continue"
+                & p4 -ztag sync @syncArgs @Paths 2>&1 
+            } | ForEach-Object {
+                $line = $_.ToString()
+
+                if ($_ -is [System.Management.Automation.ErrorRecord]) {
+                    if ($line -match $script:CONSTANTS.PerforceUpToDate) {
+                        $syncStats.UpToDate = $true
+                    } elseif ($line -match $script:CONSTANTS.PerforceNoMatch) {
+                        # A path spec with nothing in it, e.g. a project without plugins
+                        $syncStats.NoMatch++
+                    } else {
+                        $syncStats.Errors++
+                        if ($errorLines.Count -lt $script:CONSTANTS.MaxSyncErrors) {
+                            $errorLines.Add($line)
+                        }
+                    }
+                } elseif ($line.StartsWith("... ")) {
+                    $field, $value = $line.Substring(4).Split(" ", 2)
+
+                    if ($field -eq "depotFile" -and $record.Count -gt 0) {
+                        Add-SyncRecord -Record $record -Stats $syncStats -ChangedLines $changedLines
+                        $record.Clear()
                     }
+                    $record[$field] = $value
+                }
+
+                if ($progressTimer.ElapsedMilliseconds -ge $script:CONSTANTS.SyncProgressIntervalMs) {
+                    $progressTimer.Restart()
+                    Write-SyncProgress -Stats $syncStats -Elapsed $syncTimer.Elapsed
                 }
             }
+
+            $syncExitCode = $LASTEXITCODE
+            $syncTimer.Stop()
+            Write-Progress -Activity "Syncing from Perforce" -Completed
+
+            if ($record.Count -gt 0) {
+                Add-SyncRecord -Record $record -Stats $syncStats -ChangedLines $changedLines
+            }
+
+            $changedCount = $syncStats.Updated + $syncStats.Added + $syncStats.Deleted
+            Stop-TraceSpan -Span $syncSpan -Arguments @{ arguments = $syncArgs -join " "; exitCode = $syncExitCode; files = $changedCount + $syncStats.Other; bytes = $syncStats.Bytes }
             
             # Check result using exit code
-            if ($syncExitCode -eq 0 -or $syncError -match $script:CONSTANTS.PerforceUpToDate) {
-                $afterCL = Get-LatestHaveChangelist
+            if ($syncExitCode -eq 0 -or $syncStats.UpToDate -or ($syncStats.NoMatch -gt 0 -and $syncStats.Errors -eq 0)) {
+                $script:runState.Sync = @{
+                    Files = $changedCount + $syncStats.Other
+                    Bytes = $syncStats.Bytes
+                    Seconds = [math]::Round($syncTimer.Elapsed.TotalSeconds, 3)
+                    Parallel = $syncArgs.Count -gt 0
+                }
+                Write-SyncThroughput -FileCount ($changedCount + $syncStats.Other) -Bytes $syncStats.Bytes -Elapsed $syncTimer.Elapsed -Parallel:($syncArgs.Count -gt 0)
+
+                $afterCL = Get-SyncedChangelist -BeforeCL $beforeCL -Stats $syncStats
+                $script:runState.HaveCL = $afterCL
                 
                 Write-Host ""
                 
@@ -750,15 +1658,21 @@ function Sync-FromPerforce {
                 } else {
                     Write-Host "Successfully synced from CL $beforeCL to CL $afterCL" -ForegroundColor Green
                     Write-Log "Synced from CL $beforeCL to CL $afterCL" "INFO"
+
+                    # Also fills the index for the code change check that follows
+                    $summary = Invoke-ChangelistIndex -Command "summary" -FromCL $beforeCL -ToCL $afterCL
+                    if ($summary) {
+                        Write-Host "Changelists synced: $($summary.changelists) by $($summary.users) user(s), $($summary.files) file revision(s)" -ForegroundColor Cyan
+                        Write-Log "Changelists synced: $($summary.changelists), users: $($summary.users), files: $($summary.files)" "INFO"
+                    }
                     
                     # Show summary of changes
-                    $updatedFiles = $syncOutput | Where-Object { $_ -match "updating|added|deleted" }
-                    if ($updatedFiles.Count -gt 0) {
+                    if ($changedCount -gt 0) {
                         Write-Host ""
-                        Write-Host "Files changed: $($updatedFiles.Count)" -ForegroundColor Cyan
+                        Write-Host "Files changed: $changedCount ($($syncStats.Updated) updated, $($syncStats.Added) added, $($syncStats.Deleted) deleted)" -ForegroundColor Cyan
                         
-                        if ($Verbose -and $updatedFiles.Count -le 20) {
-                            $updatedFiles | ForEach-Object { Write-Host "  $_" -ForegroundColor DarkGray }
+                        if ($Verbose -and $changedCount -le $script:CONSTANTS.MaxListedFiles) {
+                            $changedLines | ForEach-Object { Write-Host "  $_" -ForegroundColor DarkGray }
                         }
                     }
                 }
@@ -768,8 +1682,12 @@ function Sync-FromPerforce {
                 
             } else {
                 # Sync failed
-                $errorMsg = $syncError | Where-Object { $_ -match "error|failed|can't" } | Select-Object -First 5
+                $errorMsg = $errorLines | Where-Object { $_ -match "error|failed|can't" } | Select-Object -First 5
                 $jointErrorMsg = $errorMsg -join "; "
+
+                if ($syncStats.Errors -gt 0) {
+                    Write-Log "p4 sync reported $($syncStats.Errors) error line(s), first: $($errorLines -join '; ')" "ERROR"
+                }
                 
                 throw [BuildException]::new(
                     "Perforce sync failed (Exit code: $syncExitCode)",
@@ -798,306 +1716,1970 @@ function Sync-FromPerforce {
     }
 }
 
-function Get-LatestHaveChangelist {
+function Get-HeadChangelist {
     <#
     .SYNOPSIS
-        Get the latest changelist number that the user has synced
+        Newest submitted changelist in the workspace view, $null when it cannot be read
+    .DESCRIPTION
+        Both halves of a code-first sync are pinned to it, so code and content end up
+        at the same changelist even when someone submits in between.
     #>
-    
+
     try {
         Push-Location $script:projectRoot
-        
-        # FIXED: Proper quoting of ...#have
-        Write-Log "Executing: p4 changes -m1 `"...#have`"" "VERBOSE"
-        $output = p4 changes -m1 "...#have" 2>&1
-        
-        if ($LASTEXITCODE -eq 0 -and $output -match "Change (\d+)") {
-            $cl = [int]$Matches[1]
-            Write-Log "Latest have changelist: $cl" "VERBOSE"
-            return $cl
+
+        Write-Log "Executing: p4 changes -m1 -s submitted `"...#head`"" "VERBOSE"
+        $span = Start-TraceSpan -Name "p4 changes -m1 ...#head" -Category "p4"
+        $output = & {
+            $ErrorActionPreference = "Continue"
+            & p4 changes -m1 -s submitted "...#head" 2>&1
         }
-        
-        Write-Log "Could not determine changelist (output: $output)" "VERBOSE"
-        throw "Could not determine changelist (output: $output)"
-        
-    } catch {
-        $Message = $_.Exception.Message
-        Write-Log "Could not get changelist info: $Message" "WARNING"
-        throw [BuildException]::new(
-            "Could not get changelist info: $Message",
-            "Perforce",
-            "Check your Perforce connection and workspace"
-        )
+        Stop-TraceSpan -Span $span -Arguments @{ exitCode = $LASTEXITCODE }
+
+        if ($LASTEXITCODE -eq 0 -and "$output" -match "Change (\d+)") {
+            return [int]$Matches[1]
+        }
+
+        Write-Log "Could not determine head changelist (output: $output)" "VERBOSE"
+        return $null
     } finally {
         Pop-Location
     }
 }
 
-function Test-CodeChanges {
+function Start-ContentSync {
     <#
     .SYNOPSIS
-        Check if code files changed in a specific changelist or range
+        Sync the rest of the workspace on a background runspace while the build runs
+    .DESCRIPTION
+        The code paths are already at Changelist, so p4 only transfers content. The sync
+        uses the same preview and perforce.parallelSync settings as Sync-FromPerforce.
+        Output is only counted into a shared hashtable, the console belongs to the build;
+        Wait-ContentSync logs its progress and collects the result.
     #>
     param(
         [int]$Changelist,
-        [int]$FromCL = $null
+        [string]$Directory = $script:projectRoot
     )
 
+    $spec = if ($Changelist) { "...@$Changelist" } else { "..." }
+    $syncArgs = @()
+
+    Push-Location $Directory
     try {
-        # Change to project root for p4 commands
-        Push-Location $script:projectRoot
+        $preview = Get-SyncPreview -Paths @($spec)
+    } finally {
+        Pop-Location
+    }
 
-        if ($FromCL)
-        {
-            Write-Log "Checking for code changes between CL $FromCL and CL $Changelist" "VERBOSE"
-            # Use depot syntax to search in submitted changelists (not just #have)
-            # Search submitted changelists in range, excluding FromCL
-            $changesOutput = p4 changes -m 100 "//...@>$FromCL,@<=$Changelist" 2>&1
+    if ($preview) {
+        Write-Log "Content sync preview: $($preview.Files) file(s), $($preview.Bytes) bytes, $($preview.Deleted) deletion(s)" "INFO"
+    }
 
-            # Filter out error records and keep only string output
-            $changes = @($changesOutput | Where-Object { $_ -is [String] -and $_.Trim() -ne "" })
+    if (Get-ConfigValue $script:CONSTANTS.ConfigKeys.ParallelSync -DefaultValue $false) {
+        $parallel = Get-ParallelSyncSettings -Preview $preview
 
-            Write-Log "p4 changes returned $($changes.Count) changelist(s)" "VERBOSE"
-            if ($changes.Count -eq 0) {
-                Write-Log "No changelists found in range >$FromCL to <=$Changelist" "VERBOSE"
-                Pop-Location
-                return $false
+        if ($parallel) {
+            $syncArgs += "--parallel=threads=$($parallel.Threads),batch=$($parallel.Batch),batchsize=$($parallel.BatchSize)"
+            Write-Log "Content sync parallel settings: threads=$($parallel.Threads), batch=$($parallel.Batch), batchsize=$($parallel.BatchSize)" "INFO"
+        } elseif ($preview) {
+            Write-Log "Parallel content sync skipped, only $($preview.Files) file(s) to transfer" "VERBOSE"
+        }
+    }
+
+    Write-Log "Starting content sync in the background: p4 -ztag sync $(@($syncArgs + $spec) -join ' ')" "INFO"
+
+    # Written by the runspace as files land and read by Wait-ContentSync for the progress lines
+    $progress = [hashtable]::Synchronized(@{
+        Files = 0
+        Bytes = [long]0
+        Errors = @()
+        ErrorCount = 0
+        UpToDate = $false
+        ExitCode = 0
+        TotalFiles = if ($preview) { $preview.Files } else { 0 }
+        TotalBytes = if ($preview) { $preview.Bytes } else { [long]0 }
+    })
+
+    $contentSync = {
+        param([string]$Directory, [string]$Spec, [string[]]$SyncArgs, [hashtable]$Result, [string]$UpToDate, [string]$NoMatch, [int]$MaxErrors)
+
+        Set-Location -LiteralPath $Directory
+        $result = $Result
+
+        & {
+            $ErrorActionPreference = "Continue"
+            & p4 -ztag sync @SyncArgs $Spec 2>&1
+        } | ForEach-Object {
+            $line = $_.ToString()
+
+            if ($_ -is [System.Management.Automation.ErrorRecord]) {
+                if ($line -match $UpToDate) {
+                    $result.UpToDate = $true
+                } elseif ($line -notmatch $NoMatch) {
+                    $result.ErrorCount++
+                    if ($result.Errors.Count -lt $MaxErrors) {
+                        $result.Errors += $line
+                    }
+                }
+            } elseif ($line.StartsWith("... depotFile ")) {
+                $result.Files++
+            } elseif ($line.StartsWith("... fileSize ")) {
+                $result.Bytes += [long]$line.Substring(13)
             }
         }
-        else
-        {
-            Write-Log "Checking for code changes in CL $Changelist" "VERBOSE"
-            $changes = @($Changelist)
+
+        $result.ExitCode = $LASTEXITCODE
+        return $result
+    }
+
+    $powershell = [powershell]::Create().AddScript($contentSync.ToString())
+    [void]$powershell.AddArgument($Directory)
+    [void]$powershell.AddArgument($spec)
+    [void]$powershell.AddArgument([string[]]$syncArgs)
+    [void]$powershell.AddArgument($progress)
+    foreach ($argument in @($script:CONSTANTS.PerforceUpToDate, $script:CONSTANTS.PerforceNoMatch, $script:CONSTANTS.MaxSyncErrors)) {
+        [void]$powershell.AddArgument($argument)
+    }
+
+    $script:contentSync = @{
+        PowerShell = $powershell
+        Handle = $powershell.BeginInvoke()
+        Progress = $progress
+        Timer = [System.Diagnostics.Stopwatch]::StartNew()
+        Span = Start-TraceSpan -Name "p4 sync (content)" -Category "p4"
+    }
+}
+
+function Write-ContentSyncProgress {
+    <#
+    .SYNOPSIS
+        Log how far the background content sync got, against the preview totals when known
+    #>
+    param([hashtable]$ContentSync)
+
+    $progress = $ContentSync.Progress
+    if (-not $progress) {
+        return
+    }
+
+    $files = if ($progress.TotalFiles) { "$($progress.Files) of $($progress.TotalFiles)" } else { "$($progress.Files)" }
+    $megabytes = if ($progress.TotalBytes) { "$(Format-Megabytes $progress.Bytes) of $(Format-Megabytes $progress.TotalBytes)" } else { "$(Format-Megabytes $progress.Bytes)" }
+    $message = "Content sync: $files file(s), $megabytes MB, $($progress.ErrorCount) error(s) after $([math]::Round($ContentSync.Timer.Elapsed.TotalSeconds, 1))s"
+
+    Write-Host $message -ForegroundColor Gray
+    Write-Log $message "INFO"
+}
+
+function Wait-ContentSync {
+    <#
+    .SYNOPSIS
+        Wait for the background content sync and report it, $true when it succeeded
+    #>
+
+    if (-not $script:contentSync) {
+        return $true
+    }
+
+    $contentSync = $script:contentSync
+    $script:contentSync = $null
+
+    try {
+        if (-not $contentSync.Handle.IsCompleted) {
+            Write-Host "Waiting for the content sync to finish..." -ForegroundColor Cyan
+            Write-ContentSyncProgress -ContentSync $contentSync
+            Write-LogBuffer
+
+            while (-not $contentSync.Handle.AsyncWaitHandle.WaitOne($script:CONSTANTS.ContentSyncProgressIntervalMs)) {
+                Write-ContentSyncProgress -ContentSync $contentSync
+            }
         }
 
-        $codeExtensions = Get-ConfigValue $script:CONSTANTS.ConfigKeys.PerforceFileExtentions @(".cpp", ".h")
-        $foundChanges = $false
+        $result = @($contentSync.PowerShell.EndInvoke($contentSync.Handle))[0]
+        $contentSync.Timer.Stop()
+        Stop-TraceSpan -Span $contentSync.Span -Arguments @{ exitCode = $result.ExitCode; files = $result.Files; bytes = $result.Bytes }
 
-        foreach ($cl in $changes)
-        {
-            $clNum = $cl
+        if ($result.ExitCode -ne 0 -and -not $result.UpToDate -and $result.ErrorCount -gt 0) {
+            Write-Log "Content sync failed (Exit code: $($result.ExitCode)), $($result.ErrorCount) error line(s), first: $($result.Errors -join '; ')" "ERROR"
+            Write-DetailedError `
+                -Message "Perforce content sync failed (Exit code: $($result.ExitCode))" `
+                -Category "Perforce" `
+                -Suggestion "Check your network connection and workspace mapping. Error: $(@($result.Errors | Select-Object -First 5) -join '; ')"
+            return $false
+        }
 
-            if ($cl -match "Change (\d+)")
-            {
-                $clNum = [int]$Matches[1]
+        if ($result.ErrorCount -gt 0) {
+            Write-Log "Content sync finished with $($result.ErrorCount) error line(s), first: $($result.Errors -join '; ')" "WARNING"
+        }
+
+        $script:runState.ContentSync = @{
+            Files = $result.Files
+            Bytes = $result.Bytes
+            Seconds = [math]::Round($contentSync.Timer.Elapsed.TotalSeconds, 3)
+        }
+
+        Write-Host "Content sync finished: $($result.Files) file(s), $(Format-Megabytes $result.Bytes) MB in $([math]::Round($contentSync.Timer.Elapsed.TotalSeconds, 1))s" -ForegroundColor Green
+        Write-Log "Content sync finished: $($result.Files) file(s), $($result.Bytes) bytes in $($contentSync.Timer.Elapsed.TotalSeconds)s" "INFO"
+        return $true
+
+    } catch {
+        Write-Log "Content sync failed: $($_.Exception.Message)" "ERROR"
+        return $false
+    } finally {
+        $contentSync.PowerShell.Dispose()
+    }
+}
+
+function Stop-ContentSync {
+    <#
+    .SYNOPSIS
+        Stop the background content sync of a failed run instead of waiting for it
+    .DESCRIPTION
+        Files already synced stay synced; the next run syncs the rest.
+    #>
+
+    if (-not $script:contentSync) {
+        return
+    }
+
+    $contentSync = $script:contentSync
+    $script:contentSync = $null
+
+    try {
+        if (-not $contentSync.Handle.IsCompleted) {
+            Write-Host "Stopping the content sync, the next run syncs the rest" -ForegroundColor Yellow
+            Write-Log "Run failed, stopping the content sync after $([math]::Round($contentSync.Timer.Elapsed.TotalSeconds, 1))s" "WARNING"
+            Write-ContentSyncProgress -ContentSync $contentSync
+            $contentSync.PowerShell.Stop()
+        }
+        Stop-TraceSpan -Span $contentSync.Span -Arguments @{ stopped = $true }
+    } catch {
+        Write-Log "Could not stop the content sync: $($_.Exception.Message)" "WARNING"
+    } finally {
+        $contentSync.PowerShell.Dispose()
+    }
+}
+
+function Add-SyncRecord {
+    <#
+    .SYNOPSIS
+        Count one file record of p4 -ztag sync into the running sync counters
+    #>
+    param(
+        [hashtable]$Record,
+        [hashtable]$Stats,
+        [System.Collections.Generic.List[string]]$ChangedLines
+    )
+
+    # The first record carries the totals of the whole sync, they replace the preview estimate
+    if ($Record.totalFileSize) {
+        $Stats.TotalBytes = [long]$Record.totalFileSize
+    }
+    if ($Record.fileSize) {
+        $Stats.Bytes += [long]$Record.fileSize
+    }
+    if ($Record.change -and [int]$Record.change -gt $Stats.HighestChange) {
+        $Stats.HighestChange = [int]$Record.change
+    }
+
+    switch ($Record.action) {
+        "added" { $Stats.Added++ }
+        "deleted" { $Stats.Deleted++ }
+        { $_ -in "updated", "refreshed", "replaced" } { $Stats.Updated++ }
+        default {
+            $Stats.Other++
+            return
+        }
+    }
+
+    if ($ChangedLines.Count -le $script:CONSTANTS.MaxListedFiles) {
+        $ChangedLines.Add("$($Record.depotFile)#$($Record.rev) - $($Record.action)")
+    }
+}
+
+function Write-SyncProgress {
+    <#
+    .SYNOPSIS
+        Refresh the sync progress bar from the running counters
+    .DESCRIPTION
+        When the byte total is known the bar shows how much is done, the transfer rate
+        and the time left at that rate.
+    #>
+    param(
+        [hashtable]$Stats,
+        [TimeSpan]$Elapsed
+    )
+
+    $files = $Stats.Updated + $Stats.Added + $Stats.Deleted + $Stats.Other
+    $status = "$files file(s): $($Stats.Updated) updated, $($Stats.Added) added, $($Stats.Deleted) deleted"
+
+    if ($Stats.Errors -gt 0) {
+        $status += ", $($Stats.Errors) error(s)"
+    }
+
+    $progress = @{
+        Activity = "Syncing from Perforce"
+        Status = "$status - $([int]$Elapsed.TotalSeconds)s"
+    }
+
+    if ($Stats.TotalBytes -gt 0) {
+        $bytesPerSecond = $Stats.Bytes / [math]::Max($Elapsed.TotalSeconds, 0.001)
+        $progress.PercentComplete = [int][math]::Min(100, 100 * $Stats.Bytes / $Stats.TotalBytes)
+        $progress.Status += " - $(Format-Megabytes $Stats.Bytes) of $(Format-Megabytes $Stats.TotalBytes) MB at $(Format-Megabytes $bytesPerSecond) MB/s"
+
+        if ($bytesPerSecond -gt 0) {
+            $progress.SecondsRemaining = [int][math]::Max(0, ($Stats.TotalBytes - $Stats.Bytes) / $bytesPerSecond)
+        }
+    }
+
+    Write-Progress @progress
+}
+
+function Write-SyncThroughput {
+    <#
+    .SYNOPSIS
+        Log how fast the sync transferred files, so parallel settings can be tuned per site
+    #>
+    param(
+        [int]$FileCount,
+        [long]$Bytes = 0,
+        [TimeSpan]$Elapsed,
+        [switch]$Parallel
+    )
+
+    if ($FileCount -eq 0) {
+        return
+    }
+
+    $seconds = [math]::Max($Elapsed.TotalSeconds, 0.001)
+    $mode = if ($Parallel) { "parallel" } else { "serial" }
+    $message = "Synced $FileCount file(s) in $([math]::Round($seconds, 1))s ($mode): $([math]::Round($FileCount / $seconds, 1)) files/s"
+
+    if ($Bytes -gt 0) {
+        $message += ", $(Format-Megabytes $Bytes) MB, $([math]::Round($Bytes / 1MB / $seconds, 2)) MB/s"
+    }
+
+    Write-Log $message "INFO"
+}
+
+function Format-Megabytes {
+    <#
+    .SYNOPSIS
+        Bytes as megabytes with one decimal, for progress and log lines
+    #>
+    param([double]$Bytes)
+
+    return [math]::Round($Bytes / 1MB, 1)
+}
+
+function Get-HaveChangelist {
+    <#
+    .SYNOPSIS
+        Changelist the workspace has for this run, asking the server at most once
+    .DESCRIPTION
+        The have changelist query scans the whole have table, so its answer is kept in
+        the run state. Sync-FromPerforce replaces it with the changelist it synced to.
+    #>
+
+    if (-not $script:runState.HaveCL) {
+        $script:runState.HaveCL = Get-LatestHaveChangelist
+    }
+    return $script:runState.HaveCL
+}
+
+function Get-SyncedChangelist {
+    <#
+    .SYNOPSIS
+        Have changelist after a sync, worked out from what the sync reported
+    .DESCRIPTION
+        Nothing synced means nothing moved. Otherwise the newest change in the tagged sync
+        records is used, and only when the records carried no change numbers is the
+        have table queried again.
+    #>
+    param(
+        [int]$BeforeCL,
+        [hashtable]$Stats
+    )
+
+    $syncedCount = $Stats.Updated + $Stats.Added + $Stats.Deleted + $Stats.Other
+
+    if ($syncedCount -eq 0) {
+        return $BeforeCL
+    }
+
+    if ($Stats.HighestChange -gt 0) {
+        return [math]::Max($BeforeCL, $Stats.HighestChange)
+    }
+
+    Write-Log "Sync output had no change numbers, asking for the have changelist" "VERBOSE"
+    return Get-LatestHaveChangelist
+}
+
+function Get-LatestHaveChangelist {
+    <#
+    .SYNOPSIS
+        Get the latest changelist number that the user has synced
+    #>
+    
+    try {
+        Push-Location $script:projectRoot
+        
+        # FIXED: Proper quoting of ...#have
+        Write-Log "Executing: p4 changes -m1 `"...#have`"" "VERBOSE"
+        $span = Start-TraceSpan -Name "p4 changes -m1 ...#have" -Category "p4"
+        $output = p4 changes -m1 "...#have" 2>&1
+        Stop-TraceSpan -Span $span -Arguments @{ exitCode = $LASTEXITCODE }
+        
+        if ($LASTEXITCODE -eq 0 -and $output -match "Change (\d+)") {
+            $cl = [int]$Matches[1]
+            Write-Log "Latest have changelist: $cl" "VERBOSE"
+            return $cl
+        }
+        
+        Write-Log "Could not determine changelist (output: $output)" "VERBOSE"
+        throw "Could not determine changelist (output: $output)"
+        
+    } catch {
+        $Message = $_.Exception.Message
+        Write-Log "Could not get changelist info: $Message" "WARNING"
+        throw [BuildException]::new(
+            "Could not get changelist info: $Message",
+            "Perforce",
+            "Check your Perforce connection and workspace"
+        )
+    } finally {
+        Pop-Location
+    }
+}
+
+function Get-ChangedFiles {
+    <#
+    .SYNOPSIS
+        List the files submitted in a changelist range whose names end in one of the extensions
+    .DESCRIPTION
+        Answered from the local changelist index when it is available, otherwise asks the
+        server once with one filespec per extension, so the cost does not grow with the
+        number of changelists in the range. FromCL is excluded, ToCL is included, and
+        without FromCL only ToCL itself is checked.
+    #>
+    param(
+        [int]$ToCL,
+        [int]$FromCL = 0,
+        [string[]]$Extensions
+    )
+
+    $indexFromCL = if ($FromCL) { $FromCL } else { $ToCL - 1 }
+    $indexedFiles = Invoke-ChangelistIndex -Command "files" -FromCL $indexFromCL -ToCL $ToCL -Extensions $Extensions
+
+    if ($null -ne $indexedFiles) {
+        Write-Log "Changed files answered from the changelist index" "VERBOSE"
+        return $indexedFiles
+    }
+
+    if ($FromCL) {
+        $revisionRange = "@$($FromCL + 1),@$ToCL"
+    } else {
+        $revisionRange = "@=$ToCL"
+    }
+
+    $fileSpecs = @($Extensions | ForEach-Object { "...$_$revisionRange" })
+    Write-Log "Executing: p4 files $($fileSpecs -join ' ')" "VERBOSE"
+
+    # p4 reports extensions without matches on stderr, collect everything and sort it out below
+    $span = Start-TraceSpan -Name "p4 files" -Category "p4"
+    $p4Output = & {
+        $ErrorActionPreference = "Continue"
+        & p4 files @fileSpecs 2>&1
+    }
+    $filesExitCode = $LASTEXITCODE
+    Stop-TraceSpan -Span $span -Arguments @{ arguments = $fileSpecs -join " "; exitCode = $filesExitCode }
+
+    $changedFiles = @()
+    $problems = @()
+
+    foreach ($outputObject in $p4Output) {
+        $line = $outputObject.ToString().Trim()
+
+        if ($line -match "^(//[^#]+)#(\d+) - (\S+) change (\d+)") {
+            $changedFiles += [PSCustomObject]@{
+                DepotFile = $Matches[1]
+                Revision = [int]$Matches[2]
+                Action = $Matches[3]
+                Change = [int]$Matches[4]
+            }
+        } elseif ($line -and $line -notmatch $script:CONSTANTS.PerforceNoMatch) {
+            $problems += $line
+        }
+    }
+
+    if ($filesExitCode -ne 0 -and $problems.Count -gt 0) {
+        throw "p4 files failed (Exit code: $filesExitCode): $($problems -join '; ')"
+    }
+
+    return $changedFiles
+}
+
+function Get-BuildDecision {
+    <#
+    .SYNOPSIS
+        Map changed files to the modules that own them and decide whether to build
+    .DESCRIPTION
+        module_resolver.py classifies the files, maps the compile-affecting ones with
+        one batched p4 where and finds the nearest Build.cs and .uplugin. With Local the
+        files are workspace paths relative to the project root and p4 is not asked. Returns
+        $null when the resolver cannot run, callers then build as before.
+    #>
+    param(
+        [object[]]$Files,
+        [switch]$Local
+    )
+
+    $listFile = Join-Path ([System.IO.Path]::GetTempPath()) "sync_and_build_changed_$PID.txt"
+
+    try {
+        Set-Content -Path $listFile -Value @($Files | ForEach-Object { if ($Local) { $_ } else { $_.DepotFile } }) -Encoding UTF8
+        $arguments = @("--root", $script:projectRoot, "--files-from", $listFile)
+        if ($Local) {
+            $arguments += "--local"
+        }
+        $decision = Invoke-PythonTool -Script $script:CONSTANTS.PythonTools.ModuleResolver -Arguments $arguments
+    } catch {
+        Write-Log "Could not resolve changed modules: $($_.Exception.Message)" "VERBOSE"
+        return $null
+    } finally {
+        Remove-Item -LiteralPath $listFile -ErrorAction SilentlyContinue
+    }
+
+    if ($null -ne $decision) {
+        $moduleNames = @($decision.modules | ForEach-Object { $_.name }) -join ", "
+        Write-Log "Build decision: build=$($decision.build), modules: $moduleNames, plugins: $(@($decision.plugins) -join ', ')" "VERBOSE"
+    }
+
+    return $decision
+}
+
+function Test-CodeChanges {
+    <#
+    .SYNOPSIS
+        Check if code files changed in a specific changelist or range
+    #>
+    param(
+        [int]$Changelist,
+        [int]$FromCL = $null
+    )
+
+    try {
+        # Change to project root for p4 commands
+        Push-Location $script:projectRoot
+
+        if ($FromCL) {
+            Write-Log "Checking for code changes between CL $FromCL and CL $Changelist" "VERBOSE"
+        } else {
+            Write-Log "Checking for code changes in CL $Changelist" "VERBOSE"
+        }
+
+        $codeExtensions = Get-ConfigValue $script:CONSTANTS.ConfigKeys.PerforceFileExtentions @(".cpp", ".h")
+        $codeFiles = @(Get-ChangedFiles -ToCL $Changelist -FromCL $FromCL -Extensions $codeExtensions)
+
+        if ($codeFiles.Count -eq 0) {
+            Write-Log "No code changes detected" "VERBOSE"
+            Pop-Location
+            return $false
+        }
+
+        # Config and script files match the extensions too but do not need compiling
+        $decision = Get-BuildDecision -Files $codeFiles
+        if ($null -ne $decision) {
+            $script:runState.AffectedModules = @($decision.modules | ForEach-Object { $_.name })
+
+            if (-not $decision.build) {
+                Write-Host "Only config/script files changed ($($decision.categories.config) config, $($decision.categories.script) script, $($decision.categories.other) other), no compiled module affected" -ForegroundColor Cyan
+                Write-Log "No compiled module affected by $($codeFiles.Count) changed file(s)" "INFO"
+                Pop-Location
+                return $false
+            }
+
+            if ($script:runState.AffectedModules.Count -gt 0) {
+                Write-Host "Affected modules: $($script:runState.AffectedModules -join ', ')" -ForegroundColor Cyan
+            }
+            if (@($decision.unowned).Count -gt 0) {
+                Write-Log "Changed files outside any module: $(@($decision.unowned) -join ', ')" "VERBOSE"
+            }
+        }
+
+        # Show why a build is needed, the full list goes to the log
+        $changeCount = @($codeFiles | Select-Object -ExpandProperty Change -Unique).Count
+        Write-Host "Code files changed: $($codeFiles.Count) in $changeCount changelist(s)" -ForegroundColor Cyan
+
+        $codeFiles | Select-Object -First $script:CONSTANTS.MaxListedFiles | ForEach-Object {
+            Write-Host "  $($_.DepotFile)#$($_.Revision) ($($_.Action), CL $($_.Change))" -ForegroundColor DarkGray
+        }
+
+        if ($codeFiles.Count -gt $script:CONSTANTS.MaxListedFiles) {
+            Write-Host "  ... and $($codeFiles.Count - $script:CONSTANTS.MaxListedFiles) more (see log)" -ForegroundColor DarkGray
+        }
+
+        # Which changelists are responsible, with author and description when the index knows them
+        Write-Host "Triggered by:" -ForegroundColor Cyan
+        $triggers = @($codeFiles | Group-Object -Property Change | Sort-Object { [int]$_.Name } -Descending)
+
+        $triggers | Select-Object -First $script:CONSTANTS.MaxListedFiles | ForEach-Object {
+            $first = $_.Group[0]
+            $author = if ($first.User) { " by $($first.User): $($first.Description)" } else { "" }
+            Write-Host "  CL $($_.Name)$author ($($_.Count) file(s))" -ForegroundColor DarkGray
+        }
+
+        $fileList = ($codeFiles | ForEach-Object { "  $($_.DepotFile)#$($_.Revision) $($_.Action) change $($_.Change)" }) -join "`n"
+        Write-Log "Code files changed:`n$fileList" "VERBOSE"
+
+        Pop-Location
+        return $true
+
+    } catch {
+        $Message = $_.Exception.Message
+        Write-Log "Could not check for code changes: $Message" "WARNING"
+        Pop-Location
+        return $true
+    }
+}
+
+function Get-SourceChanges {
+    <#
+    .SYNOPSIS
+        Compare the compiled source files with the manifest saved by the last successful build
+    .DESCRIPTION
+        Catches local edits, unshelved and reverted files as well as synced ones. Returns
+        $null when there is no manifest yet, the manifest is turned off or Python is not
+        available, callers then fall back to the changelist check.
+    #>
+
+    if (-not (Get-ConfigValue $script:CONSTANTS.ConfigKeys.UseSourceManifest -DefaultValue $true)) {
+        return $null
+    }
+
+    $manifestFile = Join-Path $configDir $script:CONSTANTS.FileNames.SourceManifestFileName
+    $diff = Invoke-PythonTool -Script $script:CONSTANTS.PythonTools.SourceManifest -Arguments @(
+        "--root", $script:projectRoot,
+        "--manifest", $manifestFile,
+        "diff"
+    )
+
+    if ($null -eq $diff -or -not $diff.manifest) {
+        Write-Log "No source manifest to compare with" "VERBOSE"
+        return $null
+    }
+
+    Write-Log "Source manifest: $($diff.scanned) file(s) scanned, $($diff.hashed) hashed, $($diff.refreshed) touched but unchanged" "VERBOSE"
+
+    $changes = [PSCustomObject]@{
+        Changed = @($diff.changed)
+        Added = @($diff.added)
+        Removed = @($diff.removed)
+        Count = @($diff.changed).Count + @($diff.added).Count + @($diff.removed).Count
+    }
+
+    if ($changes.Count -gt 0) {
+        $fileList = (@($changes.Changed | ForEach-Object { "  edited $_" }) +
+                     @($changes.Added | ForEach-Object { "  added $_" }) +
+                     @($changes.Removed | ForEach-Object { "  removed $_" })) -join "`n"
+        Write-Log "Source files changed since the last build:`n$fileList" "VERBOSE"
+    }
+
+    return $changes
+}
+
+function Test-SourceChangesNeedBuild {
+    <#
+    .SYNOPSIS
+        Decide the build from the source manifest diff, with what the changelist check found
+    .DESCRIPTION
+        The manifest only holds compiled files, so no difference means nothing to compile
+        even when synced code files were reported. Files that differ are mapped to their
+        modules without asking p4, next to the modules the changelist check found.
+    #>
+    param(
+        [object]$SourceChanges,
+        [bool]$SyncedCodeChanges
+    )
+
+    if ($SourceChanges.Count -eq 0) {
+        if ($SyncedCodeChanges) {
+            Write-Host "Synced code files match the last build - skipping build" -ForegroundColor Green
+            Write-Log "Synced code files match the source manifest of the last build" "INFO"
+        } else {
+            Write-Host "Source files match the last build - skipping build" -ForegroundColor Green
+            Write-Log "Source files match the last build" "INFO"
+        }
+        $script:runState.AffectedModules = @()
+        return $false
+    }
+
+    Write-Host "Source files changed since the last build: $($SourceChanges.Changed.Count) edited, $($SourceChanges.Added.Count) added, $($SourceChanges.Removed.Count) removed" -ForegroundColor Yellow
+    Write-Log "Source files changed since the last build: $($SourceChanges.Count)" "INFO"
+
+    $decision = Get-BuildDecision -Files @($SourceChanges.Changed + $SourceChanges.Added + $SourceChanges.Removed) -Local
+    if ($null -ne $decision) {
+        $modules = @(@($script:runState.AffectedModules) + @($decision.modules | ForEach-Object { $_.name }) | Where-Object { $_ } | Sort-Object -Unique)
+        $script:runState.AffectedModules = $modules
+        if ($modules.Count -gt 0) {
+            Write-Host "Affected modules: $($modules -join ', ')" -ForegroundColor Cyan
+        }
+    }
+
+    return $true
+}
+
+function Save-SourceManifest {
+    <#
+    .SYNOPSIS
+        Record the compiled source files after a successful build
+    .DESCRIPTION
+        Files modified after BuildStart are left out, so an edit made while the build
+        ran still counts as a change next time.
+    #>
+    param([datetime]$BuildStart)
+
+    if (-not (Get-ConfigValue $script:CONSTANTS.ConfigKeys.UseSourceManifest -DefaultValue $true)) {
+        return
+    }
+
+    $manifestFile = Join-Path $configDir $script:CONSTANTS.FileNames.SourceManifestFileName
+    $notAfter = ([DateTimeOffset]$BuildStart).ToUnixTimeMilliseconds() / 1000
+
+    $result = Invoke-PythonTool -Script $script:CONSTANTS.PythonTools.SourceManifest -Arguments @(
+        "--root", $script:projectRoot,
+        "--manifest", $manifestFile,
+        "save",
+        "--not-after", $notAfter.ToString([System.Globalization.CultureInfo]::InvariantCulture)
+    )
+
+    if ($null -ne $result) {
+        Write-Log "Source manifest saved: $($result.files) file(s), $($result.hashed) hashed" "VERBOSE"
+    }
+}
+
+# ==========================================
+# Build Functions
+# ==========================================
+
+function Enter-BuildSlot {
+    <#
+    .SYNOPSIS
+        Wait for one of the build slots of a batch run, $null outside a batch run
+    .DESCRIPTION
+        Start-BatchMode creates a named semaphore with one count per concurrent UBT run
+        and passes its name to every project it starts.
+    #>
+
+    $slotsName = [Environment]::GetEnvironmentVariable($script:CONSTANTS.Batch.BuildSlotsVariable)
+    if (-not $slotsName) {
+        return $null
+    }
+
+    $semaphore = $null
+    if (-not [System.Threading.Semaphore]::TryOpenExisting($slotsName, [ref]$semaphore)) {
+        Write-Log "Build slots $slotsName not found, building without waiting" "WARNING"
+        return $null
+    }
+
+    if (-not $semaphore.WaitOne(0)) {
+        Write-Host "Waiting for a free build slot (other projects are building)..." -ForegroundColor Yellow
+        $waitTimer = [System.Diagnostics.Stopwatch]::StartNew()
+        Write-LogBuffer
+        [void]$semaphore.WaitOne()
+        Write-Log "Waited $([math]::Round($waitTimer.Elapsed.TotalSeconds, 1))s for a build slot" "INFO"
+    }
+
+    return @{ Semaphore = $semaphore; Held = $true }
+}
+
+function Exit-BuildSlot {
+    <#
+    .SYNOPSIS
+        Give back a slot taken by Enter-BuildSlot, once
+    #>
+    param([hashtable]$Slot)
+
+    if ($Slot -and $Slot.Held) {
+        $Slot.Held = $false
+        [void]$Slot.Semaphore.Release()
+        $Slot.Semaphore.Dispose()
+    }
+}
+
+function Enter-ProjectLock {
+    <#
+    .SYNOPSIS
+        Take the run lock of this project and workspace, $null when another run still holds it
+    .DESCRIPTION
+        A named mutex shared by every PowerShell of the user, named after the Config and Logs
+        folder and P4CLIENT, so a watch mode run and a run from the console never sync the
+        same workspace or write the same log at once. Waits up to TimeoutSeconds, -1 waits
+        until the other run ends. The thread holding it can take it again.
+    #>
+    param([int]$TimeoutSeconds = -1)
+
+    $key = "$([System.IO.Path]::GetFullPath($stateRoot))|$env:P4CLIENT".ToLowerInvariant()
+    $sha1 = [System.Security.Cryptography.SHA1]::Create()
+    try {
+        $hash = [System.BitConverter]::ToString($sha1.ComputeHash([System.Text.Encoding]::UTF8.GetBytes($key))).Replace("-", "")
+    } finally {
+        $sha1.Dispose()
+    }
+
+    $mutex = [System.Threading.Mutex]::new($false, "SyncAndBuild_Run_$hash")
+    try {
+        $taken = $mutex.WaitOne($(if ($TimeoutSeconds -lt 0) { -1 } else { $TimeoutSeconds * 1000 }))
+    } catch [System.Threading.AbandonedMutexException] {
+        # The run that held it was killed, the lock passes to this one
+        $taken = $true
+    }
+
+    if (-not $taken) {
+        $mutex.Dispose()
+        return $null
+    }
+
+    return @{ Mutex = $mutex; Held = $true }
+}
+
+function Exit-ProjectLock {
+    <#
+    .SYNOPSIS
+        Give back a lock taken by Enter-ProjectLock, once
+    #>
+    param([hashtable]$Lock)
+
+    if ($Lock -and $Lock.Held) {
+        $Lock.Held = $false
+        $Lock.Mutex.ReleaseMutex()
+        $Lock.Mutex.Dispose()
+    }
+}
+
+function Invoke-ProjectBuild {
+    <#
+    .SYNOPSIS
+        Build the Unreal project with real-time output
+    #>
+    param(
+        [string]$UERoot,
+        [switch]$CleanBuild
+    )
+    
+    Write-Header "BUILDING PROJECT"
+    
+    if ($CleanBuild) {
+        Write-Host "Clean build requested - this will take longer" -ForegroundColor Yellow
+    } else {
+        Write-Host "Performing incremental build" -ForegroundColor Cyan
+    }
+    
+    Write-Host "Estimated time: 5-15 minutes (depending on changes)" -ForegroundColor Gray
+    Write-Host ""
+    
+    $buildBat = Join-Path $UERoot $script:CONSTANTS.Paths.UnrealBuildBat
+    
+    # Build arguments
+    $buildArgs = @(
+        "$($script:projectName)Editor",
+        "Win64",
+        "Development",
+        "`"$($script:projectFile)`""
+    )
+    
+    if ($CleanBuild) {
+        $buildArgs += "-Clean"
+    }
+    
+    # Optional: Add UBT logging (doesn't affect performance)
+    $useUBTLogging = Get-ConfigValue $script:CONSTANTS.ConfigKeys.UseUBTLogging -DefaultValue $true
+    if ($useUBTLogging) {
+        $buildLogFile = Join-Path $logsDir $script:CONSTANTS.FileNames.BuildLogFileName
+        $buildArgs += "-Log=`"$buildLogFile`""
+        Write-Log "Build log will be saved to: $buildLogFile" "VERBOSE"
+    }
+    
+    $buildArgsStr = $buildArgs -join " "
+    Write-Log "Executing: $buildBat $buildArgsStr" "VERBOSE"
+    
+    Write-Host "Starting build..." -ForegroundColor Cyan
+    Write-Host "Build output will stream below:" -ForegroundColor Gray
+    Write-Host ""
+    Write-Host "----------------------------------------" -ForegroundColor DarkGray
+    
+    # In a batch run other projects may be building, wait for a free slot
+    $buildSlot = Enter-BuildSlot
+    $buildStartTime = Get-Date
+    
+    try {
+        Write-LogBuffer
+        $process = Start-Process  -FilePath $buildBat `
+                                  -ArgumentList $buildArgs `
+                                  -NoNewWindow `
+                                  -Wait `
+                                  -PassThru
+        
+        Exit-BuildSlot -Slot $buildSlot
+        $buildEndTime = Get-Date
+        $buildDuration = $buildEndTime - $buildStartTime
+
+        $script:runState.Build = @{
+            Seconds = [math]::Round($buildDuration.TotalSeconds, 3)
+            ExitCode = $process.ExitCode
+            Clean = [bool]$CleanBuild
+        }
+
+        if ($useUBTLogging) {
+            Save-LogCopy -Path $buildLogFile -Kind "build"
+            Invoke-BuildLogAnalysis -LogFile $buildLogFile
+        }
+        
+        Write-Host "----------------------------------------" -ForegroundColor DarkGray
+        Write-Host ""
+        
+        if ($process.ExitCode -eq 0) {
+            Save-SourceManifest -BuildStart $buildStartTime
+
+            Write-Host "BUILD SUCCESSFUL!" -ForegroundColor Green
+            Write-Host "Build time: $($buildDuration.ToString('mm\:ss'))" -ForegroundColor Cyan
+            Write-Host ""
+            
+            Write-Log "Build succeeded in $($buildDuration.TotalSeconds) seconds" "INFO"
+            
+            return $true
+        } else {
+            Write-Host "BUILD FAILED!" -ForegroundColor Red
+            Write-Host "Exit code: $($process.ExitCode)" -ForegroundColor Red
+            Write-Host "Build time: $($buildDuration.ToString('mm\:ss'))" -ForegroundColor Gray
+            Write-Host ""
+            
+            if ($useUBTLogging) {
+                Write-Host "Check the build log for details: $buildLogFile" -ForegroundColor Yellow
+            }
+            
+            Write-Log "Build failed (Exit code: $($process.ExitCode), Duration: $($buildDuration.TotalSeconds)s)" "ERROR"
+            
+            return $false
+        }
+        
+    } catch {
+        $Message = $_.Exception.Message
+        Write-Log "Build error: $Message" "ERROR"
+        Write-DetailedError `
+            -Message "Build process crashed: $Message" `
+            -Category "Build" `
+            -Suggestion "Check that Visual Studio Build Tools are installed and UE path is correct"
+        return $false
+    } finally {
+        Exit-BuildSlot -Slot $buildSlot
+    }
+}
+
+function Invoke-BuildLogAnalysis {
+    <#
+    .SYNOPSIS
+        Turn the UBT log into a compile hotspot report and show the top modules
+    .DESCRIPTION
+        ubt_log_analyzer.py streams the log and writes last_build_report.json and
+        last_build_report.txt next to it. Skipped without a log or without Python.
+    #>
+    param([string]$LogFile)
+
+    if (-not $LogFile -or -not (Test-Path -LiteralPath $LogFile)) {
+        return
+    }
+
+    $logDirectory = Split-Path -Parent $LogFile
+    $reportFile = Join-Path $logDirectory $script:CONSTANTS.FileNames.BuildReportFileName
+    $summaryFile = Join-Path $logDirectory $script:CONSTANTS.FileNames.BuildSummaryFileName
+
+    $report = Invoke-PythonTool -Script $script:CONSTANTS.PythonTools.UbtLogAnalyzer -Arguments @(
+        "--log", $LogFile,
+        "--output", $reportFile,
+        "--summary", $summaryFile
+    )
+
+    if ($null -eq $report) {
+        return
+    }
+
+    if ($script:runState.Build) {
+        $script:runState.Build.Warnings = $report.warnings
+    }
+
+    Write-Log "Build report: $($report.actions.total) action(s), $($report.warnings) warning(s), $($report.errors) error(s), saved to $reportFile" "INFO"
+
+    $hotspots = @($report.modules | Where-Object { $_.compiles -gt 0 } | Select-Object -First 3)
+    if ($hotspots.Count -gt 0) {
+        $timed = $report.actions.timed -gt 0
+        Write-Host "Compile hotspots:" -ForegroundColor Cyan
+        foreach ($module in $hotspots) {
+            $detail = if ($timed) { "$([math]::Round($module.seconds, 1))s" } else { "$($module.compiles) compile action(s)" }
+            Write-Host "  $($module.module): $detail" -ForegroundColor Gray
+        }
+        Write-Host "Full report: $summaryFile" -ForegroundColor Gray
+        Write-Host ""
+    }
+}
+
+function Test-ProjectBinariesExist {
+    <#
+    .SYNOPSIS
+        Check if project binaries exist
+    #>
+    
+    $binaryPath = Join-Path $script:projectRoot "$($script:projectName)\Binaries\Win64\UnrealEditor-$($script:projectName).dll"
+    
+    $exists = Test-Path $binaryPath
+    Write-Log "Checking for project binary: $binaryPath - Exists: $exists" "VERBOSE"
+    
+    return $exists
+}
+
+# ==========================================
+# Editor Functions
+# ==========================================
+
+function Get-DdcPrefillBatches {
+    <#
+    .SYNOPSIS
+        Split the package file names into command lines for the DerivedDataCache commandlet
+    .DESCRIPTION
+        At least one batch per process so they all have work, and more when a batch would
+        not fit in one command line.
+    #>
+    param(
+        [string[]]$Packages,
+        [int]$Processes
+    )
+
+    $perBatch = [math]::Ceiling($Packages.Count / [math]::Max($Processes, 1))
+    $batches = [System.Collections.Generic.List[object]]::new()
+    $batch = [System.Collections.Generic.List[string]]::new()
+    $length = 0
+
+    foreach ($package in $Packages) {
+        if ($batch.Count -gt 0 -and ($batch.Count -ge $perBatch -or $length + $package.Length + 3 -gt $script:CONSTANTS.DdcPrefill.MaxCommandLine)) {
+            $batches.Add($batch.ToArray())
+            $batch.Clear()
+            $length = 0
+        }
+        $batch.Add($package)
+        $length += $package.Length + 3
+    }
+
+    if ($batch.Count -gt 0) {
+        $batches.Add($batch.ToArray())
+    }
+
+    return ,$batches.ToArray()
+}
+
+function Invoke-DdcPrefill {
+    <#
+    .SYNOPSIS
+        Fill the Derived Data Cache for the assets the sync brought in, before the editor opens
+    .DESCRIPTION
+        With editor.ddcPrefill, runs the DerivedDataCache commandlet on the .uasset/.umap
+        files submitted between the changelist before the sync and the one after it, so the
+        first editor launch does not compile their shaders. Skipped below
+        editor.ddcPrefillMinPackages files. The files are spread over
+        editor.ddcPrefillProcesses commandlets (0 = one per 8 cores, up to 4) and whatever
+        is still running after editor.ddcPrefillTimeoutMinutes is stopped. In a batch run the
+        commandlets compile shaders as hard as UBT does, so they hold a build slot while they
+        run. The prefill only saves time later, so it never fails the run. Its time goes into
+        the run history.
+    #>
+    param([string]$UERoot)
+
+    if (-not (Get-ConfigValue $script:CONSTANTS.ConfigKeys.DdcPrefill -DefaultValue $false)) {
+        return
+    }
+
+    $fromCL = [int]$script:runState.HaveCLBefore
+    $toCL = [int]$script:runState.HaveCL
+    if (-not $fromCL -or -not $toCL -or $toCL -le $fromCL) {
+        Write-Log "DDC prefill skipped, nothing was synced" "VERBOSE"
+        return
+    }
+
+    $prefillTimer = [System.Diagnostics.Stopwatch]::StartNew()
+    $span = Start-TraceSpan -Name "DDC prefill" -Category "editor"
+    $buildSlot = $null
+
+    try {
+        try {
+            Push-Location $script:projectRoot
+            $changedFiles = @(Get-ChangedFiles -ToCL $toCL -FromCL $fromCL -Extensions $script:CONSTANTS.DdcPrefill.Extensions)
+        } finally {
+            Pop-Location
+        }
+
+        # The commandlet finds packages by file name under the content folders
+        $packages = @($changedFiles |
+            Where-Object { $_.Action -notmatch "delete" } |
+            ForEach-Object { $_.DepotFile.Substring($_.DepotFile.LastIndexOf("/") + 1) } |
+            Sort-Object -Unique)
+
+        $minPackages = [int](Get-ConfigValue $script:CONSTANTS.ConfigKeys.DdcPrefillMinPackages -DefaultValue $script:CONSTANTS.DdcPrefill.MinPackages)
+        if ($packages.Count -eq 0 -or $packages.Count -lt $minPackages) {
+            Write-Log "DDC prefill skipped, $($packages.Count) changed package(s) between CL $fromCL and CL $toCL (minimum $minPackages)" "VERBOSE"
+            return
+        }
+
+        $editorCmd = Join-Path $UERoot $script:CONSTANTS.Paths.UnrealEditorCmdExe
+        if (-not (Test-Path $editorCmd)) {
+            Write-Log "DDC prefill skipped, commandlet executable not found: $editorCmd" "WARNING"
+            return
+        }
+
+        $processes = [int](Get-ConfigValue $script:CONSTANTS.ConfigKeys.DdcPrefillProcesses -DefaultValue 0)
+        if ($processes -le 0) {
+            $processes = [math]::Min([math]::Max([math]::Floor([Environment]::ProcessorCount / $script:CONSTANTS.DdcPrefill.CoresPerProcess), 1), $script:CONSTANTS.DdcPrefill.MaxProcesses)
+        }
+        $timeoutMinutes = [double](Get-ConfigValue $script:CONSTANTS.ConfigKeys.DdcPrefillTimeoutMinutes -DefaultValue $script:CONSTANTS.DdcPrefill.TimeoutMinutes)
+
+        $pending = [System.Collections.Generic.Queue[object]]::new()
+        foreach ($batch in (Get-DdcPrefillBatches -Packages $packages -Processes $processes)) {
+            $pending.Enqueue($batch)
+        }
+
+        Write-Header "DDC PREFILL"
+        Write-Host "Filling the Derived Data Cache for $($packages.Count) changed package(s) with $processes commandlet(s), up to $timeoutMinutes minute(s)..." -ForegroundColor Cyan
+        Write-Log "DDC prefill: $($packages.Count) package(s) in $($pending.Count) batch(es), $processes process(es), timeout $timeoutMinutes min" "INFO"
+
+        # In a batch run other projects may be building, the time limit starts with the slot
+        $buildSlot = Enter-BuildSlot
+        $commandletTimer = [System.Diagnostics.Stopwatch]::StartNew()
+
+        $running = [System.Collections.Generic.List[object]]::new()
+        $failed = 0
+        $timedOut = $false
+        $batchNumber = 0
+        $stamp = if ($script:logStamp) { $script:logStamp } else { Get-Date -Format "yyyyMMdd_HHmmss" }
+
+        while ($true) {
+            while ($running.Count -lt $processes -and $pending.Count -gt 0) {
+                $batchNumber++
+                $batchLog = Join-Path $logsDir "ddc_prefill_$($stamp)_$batchNumber.log"
+                $arguments = @("`"$($script:projectFile)`"") + $script:CONSTANTS.DdcPrefill.Arguments + @("-abslog=`"$batchLog`"") + @($pending.Dequeue() | ForEach-Object { "`"$_`"" })
+
+                Write-Log "Executing: $editorCmd $($arguments -join ' ')" "VERBOSE"
+                $process = Start-Process -FilePath $editorCmd -ArgumentList $arguments -WindowStyle Hidden -PassThru
+                # Reading the handle now keeps the exit code available after the process ends
+                $null = $process.Handle
+                $running.Add($process)
+            }
+
+            foreach ($process in @($running | Where-Object { $_.HasExited })) {
+                if ($process.ExitCode -ne 0) {
+                    $failed++
+                    Write-Log "DDC prefill commandlet exited with code $($process.ExitCode)" "WARNING"
+                }
+                [void]$running.Remove($process)
+            }
+
+            if ($running.Count -eq 0 -and $pending.Count -eq 0) {
+                break
+            }
+
+            if ($commandletTimer.Elapsed.TotalMinutes -ge $timeoutMinutes) {
+                $timedOut = $true
+                foreach ($process in $running) {
+                    Stop-Process -Id $process.Id -Force -ErrorAction SilentlyContinue
+                }
+                Write-Log "DDC prefill stopped after $timeoutMinutes minute(s), $($running.Count) commandlet(s) running and $($pending.Count) batch(es) not started" "WARNING"
+                break
+            }
+
+            Write-LogBuffer
+            Start-Sleep -Milliseconds $script:CONSTANTS.DdcPrefill.PollIntervalMs
+        }
+
+        Exit-BuildSlot -Slot $buildSlot
+        $seconds = [math]::Round($prefillTimer.Elapsed.TotalSeconds, 3)
+        $script:runState.DdcPrefill = @{
+            Packages = $packages.Count
+            Processes = $processes
+            Seconds = $seconds
+            TimedOut = $timedOut
+            Failed = $failed
+        }
+
+        $status = if ($timedOut) { "stopped at the time limit" } elseif ($failed -gt 0) { "finished with $failed failed commandlet(s)" } else { "finished" }
+        Write-Host "DDC prefill $status in $([math]::Round($seconds, 1))s" -ForegroundColor $(if ($timedOut -or $failed -gt 0) { "Yellow" } else { "Green" })
+        Write-Log "DDC prefill $status in ${seconds}s" "INFO"
+
+    } catch {
+        Write-Log "DDC prefill failed: $($_.Exception.Message)" "WARNING"
+    } finally {
+        Exit-BuildSlot -Slot $buildSlot
+        Stop-TraceSpan -Span $span -Arguments @{ packages = $script:runState.DdcPrefill.Packages }
+    }
+}
+
+function Test-KeyPressed {
+    <#
+    .SYNOPSIS
+        Take a key pressed in the console, $false when none was or there is no console
+    #>
+
+    try {
+        if ([Console]::IsInputRedirected -or -not [Console]::KeyAvailable) {
+            return $false
+        }
+        [void][Console]::ReadKey($true)
+        return $true
+    } catch {
+        return $false
+    }
+}
+
+function Wait-EditorReady {
+    <#
+    .SYNOPSIS
+        Wait for the editor's main window and return the seconds since the launch
+    .DESCRIPTION
+        Returns $null when the editor exits first, is not ready within
+        editor.readyTimeoutMinutes (0 skips the wait) or a key is pressed to stop
+        waiting; the launch itself is not affected.
+    #>
+    param(
+        $Process,
+        [System.Diagnostics.Stopwatch]$Timer
+    )
+
+    if ($null -eq $Process) {
+        return $null
+    }
+
+    $timeoutMinutes = [double](Get-ConfigValue $script:CONSTANTS.ConfigKeys.EditorReadyTimeoutMinutes -DefaultValue $script:CONSTANTS.EditorReady.TimeoutMinutes)
+    if ($timeoutMinutes -le 0) {
+        return $null
+    }
+
+    $timeout = [TimeSpan]::FromMinutes($timeoutMinutes)
+    $nextProgress = $script:CONSTANTS.EditorReady.ProgressIntervalSeconds
+    Write-Host "Waiting up to $timeoutMinutes minute(s) for the editor window, press any key to stop waiting" -ForegroundColor Gray
+    Write-LogBuffer
+
+    while ($Timer.Elapsed -lt $timeout) {
+        $Process.Refresh()
+
+        if ($Process.HasExited) {
+            Write-Log "Editor exited before its main window opened" "WARNING"
+            return $null
+        }
+
+        if ($Process.MainWindowHandle -ne [IntPtr]::Zero -and $Process.MainWindowTitle -like "*$($script:projectName)*") {
+            return [math]::Round($Timer.Elapsed.TotalSeconds, 3)
+        }
+
+        if (Test-KeyPressed) {
+            Write-Log "Stopped waiting for the editor window after $([math]::Round($Timer.Elapsed.TotalSeconds, 1))s, not timed" "INFO"
+            return $null
+        }
+
+        if ($Timer.Elapsed.TotalSeconds -ge $nextProgress) {
+            Write-Host "Still waiting for the editor window ($([math]::Round($Timer.Elapsed.TotalSeconds))s)..." -ForegroundColor Gray
+            $nextProgress += $script:CONSTANTS.EditorReady.ProgressIntervalSeconds
+        }
+
+        Start-Sleep -Milliseconds $script:CONSTANTS.EditorReady.PollIntervalMs
+    }
+
+    Write-Log "Editor main window did not open within $timeoutMinutes minute(s), not timed" "WARNING"
+    return $null
+}
+
+function Start-UnrealEditor {
+    <#
+    .SYNOPSIS
+        Launch the Unreal Editor
+    #>
+    param([string]$UERoot)
+    
+    Write-Header "READY TO LAUNCH"
+    
+    $editorExe = Join-Path $UERoot $script:CONSTANTS.Paths.UnrealEditorExe
+    
+    if (-not (Test-Path $editorExe)) {
+        Write-Log "Editor executable not found: $editorExe" "WARNING"
+        Write-Host "Warning: UnrealEditor.exe not found" -ForegroundColor Yellow
+        Write-Host "You may need to build the engine first" -ForegroundColor Yellow
+        return $false
+    }
+    
+    # Check if auto-launch is enabled
+    $autoLaunch = Get-ConfigValue $script:CONSTANTS.ConfigKeys.EditorAutoLaunch -DefaultValue $false
+    
+    if (-not $autoLaunch){
+        Write-Host "Launch Unreal Editor now? (Y/N): " -NoNewline -ForegroundColor Yellow
+        $response = Read-Host
+        $launch = $response -eq "Y" -or $response -eq "y"
+    }
+    
+    if ($launch -or $autoLaunch) {
+
+        if (-not $autoLaunch){
+            Write-Host ""
+            Write-Host "Save Response for future operations? (Y/N): " -NoNewline -ForegroundColor Yellow
+            $response = Read-Host
+            
+            if ($response -eq "Y" -or $response -eq "y")
+            {
+                Set-ConfigValue $script:CONSTANTS.ConfigKeys.EditorAutoLaunch $true
+            }
+        }
+        
+        Write-Host "Launching editor..." -ForegroundColor Cyan
+        
+        try {
+            $launchTimer = [System.Diagnostics.Stopwatch]::StartNew()
+            $editorProcess = Start-Process -FilePath $editorExe -ArgumentList "`"$($script:projectFile)`"" -PassThru
+            
+            Write-Host "Editor launched successfully!" -ForegroundColor Green
+            
+            Write-Log "Editor launched successfully" "INFO"
+
+            $readySeconds = Wait-EditorReady -Process $editorProcess -Timer $launchTimer
+            if ($null -ne $readySeconds) {
+                $script:runState.EditorReadySeconds = $readySeconds
+                Write-Host "Editor ready after $($readySeconds)s" -ForegroundColor Green
+                Write-Log "Editor ready after $($readySeconds)s" "INFO"
+            }
+            Write-Host ""
+
+            return $true
+            
+        } catch {
+            Write-Log "Failed to launch editor: $($_.Exception.Message)" "ERROR"
+            Write-Host "Failed to launch editor: $($_.Exception.Message)" -ForegroundColor Red
+            return $false
+        }
+    } else {
+        Write-Host ""
+        Write-Host "Skipping editor launch" -ForegroundColor Gray
+        Write-Log "User chose not to launch editor" "INFO"
+        return $true
+    }
+}
+
+# ==========================================
+# Run History
+# ==========================================
+
+function Add-RunHistory {
+    <#
+    .SYNOPSIS
+        Append this run's changelists, sync numbers and phase timings to the run history
+    .DESCRIPTION
+        One JSON object per line, read by run_history.py for the p50/p95/max report.
+        Phases that did not run are left null.
+    #>
+    param(
+        [switch]$Succeeded,
+        [double]$TotalSeconds,
+        [string]$Path = (Join-Path $logsDir $script:CONSTANTS.FileNames.RunHistoryFileName)
+    )
+
+    $state = $script:runState
+
+    $record = [ordered]@{
+        timestamp = (Get-Date).ToString("yyyy-MM-ddTHH:mm:ssK")
+        project = $script:projectName
+        succeeded = [bool]$Succeeded
+        fromCL = $state.HaveCLBefore
+        toCL = $state.HaveCL
+        filesPending = $state.SyncPreview.Files
+        bytesPending = $state.SyncPreview.Bytes
+        filesSynced = $state.Sync.Files
+        bytesSynced = $state.Sync.Bytes
+        syncSeconds = $state.Sync.Seconds
+        contentSyncSeconds = $state.ContentSync.Seconds
+        filesContentSynced = $state.ContentSync.Files
+        bytesContentSynced = $state.ContentSync.Bytes
+        codeCheckSeconds = $state.CodeCheckSeconds
+        buildRan = $null -ne $state.Build
+        buildSeconds = $state.Build.Seconds
+        buildExitCode = $state.Build.ExitCode
+        buildWarnings = $state.Build.Warnings
+        ddcPrefillSeconds = $state.DdcPrefill.Seconds
+        ddcPrefillPackages = $state.DdcPrefill.Packages
+        ddcPrefillTimedOut = $state.DdcPrefill.TimedOut
+        affectedModules = $state.AffectedModules
+        editorReadySeconds = $state.EditorReadySeconds
+        totalSeconds = [math]::Round($TotalSeconds, 3)
+    }
+
+    try {
+        $line = $record | ConvertTo-Json -Compress -Depth $script:CONSTANTS.JsonConfigDepth
+        Add-Content -Path $Path -Value $line -Encoding UTF8
+    } catch {
+        Write-Log "Could not write run history: $($_.Exception.Message)" "WARNING"
+    }
+}
+
+# ==========================================
+# Watch Mode
+# ==========================================
+
+function Get-WatchBusyReason {
+    <#
+    .SYNOPSIS
+        Why the machine is not idle enough for a background sync and build, $null when it is
+    .DESCRIPTION
+        An open editor or a running build holds the binaries and files a sync would replace,
+        and a busy CPU belongs to the developer. A CPU load that cannot be read does not block.
+    #>
+
+    $running = @(Get-Process -Name $script:CONSTANTS.Watch.BusyProcesses -ErrorAction SilentlyContinue)
+    if ($running.Count -gt 0) {
+        return "$($running[0].ProcessName) is running"
+    }
+
+    $maxCpuPercent = [int](Get-ConfigValue $script:CONSTANTS.ConfigKeys.WatchMaxCpuPercent -DefaultValue $script:CONSTANTS.Watch.MaxCpuPercent)
+    try {
+        $cpuPercent = (Get-CimInstance -ClassName Win32_Processor -ErrorAction Stop | Measure-Object -Property LoadPercentage -Average).Average
+    } catch {
+        Write-Log "Could not read the CPU load: $($_.Exception.Message)" "VERBOSE"
+        return $null
+    }
+
+    if ($null -ne $cpuPercent -and $cpuPercent -gt $maxCpuPercent) {
+        return "CPU load is $([math]::Round($cpuPercent))% (limit $maxCpuPercent%)"
+    }
+
+    return $null
+}
+
+function Invoke-WatchRun {
+    <#
+    .SYNOPSIS
+        One background sync and build of watch mode, $true only when Main itself succeeded
+    #>
+    param([hashtable]$Lock)
+
+    try {
+        $output = @(Main -NoEditor -ProjectFile $script:projectFile)
+    } finally {
+        Exit-ProjectLock -Lock $Lock
+    }
+
+    # Anything else a call left in Main's output must not pass for a success
+    return ($output.Count -gt 0 -and $output[-1] -eq $true)
+}
+
+function Start-WatchMode {
+    <#
+    .SYNOPSIS
+        Keep the workspace synced and built in the background, ahead of the next click
+    .DESCRIPTION
+        Polls the head changelist with one p4 changes -m1 call. When it is newer than the
+        last built changelist and the machine is idle (see Get-WatchBusyReason), runs Main
+        without the editor launch, which syncs, builds if compiled inputs changed and
+        updates build.lastBuiltCL. The next normal run then finds nothing to do.
+
+        Polls double their interval up to watch.maxPollSeconds while nothing new arrives
+        or the server cannot be reached, and go back to watch.pollSeconds on a new
+        changelist. Stops with Ctrl+C, or after MaxPolls polls when it is above 0.
+
+        Nobody answers prompts in the background, so the project and engine are resolved
+        once before the loop and watch mode does not start when that needs a choice. A run
+        started from the console holds the project lock, the changelist waits for it like
+        for a busy machine, and the log is released while watch mode sleeps.
+        Returns $false in that case.
+    #>
+    param([int]$MaxPolls = 0)
+
+    Initialize-Log
+    Write-Header "SYNC AND BUILD - WATCH MODE"
+
+    $script:unattended = $true
+    try {
+        Initialize-ProjectPaths
+        $null = Get-UnrealEngineRoot
+    } catch {
+        Write-Host "Watch mode cannot start: $($_.Exception.Message)" -ForegroundColor Red
+        if ($_.Exception -is [BuildException]) {
+            Write-Host $_.Exception.Suggestion -ForegroundColor Yellow
+        }
+        Write-Log "Watch mode cannot start: $($_.Exception.Message)" "ERROR"
+        $script:unattended = $false
+        Close-Log
+        return $false
+    }
+
+    $pollSeconds = [math]::Max([int](Get-ConfigValue $script:CONSTANTS.ConfigKeys.WatchPollSeconds -DefaultValue $script:CONSTANTS.Watch.PollSeconds), 1)
+    $maxPollSeconds = [math]::Max([int](Get-ConfigValue $script:CONSTANTS.ConfigKeys.WatchMaxPollSeconds -DefaultValue $script:CONSTANTS.Watch.MaxPollSeconds), $pollSeconds)
+
+    Write-Host "Watching $script:projectName for new changelists every ${pollSeconds}s (Ctrl+C to stop)" -ForegroundColor Cyan
+    Write-Log "Watch mode started: poll ${pollSeconds}s, backoff up to ${maxPollSeconds}s" "INFO"
+
+    $interval = $pollSeconds
+    $pendingCL = $null
+    $doneCL = 0
+    $polls = 0
+    $failedCL = $null
+    $lastBusyReason = $null
+
+    try {
+        while ($MaxPolls -le 0 -or $polls -lt $MaxPolls) {
+            $polls++
+
+            if (-not $pendingCL) {
+                $headCL = Get-HeadChangelist
+                $lastBuiltCL = [int](Get-ConfigValue $script:CONSTANTS.ConfigKeys.LastBuiltCL -DefaultValue 0)
+
+                if (-not $headCL) {
+                    $interval = [math]::Min($interval * 2, $maxPollSeconds)
+                    Write-Log "Could not read the head changelist, next poll in ${interval}s" "WARNING"
+                } elseif ($headCL -gt [math]::Max($lastBuiltCL, $doneCL)) {
+                    $pendingCL = $headCL
+                    # A changelist that just failed keeps its backoff
+                    if ($headCL -ne $failedCL) {
+                        $interval = $pollSeconds
+                    }
+                    Write-Host "[$(Get-Date -Format 'HH:mm:ss')] New changelist $headCL (last built: $lastBuiltCL)" -ForegroundColor Yellow
+                    Write-Log "New changelist $headCL, last built $lastBuiltCL" "INFO"
+                } else {
+                    $interval = [math]::Min($interval * 2, $maxPollSeconds)
+                    Write-Log "Up to date at CL $headCL, next poll in ${interval}s" "VERBOSE"
+                }
+            }
+
+            if ($pendingCL) {
+                $busyReason = Get-WatchBusyReason
+                $projectLock = $null
+                if (-not $busyReason) {
+                    # A run started from the console goes first, Main takes the lock again
+                    $projectLock = Enter-ProjectLock -TimeoutSeconds 0
+                    if (-not $projectLock) {
+                        $busyReason = "another run of $script:projectName is in progress"
+                    }
+                }
+                if (-not $busyReason) {
+                    $lastBusyReason = $null
+                }
+
+                if ($busyReason) {
+                    # Said once, an open editor keeps the machine busy for hours
+                    if ($busyReason -ne $lastBusyReason) {
+                        Write-Log "CL $pendingCL waits for an idle machine: $busyReason" "INFO"
+                    }
+                    $lastBusyReason = $busyReason
+                    $interval = $pollSeconds
+                } elseif (Invoke-WatchRun -Lock $projectLock) {
+                    # The sync may have gone past the polled changelist
+                    $doneCL = [math]::Max($pendingCL, [int]$script:runState.HaveCL)
+                    $pendingCL = $null
+                    $failedCL = $null
+                    $interval = $pollSeconds
+                    Write-Host "[$(Get-Date -Format 'HH:mm:ss')] Workspace ready at CL $doneCL" -ForegroundColor Green
+                } else {
+                    # Tried again on a later poll, without hammering a broken server or build
+                    $failedCL = $pendingCL
+                    $pendingCL = $null
+                    $interval = [math]::Min($interval * 2, $maxPollSeconds)
+                    Write-Log "Background sync and build failed, retrying in ${interval}s" "WARNING"
+                }
+            }
+
+            if ($MaxPolls -le 0 -or $polls -lt $MaxPolls) {
+                # A run from the console rewrites the log while this one sleeps
+                Close-Log
+                Start-Sleep -Seconds $interval
+            }
+        }
+    } finally {
+        # Ctrl+C ends the loop here too
+        $script:unattended = $false
+        Close-Log
+    }
+
+    return $true
+}
+
+# ==========================================
+# Batch Mode
+# ==========================================
+
+function Get-BatchProjects {
+    <#
+    .SYNOPSIS
+        Projects of a batch run: the given .uproject paths, batch.projects, or every project found
+    .DESCRIPTION
+        batch.projects entries are a .uproject path or an object with project, and optionally
+        workspace (P4CLIENT for that run) and engine. Each project gets a state folder named
+        after it, and after its workspace when several entries share a project name.
+    #>
+    param([string[]]$Projects)
+
+    $entries = @()
+
+    if ($Projects) {
+        $entries = @($Projects | ForEach-Object { @{ ProjectFile = $_; Workspace = $null; Engine = $null } })
+    } else {
+        $configured = @(Get-ConfigValue $script:CONSTANTS.ConfigKeys.BatchProjects -DefaultValue @())
+        $entries = @($configured | Where-Object { $_ } | ForEach-Object {
+            if ($_ -is [string]) {
+                @{ ProjectFile = $_; Workspace = $null; Engine = $null }
+            } else {
+                @{ ProjectFile = $_.project; Workspace = $_.workspace; Engine = $_.engine }
+            }
+        })
+    }
+
+    if ($entries.Count -eq 0) {
+        $searchRoot = Split-Path -Parent (Split-Path -Parent (Split-Path -Parent $script:scriptRoot))
+        $entries = @(Find-UnrealProject -SearchPath $searchRoot -All | ForEach-Object { @{ ProjectFile = $_.FullName; Workspace = $null; Engine = $null } })
+    }
+
+    foreach ($entry in $entries) {
+        $entry.Name = [System.IO.Path]::GetFileNameWithoutExtension($entry.ProjectFile)
+        if ($entry.Workspace) {
+            $entry.Name = "$($entry.Name)_$($entry.Workspace)"
+        }
+        $entry.StateDir = Join-Path (Join-Path $script:scriptRoot "..") (Join-Path $script:CONSTANTS.Batch.StateFolder $entry.Name)
+    }
+
+    return ,$entries
+}
+
+function Get-BuildSlotCount {
+    <#
+    .SYNOPSIS
+        How many UBT runs a batch run lets build at once
+    .DESCRIPTION
+        batch.maxConcurrentBuilds when set, otherwise one per CoresPerBuild cores limited by
+        one per MemoryPerBuildGB of free memory, and at least one.
+    #>
+
+    $configured = [int](Get-ConfigValue $script:CONSTANTS.ConfigKeys.BatchMaxBuilds -DefaultValue 0)
+    if ($configured -gt 0) {
+        return $configured
+    }
+
+    $byCores = [math]::Floor([Environment]::ProcessorCount / $script:CONSTANTS.Batch.CoresPerBuild)
+    $slots = $byCores
+
+    try {
+        $freeGB = (Get-CimInstance -ClassName Win32_OperatingSystem -ErrorAction Stop).FreePhysicalMemory / 1MB
+        $byMemory = [math]::Floor($freeGB / $script:CONSTANTS.Batch.MemoryPerBuildGB)
+        $slots = [math]::Min($byCores, $byMemory)
+        Write-Log "Build slots: $byCores by $([Environment]::ProcessorCount) cores, $byMemory by $([math]::Round($freeGB, 1)) GB free" "VERBOSE"
+    } catch {
+        Write-Log "Could not read free memory, build slots by cores only: $($_.Exception.Message)" "VERBOSE"
+    }
+
+    return [int][math]::Max($slots, 1)
+}
+
+function Initialize-BatchState {
+    <#
+    .SYNOPSIS
+        Create the Config and Logs folders of a batch project, $null when it is ready to run
+    .DESCRIPTION
+        A new project starts from a copy of this tool's config (same engine and settings)
+        without its last built changelist. With unrealEngine.useIndex the project resolves its
+        own engine from its EngineAssociation, so only a project without the index and without
+        a valid unrealEngine.path cannot run. Returns why the project cannot run otherwise.
+    #>
+    param([hashtable]$Entry)
+
+    $entryConfigDir = Join-Path $Entry.StateDir "Config"
+    New-Item -ItemType Directory -Force -Path $entryConfigDir, (Join-Path $Entry.StateDir "Logs") | Out-Null
+    $entryConfigFile = Join-Path $entryConfigDir $script:CONSTANTS.FileNames.ConfigFileName
+
+    if (-not (Test-Path $entryConfigFile)) {
+        $config = Get-Config | ConvertTo-Json -Depth $script:CONSTANTS.JsonConfigDepth | ConvertFrom-Json
+        $config.build | Add-Member -NotePropertyName "lastBuiltCL" -NotePropertyValue 0 -Force
+        $config.project | Add-Member -NotePropertyName "name" -NotePropertyValue "" -Force
+        if ($Entry.Engine) {
+            $config.unrealEngine | Add-Member -NotePropertyName "path" -NotePropertyValue $Entry.Engine -Force
+        }
+        $config | ConvertTo-Json -Depth $script:CONSTANTS.JsonConfigDepth | Out-File -FilePath $entryConfigFile -Encoding UTF8
+    }
+
+    $engineConfig = (Get-Content $entryConfigFile -Raw -Encoding UTF8 | ConvertFrom-Json).unrealEngine
+    $engine = $engineConfig.path
+    if ($engine -and (Test-Path (Join-Path $engine $script:CONSTANTS.Paths.UnrealBuildBat))) {
+        return $null
+    }
+
+    # A batch run cannot stop to ask for the engine
+    if ($engineConfig.useIndex -eq $false) {
+        return "Unreal Engine not found ($engine) and unrealEngine.useIndex is off, set unrealEngine.path in $entryConfigFile"
+    }
+
+    return $null
+}
+
+function Invoke-BatchChild {
+    <#
+    .SYNOPSIS
+        Run one batch project without the editor and return the exit code of its PowerShell
+    .DESCRIPTION
+        Only Main's own result counts: anything else a call left in its output must not turn a
+        failed run into a success.
+    #>
+    param([string]$ProjectFile)
+
+    $output = @(Main -ProjectFile $ProjectFile -NoEditor -Unattended)
+    if ($output.Count -gt 0 -and $output[-1] -eq $true) {
+        return 0
+    }
+
+    return 1
+}
+
+function Get-PerforceSettings {
+    <#
+    .SYNOPSIS
+        Perforce settings p4 resolves in a folder, from P4CONFIG files, the environment and p4 set
+    #>
+    param([string]$Directory)
+
+    $settings = @{}
+
+    try {
+        Push-Location $Directory
+
+        $output = & {
+            $ErrorActionPreference = "Continue"
+            & p4 set -q 2>&1
+        }
+        if ($LASTEXITCODE -ne 0) {
+            Write-Log "Could not read the Perforce settings of $Directory (output: $output)" "WARNING"
+            return $settings
+        }
+
+        foreach ($line in $output) {
+            if ("$line" -match "^(P4\w+)=(.*)$") {
+                $settings[$Matches[1]] = $Matches[2]
             }
+        }
+        return $settings
+    } finally {
+        Pop-Location
+    }
+}
+
+function Start-BatchProject {
+    <#
+    .SYNOPSIS
+        Start Main for one batch project in its own PowerShell, without the editor
+    #>
+    param(
+        [hashtable]$Entry,
+        [string]$SlotsName
+    )
 
-            Write-Log "Describing CL $clNum" "VERBOSE"
+    $scriptPath = (Join-Path $script:scriptRoot "sync_and_build.ps1").Replace("'", "''")
+    $projectFile = $Entry.ProjectFile.Replace("'", "''")
+    $command = "& { . '$scriptPath'; exit (Invoke-BatchChild -ProjectFile '$projectFile') }"
+    $consoleLog = Join-Path $Entry.StateDir (Join-Path "Logs" $script:CONSTANTS.Batch.ConsoleLogFileName)
 
-            $description = p4 describe -s $clNum 2>&1 | Out-String
-            Write-Host "CL $clNum description: `n$description"
-            foreach ($ext in $codeExtensions)
-            {
-                $pattern = [regex]::Escape($ext) + "#\d+"
-                if ($description -match $pattern)
-                {
-                    Write-Log "Found code changes in CL $clNum (matched: $ext)" "VERBOSE"
-                    $foundChanges = $true
-                }
+    # The child inherits the environment, set only while it starts
+    $variables = @{
+        $script:CONSTANTS.Batch.StateDirVariable = $Entry.StateDir
+        $script:CONSTANTS.Batch.BuildSlotsVariable = $SlotsName
+    }
+    if ($Entry.Workspace) {
+        # A P4CONFIG file beats P4CLIENT, so the child gets what the project folder resolves to
+        # as variables and a P4CONFIG that matches no file, which leaves the workspace to P4CLIENT
+        $settings = Get-PerforceSettings -Directory (Split-Path $Entry.ProjectFile -Parent)
+        foreach ($name in $settings.Keys) {
+            if ($name -notin "P4CLIENT", "P4CONFIG") {
+                $variables[$name] = $settings[$name]
             }
         }
+        $variables["P4CONFIG"] = $script:CONSTANTS.Batch.NoP4ConfigName
+        $variables["P4CLIENT"] = $Entry.Workspace
+    }
+    $previous = @{}
+    foreach ($name in $variables.Keys) {
+        $previous[$name] = [Environment]::GetEnvironmentVariable($name)
+        [Environment]::SetEnvironmentVariable($name, $variables[$name])
+    }
 
-        if (-not $foundChanges)
-        {
-            Write-Log "No code changes detected" "VERBOSE"
+    try {
+        Write-Log "Starting batch project $($Entry.Name): $command" "VERBOSE"
+        $process = Start-Process -FilePath "powershell.exe" `
+                                 -ArgumentList @("-ExecutionPolicy", "Bypass", "-NoProfile", "-Command", "`"$command`"") `
+                                 -NoNewWindow `
+                                 -RedirectStandardOutput $consoleLog `
+                                 -RedirectStandardError "$consoleLog.err" `
+                                 -PassThru
+        # Reading the handle now keeps the exit code available after the process ends
+        $null = $process.Handle
+        return $process
+    } finally {
+        foreach ($name in $previous.Keys) {
+            [Environment]::SetEnvironmentVariable($name, $previous[$name])
         }
+    }
+}
 
-        Pop-Location
-        return $foundChanges
+function Get-BatchHistoryLineCount {
+    <#
+    .SYNOPSIS
+        Lines in the run history of a batch project, 0 when it has none yet
+    #>
+    param([hashtable]$Entry)
 
-    } catch {
-        $Message = $_.Exception.Message
-        Write-Log "Could not check for code changes: $Message" "WARNING"
-        Pop-Location
-        return $true
+    $historyFile = Join-Path $Entry.StateDir (Join-Path "Logs" $script:CONSTANTS.FileNames.RunHistoryFileName)
+    if (-not (Test-Path $historyFile)) {
+        return 0
     }
-}
 
-# ==========================================
-# Build Functions
-# ==========================================
+    return @(Get-Content $historyFile -Encoding UTF8).Count
+}
 
-function Invoke-ProjectBuild {
+function Get-BatchResult {
     <#
     .SYNOPSIS
-        Build the Unreal project with real-time output
+        Outcome of a finished batch project, with its numbers from its run history
+    .DESCRIPTION
+        Only a line added after the project started counts, HistoryLines being the length of
+        the history then. A project that never started, or did not get to write its line,
+        shows no numbers rather than those of an older run.
     #>
     param(
-        [string]$UERoot,
-        [switch]$CleanBuild
-    )
-    
-    Write-Header "BUILDING PROJECT"
-    
-    if ($CleanBuild) {
-        Write-Host "Clean build requested - this will take longer" -ForegroundColor Yellow
-    } else {
-        Write-Host "Performing incremental build" -ForegroundColor Cyan
-    }
-    
-    Write-Host "Estimated time: 5-15 minutes (depending on changes)" -ForegroundColor Gray
-    Write-Host ""
-    
-    $buildBat = Join-Path $UERoot $script:CONSTANTS.Paths.UnrealBuildBat
-    
-    # Build arguments
-    $buildArgs = @(
-        "$($script:projectName)Editor",
-        "Win64",
-        "Development",
-        "`"$($script:projectFile)`""
+        [hashtable]$Entry,
+        [bool]$Succeeded,
+        [string]$Note = "",
+        [object]$HistoryLines = $null
     )
-    
-    if ($CleanBuild) {
-        $buildArgs += "-Clean"
-    }
-    
-    # Optional: Add UBT logging (doesn't affect performance)
-    $useUBTLogging = Get-ConfigValue $script:CONSTANTS.ConfigKeys.UseUBTLogging -DefaultValue $true
-    if ($useUBTLogging) {
-        $buildLogFile = Join-Path $logsDir $script:CONSTANTS.FileNames.BuildLogFileName
-        $buildArgs += "-Log=`"$buildLogFile`""
-        Write-Log "Build log will be saved to: $buildLogFile" "VERBOSE"
-    }
-    
-    $buildArgsStr = $buildArgs -join " "
-    Write-Log "Executing: $buildBat $buildArgsStr" "VERBOSE"
-    
-    Write-Host "Starting build..." -ForegroundColor Cyan
-    Write-Host "Build output will stream below:" -ForegroundColor Gray
-    Write-Host ""
-    Write-Host "----------------------------------------" -ForegroundColor DarkGray
-    
-    $buildStartTime = Get-Date
-    
+
+    $record = $null
+    $historyFile = Join-Path $Entry.StateDir (Join-Path "Logs" $script:CONSTANTS.FileNames.RunHistoryFileName)
     try {
-        $process = Start-Process  -FilePath $buildBat `
-                                  -ArgumentList $buildArgs `
-                                  -NoNewWindow `
-                                  -Wait `
-                                  -PassThru
-        
-        $buildEndTime = Get-Date
-        $buildDuration = $buildEndTime - $buildStartTime
-        
-        Write-Host "----------------------------------------" -ForegroundColor DarkGray
-        Write-Host ""
-        
-        if ($process.ExitCode -eq 0) {
-            Write-Host "BUILD SUCCESSFUL!" -ForegroundColor Green
-            Write-Host "Build time: $($buildDuration.ToString('mm\:ss'))" -ForegroundColor Cyan
-            Write-Host ""
-            
-            Write-Log "Build succeeded in $($buildDuration.TotalSeconds) seconds" "INFO"
-            
-            return $true
-        } else {
-            Write-Host "BUILD FAILED!" -ForegroundColor Red
-            Write-Host "Exit code: $($process.ExitCode)" -ForegroundColor Red
-            Write-Host "Build time: $($buildDuration.ToString('mm\:ss'))" -ForegroundColor Gray
-            Write-Host ""
-            
-            if ($useUBTLogging) {
-                Write-Host "Check the build log for details: $buildLogFile" -ForegroundColor Yellow
+        if ($null -ne $HistoryLines -and (Test-Path $historyFile)) {
+            $lines = @(Get-Content $historyFile -Encoding UTF8)
+            if ($lines.Count -gt [int]$HistoryLines) {
+                $record = $lines[-1] | ConvertFrom-Json
             }
-            
-            Write-Log "Build failed (Exit code: $($process.ExitCode), Duration: $($buildDuration.TotalSeconds)s)" "ERROR"
-            
-            return $false
         }
-        
     } catch {
-        $Message = $_.Exception.Message
-        Write-Log "Build error: $Message" "ERROR"
-        Write-DetailedError `
-            -Message "Build process crashed: $Message" `
-            -Category "Build" `
-            -Suggestion "Check that Visual Studio Build Tools are installed and UE path is correct"
-        return $false
+        Write-Log "Could not read the run history of $($Entry.Name): $($_.Exception.Message)" "VERBOSE"
+    }
+
+    return [PSCustomObject]@{
+        Project = $Entry.Name
+        Succeeded = $Succeeded
+        FromCL = $record.fromCL
+        ToCL = $record.toCL
+        SyncSeconds = $record.syncSeconds
+        BuildSeconds = $record.buildSeconds
+        TotalSeconds = $record.totalSeconds
+        Note = $Note
     }
 }
 
-function Test-ProjectBinariesExist {
+function Write-BatchSummary {
     <#
     .SYNOPSIS
-        Check if project binaries exist
+        One line per project of a batch run: result, changelists and phase times
     #>
-    
-    $binaryPath = Join-Path $script:projectRoot "$($script:projectName)\Binaries\Win64\UnrealEditor-$($script:projectName).dll"
-    
-    $exists = Test-Path $binaryPath
-    Write-Log "Checking for project binary: $binaryPath - Exists: $exists" "VERBOSE"
-    
-    return $exists
-}
+    param([object[]]$Results)
 
-# ==========================================
-# Editor Functions
-# ==========================================
+    $format = "{0,-28} {1,-7} {2,-17} {3,9} {4,9} {5,9}"
+    $seconds = { param($value) if ($null -eq $value) { "-" } else { "$([math]::Round($value, 1))s" } }
 
-function Start-UnrealEditor {
+    Write-Header "BATCH SUMMARY"
+    Write-Host ($format -f "Project", "Result", "Changelists", "Sync", "Build", "Total") -ForegroundColor White
+
+    foreach ($result in $Results) {
+        $changelists = if ($result.ToCL) { "$($result.FromCL) -> $($result.ToCL)" } else { "-" }
+        $line = $format -f $result.Project, $(if ($result.Succeeded) { "OK" } else { "FAILED" }), $changelists,
+            (& $seconds $result.SyncSeconds), (& $seconds $result.BuildSeconds), (& $seconds $result.TotalSeconds)
+        Write-Host $line -ForegroundColor $(if ($result.Succeeded) { "Green" } else { "Red" })
+        if ($result.Note) {
+            Write-Host "  $($result.Note)" -ForegroundColor Yellow
+        }
+        Write-Log ($line + $(if ($result.Note) { " ($($result.Note))" } else { "" })) "INFO"
+    }
+
+    Write-Host ""
+}
+
+function Start-BatchMode {
     <#
     .SYNOPSIS
-        Launch the Unreal Editor
+        Sync and build several projects or workspaces in one unattended run
+    .DESCRIPTION
+        Up to batch.maxConcurrentProjects projects run at once (0 = up to 4), each as Main
+        -NoEditor in its own PowerShell, so one project syncs while another builds. UBT runs
+        wait for one of Get-BuildSlotCount slots. Prints a summary table at the end and
+        returns whether every project succeeded.
     #>
-    param([string]$UERoot)
-    
-    Write-Header "READY TO LAUNCH"
-    
-    $editorExe = Join-Path $UERoot $script:CONSTANTS.Paths.UnrealEditorExe
-    
-    if (-not (Test-Path $editorExe)) {
-        Write-Log "Editor executable not found: $editorExe" "WARNING"
-        Write-Host "Warning: UnrealEditor.exe not found" -ForegroundColor Yellow
-        Write-Host "You may need to build the engine first" -ForegroundColor Yellow
-        return $false
+    param([string[]]$Projects)
+
+    Initialize-Log
+    Write-Header "SYNC AND BUILD - BATCH MODE"
+
+    $entries = Get-BatchProjects -Projects $Projects
+    $maxProjects = [int](Get-ConfigValue $script:CONSTANTS.ConfigKeys.BatchMaxProjects -DefaultValue 0)
+    if ($maxProjects -le 0) {
+        $maxProjects = [math]::Min($entries.Count, $script:CONSTANTS.Batch.MaxProjects)
     }
-    
-    # Check if auto-launch is enabled
-    $autoLaunch = Get-ConfigValue $script:CONSTANTS.ConfigKeys.EditorAutoLaunch -DefaultValue $false
-    
-    if (-not $autoLaunch){
-        Write-Host "Launch Unreal Editor now? (Y/N): " -NoNewline -ForegroundColor Yellow
-        $response = Read-Host
-        $launch = $response -eq "Y" -or $response -eq "y"
+    $buildSlots = Get-BuildSlotCount
+
+    Write-Host "$($entries.Count) project(s), $maxProjects at a time, $buildSlots build(s) at a time" -ForegroundColor Cyan
+    Write-Log "Batch run: $($entries.Count) project(s), $maxProjects concurrent, $buildSlots build slot(s)" "INFO"
+
+    $slotsName = "SyncAndBuild_Builds_$PID"
+    $semaphore = [System.Threading.Semaphore]::new($buildSlots, $buildSlots, $slotsName)
+
+    $pending = [System.Collections.Generic.Queue[object]]::new()
+    foreach ($entry in $entries) {
+        $pending.Enqueue($entry)
     }
-    
-    if ($launch -or $autoLaunch) {
+    $running = [System.Collections.Generic.List[object]]::new()
+    $results = [System.Collections.Generic.List[object]]::new()
 
-        if (-not $autoLaunch){
-            Write-Host ""
-            Write-Host "Save Response for future operations? (Y/N): " -NoNewline -ForegroundColor Yellow
-            $response = Read-Host
-            
-            if ($response -eq "Y" -or $response -eq "y")
-            {
-                Set-ConfigValue $script:CONSTANTS.ConfigKeys.EditorAutoLaunch $true
+    try {
+        while ($pending.Count -gt 0 -or $running.Count -gt 0) {
+            while ($running.Count -lt $maxProjects -and $pending.Count -gt 0) {
+                $entry = $pending.Dequeue()
+
+                $problem = Initialize-BatchState -Entry $entry
+                if ($problem) {
+                    Write-Log "$($entry.Name) skipped: $problem" "WARNING"
+                    $results.Add((Get-BatchResult -Entry $entry -Succeeded $false -Note $problem))
+                    continue
+                }
+
+                # Older runs stay in the history, the result only reads what this run adds
+                $historyLines = Get-BatchHistoryLineCount -Entry $entry
+
+                Write-Host "[$(Get-Date -Format 'HH:mm:ss')] $($entry.Name) started" -ForegroundColor Cyan
+                $running.Add(@{ Entry = $entry; HistoryLines = $historyLines; Process = (Start-BatchProject -Entry $entry -SlotsName $slotsName) })
+            }
+
+            foreach ($project in @($running | Where-Object { $_.Process.HasExited })) {
+                $succeeded = $project.Process.ExitCode -eq 0
+                $note = if ($succeeded) { "" } else { "See $(Join-Path $project.Entry.StateDir 'Logs')" }
+                Write-Host "[$(Get-Date -Format 'HH:mm:ss')] $($project.Entry.Name) $(if ($succeeded) { 'finished' } else { 'failed' })" -ForegroundColor $(if ($succeeded) { "Green" } else { "Red" })
+                $results.Add((Get-BatchResult -Entry $project.Entry -Succeeded $succeeded -Note $note -HistoryLines $project.HistoryLines))
+                [void]$running.Remove($project)
+            }
+
+            if ($running.Count -gt 0) {
+                Write-LogBuffer
+                Start-Sleep -Milliseconds $script:CONSTANTS.Batch.PollIntervalMs
             }
         }
-        
-        Write-Host "Launching editor..." -ForegroundColor Cyan
-        
-        try {
-            Start-Process -FilePath $editorExe -ArgumentList "`"$($script:projectFile)`""
-            
-            Write-Host "Editor launched successfully!" -ForegroundColor Green
-            Write-Host "It may take a minute to open." -ForegroundColor Gray
-            Write-Host ""
-            
-            Write-Log "Editor launched successfully" "INFO"
-            return $true
-            
-        } catch {
-            Write-Log "Failed to launch editor: $($_.Exception.Message)" "ERROR"
-            Write-Host "Failed to launch editor: $($_.Exception.Message)" -ForegroundColor Red
-            return $false
-        }
-    } else {
-        Write-Host ""
-        Write-Host "Skipping editor launch" -ForegroundColor Gray
-        Write-Log "User chose not to launch editor" "INFO"
-        return $true
+    } finally {
+        $semaphore.Dispose()
     }
+
+    Write-BatchSummary -Results $results.ToArray()
+    Close-Log
+
+    return (@($results | Where-Object { -not $_.Succeeded }).Count -eq 0)
 }
 
 # ==========================================
@@ -1128,6 +3710,24 @@ function Main
     .PARAMETER Verbose
         Show detailed operation logs
 
+    .PARAMETER Watch
+        Stay running and sync and build new changelists in the background, see Start-WatchMode
+
+    .PARAMETER NoEditor
+        Stop after the build, without launching the editor
+
+    .PARAMETER Batch
+        Sync and build several projects unattended, see Start-BatchMode
+
+    .PARAMETER Projects
+        .uproject paths for -Batch, batch.projects from the config otherwise
+
+    .PARAMETER ProjectFile
+        Use this .uproject instead of detecting the project
+
+    .PARAMETER Unattended
+        Fail instead of asking when the project or engine needs a choice, for batch projects
+
     .NOTES
         Version: 2.0
         Improvements over v1:
@@ -1142,13 +3742,45 @@ function Main
         [switch]$SkipSync = $false,
         [switch]$Clean = $false,
         [switch]$ForceBuild = $false,
-        [switch]$Verbose = $false
+        [switch]$Verbose = $false,
+        [switch]$Watch = $false,
+        [switch]$NoEditor = $false,
+        [switch]$Batch = $false,
+        [string[]]$Projects = @(),
+        [string]$ProjectFile = "",
+        [switch]$Unattended = $false
     )
 
-    try 
+    if ($Watch) {
+        return (Start-WatchMode) -ne $false
+    }
+
+    if ($Batch) {
+        return Start-BatchMode -Projects $Projects
+    }
+
+    $runTimer = [System.Diagnostics.Stopwatch]::StartNew()
+    $runSucceeded = $false
+    $wasUnattended = $script:unattended
+    if ($Unattended) {
+        $script:unattended = $true
+    }
+
+    # Another run of this project owns the workspace, the config and the log until it ends
+    $projectLock = Enter-ProjectLock -TimeoutSeconds 0
+    if (-not $projectLock) {
+        Write-Host "Another run of this project is syncing or building, waiting for it to finish..." -ForegroundColor Yellow
+        $projectLock = Enter-ProjectLock
+    }
+
+    try
     {
         # Initialize
         Initialize-Log
+        $script:runState = @{}
+        Start-Trace
+        $mainSpan = Start-TraceSpan -Name "Main"
+        Start-LogRetention
         
         Write-Host ""
         Write-Header "UNREAL ENGINE - SYNC AND BUILD TOOL v2.0"
@@ -1157,21 +3789,22 @@ function Main
         
         # Initialize project paths
         Write-Log "Initializing project paths..." "INFO"
-        Initialize-ProjectPaths
+        $null = Invoke-TraceSpan "Initialize-ProjectPaths" { Initialize-ProjectPaths -ProjectFile $ProjectFile }
         
         Write-Host "Project: $script:projectName" -ForegroundColor White
         Write-Host "Location: $script:projectRoot" -ForegroundColor Gray
         Write-Host ""
         
         # Get Unreal Engine path
-        $ueRoot = Get-UnrealEngineRoot
-        Test-UnrealEngineValid -UERoot $ueRoot
+        $ueRoot = Invoke-TraceSpan "Get-UnrealEngineRoot" { Get-UnrealEngineRoot }
+        # Its $true would end up in Main's output next to the result
+        $null = Invoke-TraceSpan "Test-UnrealEngineValid" { Test-UnrealEngineValid -UERoot $ueRoot }
         
         Write-Host "Unreal Engine: $ueRoot" -ForegroundColor White
         Write-Host ""
     
         # Check if initial build is needed
-        if (-not (Test-ProjectBinariesExist)) {
+        if (-not (Invoke-TraceSpan "Test-ProjectBinariesExist" { Test-ProjectBinariesExist })) {
             Write-Header "INITIAL BUILD REQUIRED"
             Write-Host "Project binaries not found. This is normal for first-time setup." -ForegroundColor Yellow
             Write-Host "An initial build is required before the editor can open." -ForegroundColor Yellow
@@ -1179,22 +3812,41 @@ function Main
             Write-Host "This will take 10-30 minutes depending on your hardware." -ForegroundColor Yellow
             Write-Host ""
             
-            if (-not (Invoke-ProjectBuild -UERoot:$ueRoot -CleanBuild:$Clean)) {
+            if (-not (Invoke-TraceSpan "Invoke-ProjectBuild (initial)" { Invoke-ProjectBuild -UERoot:$ueRoot -CleanBuild:$Clean })) {
                 throw "Initial build failed"
             }
             
             Write-Host ""
         }
     
-        # Sync from Perforce
-        if (-not (Sync-FromPerforce -SkipSync:$SkipSync)) {
+        # Sync from Perforce, with perforce.codeFirstSync the code first and the content next to the build
+        $syncCL = $null
+        if (-not $SkipSync -and (Get-ConfigValue $script:CONSTANTS.ConfigKeys.CodeFirstSync -DefaultValue $false)) {
+            $syncCL = Get-HeadChangelist
+            if (-not $syncCL) {
+                Write-Log "Head changelist unknown, syncing everything first" "WARNING"
+            }
+        }
+
+        if ($syncCL) {
+            Write-Host "Code-first sync: source and project files at CL $syncCL, content next to the build" -ForegroundColor Cyan
+            $codePaths = @($script:CONSTANTS.CodeFirstSyncPaths | ForEach-Object { "$_@$syncCL" })
+
+            if (-not (Invoke-TraceSpan "Sync-FromPerforce (code)" { Sync-FromPerforce -Paths $codePaths })) {
+                throw "Perforce sync failed"
+            }
+
+            # The code is at the pinned changelist, which is what the build decision needs
+            $script:runState.HaveCL = $syncCL
+            Start-ContentSync -Changelist $syncCL
+        } elseif (-not (Invoke-TraceSpan "Sync-FromPerforce" { Sync-FromPerforce -SkipSync:$SkipSync })) {
             throw "Perforce sync failed"
         }
     
         # Check for code changes and build if needed
         Write-Header "STEP 2: CHECKING FOR CODE CHANGES"
         try{
-            $currentCL = Get-LatestHaveChangelist
+            $currentCL = Invoke-TraceSpan "Get-HaveChangelist" { Get-HaveChangelist }
         }
         catch {
             if (-not $ForceBuild) { throw $_.Exception.Message }
@@ -1217,6 +3869,13 @@ function Main
             $lastBuiltCL = Get-ConfigValue $script:CONSTANTS.ConfigKeys.LastBuiltCL -DefaultValue 0
             Write-Host "Last built changelist: $lastBuiltCL" -ForegroundColor Gray
             Write-Host ""
+
+            # Local edits count too, the manifest of the last build tells what is on disk
+            $codeCheckTimer = [System.Diagnostics.Stopwatch]::StartNew()
+            $sourceChanges = $null
+            if (-not $ForceBuild -and -not $Clean) {
+                $sourceChanges = Invoke-TraceSpan "Get-SourceChanges" { Get-SourceChanges }
+            }
             
             if ($ForceBuild) {
                 Write-Host "Force build requested" -ForegroundColor Yellow
@@ -1228,24 +3887,37 @@ function Main
                 Write-Log "Clean build requested by user" "INFO"
                 $needsBuild = $true
                 
-            } elseif ($currentCL -ne $lastBuiltCL) {
-                Write-Host "Checking for code changes..." -ForegroundColor Cyan
-                
-                # Check if there are code changes
-                if (Test-CodeChanges -Changelist $currentCL -FromCL $lastBuiltCL) {
+            } else {
+                # What the sync brought in and the modules it affects, from the server
+                $hasCodeChanges = $false
+                if ($currentCL -ne $lastBuiltCL) {
+                    Write-Host "Checking for code changes..." -ForegroundColor Cyan
+                    $hasCodeChanges = Invoke-TraceSpan "Test-CodeChanges" { Test-CodeChanges -Changelist $currentCL -FromCL $lastBuiltCL }
+                }
+                if ($currentCL -ne $lastBuiltCL -or $null -ne $sourceChanges) {
+                    $script:runState.CodeCheckSeconds = [math]::Round($codeCheckTimer.Elapsed.TotalSeconds, 3)
+                }
+
+                if ($null -ne $sourceChanges) {
+                    # The manifest confirms it against the disk: synced files that came back
+                    # identical do not build, local edits outside the changelist range do
+                    $needsBuild = Test-SourceChangesNeedBuild -SourceChanges $sourceChanges -SyncedCodeChanges $hasCodeChanges
+                } elseif ($hasCodeChanges) {
                     Write-Host "Code changes detected!" -ForegroundColor Yellow
                     Write-Log "Code changes detected between CL $lastBuiltCL and CL $currentCL" "INFO"
                     $needsBuild = $true
-                } else {
+                } elseif ($currentCL -ne $lastBuiltCL) {
                     Write-Host "No code changes detected - skipping build" -ForegroundColor Green
                     Write-Log "No code changes detected" "INFO"
-                    
-                    # Update tracker even though we didn't build
+                } else {
+                    Write-Host "Project already built for this changelist" -ForegroundColor Green
+                    Write-Log "Already built CL $currentCL" "INFO"
+                }
+
+                # Update tracker even though we didn't build
+                if (-not $needsBuild -and $currentCL -ne $lastBuiltCL) {
                     Set-ConfigValue $script:CONSTANTS.ConfigKeys.lastBuiltCL $currentCL
                 }
-            } else {
-                Write-Host "Project already built for this changelist" -ForegroundColor Green
-                Write-Log "Already built CL $currentCL" "INFO"
             }
         }
     
@@ -1253,7 +3925,7 @@ function Main
         
         # Build if needed
         if ($needsBuild) {
-            if (Invoke-ProjectBuild -UERoot $ueRoot -CleanBuild:$Clean) {
+            if (Invoke-TraceSpan "Invoke-ProjectBuild" { Invoke-ProjectBuild -UERoot $ueRoot -CleanBuild:$Clean }) {
                 # Save the changelist we just built
                 if ($currentCL) {
                     Set-ConfigValue $script:CONSTANTS.ConfigKeys.lastBuiltCL $currentCL
@@ -1267,8 +3939,18 @@ function Main
             Write-Host ""
         }
         
+        # The editor needs the content too
+        if (-not (Invoke-TraceSpan "Wait-ContentSync" { Wait-ContentSync })) {
+            throw "Perforce content sync failed"
+        }
+
+        # Warm the DDC for the synced assets so the editor opens without compiling them
+        Invoke-DdcPrefill -UERoot $ueRoot
+
         # Launch editor
-        if (-not (Start-UnrealEditor -UERoot $ueRoot)) {
+        if ($NoEditor) {
+            Write-Log "Editor launch skipped" "INFO"
+        } elseif (-not (Invoke-TraceSpan "Start-UnrealEditor" { Start-UnrealEditor -UERoot $ueRoot })) {
             Write-Log "Editor launch failed or cancelled" "WARNING"
         }
         
@@ -1284,9 +3966,12 @@ function Main
 Finished: $(Get-Date)
 ==========================================
 "@
+        # The footer is appended by Out-File, which needs the file released
+        Close-Log
         $footer | Out-File -FilePath $logFile -Append -Encoding UTF8
         
         Write-Log "Script completed successfully" "SUCCESS"
+        $runSucceeded = $true
         
         return $true
     
@@ -1331,4 +4016,17 @@ Finished: $(Get-Date)
         
         return $false
     }
+    finally
+    {
+        # A failed run must not leave the content sync running unattended, nor wait for it
+        Stop-ContentSync
+        Stop-TraceSpan -Span $mainSpan -Arguments @{ succeeded = $runSucceeded }
+        Save-Trace
+        Add-RunHistory -Succeeded:$runSucceeded -TotalSeconds $runTimer.Elapsed.TotalSeconds
+        Wait-LogRetention
+        Close-Log
+        Save-LogCopy -Path $script:logFile -Kind "run"
+        $script:unattended = $wasUnattended
+        Exit-ProjectLock -Lock $projectLock
+    }
 }
@@ -0,0 +1,28 @@
+@echo off
+REM ==========================================
+REM Unreal Engine - Sync and Build Tool v2.0
+REM Batch mode: syncs and builds every project
+REM in batch.projects unattended (build machines)
+REM ==========================================
+
+echo.
+echo ==========================================
+echo Sync and Build Tool v2.0 - Batch Mode
+echo ==========================================
+echo.
+
+REM Run the PowerShell script with execution policy bypass, the exit code tells whether every project succeeded
+PowerShell.exe -ExecutionPolicy Bypass -NoProfile -Command "& { . '%~dp0sync_and_build.ps1'; if (Main -Batch) { exit 0 } else { exit 1 } }"
+
+if %ERRORLEVEL% NEQ 0 (
+    echo.
+    echo ==========================================
+    echo One or more projects failed!
+    echo ==========================================
+    echo.
+    echo Check the batch summary above and the Batch folder logs.
+    echo.
+    exit /b %ERRORLEVEL%
+)
+
+exit /b 0
@@ -0,0 +1,21 @@
+@echo off
+REM ==========================================
+REM Unreal Engine - Sync and Build Tool v2.0
+REM Watch mode: syncs and builds new changelists
+REM in the background until the window is closed
+REM ==========================================
+
+echo.
+echo ==========================================
+echo Sync and Build Tool v2.0 - Watch Mode
+echo ==========================================
+echo Press Ctrl+C or close this window to stop.
+echo.
+
+REM Run the PowerShell script with execution policy bypass
+PowerShell.exe -ExecutionPolicy Bypass -NoProfile -Command "& { . '%~dp0sync_and_build.ps1'; Main -Watch }" %*
+
+echo.
+echo Watch mode stopped.
+pause
+exit /b 0
@@ -0,0 +1,300 @@
+"""Compile hotspot report from an Unreal Build Tool log.
+
+The sync script passes -Log=Logs/last_build.log to UBT and runs this right after every
+build. The log is read one line at a time, so a multi-hundred-MB log of a full engine
+build is handled in constant memory: only per-module totals, per-warning-code counts and
+the slowest files are kept.
+
+    python ubt_log_analyzer.py --log Logs/last_build.log --output Logs/last_build_report.json --summary Logs/last_build_report.txt
+
+Per-action times are only in the log when the executor prints them, e.g. with
+bShowCompilationTimes in BuildConfiguration.xml. Without them modules are ranked by the
+number of compile actions.
+"""
+
+import argparse
+import gzip
+import heapq
+import json
+import re
+import sys
+
+DEFAULT_TOP = 20
+
+# [12/340] Compile [x64] Module.Engine.3.cpp (0:04.53 at +0:12)
+ACTION_LINE = re.compile(r"^\[(?P<index>\d+)/(?P<total>\d+)\]\s+(?P<description>.+)$")
+ACTION_DURATION = re.compile(
+    r"\s+\((?:(?:(?P<hours>\d+):)?(?P<minutes>\d+):(?P<seconds>\d+(?:\.\d+)?)|(?P<plain>\d+(?:\.\d+)?)s)(?: at \+[^)]*)?\)$")
+ARCHITECTURE = re.compile(r"^\[[^\]]+\]\s+")
+# Newer UBT versions prefix log file lines with the time since start
+LINE_TIMESTAMP = re.compile(r"^\[\s*[\d:.]+\s*\]\s*")
+
+VERBS = ("Compile", "Link", "Lib", "Resource", "Copy", "Strip", "Deploy", "Run", "WriteMetadata")
+EXTENSION_VERBS = {
+    ".cpp": "Compile", ".c": "Compile", ".cc": "Compile", ".ispc": "Compile",
+    ".dll": "Link", ".exe": "Link", ".lib": "Lib", ".rc": "Resource", ".res": "Resource",
+}
+
+# Module.Engine.3.cpp, SharedPCH.Engine.Cpp20.cpp, PCH.MyGame.h.cpp
+UNITY_OR_PCH = re.compile(r"^(?:Module|SharedPCH|PCH)\.(?P<module>[A-Za-z_][\w]*)\.")
+# UnrealEditor-MyGame.dll, MyGame-Win64-DebugGame.exe, UnrealEditor-MyGame-Win64-DebugGame.lib
+BINARY = re.compile(r"^(?:UnrealEditor-|UE4Editor-|UnrealGame-)?(?P<module>[A-Za-z_][\w]*?)(?:-Win64-\w+)?\.(?:dll|exe|lib)$", re.IGNORECASE)
+
+MSVC_DIAGNOSTIC = re.compile(
+    r"^(?P<path>.+?)\(\d+(?:,\d+)?\)\s*:\s*(?P<kind>warning|error|fatal error)\s+(?P<code>[A-Z]+\d+)\s*:", re.IGNORECASE)
+CLANG_DIAGNOSTIC = re.compile(r"^(?P<path>.+?):\d+:\d+:\s*(?P<kind>warning|error|fatal error):(?P<text>.*)$", re.IGNORECASE)
+CLANG_FLAG = re.compile(r"\[(?P<code>-W[\w\-+=]+)\]\s*$")
+# Folders under Source/ that group modules rather than being one
+SOURCE_GROUPS = {"runtime", "editor", "developer", "programs", "thirdparty"}
+
+TOTAL_TIME = re.compile(r"Total execution time:\s*(?P<seconds>\d+(?:\.\d+)?)\s*seconds", re.IGNORECASE)
+EXECUTOR_TIME = re.compile(r"Total time in (?P<executor>.+?) executor:\s*(?P<seconds>\d+(?:\.\d+)?)\s*seconds", re.IGNORECASE)
+RESULT = re.compile(r"^Result:\s*(?P<result>\w+)")
+
+UNKNOWN_MODULE = "(unknown)"
+
+
+class BuildLogReport:
+    """Running totals of one UBT log, fed a line at a time"""
+
+    def __init__(self, top: int=DEFAULT_TOP):
+        self.top = top
+        self.lines = 0
+        self.action_total = 0
+        self.actions = {}
+        self.modules = {}
+        self.warning_codes = {}
+        self.warnings = 0
+        self.errors = 0
+        self.timed_actions = 0
+        self.total_seconds = None
+        self.executor_seconds = None
+        self.result = None
+        self._slowest = []
+        self._order = 0
+
+    def add_line(self, line: str):
+        self.lines += 1
+        line = LINE_TIMESTAMP.sub("", line.rstrip("\r\n"), count=1)
+
+        action = ACTION_LINE.match(line)
+        if action:
+            self.action_total = max(self.action_total, int(action.group("total")))
+            self._add_action(action.group("description"))
+            return
+
+        diagnostic = MSVC_DIAGNOSTIC.match(line) or CLANG_DIAGNOSTIC.match(line)
+        if diagnostic:
+            self._add_diagnostic(diagnostic)
+            return
+
+        total = TOTAL_TIME.search(line)
+        if total:
+            self.total_seconds = float(total.group("seconds"))
+            return
+
+        executor = EXECUTOR_TIME.search(line)
+        if executor:
+            self.executor_seconds = float(executor.group("seconds"))
+            return
+
+        result = RESULT.match(line)
+        if result:
+            self.result = result.group("result")
+
+    def _add_action(self, description: str):
+        seconds = None
+        duration = ACTION_DURATION.search(description)
+        if duration:
+            seconds = _duration_seconds(duration)
+            description = description[:duration.start()]
+
+        verb, target = _split_action(description)
+        self.actions[verb] = self.actions.get(verb, 0) + 1
+
+        module = _module_from_target(target)
+        entry = self._module(module)
+        if verb == "Compile":
+            entry["compiles"] += 1
+            if target.startswith("Module."):
+                entry["unityFiles"] += 1
+        elif verb in ("Link", "Lib"):
+            entry["links"] += 1
+
+        if seconds is not None:
+            self.timed_actions += 1
+            entry["seconds"] += seconds
+            self._keep_slowest({"file": target, "module": module, "action": verb, "seconds": round(seconds, 3)})
+
+    def _add_diagnostic(self, match: re.Match):
+        kind = match.group("kind").lower()
+        if kind != "warning":
+            self.errors += 1
+            return
+
+        self.warnings += 1
+        code = match.groupdict().get("code")
+        if code is None:
+            flag = CLANG_FLAG.search(match.group("text"))
+            code = flag.group("code") if flag else "(none)"
+        self.warning_codes[code] = self.warning_codes.get(code, 0) + 1
+        self._module(_module_from_path(match.group("path")))["warnings"] += 1
+
+    def _module(self, name: str)-> dict:
+        if name not in self.modules:
+            self.modules[name] = {"module": name, "compiles": 0, "unityFiles": 0, "links": 0, "seconds": 0.0, "warnings": 0}
+        return self.modules[name]
+
+    def _keep_slowest(self, entry: dict):
+        # Bounded min-heap, the order breaks ties so entries are never compared
+        self._order += 1
+        item = (entry["seconds"], self._order, entry)
+        if len(self._slowest) < self.top:
+            heapq.heappush(self._slowest, item)
+        elif item[0] > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, item)
+
+    def to_dict(self)-> dict:
+        timed = self.timed_actions > 0
+        modules = sorted(
+            self.modules.values(),
+            key=lambda module: (module["seconds"], module["compiles"], module["warnings"]) if timed else (module["compiles"], module["warnings"]),
+            reverse=True)
+        for module in modules:
+            module["seconds"] = round(module["seconds"], 3)
+
+        return {
+            "lines": self.lines,
+            "result": self.result,
+            "totalSeconds": self.total_seconds,
+            "executorSeconds": self.executor_seconds,
+            "actions": {
+                "total": max(self.action_total, sum(self.actions.values())),
+                "byType": dict(sorted(self.actions.items(), key=lambda item: item[1], reverse=True)),
+                "timed": self.timed_actions,
+            },
+            "warnings": self.warnings,
+            "errors": self.errors,
+            "warningCodes": [
+                {"code": code, "count": count}
+                for code, count in sorted(self.warning_codes.items(), key=lambda item: item[1], reverse=True)[:self.top]
+            ],
+            "modules": modules[:self.top],
+            "files": [entry for _, _, entry in sorted(self._slowest, reverse=True)],
+        }
+
+
+def _duration_seconds(match: re.Match)-> float:
+    if match.group("plain") is not None:
+        return float(match.group("plain"))
+    return int(match.group("hours") or 0) * 3600 + int(match.group("minutes")) * 60 + float(match.group("seconds"))
+
+def _split_action(description: str)-> tuple[str, str]:
+    """Verb and target of an action line; old UBT versions only print the file name"""
+
+    verb, _, rest = description.strip().partition(" ")
+    if verb in VERBS and rest:
+        return verb, ARCHITECTURE.sub("", rest.strip()).strip()
+
+    target = description.strip()
+    extension = target[target.rfind("."):].lower() if "." in target else ""
+    return EXTENSION_VERBS.get(extension, "Other"), target
+
+def _module_from_target(target: str)-> str:
+    name = re.split(r"[\\/]", target)[-1]
+    match = UNITY_OR_PCH.match(name) or BINARY.match(name)
+    return match.group("module") if match else UNKNOWN_MODULE
+
+def _module_from_path(path: str)-> str:
+    """Module folder of a source file: the first folder under Source/ that is not a group"""
+
+    parts = re.split(r"[\\/]", path)
+    for index in range(len(parts) - 1, -1, -1):
+        if parts[index].lower() == "source":
+            for part in parts[index + 1:-1]:
+                if part.lower() not in SOURCE_GROUPS:
+                    return part
+            break
+    return UNKNOWN_MODULE
+
+def analyze(path, top: int=DEFAULT_TOP)-> dict:
+    """Stream the log at path (plain or .gz) and return the hotspot report"""
+
+    report = BuildLogReport(top)
+    opener = gzip.open if str(path).endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8-sig", errors="replace") as log:
+        for line in log:
+            report.add_line(line)
+
+    result = report.to_dict()
+    result["log"] = str(path)
+    return result
+
+def format_summary(report: dict, top: int=10)-> str:
+    actions = report["actions"]
+    by_type = ", ".join(f"{count} {verb.lower()}" for verb, count in actions["byType"].items()) or "none"
+    timed = actions["timed"] > 0
+
+    lines = [
+        f"Build log: {report['log']}",
+        f"Result: {report['result'] or 'unknown'}",
+        f"Total time: {_seconds(report['totalSeconds'])} (executor {_seconds(report['executorSeconds'])})",
+        f"Actions: {actions['total']} ({by_type})",
+        f"Warnings: {report['warnings']}, errors: {report['errors']}",
+        "",
+    ]
+
+    if not timed:
+        lines.append("No per-action times in this log (enable bShowCompilationTimes), modules ranked by compile actions")
+        lines.append("")
+
+    lines.append(f"{'Module':<40}{'Compiles':>10}{'Unity':>8}{'Warnings':>10}{'Time':>10}")
+    for module in report["modules"][:top]:
+        lines.append(
+            f"{module['module']:<40}{module['compiles']:>10}{module['unityFiles']:>8}{module['warnings']:>10}"
+            f"{_seconds(module['seconds'] if timed else None):>10}")
+
+    if report["files"]:
+        lines += ["", f"{'Slowest actions':<60}{'Time':>10}"]
+        for entry in report["files"][:top]:
+            lines.append(f"{entry['file']:<60}{_seconds(entry['seconds']):>10}")
+
+    if report["warningCodes"]:
+        lines += ["", "Most frequent warnings: " + ", ".join(f"{code['code']} x{code['count']}" for code in report["warningCodes"][:top])]
+
+    return "\n".join(lines)
+
+def _seconds(value: float | None)-> str:
+    return "-" if value is None else f"{value:.1f}s"
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description="Compile hotspots from an Unreal Build Tool log")
+    parser.add_argument("--log", required=True, help="UBT log written with -Log=")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--summary", help="Write the text summary to this file")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="Modules, files and warning codes to keep")
+    parser.add_argument("--text", action="store_true", help="Print the text summary instead of JSON")
+    return parser.parse_args(argv)
+
+def main(argv=None)-> int:
+    args = _parse_args(argv)
+
+    try:
+        report = analyze(args.log, top=args.top)
+    except OSError as e:
+        print(f"Could not read {args.log}: {e}", file=sys.stderr)
+        return 1
+
+    summary = format_summary(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(report, output, indent=2)
+    if args.summary:
+        with open(args.summary, "w", encoding="utf-8") as output:
+            output.write(summary + "\n")
+
+    print(summary if args.text else json.dumps(report))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,279 @@
+import unittest
+import os
+import re
+import sys
+import json
+import io
+import tempfile
+from contextlib import redirect_stdout
+
+# Add the Source directory to path to import the module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'Source')))
+import changelist_index
+from changelist_index import ChangelistIndex
+from p4_session import FakeP4Runner, P4Error, P4Session
+
+
+def fake_server(changelists: dict)-> FakeP4Runner:
+    """Runner answering p4 changes and p4 files -a from {change: [(depot_file, action), ...]}"""
+
+    def in_range(filespec: str)-> tuple[str, list[int]]:
+        match = re.search(r"^(.*?)\.\.\.@(\d+),(?:@(\d+)|#head)$", filespec)
+        start = int(match.group(2))
+        end = int(match.group(3)) if match.group(3) else max(changelists)
+        return match.group(1), [change for change in changelists if start <= change <= end]
+
+    def changes(args, lines):
+        if "-m1" in args:
+            return [{"code": "stat", "change": str(max(changelists))}]
+
+        prefix, found = in_range(args[-1])
+        found = [change for change in found
+                 if any(depot_file.startswith(prefix) for depot_file, _ in changelists[change])]
+        if not found:
+            return [{"code": "error", "data": f"{args[-1]} - no such file(s).\n"}]
+        return [{"code": "stat", "change": str(change), "user": f"user{change % 3}", "client": "ws",
+                 "time": "1700000000", "desc": f"Change {change} work\nmore details\n"}
+                for change in sorted(found, reverse=True)]
+
+    def files(args, lines):
+        prefix, found = in_range(args[-1])
+        records = [{"code": "stat", "depotFile": depot_file, "rev": "1", "change": str(change), "action": action}
+                   for change in sorted(found, reverse=True)
+                   for depot_file, action in changelists[change] if depot_file.startswith(prefix)]
+        return records or [{"code": "error", "data": f"{args[-1]} - no such file(s).\n"}]
+
+    return FakeP4Runner({"changes": changes, "files": files})
+
+
+CHANGELISTS = {
+    101: [("//depot/Source/Game/Player.cpp", "edit")],
+    102: [("//depot/Content/Maps/Main.umap", "edit")],
+    103: [("//depot/Source/Game/Player.h", "edit"), ("//depot/Content/UI/Menu.uasset", "add")],
+    104: [("//depot/Source/Game/Game.Build.cs", "edit")],
+    105: [("//depot/Content/UI/Logo.uasset", "delete")],
+}
+
+
+class TestChangelistIndex(unittest.TestCase):
+    """Tests for ChangelistIndex"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "changelists.db")
+        self.runner = fake_server(CHANGELISTS)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _index(self, runner=None)-> ChangelistIndex:
+        index = ChangelistIndex(self.db_path, P4Session(runner=runner or self.runner))
+        self.addCleanup(index.close)
+        return index
+
+    def _commands(self, runner=None)-> list:
+        return [FakeP4Runner.split(call)[0][0] for call in (runner or self.runner).calls]
+
+    def test_update_fetches_range_with_one_files_query(self):
+        """Test the range is listed once and its files come from one p4 files -a"""
+        index = self._index()
+        added = index.update(to_change=105, since=100)
+
+        self.assertEqual(added, 5)
+        self.assertEqual(self._commands(), ["changes", "files"])
+        self.assertEqual((index.low_water, index.high_water), (101, 105))
+
+    def test_update_only_fetches_newer_changelists(self):
+        """Test a second update asks only past the high water mark"""
+        index = self._index()
+        index.update(to_change=103, since=100)
+        self.runner.calls.clear()
+
+        added = index.update(to_change=105, since=100)
+
+        self.assertEqual(added, 2)
+        self.assertIn("//...@104,@105", self.runner.calls[0])
+
+    def test_update_up_to_date_asks_nothing(self):
+        """Test an indexed range asks nothing"""
+        index = self._index()
+        index.update(to_change=105, since=100)
+        self.runner.calls.clear()
+
+        self.assertEqual(index.update(to_change=105, since=100), 0)
+        self.assertEqual(self.runner.calls, [])
+
+    def test_update_backfills_older_range(self):
+        """Test asking from an older changelist fetches only the missing start"""
+        index = self._index()
+        index.update(to_change=105, since=102)
+        self.runner.calls.clear()
+
+        index.update(to_change=105, since=100)
+
+        self.assertIn("//...@101,@102", self.runner.calls[0])
+        self.assertEqual(index.low_water, 101)
+
+    def test_update_without_bounds_indexes_only_latest(self):
+        """Test an empty index never walks the whole history"""
+        index = self._index()
+        index.update()
+
+        self.assertEqual((index.low_water, index.high_water), (105, 105))
+
+    def test_empty_range_is_covered(self):
+        """Test a range without changelists still moves the high water mark"""
+        runner = fake_server(CHANGELISTS)
+        index = self._index(runner)
+        index.update(to_change=105, since=100)
+
+        self.assertEqual(index.update(to_change=108, since=100), 0)
+        self.assertEqual(index.high_water, 108)
+
+    def test_index_persists(self):
+        """Test a new index on the same file does not ask the server again"""
+        index = self._index()
+        index.update(to_change=105, since=100)
+        index.close()
+
+        runner = fake_server(CHANGELISTS)
+        reopened = self._index(runner)
+        self.assertTrue(reopened.covers(100, 105))
+        self.assertEqual(len(reopened.files(100, 105)), 6)
+        self.assertEqual(runner.calls, [])
+
+    def test_changing_path_resets(self):
+        """Test an index built for another path starts over"""
+        self._index().update(to_change=105, since=100)
+
+        index = ChangelistIndex(self.db_path, P4Session(runner=self.runner), path="//other/...")
+        self.addCleanup(index.close)
+        self.assertEqual(index.high_water, 0)
+
+    def test_files_outside_the_path_are_not_indexed(self):
+        """Test a changelist that also touched files outside the path only keeps the ones inside"""
+        index = ChangelistIndex(self.db_path, P4Session(runner=self.runner), path="//depot/Source/...")
+        self.addCleanup(index.close)
+        index.update(to_change=105, since=100)
+
+        self.assertEqual([file["depotFile"] for file in index.files(100, 105)], [
+            "//depot/Source/Game/Game.Build.cs",
+            "//depot/Source/Game/Player.h",
+            "//depot/Source/Game/Player.cpp",
+        ])
+        self.assertEqual(index.summary(100, 105)["files"], 3)
+
+    def test_covers(self):
+        """Test covers needs both ends of the range"""
+        index = self._index()
+        self.assertFalse(index.covers(100, 105))
+        index.update(to_change=104, since=101)
+        self.assertTrue(index.covers(101, 104))
+        self.assertFalse(index.covers(100, 104))
+        self.assertFalse(index.covers(101, 105))
+
+    def test_files_filters_extensions_case_insensitive(self):
+        """Test extension filtering matches .Build.cs with .build.cs"""
+        index = self._index()
+        index.update(to_change=105, since=100)
+
+        files = index.files(100, 105, [".cpp", ".h", ".build.cs"])
+
+        self.assertEqual([file["depotFile"] for file in files], [
+            "//depot/Source/Game/Game.Build.cs",
+            "//depot/Source/Game/Player.h",
+            "//depot/Source/Game/Player.cpp",
+        ])
+        self.assertEqual(files[0]["description"], "Change 104 work")
+
+    def test_files_excludes_from_change(self):
+        """Test the range starts after from_change"""
+        index = self._index()
+        index.update(to_change=105, since=100)
+
+        self.assertEqual(index.files(101, 102), [{
+            "depotFile": "//depot/Content/Maps/Main.umap", "revision": 1, "action": "edit",
+            "change": 102, "user": "user0", "description": "Change 102 work"}])
+
+    def test_summary(self):
+        """Test summary counts changelists, users and actions"""
+        index = self._index()
+        index.update(to_change=105, since=100)
+
+        summary = index.summary(100, 105)
+
+        self.assertEqual(summary["changelists"], 5)
+        self.assertEqual(summary["users"], 3)
+        self.assertEqual(summary["files"], 6)
+        self.assertEqual(summary["actions"], {"add": 1, "delete": 1, "edit": 4})
+
+    def test_trigger_lists_changelists_with_code(self):
+        """Test trigger names the changelists that touched code"""
+        index = self._index()
+        index.update(to_change=105, since=100)
+
+        triggers = index.trigger(100, 105, [".cpp", ".h"])
+
+        self.assertEqual([(entry["change"], entry["files"]) for entry in triggers], [(103, 1), (101, 1)])
+
+    def test_server_error_raises(self):
+        """Test a failing server is reported instead of marking the range as indexed"""
+        runner = FakeP4Runner({"changes": [{"code": "error", "data": "Connect to server failed"}]})
+        index = self._index(runner)
+
+        with self.assertRaises(P4Error):
+            index.update(to_change=105, since=100)
+        self.assertEqual(index.high_water, 0)
+
+
+class TestCommandLine(unittest.TestCase):
+    """Tests for the JSON command line used by the sync script"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "changelists.db")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _main(self, *argv, runner=None):
+        stdout = io.StringIO()
+        session = P4Session(runner=runner or fake_server(CHANGELISTS))
+        with redirect_stdout(stdout):
+            code = changelist_index.main(["--db", self.db_path, *argv], session=session)
+        return code, stdout.getvalue()
+
+    def test_files_with_update(self):
+        """Test files --update fetches the range and prints JSON"""
+        code, output = self._main("files", "--from", "100", "--to", "105", "--ext", ".cpp", "--update")
+
+        self.assertEqual(code, 0)
+        self.assertEqual([file["depotFile"] for file in json.loads(output)], ["//depot/Source/Game/Player.cpp"])
+
+    def test_summary_without_update_uses_index_only(self):
+        """Test summary without --update never asks the server"""
+        runner = fake_server(CHANGELISTS)
+        code, output = self._main("summary", "--from", "100", "--to", "105", runner=runner)
+
+        self.assertEqual(code, 0)
+        self.assertEqual(json.loads(output)["changelists"], 0)
+        self.assertEqual(runner.calls, [])
+
+    def test_update_command(self):
+        """Test update prints the water marks"""
+        code, output = self._main("update", "--since", "100", "--to", "105")
+
+        self.assertEqual(code, 0)
+        self.assertEqual(json.loads(output), {"added": 5, "lowWater": 101, "highWater": 105})
+
+    def test_error_exit_code(self):
+        """Test server errors give a non-zero exit code and no JSON on stdout"""
+        runner = FakeP4Runner({"changes": [{"code": "error", "data": "Connect to server failed"}]})
+        code, output = self._main("files", "--from", "100", "--to", "105", "--update", runner=runner)
+
+        self.assertEqual(code, 1)
+        self.assertEqual(output, "")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+import unittest
+import os
+import sys
+import json
+import io
+import tempfile
+from contextlib import redirect_stdout
+
+# Add the Source directory to path to import the module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'Source')))
+import engine_index
+from engine_index import build_index, read_build_version, resolve
+
+SOURCE_BUILD_ID = "{4C5E2D1A-0000-4B3C-9D2E-6F7A8B9C0D1E}"
+
+
+class TestEngineIndex(unittest.TestCase):
+    """Tests for the engine index and EngineAssociation matching"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = self.temp_dir.name
+        self.index_path = os.path.join(self.root, "engine_index.json")
+        self.launcher_file = os.path.join(self.root, "LauncherInstalled.dat")
+        self.install_ini = os.path.join(self.root, "Install.ini")
+        self.search_root = os.path.join(self.root, "Epic Games")
+
+        self.launcher_53 = self._engine("Epic Games/UE_5.3", 5, 3, 2)
+        self.launcher_54 = self._engine("Epic Games/UE_5.4", 5, 4, 0)
+        self.source_build = self._engine("Source/UnrealEngine", 5, 3, 0, changelist=0)
+        self._write("LauncherInstalled.dat", json.dumps({"InstallationList": [
+            {"InstallLocation": self.launcher_53, "AppName": "UE_5.3"},
+            {"InstallLocation": self.launcher_54, "AppName": "UE_5.4"},
+            {"InstallLocation": os.path.join(self.root, "Fab"), "AppName": "SomePlugin"},
+        ]}))
+        self._write("Install.ini", f"[Installations]\n{SOURCE_BUILD_ID}={self.source_build}\n")
+        self.project = self._project("Projects/Game/Game.uproject", "5.3")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _write(self, relative: str, content: str)-> str:
+        path = os.path.join(self.root, *relative.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(content)
+        return path
+
+    def _engine(self, relative: str, major: int, minor: int, patch: int, changelist: int=29000000)-> str:
+        self._write(f"{relative}/Engine/Build/Build.version", json.dumps({
+            "MajorVersion": major, "MinorVersion": minor, "PatchVersion": patch,
+            "Changelist": changelist, "BranchName": f"++UE5+Release-{major}.{minor}",
+        }))
+        return os.path.join(self.root, *relative.split("/"))
+
+    def _project(self, relative: str, association: str)-> str:
+        return self._write(relative, json.dumps({"FileVersion": 3, "EngineAssociation": association}))
+
+    def _resolve(self, project=None, **kwargs)-> dict:
+        options = {"launcher_file": self.launcher_file, "install_ini_files": (self.install_ini,)}
+        options.update(kwargs)
+        return resolve(self.index_path, project or self.project, **options)
+
+    def test_reads_exact_version_from_build_version(self):
+        """Test major, minor, patch and changelist come from Build.version"""
+        version = read_build_version(self.launcher_53)
+
+        self.assertEqual(version["version"], "5.3.2")
+        self.assertEqual(version["changelist"], 29000000)
+        self.assertIsNone(read_build_version(os.path.join(self.root, "Missing")))
+
+    def test_indexes_launcher_and_registered_engines(self):
+        """Test launcher engines and Install.ini source builds are indexed, other launcher apps are not"""
+        index = build_index(self.launcher_file, (self.install_ini,), (), ())
+
+        engines = [(engine["id"], engine["source"], engine["version"]) for engine in index["engines"]]
+        self.assertEqual(engines, [("UE_5.3", "launcher", "5.3.2"), ("UE_5.4", "launcher", "5.4.0"),
+                                   (SOURCE_BUILD_ID, "registered", "5.3.0")])
+
+    def test_version_association_prefers_launcher_install(self):
+        """Test "5.3" resolves to the launcher engine without asking"""
+        match = self._resolve()["match"]
+
+        self.assertEqual(match["path"], self.launcher_53)
+        self.assertEqual(match["version"], "5.3.2")
+
+    def test_configured_engine_kept_when_it_matches(self):
+        """Test the engine already in the config wins over other engines of the same version"""
+        match = self._resolve(preferred=self.source_build)["match"]
+        self.assertEqual(match["path"], self.source_build)
+
+        match = self._resolve(preferred=self.launcher_54)["match"]
+        self.assertEqual(match["path"], self.launcher_53)
+
+    def test_guid_association_matches_registered_build(self):
+        """Test a {GUID} association finds the build registered from the ini or the registry"""
+        project = self._project("Projects/Tool/Tool.uproject", SOURCE_BUILD_ID.lower())
+        self.assertEqual(self._resolve(project)["match"]["path"], self.source_build)
+
+        other_build = self._engine("Source/Other", 5, 5, 0)
+        project = self._project("Projects/Other/Other.uproject", "{OTHER-BUILD}")
+        match = self._resolve(project, registered=[("{OTHER-BUILD}", other_build)])["match"]
+        self.assertEqual(match["version"], "5.5.0")
+
+    def test_empty_association_uses_containing_engine(self):
+        """Test a project inside a source build resolves to that build"""
+        project = self._project("Source/UnrealEngine/Samples/Lyra/Lyra.uproject", "")
+        self.assertEqual(self._resolve(project)["match"]["path"], self.source_build)
+
+        self.assertIsNone(self._resolve(self._project("Projects/Loose/Loose.uproject", ""))["match"])
+
+    def test_search_roots_find_unlisted_engines(self):
+        """Test UE_* folders under a search root are indexed when no launcher file exists"""
+        self._engine("Epic Games/UE_5.1", 5, 1, 1)
+        os.makedirs(os.path.join(self.search_root, "Launcher"))
+
+        result = self._resolve(launcher_file=os.path.join(self.root, "missing.dat"), install_ini_files=(),
+                               search_roots=[self.search_root])
+
+        self.assertEqual([engine["id"] for engine in result["engines"]], ["UE_5.1", "UE_5.3", "UE_5.4"])
+        self.assertEqual(result["match"]["path"], self.launcher_53)
+
+    def test_cache_reused_until_a_source_changes(self):
+        """Test the second run is served from the cache and a new Build.version invalidates it"""
+        self.assertFalse(self._resolve()["cached"])
+        self.assertTrue(self._resolve()["cached"])
+
+        self._engine("Epic Games/UE_5.3", 5, 3, 12)
+        result = self._resolve()
+
+        self.assertFalse(result["cached"])
+        self.assertEqual(result["match"]["version"], "5.3.12")
+        self.assertFalse(self._resolve(preferred=self.launcher_53)["cached"])
+
+    def test_main_prints_match(self):
+        """Test the JSON printed for the sync script"""
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            code = engine_index.main(["--index", self.index_path, "--project", self.project,
+                                      "--launcher-file", self.launcher_file, "--install-ini", self.install_ini,
+                                      "--registered", f"{{X}}={self.source_build}"])
+
+        self.assertEqual(code, 0)
+        output = json.loads(stdout.getvalue())
+        self.assertEqual(output["association"], "5.3")
+        self.assertEqual(output["match"]["id"], "UE_5.3")
+        self.assertFalse(os.path.exists(self.index_path + ".tmp"))
+
+    def test_main_missing_project(self):
+        """Test a missing .uproject is reported as a failure"""
+        with redirect_stdout(io.StringIO()):
+            code = engine_index.main(["--index", self.index_path, "--project", os.path.join(self.root, "No.uproject"),
+                                      "--launcher-file", self.launcher_file])
+        self.assertEqual(code, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,12 +1,17 @@
 import unittest
+import marshal
 import os
 import sys
+import tempfile
+import threading
+import time
 from unittest.mock import patch, MagicMock, mock_open
 from pathlib import Path
 
 # Add parent directory to path to import the module
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import Installer as installer
+from p4_session import FakeP4Runner
 
 
 class TestPathGetters(unittest.TestCase):
@@ -56,12 +61,12 @@ class TestPathGetters(unittest.TestCase):
         self.assertEqual(result, Path("C:\\Project"))
 
     @patch('pathlib.Path.is_dir')
-    @patch('pathlib.Path.rglob')
-    def test_get_uproject_path_found(self, mock_rglob, mock_is_dir):
+    @patch('Installer.find_project_files')
+    def test_get_uproject_path_found(self, mock_find, mock_is_dir):
         """Test get_uproject_path when .uproject file is found"""
         mock_is_dir.return_value = True
         expected_path = Path("C:\\Project\\MyGame.uproject")
-        mock_rglob.return_value = iter([expected_path])
+        mock_find.return_value = {installer.UPROJECT_PATTERN: expected_path, installer.P4CONFIG_PATTERN: None}
 
         project_path = Path("C:\\Project")
         result = installer.get_uproject_path(project_path)
@@ -75,16 +80,104 @@ class TestPathGetters(unittest.TestCase):
         self.assertIsNone(result)
 
     @patch('pathlib.Path.is_dir')
-    @patch('pathlib.Path.rglob')
-    def test_get_uproject_path_not_found(self, mock_rglob, mock_is_dir):
+    @patch('Installer.find_project_files')
+    def test_get_uproject_path_not_found(self, mock_find, mock_is_dir):
         """Test get_uproject_path when .uproject file is not found"""
         mock_is_dir.return_value = True
-        mock_rglob.return_value = iter([])
+        mock_find.return_value = {installer.UPROJECT_PATTERN: None, installer.P4CONFIG_PATTERN: None}
 
         result = installer.get_uproject_path(Path("C:\\Project"))
         self.assertIsNone(result)
 
 
+class TestFindProjectFiles(unittest.TestCase):
+    """Tests for the single-pass project walker"""
+
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self._temp_dir.name)
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def _make_file(self, *parts):
+        path = self.root.joinpath(*parts)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch()
+        return path
+
+    def test_finds_both_kinds_in_one_walk(self):
+        """Test the walker returns the .uproject and the .p4config together"""
+        uproject = self._make_file("Game", "Game.uproject")
+        p4config = self._make_file(".p4config")
+
+        found = installer.find_project_files(self.root)
+
+        self.assertEqual(found[installer.UPROJECT_PATTERN], uproject)
+        self.assertEqual(found[installer.P4CONFIG_PATTERN], p4config)
+
+    def test_scans_each_directory_once(self):
+        """Test looking for both kinds of file lists each directory a single time"""
+        self._make_file("Game", "Game.uproject")
+        self._make_file("Game", "Source", "Game.Build.cs")
+
+        with patch('Installer.os.scandir', wraps=os.scandir) as mock_scandir:
+            installer.find_project_files(self.root)
+
+        scanned = [call.args[0] for call in mock_scandir.call_args_list]
+        self.assertEqual(len(scanned), len(set(scanned)))
+
+    def test_prunes_heavy_unreal_folders(self):
+        """Test files inside Saved, Intermediate, DerivedDataCache, Binaries and Content are never reported"""
+        for folder in ("Saved", "Intermediate", "DerivedDataCache", "Binaries", "Content"):
+            self._make_file("Game", folder, "Copy.uproject")
+
+        found = installer.find_project_files(self.root)
+
+        self.assertIsNone(found[installer.UPROJECT_PATTERN])
+
+    def test_returns_shallowest_match(self):
+        """Test a shallower match wins over a deeper one"""
+        self._make_file("A", "B", "Deep.uproject")
+        expected = self._make_file("Z", "Shallow.uproject")
+
+        found = installer.find_project_files(self.root)
+
+        self.assertEqual(found[installer.UPROJECT_PATTERN], expected)
+
+    def test_respects_max_depth(self):
+        """Test files below the maximum depth are not found"""
+        self._make_file("one", "two", "Game.uproject")
+
+        shallow = installer.find_project_files(self.root, max_depth=1)
+        deep = installer.find_project_files(self.root, max_depth=2)
+
+        self.assertIsNone(shallow[installer.UPROJECT_PATTERN])
+        self.assertIsNotNone(deep[installer.UPROJECT_PATTERN])
+
+    def test_accepts_custom_patterns(self):
+        """Test the walker can be reused for other file kinds"""
+        expected = self._make_file("Game", "Source", "Game.Target.cs")
+
+        found = installer.find_project_files(self.root, patterns=("*.target.cs",))
+
+        self.assertEqual(found, {"*.target.cs": expected})
+
+    def test_caches_other_kind_found_by_shared_walk(self):
+        """Test looking up the .uproject also caches the .p4config found in the same walk"""
+        self._make_file("Game", "Game.uproject")
+        p4config = self._make_file(".p4config")
+        cache = installer.DiscoveryCache(self.root / "cache.json")
+
+        installer.get_uproject_path(self.root, cache=cache)
+
+        with patch('Installer.find_project_files') as mock_find:
+            result = installer.get_p4_config_path(self.root, cache=cache)
+
+        self.assertEqual(result, p4config)
+        mock_find.assert_not_called()
+
+
 class TestSearchForFile(unittest.TestCase):
     """Tests for search_for_file and related functions"""
 
@@ -95,7 +188,7 @@ class TestSearchForFile(unittest.TestCase):
         mock_search.return_value = expected_path
 
         result = installer.get_p4_path()
-        mock_search.assert_called_once_with(installer.P4_COMMON_PATHS, "p4.exe")
+        mock_search.assert_called_once_with(installer.P4_COMMON_PATHS, "p4.exe", None)
         self.assertEqual(result, expected_path)
 
     @patch('Installer._search_for_file')
@@ -105,12 +198,13 @@ class TestSearchForFile(unittest.TestCase):
         mock_search.return_value = expected_path
 
         result = installer.get_p4v_path()
-        mock_search.assert_called_once_with(installer.P4V_COMMON_PATHS, "p4v.exe")
+        mock_search.assert_called_once_with(installer.P4V_COMMON_PATHS, "p4v.exe", None)
         self.assertEqual(result, expected_path)
 
+    @patch('Installer.shutil.which', return_value=None)
     @patch('pathlib.Path.exists')
     @patch('Installer.get_root_path')
-    def test_search_for_file_found_in_common_paths(self, mock_get_root, mock_exists):
+    def test_search_for_file_found_in_common_paths(self, mock_get_root, mock_exists, _):
         """Test _search_for_file when file is found in common paths"""
         mock_get_root.return_value = Path("C:\\")
         mock_exists.return_value = True
@@ -119,34 +213,31 @@ class TestSearchForFile(unittest.TestCase):
         result = installer._search_for_file(common_paths, "p4.exe")
         self.assertEqual(result, Path("C:\\Program Files\\Perforce\\p4.exe"))
 
-    @patch('pathlib.Path.exists')
-    @patch('pathlib.Path.rglob')
-    @patch('Installer.get_root_path')
-    def test_search_for_file_found_by_rglob(self, mock_get_root, mock_rglob, mock_exists):
-        """Test _search_for_file when file is found by recursive search"""
-        mock_exists.return_value = False
-        mock_get_root.return_value = Path("C:\\")
-        expected_path = Path("C:\\SomeFolder\\p4.exe")
-        mock_rglob.return_value = iter([expected_path])
-
-        result = installer._search_for_file([], "p4.exe")
-        self.assertEqual(result, expected_path)
-
-    @patch('pathlib.Path.exists')
-    @patch('pathlib.Path.rglob')
-    @patch('Installer.get_root_path')
-    def test_search_for_file_not_found(self, mock_get_root, mock_rglob, mock_exists):
+    @patch('Installer.shutil.which', return_value=None)
+    @patch('Installer.locate_executable')
+    def test_search_for_file_reports_search(self, mock_locate, _):
+        """Test _search_for_file passes the search result to the callback"""
+        search = installer.LocatorResult(Path("C:\\SomeFolder\\p4.exe"), 42, 1.5, "disk scan")
+        mock_locate.return_value = search
+        reported = []
+
+        result = installer._search_for_file([], "p4.exe", reported.append)
+        self.assertEqual(result, search.path)
+        self.assertEqual(reported, [search])
+
+    @patch('Installer.shutil.which', return_value=None)
+    @patch('Installer.locate_executable')
+    def test_search_for_file_not_found(self, mock_locate, _):
         """Test _search_for_file when file is not found"""
-        mock_exists.return_value = False
-        mock_get_root.return_value = Path("C:\\")
-        mock_rglob.return_value = iter([])
+        mock_locate.return_value = installer.LocatorResult(None, 10, 0.1)
 
         result = installer._search_for_file([], "nonexistent.exe")
         self.assertIsNone(result)
 
+    @patch('Installer.shutil.which', return_value=None)
     @patch('pathlib.Path.exists')
     @patch('Installer.get_root_path')
-    def test_search_for_file_multiple_common_paths(self, mock_get_root, mock_exists):
+    def test_search_for_file_multiple_common_paths(self, mock_get_root, mock_exists, _):
         """Test _search_for_file with multiple common paths, finds in second"""
         mock_get_root.return_value = Path("C:\\")
         # First path doesn't exist, second one does
@@ -160,18 +251,221 @@ class TestSearchForFile(unittest.TestCase):
         self.assertEqual(result, Path("C:\\Program Files (x86)\\Perforce\\p4.exe"))
 
 
+class TestLocateExecutable(unittest.TestCase):
+    """Tests for the bounded executable locator, run against synthetic trees"""
+
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self._temp_dir.name)
+        which_patcher = patch('Installer.shutil.which', return_value=None)
+        which_patcher.start()
+        self.addCleanup(which_patcher.stop)
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def _make_file(self, *parts):
+        path = self.root.joinpath(*parts)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch()
+        return path
+
+    def test_prefers_path_lookup(self):
+        """Test locate_executable returns the PATH hit without walking the disk"""
+        with patch('Installer.shutil.which', return_value="/usr/bin/p4"), \
+             patch('Installer._walk_for_file') as mock_walk:
+            result = installer.locate_executable("p4.exe", [], root=self.root)
+
+        self.assertEqual(result.path, Path("/usr/bin/p4"))
+        self.assertEqual(result.source, "PATH")
+        mock_walk.assert_not_called()
+
+    def test_finds_file_in_common_path_under_root(self):
+        """Test locate_executable checks the known install roots before walking"""
+        expected = self._make_file("Program Files", "Perforce", "p4.exe")
+
+        result = installer.locate_executable("p4.exe", installer.P4_COMMON_PATHS, root=self.root)
+
+        self.assertEqual(result.path, expected)
+        self.assertEqual(result.scanned_dirs, 0)
+
+    def test_walk_finds_file_and_reports_stats(self):
+        """Test the fallback walk finds a nested file and counts scanned directories"""
+        expected = self._make_file("Tools", "Helix", "bin", "p4.exe")
+
+        result = installer.locate_executable("p4.exe", [], root=self.root)
+
+        self.assertEqual(result.path, expected)
+        self.assertGreater(result.scanned_dirs, 0)
+        self.assertGreaterEqual(result.elapsed, 0.0)
+
+    def test_walk_matches_case_insensitively(self):
+        """Test the walk matches file names regardless of case"""
+        expected = self._make_file("Apps", "P4.EXE")
+
+        result = installer.locate_executable("p4.exe", [], root=self.root)
+
+        self.assertEqual(result.path, expected)
+
+    def test_walk_returns_shallowest_match(self):
+        """Test the walk prefers the shallowest match over deeper ones"""
+        self._make_file("a", "b", "c", "p4.exe")
+        expected = self._make_file("z", "p4.exe")
+
+        result = installer.locate_executable("p4.exe", [], root=self.root)
+
+        self.assertEqual(result.path, expected)
+
+    def test_walk_skips_excluded_folders(self):
+        """Test the walk never descends into skip-listed folders"""
+        self._make_file("Windows", "p4.exe")
+        self._make_file("Game", "Intermediate", "p4.exe")
+        self._make_file("node_modules", "p4.exe")
+
+        result = installer.locate_executable("p4.exe", [], root=self.root)
+
+        self.assertIsNone(result.path)
+
+    def test_walk_respects_depth_limit(self):
+        """Test the walk gives up below the maximum depth"""
+        self._make_file("one", "two", "three", "p4.exe")
+
+        shallow = installer.locate_executable("p4.exe", [], root=self.root, max_depth=2)
+        deep = installer.locate_executable("p4.exe", [], root=self.root, max_depth=3)
+
+        self.assertIsNone(shallow.path)
+        self.assertIsNotNone(deep.path)
+
+    def test_walk_stops_after_match(self):
+        """Test the walk does not scan deeper levels once a match is found"""
+        self._make_file("p4.exe")
+        for index in range(5):
+            self._make_file(f"dir{index}", "nested", "other.txt")
+
+        result = installer.locate_executable("p4.exe", [], root=self.root)
+
+        self.assertEqual(result.path, self.root / "p4.exe")
+        self.assertEqual(result.scanned_dirs, 1)
+
+
+class TestDiscoveryCache(unittest.TestCase):
+    """Tests for the persistent tool-discovery cache"""
+
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self._temp_dir.name)
+        self.cache_file = self.root / "Config" / installer.DISCOVERY_CACHE_FILE_NAME
+        self.tool = self.root / "p4.exe"
+        self.tool.write_text("binary")
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def test_round_trip_through_disk(self):
+        """Test a saved entry is returned by a new cache instance"""
+        cache = installer.DiscoveryCache(self.cache_file)
+        cache.put("p4", None, self.tool)
+        cache.save()
+
+        reloaded = installer.DiscoveryCache(self.cache_file)
+        self.assertEqual(reloaded.get("p4"), self.tool)
+
+    def test_entries_are_keyed_by_project_root(self):
+        """Test the same kind is cached separately per project root"""
+        cache = installer.DiscoveryCache(self.cache_file)
+        cache.put("uproject", self.root / "ProjectA", self.tool)
+
+        self.assertEqual(cache.get("uproject", self.root / "ProjectA"), self.tool)
+        self.assertIsNone(cache.get("uproject", self.root / "ProjectB"))
+
+    def test_changed_file_invalidates_entry(self):
+        """Test an entry whose size changed is treated as a miss"""
+        cache = installer.DiscoveryCache(self.cache_file)
+        cache.put("p4", None, self.tool)
+
+        self.tool.write_text("a different binary")
+
+        self.assertIsNone(cache.get("p4"))
+
+    def test_deleted_file_invalidates_entry(self):
+        """Test an entry whose file disappeared is treated as a miss"""
+        cache = installer.DiscoveryCache(self.cache_file)
+        cache.put("p4", None, self.tool)
+
+        self.tool.unlink()
+
+        self.assertIsNone(cache.get("p4"))
+
+    def test_corrupt_file_starts_empty(self):
+        """Test an unreadable cache file is ignored"""
+        self.cache_file.parent.mkdir(parents=True)
+        self.cache_file.write_text("{not json")
+
+        cache = installer.DiscoveryCache(self.cache_file)
+        self.assertIsNone(cache.get("p4"))
+
+    def test_save_without_changes_does_not_write(self):
+        """Test save skips writing when nothing changed"""
+        cache = installer.DiscoveryCache(self.cache_file)
+        cache.save()
+
+        self.assertFalse(self.cache_file.exists())
+
+    def test_cached_lookup_skips_search_on_hit(self):
+        """Test a valid cached path avoids running the search"""
+        cache = installer.DiscoveryCache(self.cache_file)
+        cache.put("p4", None, self.tool)
+        search = MagicMock()
+
+        result = installer._cached_lookup(cache, "p4", None, search)
+
+        self.assertEqual(result, self.tool)
+        search.assert_not_called()
+
+    def test_cached_lookup_searches_and_stores_on_miss(self):
+        """Test a miss runs the search and caches a found path"""
+        cache = installer.DiscoveryCache(self.cache_file)
+        search = MagicMock(return_value=self.tool)
+
+        first = installer._cached_lookup(cache, "p4", None, search)
+        second = installer._cached_lookup(cache, "p4", None, search)
+
+        self.assertEqual(first, self.tool)
+        self.assertEqual(second, self.tool)
+        search.assert_called_once()
+
+    def test_cached_lookup_does_not_store_misses(self):
+        """Test a failed search is not cached so the next run searches again"""
+        cache = installer.DiscoveryCache(self.cache_file)
+        search = MagicMock(return_value=None)
+
+        installer._cached_lookup(cache, "p4", None, search)
+        installer._cached_lookup(cache, "p4", None, search)
+
+        self.assertEqual(search.call_count, 2)
+
+    @patch('Installer._search_for_file')
+    def test_get_p4_path_uses_cache(self, mock_search):
+        """Test get_p4_path answers from the cache without searching"""
+        cache = installer.DiscoveryCache(self.cache_file)
+        cache.put("p4", None, self.tool)
+
+        result = installer.get_p4_path(cache=cache)
+
+        self.assertEqual(result, self.tool)
+        mock_search.assert_not_called()
+
+
 class TestP4Config(unittest.TestCase):
     """Tests for P4 configuration functions"""
 
     @patch('Installer.get_project_path')
     @patch('Installer.get_app_path')
-    @patch('pathlib.Path.rglob')
-    @patch('pathlib.Path.is_file')
-    def test_get_p4_config_path_found(self, mock_is_file, mock_rglob, mock_get_app, mock_get_project):
+    @patch('Installer.find_project_files')
+    def test_get_p4_config_path_found(self, mock_find, mock_get_app, mock_get_project):
         """Test get_p4_config_path when config file is found"""
         expected_path = Path("C:\\Project\\.p4config")
-        mock_is_file.return_value = True
-        mock_rglob.return_value = [expected_path]
+        mock_find.return_value = {installer.UPROJECT_PATTERN: None, installer.P4CONFIG_PATTERN: expected_path}
         mock_get_project.return_value = Path("C:\\Project")
 
         result = installer.get_p4_config_path()
@@ -179,67 +473,43 @@ class TestP4Config(unittest.TestCase):
 
     @patch('Installer.get_project_path')
     @patch('Installer.get_app_path')
-    @patch('pathlib.Path.rglob')
-    def test_get_p4_config_path_not_found(self, mock_rglob, mock_get_app, mock_get_project):
+    @patch('Installer.find_project_files')
+    def test_get_p4_config_path_not_found(self, mock_find, mock_get_app, mock_get_project):
         """Test get_p4_config_path when config file is not found"""
-        mock_rglob.return_value = []
+        mock_find.return_value = {installer.UPROJECT_PATTERN: None, installer.P4CONFIG_PATTERN: None}
         mock_get_project.return_value = Path("C:\\Project")
 
         result = installer.get_p4_config_path()
         self.assertIsNone(result)
 
-    @patch('Installer.subprocess.run')
-    def test_get_p4_env_var_success(self, mock_run):
-        """Test _get_p4_env_var with successful execution"""
-        mock_result = MagicMock()
-        mock_result.returncode = 0
-        mock_result.stdout = "P4USER=testuser\n"
-        mock_run.return_value = mock_result
-
-        result = installer._get_p4_env_var("P4USER")
-        self.assertEqual(result, ["P4USER", "testuser"])
-
-    @patch('Installer.subprocess.run')
-    def test_get_p4_env_var_failure(self, mock_run):
-        """Test _get_p4_env_var with failed execution"""
-        mock_result = MagicMock()
-        mock_result.returncode = 1
-        mock_run.return_value = mock_result
-
-        result = installer._get_p4_env_var("P4USER")
-        self.assertIsNone(result)
+    def test_get_p4_env_vars(self):
+        """Test get_p4_env_vars reads all variables with one p4 set"""
+        runner = FakeP4Runner(env={"P4USER": "testuser", "P4PORT": "localhost:1666", "P4CLIENT": "testclient"})
 
-    @patch('Installer._get_p4_env_var')
-    def test_get_p4_env_vars(self, mock_get_var):
-        """Test get_p4_env_vars returns dict with all variables"""
-        mock_get_var.side_effect = [
-            ["P4USER", "testuser"],
-            ["P4PORT", "localhost:1666"],
-            ["P4CLIENT", "testclient"]
-        ]
-
-        result = installer.get_p4_env_vars()
+        result = installer.get_p4_env_vars(installer.P4Session(runner=runner))
         self.assertEqual(result, {
             "P4USER": "testuser",
             "P4PORT": "localhost:1666",
             "P4CLIENT": "testclient"
         })
+        self.assertEqual(len(runner.calls), 1)
 
-    @patch('Installer._get_p4_env_var')
-    def test_get_p4_env_vars_partial(self, mock_get_var):
+    def test_get_p4_env_vars_partial(self):
         """Test get_p4_env_vars when some variables are not available"""
-        mock_get_var.side_effect = [
-            ["P4USER", "testuser"],
-            None,
-            ["P4CLIENT", "testclient"]
-        ]
+        runner = FakeP4Runner(env={"P4USER": "testuser", "P4CLIENT": "testclient", "P4EDITOR": "notepad"})
 
-        result = installer.get_p4_env_vars()
+        result = installer.get_p4_env_vars(installer.P4Session(runner=runner))
         self.assertEqual(result, {
             "P4USER": "testuser",
             "P4CLIENT": "testclient"
         })
 
+    @patch('p4_session.SubprocessRunner.run')
+    def test_get_p4_env_vars_failure(self, mock_run):
+        """Test get_p4_env_vars returns an empty dict when p4 set fails"""
+        mock_run.return_value = (1, b"")
+        self.assertEqual(installer.get_p4_env_vars(), {})
+
     @patch('Installer.set_config_file')
     @patch('Installer.get_project_path')
     @patch('Installer.get_app_path')
@@ -255,7 +525,8 @@ class TestP4Config(unittest.TestCase):
 
     @patch('builtins.open', new_callable=mock_open, read_data="\n")
     @patch('Installer.get_p4_env_vars')
-    def test_set_config_empty_file(self, mock_get_vars, mock_file):
+    @patch('pathlib.Path.exists', return_value=True)
+    def test_set_config_empty_file(self, _, mock_get_vars, mock_file):
         """Test set_config writes to empty file"""
         mock_get_vars.return_value = {
             "P4USER": "testuser",
@@ -273,7 +544,8 @@ class TestP4Config(unittest.TestCase):
 
     @patch('builtins.open', new_callable=mock_open, read_data="P4USER=olduser\nP4PORT=oldport\n")
     @patch('Installer.get_p4_env_vars')
-    def test_set_config_existing_file(self, mock_get_vars, mock_file):
+    @patch('pathlib.Path.exists', return_value=True)
+    def test_set_config_existing_file(self, _, mock_get_vars, mock_file):
         """Test set_config updates existing file"""
         mock_get_vars.return_value = {
             "P4USER": "newuser",
@@ -411,24 +683,20 @@ class TestP4VCustomToolsPath(unittest.TestCase):
 class TestP4Connection(unittest.TestCase):
     """Tests for check_p4_connection function"""
 
-    @patch('Installer.subprocess.run')
+    @patch('p4_session.SubprocessRunner.run')
     def test_check_p4_connection_success(self, mock_run):
         """Test check_p4_connection when connection is successful"""
-        mock_result = MagicMock()
-        mock_result.returncode = 0
-        mock_run.return_value = mock_result
+        mock_run.return_value = (0, marshal.dumps({b"code": b"stat", b"Client": b"client"}))
 
         credentials = {"P4USER": "user", "P4PORT": "port", "P4CLIENT": "client"}
         result = installer.check_p4_connection(credentials)
         self.assertTrue(result)
         mock_run.assert_called_once()
 
-    @patch('Installer.subprocess.run')
+    @patch('p4_session.SubprocessRunner.run')
     def test_check_p4_connection_failure(self, mock_run):
         """Test check_p4_connection when connection fails"""
-        mock_result = MagicMock()
-        mock_result.returncode = 1
-        mock_run.return_value = mock_result
+        mock_run.return_value = (1, marshal.dumps({b"code": b"error", b"data": b"Perforce password (P4PASSWD) invalid or unset."}))
 
         credentials = {"P4USER": "user", "P4PORT": "port", "P4CLIENT": "client"}
         result = installer.check_p4_connection(credentials)
@@ -439,15 +707,13 @@ class TestP4Connection(unittest.TestCase):
         result = installer.check_p4_connection({"P4USER": "user"})
         self.assertFalse(result)
 
-    @patch('Installer.subprocess.run')
+    @patch('p4_session.SubprocessRunner.run')
     def test_check_p4_connection_timeout(self, mock_run):
-        """Test check_p4_connection handles timeout"""
-        import subprocess
-        mock_run.side_effect = subprocess.TimeoutExpired("p4 info", installer.P4_TIME_OUT)
+        """Test check_p4_connection reports a timeout as a failed connection"""
+        mock_run.side_effect = installer.P4Error("p4 did not answer", timed_out=True)
 
         credentials = {"P4USER": "user", "P4PORT": "port", "P4CLIENT": "client"}
-        with self.assertRaises(subprocess.TimeoutExpired):
-            installer.check_p4_connection(credentials)
+        self.assertFalse(installer.check_p4_connection(credentials))
 
 
 class TestCustomToolDefinition(unittest.TestCase):
@@ -598,40 +864,35 @@ class TestFixExistingCustomTool(unittest.TestCase):
 class TestEdgeCases(unittest.TestCase):
     """Tests for edge cases and error handling"""
 
-    @patch('Installer.subprocess.run')
-    def test_get_p4_env_var_timeout(self, mock_run):
-        """Test _get_p4_env_var handles timeout exception"""
-        import subprocess
-        mock_run.side_effect = subprocess.TimeoutExpired("p4 set", installer.P4_TIME_OUT)
+    @patch('p4_session.SubprocessRunner.run')
+    def test_get_p4_env_vars_timeout(self, mock_run):
+        """Test get_p4_env_vars lets a timeout through"""
+        mock_run.side_effect = installer.P4Error("p4 did not answer", timed_out=True)
 
-        with self.assertRaises(subprocess.TimeoutExpired):
-            installer._get_p4_env_var("P4USER")
+        with self.assertRaises(installer.P4Error):
+            installer.get_p4_env_vars()
 
-    @patch('Installer.subprocess.run')
-    def test_get_p4_env_var_malformed_output(self, mock_run):
-        """Test _get_p4_env_var with malformed output"""
-        mock_result = MagicMock()
-        mock_result.returncode = 0
-        mock_result.stdout = "MALFORMED_OUTPUT_NO_EQUALS"
-        mock_run.return_value = mock_result
+    def test_get_p4_env_vars_malformed_output(self):
+        """Test get_p4_env_vars ignores lines without a value"""
+        session = installer.P4Session(runner=FakeP4Runner())
+        session._memo[("set",)] = installer.P4Session.parse_set_output("MALFORMED_OUTPUT_NO_EQUALS\nP4USER=user (set)\n")
 
-        with self.assertRaises(ValueError):
-            installer._get_p4_env_var("P4USER")
+        self.assertEqual(installer.get_p4_env_vars(session), {"P4USER": "user"})
 
-    @patch('pathlib.Path.rglob')
-    def test_get_uproject_path_multiple_files(self, mock_rglob):
-        """Test get_uproject_path returns first when multiple .uproject files exist"""
-        first_project = Path("C:\\Project\\Game1.uproject")
-        second_project = Path("C:\\Project\\Game2.uproject")
-        mock_rglob.return_value = iter([first_project, second_project])
+    def test_get_uproject_path_multiple_files(self):
+        """Test get_uproject_path returns the alphabetically first when several .uproject files share a level"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            project_path = Path(temp_dir)
+            (project_path / "Game2.uproject").touch()
+            (project_path / "Game1.uproject").touch()
 
-        with patch('pathlib.Path.is_dir', return_value=True):
-            result = installer.get_uproject_path(Path("C:\\Project"))
-            self.assertEqual(result, first_project)
+            result = installer.get_uproject_path(project_path)
+            self.assertEqual(result, project_path / "Game1.uproject")
 
     @patch('builtins.open', new_callable=mock_open, read_data="P4USER=user\nP4PORT=port\n")
     @patch('Installer.get_p4_env_vars')
-    def test_set_config_file_adds_missing_vars(self, mock_get_vars, mock_file):
+    @patch('pathlib.Path.exists', return_value=True)
+    def test_set_config_file_adds_missing_vars(self, _, mock_get_vars, mock_file):
         """Test set_config_file adds variables not in existing file"""
         mock_get_vars.return_value = {
             "P4USER": "newuser",
@@ -647,7 +908,8 @@ class TestEdgeCases(unittest.TestCase):
 
     @patch('builtins.open', new_callable=mock_open, read_data="P4USER=user\n# Comment line\nP4PORT=port\nOther content\n")
     @patch('Installer.get_p4_env_vars')
-    def test_set_config_file_preserves_non_p4_lines(self, mock_get_vars, mock_file):
+    @patch('pathlib.Path.exists', return_value=True)
+    def test_set_config_file_preserves_non_p4_lines(self, _, mock_get_vars, mock_file):
         """Test set_config_file preserves lines that aren't P4 variables (covers line 205)"""
         mock_get_vars.return_value = {
             "P4USER": "newuser",
@@ -687,6 +949,8 @@ class TestToolInstallerMethods(unittest.TestCase):
             self_inst.HYPERLINK_COLOR = "#60a5fa"
 
         with patch('Installer.ToolInstaller._build_ui'), \
+             patch('pathlib.Path.mkdir'), \
+             patch('pathlib.Path.touch'), \
              patch('Installer.ToolInstaller._configure_styles', fake_configure_styles), \
              patch('Installer.get_app_path', return_value=Path("C:\\Tools\\SyncAndBuild")), \
              patch('Installer.get_project_path', return_value=Path("C:\\Project")), \
@@ -803,16 +1067,16 @@ class TestToolInstallerMethods(unittest.TestCase):
     def test_flush_to_log_file_with_buffer(self, mock_file):
         """Test _flush_to_log_file writes buffered content"""
         tool_installer = self._create_tool_installer()
-        tool_installer._buffered_log = "Test log content"
+        tool_installer._log_buffer = ["Test log ", "content"]
         tool_installer._flush_to_log_file()
 
         mock_file().write.assert_called_once_with("Test log content")
-        self.assertEqual(tool_installer._buffered_log, "")
+        self.assertEqual(tool_installer._log_buffer, [])
 
     def test_flush_to_log_file_empty_buffer(self):
         """Test _flush_to_log_file does nothing when buffer is empty"""
         tool_installer = self._create_tool_installer()
-        tool_installer._buffered_log = ""
+        tool_installer._log_buffer = []
 
         # Should return early without opening file
         with patch('builtins.open', new_callable=mock_open) as mock_file:
@@ -838,6 +1102,8 @@ class TestToolInstallerLogging(unittest.TestCase):
             self_inst.HYPERLINK_COLOR = "#60a5fa"
 
         with patch('Installer.ToolInstaller._build_ui'), \
+             patch('pathlib.Path.mkdir'), \
+             patch('pathlib.Path.touch'), \
              patch('Installer.ToolInstaller._configure_styles', fake_configure_styles), \
              patch('Installer.get_app_path', return_value=Path("C:\\Tools\\SyncAndBuild")), \
              patch('Installer.get_project_path', return_value=Path("C:\\Project")), \
@@ -849,89 +1115,91 @@ class TestToolInstallerLogging(unittest.TestCase):
             return ti
 
     def test_log_appends_to_buffer(self):
-        """Test _log appends message to _buffered_log"""
+        """Test _log appends message to the log buffer"""
         ti = self._create_tool_installer()
-        ti._buffered_log = ""
+        ti._log_buffer = []
 
         ti._log("  ▶ Test message", log_type=installer.LogType.HEADER)
 
-        self.assertIn("HEADER:", ti._buffered_log)
-        self.assertIn("Test message", ti._buffered_log)
+        self.assertIn("HEADER:", "".join(ti._log_buffer))
+        self.assertIn("Test message", "".join(ti._log_buffer))
 
     def test_log_strips_prefix_correctly(self):
         """Test _log strips the 4-char prefix from message for log file"""
         ti = self._create_tool_installer()
-        ti._buffered_log = ""
+        ti._log_buffer = []
 
         ti._info_log("Hello")
 
         # message[4:] strips the "  → " prefix, leaving just "Hello"
-        self.assertIn("INFO: Hello", ti._buffered_log)
-        self.assertNotIn("→", ti._buffered_log)
+        self.assertIn("INFO: Hello", "".join(ti._log_buffer))
+        self.assertNotIn("→", "".join(ti._log_buffer))
 
     def test_header_log(self):
         """Test _header_log formats with header prefix"""
         ti = self._create_tool_installer()
-        ti._buffered_log = ""
+        ti._log_buffer = []
 
         ti._header_log("Step 1")
+        ti._pump_ui_queue()
 
-        self.assertIn("HEADER:", ti._buffered_log)
+        self.assertIn("HEADER:", "".join(ti._log_buffer))
         ti.status_text.insert.assert_called()
 
     def test_error_log(self):
         """Test _error_log formats with error prefix"""
         ti = self._create_tool_installer()
-        ti._buffered_log = ""
+        ti._log_buffer = []
 
         ti._error_log("Something failed")
 
-        self.assertIn("ERROR:", ti._buffered_log)
-        self.assertIn("Something failed", ti._buffered_log)
+        self.assertIn("ERROR:", "".join(ti._log_buffer))
+        self.assertIn("Something failed", "".join(ti._log_buffer))
 
     def test_warning_log(self):
         """Test _warning_log formats with warning prefix"""
         ti = self._create_tool_installer()
-        ti._buffered_log = ""
+        ti._log_buffer = []
 
         ti._warning_log("Careful")
 
-        self.assertIn("WARNING:", ti._buffered_log)
+        self.assertIn("WARNING:", "".join(ti._log_buffer))
 
     def test_success_log(self):
         """Test _success_log formats with success prefix"""
         ti = self._create_tool_installer()
-        ti._buffered_log = ""
+        ti._log_buffer = []
 
         ti._success_log("Done")
 
-        self.assertIn("SUCCESS:", ti._buffered_log)
+        self.assertIn("SUCCESS:", "".join(ti._log_buffer))
 
     def test_dim_log(self):
         """Test _dim_log formats with dim prefix"""
         ti = self._create_tool_installer()
-        ti._buffered_log = ""
+        ti._log_buffer = []
 
         ti._dim_log("Author info")
 
-        self.assertIn("DIM:", ti._buffered_log)
+        self.assertIn("DIM:", "".join(ti._log_buffer))
 
     def test_add_link_buffers_to_log(self):
         """Test _add_link writes link info to buffered log"""
         ti = self._create_tool_installer()
-        ti._buffered_log = ""
+        ti._log_buffer = []
 
         ti._add_link("Click here\n", "https://example.com")
 
-        self.assertIn("LINK:", ti._buffered_log)
-        self.assertIn("https://example.com", ti._buffered_log)
-        self.assertIn("Click here", ti._buffered_log)
+        self.assertIn("LINK:", "".join(ti._log_buffer))
+        self.assertIn("https://example.com", "".join(ti._log_buffer))
+        self.assertIn("Click here", "".join(ti._log_buffer))
 
     def test_add_link_configures_tag(self):
         """Test _add_link configures a clickable tag on status_text"""
         ti = self._create_tool_installer()
 
         ti._add_link("Test link\n", "https://example.com")
+        ti._pump_ui_queue()
 
         ti.status_text.tag_configure.assert_called()
         ti.status_text.tag_bind.assert_called()
@@ -941,7 +1209,7 @@ class TestToolInstallerLogging(unittest.TestCase):
     def test_finish_success(self, mock_file):
         """Test _finish with success=True logs completion message"""
         ti = self._create_tool_installer()
-        ti._buffered_log = ""
+        ti._log_buffer = []
 
         ti._finish(success=True)
 
@@ -953,7 +1221,7 @@ class TestToolInstallerLogging(unittest.TestCase):
     def test_finish_failure(self, mock_file):
         """Test _finish with success=False logs error message"""
         ti = self._create_tool_installer()
-        ti._buffered_log = ""
+        ti._log_buffer = []
 
         ti._finish(success=False)
 
@@ -999,15 +1267,69 @@ class TestToolInstallerLogging(unittest.TestCase):
         mock_finish.assert_called_once_with(success=False)
 
     def test_on_install_clicked(self):
-        """Test _on_install_clicked disables button and calls install"""
+        """Test _on_install_clicked disables button and starts install on a worker thread"""
         ti = self._create_tool_installer()
         ti.install_btn = MagicMock()
 
-        with patch.object(ti, 'install'):
+        with patch('Installer.threading.Thread') as mock_thread:
             ti._on_install_clicked()
 
         ti.install_btn.configure.assert_called_once_with(state='disabled')
         ti.status_text.delete.assert_called_once()
+        mock_thread.assert_called_once_with(target=ti.install, daemon=True)
+        mock_thread.return_value.start.assert_called_once()
+
+    def test_log_does_not_touch_widget_until_pumped(self):
+        """Test _log only queues the line, the widget is updated by the pump"""
+        ti = self._create_tool_installer()
+
+        ti._info_log("Queued")
+        ti.status_text.insert.assert_not_called()
+
+        ti._pump_ui_queue()
+        ti.status_text.insert.assert_called_once()
+
+    def test_pump_batches_lines_into_one_insert(self):
+        """Test the pump inserts all queued lines with a single widget call"""
+        ti = self._create_tool_installer()
+
+        for index in range(5):
+            ti._info_log(f"Line {index}")
+        ti._pump_ui_queue()
+
+        ti.status_text.insert.assert_called_once()
+        args = ti.status_text.insert.call_args[0]
+        self.assertEqual(len(args), 1 + 5 * 2)
+        ti.root.after.assert_called_with(installer.LOG_PUMP_INTERVAL_MS, ti._pump_ui_queue)
+
+    def test_pump_caps_widget_line_count(self):
+        """Test the pump deletes the oldest lines once the widget holds more than the cap"""
+        ti = self._create_tool_installer()
+        ti.status_text.index.return_value = f"{installer.MAX_LOG_LINES + 10}.0"
+
+        ti._info_log("One more")
+        ti._pump_ui_queue()
+
+        ti.status_text.delete.assert_called_once_with("1.0", "11.0")
+
+    def test_call_on_ui_thread_from_worker_waits_for_pump(self):
+        """Test a worker thread call is run by the pump and its result returned to the worker"""
+        ti = self._create_tool_installer()
+        results = []
+
+        worker = threading.Thread(target=lambda: results.append(ti._call_on_ui_thread(lambda: "dialog result")))
+        worker.start()
+        while worker.is_alive():
+            ti._pump_ui_queue()
+            worker.join(0.01)
+
+        self.assertEqual(results, ["dialog result"])
+
+    def test_call_on_ui_thread_runs_directly_on_ui_thread(self):
+        """Test calls made from the Tk thread run immediately"""
+        ti = self._create_tool_installer()
+
+        self.assertEqual(ti._call_on_ui_thread(lambda: 42), 42)
 
 
 class TestSetConfigFileNewFile(unittest.TestCase):
@@ -1065,6 +1387,85 @@ class TestGetAppPathLocation(unittest.TestCase):
             self.assertEqual(result, Path("C:\\Scripts"))
 
 
+class TestCredentialValidator(unittest.TestCase):
+    """Tests for CredentialValidator background checks"""
+
+    credentials = {"P4PORT": "ssl:perforce:1666", "P4USER": "user", "P4CLIENT": "client"}
+
+    def _validator(self, records=None, delay=0.0, ttl=installer.P4_VALIDATION_CACHE_TTL):
+        runners = []
+        def factory():
+            runners.append(FakeP4Runner({"client": records if records is not None else [{"code": "stat"}]}, delay=delay))
+            return runners[-1]
+        return installer.CredentialValidator(ttl=ttl, runner_factory=factory), runners
+
+    def test_validate_success_reports_latency(self):
+        """Test a valid check returns a latency"""
+        validator, runners = self._validator()
+        result = validator.validate(self.credentials)
+        self.assertTrue(result.valid)
+        self.assertFalse(result.cancelled)
+        self.assertIsNotNone(result.latency)
+        self.assertEqual(runners[0].calls[0][-2:], ["client", "-o"])
+        self.assertIn("ssl:perforce:1666", runners[0].calls[0])
+
+    def test_validate_failure(self):
+        """Test an error record is invalid"""
+        validator, _ = self._validator([{"code": "error", "data": "Perforce password (P4PASSWD) invalid or unset."}])
+        self.assertFalse(validator.validate(self.credentials).valid)
+
+    def test_validate_missing_fields_does_not_run_p4(self):
+        """Test incomplete credentials are rejected without a p4 process"""
+        validator, runners = self._validator()
+        result = validator.validate({"P4USER": "user"})
+        self.assertFalse(result.valid)
+        self.assertEqual(runners[0].calls, [])
+
+    @patch('Installer.P4_TIME_OUT', 0.01)
+    def test_validate_timeout(self):
+        """Test a server that never answers is invalid with no latency"""
+        validator, _ = self._validator(delay=1)
+        result = validator.validate(self.credentials)
+        self.assertFalse(result.valid)
+        self.assertIsNone(result.latency)
+
+    def test_repeated_validation_is_cached(self):
+        """Test the same credentials are only checked once within the TTL"""
+        validator, runners = self._validator()
+        validator.validate(self.credentials)
+        second = validator.validate(self.credentials)
+        self.assertTrue(second.valid)
+        self.assertEqual(len(runners), 1)
+
+    def test_expired_cache_checks_again(self):
+        """Test an answer older than the TTL is not reused"""
+        validator, runners = self._validator(ttl=-1)
+        validator.validate(self.credentials)
+        validator.validate(self.credentials)
+        self.assertEqual(len(runners), 2)
+
+    def test_pending_check_is_shared(self):
+        """Test asking twice while a check runs returns the same future"""
+        validator, runners = self._validator(delay=0.2)
+        first = validator.validate_async(self.credentials)
+        second = validator.validate_async(self.credentials)
+        self.assertIs(first, second)
+        self.assertTrue(first.result(timeout=5).valid)
+        self.assertEqual(len(runners), 1)
+
+    def test_cancel_stops_check(self):
+        """Test cancelling ends the check straight away and the answer is not cached"""
+        validator, _ = self._validator(delay=5)
+
+        future = validator.validate_async(self.credentials)
+        validator.cancel()
+        result = future.result(timeout=2)
+
+        self.assertTrue(result.cancelled)
+        self.assertFalse(result.valid)
+        self.assertIsNone(validator.cached(self.credentials))
+
+
 class TestCheckP4ConnectionEdgeCases(unittest.TestCase):
     """Tests for check_p4_connection default credentials flow"""
 
@@ -1076,17 +1477,16 @@ class TestCheckP4ConnectionEdgeCases(unittest.TestCase):
         self.assertFalse(result)
         mock_get_vars.assert_called_once()
 
-    @patch('Installer.subprocess.run')
+    @patch('p4_session.SubprocessRunner.run')
     def test_check_p4_connection_empty_values(self, mock_run):
-        """Test check_p4_connection uses empty strings for missing keys"""
-        mock_result = MagicMock()
-        mock_result.returncode = 0
-        mock_run.return_value = mock_result
+        """Test check_p4_connection passes the credentials as global options"""
+        mock_run.return_value = (0, b"")
 
         credentials = {"P4USER": "user", "P4PORT": "port", "P4CLIENT": "client"}
         installer.check_p4_connection(credentials)
 
         call_args = mock_run.call_args[0][0]
+        self.assertIn("-G", call_args)
         self.assertIn("-p", call_args)
         self.assertIn("port", call_args)
         self.assertIn("-u", call_args)
@@ -1110,6 +1510,8 @@ class TestInstallExceptionHandling(unittest.TestCase):
             self_inst.HYPERLINK_COLOR = "#60a5fa"
 
         with patch('Installer.ToolInstaller._build_ui'), \
+             patch('pathlib.Path.mkdir'), \
+             patch('pathlib.Path.touch'), \
              patch('Installer.ToolInstaller._configure_styles', fake_configure_styles), \
              patch('Installer.get_app_path', return_value=Path("C:\\Tools\\SyncAndBuild")), \
              patch('Installer.get_project_path', return_value=Path("C:\\Project")), \
@@ -1157,6 +1559,23 @@ class TestInstallExceptionHandling(unittest.TestCase):
 
         mock_finish.assert_called_once_with(success=False)
 
+    @patch('builtins.open', new_callable=mock_open)
+    def test_install_skips_custom_tool_when_p4config_fails(self, _):
+        """Test customtools.xml is not written when the credentials are cancelled or rejected"""
+        ti = self._create_tool_installer()
+
+        with patch.object(ti, '_check_project_structure', return_value=True), \
+             patch.object(ti, '_setup_p4_config', return_value=False), \
+             patch.object(ti, '_check_p4', return_value=True), \
+             patch.object(ti, '_setup_custom_tool', return_value=True) as mock_custom_tool, \
+             patch.object(ti, '_warning_log') as mock_warning, \
+             patch.object(ti, '_finish') as mock_finish:
+            ti.install()
+
+        mock_custom_tool.assert_not_called()
+        mock_warning.assert_called_once_with("Skipped custom_tool: p4config did not succeed")
+        mock_finish.assert_called_once_with(success=False)
+
     @patch('builtins.open', new_callable=mock_open)
     def test_install_flushes_log_between_steps(self, mock_file):
         """Test install calls _flush_to_log_file between steps"""
@@ -1173,6 +1592,180 @@ class TestInstallExceptionHandling(unittest.TestCase):
         # _flush_to_log_file should be called once per step (4 steps)
         self.assertEqual(mock_flush.call_count, 4)
 
+    @patch('builtins.open', new_callable=mock_open)
+    def test_install_logs_concurrent_steps_in_order(self, _):
+        """Test worker step logs are written in step order even when a later step finishes first"""
+        ti = self._create_tool_installer()
+        written = []
+
+        def slow_structure():
+            time.sleep(0.2)
+            ti._info_log("structure")
+            return True
+
+        def fast_p4():
+            ti._info_log("p4")
+            return True
+
+        with patch.object(ti, '_check_project_structure', side_effect=slow_structure), \
+             patch.object(ti, '_setup_p4_config', side_effect=lambda: ti._info_log("p4config") or True), \
+             patch.object(ti, '_check_p4', side_effect=fast_p4), \
+             patch.object(ti, '_setup_custom_tool', side_effect=lambda: ti._info_log("custom tool") or True), \
+             patch.object(ti, '_write_log', side_effect=lambda message, log_type: written.append(message[4:])), \
+             patch.object(ti, '_finish'):
+            ti.install()
+
+        steps = [line for line in written if line in ("structure", "p4config", "p4", "custom tool")]
+        self.assertEqual(steps, ["structure", "p4config", "p4", "custom tool"])
+
+
+class TestStepScheduler(unittest.TestCase):
+    """Tests for the dependency-aware installer step scheduler"""
+
+    @staticmethod
+    def _run_captured(step):
+        records = []
+        return step(records), records
+
+    def _scheduler(self, steps, log):
+        return installer.StepScheduler(steps, self._run_captured, log.extend)
+
+    def test_logs_are_committed_in_declaration_order(self):
+        """Test a fast later step does not log before a slow earlier one"""
+        log = []
+
+        def slow(records):
+            time.sleep(0.2)
+            records.append("slow")
+            return True
+
+        def fast(records):
+            records.append("fast")
+            return True
+
+        steps = [installer.InstallStep("slow", slow), installer.InstallStep("fast", fast)]
+        self.assertTrue(self._scheduler(steps, log).run())
+        self.assertEqual(log, ["slow", "fast"])
+
+    def test_independent_steps_overlap(self):
+        """Test independent steps run at the same time instead of one after the other"""
+        def wait(records):
+            time.sleep(0.3)
+            return True
+
+        steps = [installer.InstallStep(f"step{index}", wait) for index in range(3)]
+
+        start = time.perf_counter()
+        self._scheduler(steps, []).run()
+        self.assertLess(time.perf_counter() - start, 0.8)
+
+    def test_dependent_step_waits_for_dependency(self):
+        """Test a step only starts after the steps it depends on succeeded"""
+        events = []
+
+        def first(records):
+            time.sleep(0.1)
+            events.append("first")
+            return True
+
+        def second(records):
+            events.append("second")
+            return True
+
+        steps = [
+            installer.InstallStep("first", first),
+            installer.InstallStep("second", second, ("first",))]
+        self._scheduler(steps, []).run()
+        self.assertEqual(events, ["first", "second"])
+
+    def test_failed_dependency_skips_dependents(self):
+        """Test steps that depend on a failed step never run"""
+        dependent = MagicMock(return_value=True)
+        independent = MagicMock(return_value=True)
+
+        steps = [
+            installer.InstallStep("check", lambda records: False),
+            installer.InstallStep("dependent", dependent, ("check",)),
+            installer.InstallStep("independent", independent)]
+
+        self.assertFalse(self._scheduler(steps, []).run())
+        dependent.assert_not_called()
+        independent.assert_called_once()
+
+    def test_skipped_steps_are_reported(self):
+        """Test on_skip gets every skipped step with the dependencies that did not succeed"""
+        on_skip = MagicMock()
+        steps = [
+            installer.InstallStep("check", lambda records: False),
+            installer.InstallStep("ok", lambda records: True),
+            installer.InstallStep("dependent", lambda records: True, ("check", "ok")),
+            installer.InstallStep("chained", lambda records: True, ("dependent",))]
+
+        installer.StepScheduler(steps, self._run_captured, lambda records: None, on_skip=on_skip).run()
+        self.assertEqual([(call.args[0].name, call.args[1]) for call in on_skip.call_args_list],
+                         [("dependent", ["check"]), ("chained", ["dependent"])])
+
+    def test_dependency_counts_before_its_done_callback(self):
+        """Test an inline step is not skipped while its captured dependency's done callback is late"""
+        class LateCallback(installer.StepScheduler):
+            def _on_done(self, step, future):
+                time.sleep(0.2)
+                super()._on_done(step, future)
+
+        def structure(records):
+            # Still running when its done callback is registered
+            time.sleep(0.1)
+            return True
+
+        on_skip = MagicMock()
+        inline = MagicMock(return_value=True)
+        steps = [
+            installer.InstallStep("structure", structure),
+            installer.InstallStep("p4config", inline, ("structure",), inline=True)]
+
+        self.assertTrue(LateCallback(steps, self._run_captured, lambda records: None, on_skip=on_skip).run())
+        inline.assert_called_once()
+        on_skip.assert_not_called()
+
+    def test_inline_step_runs_on_calling_thread(self):
+        """Test steps flagged inline run on the thread that called run()"""
+        threads = {}
+
+        def on_main():
+            threads["main"] = threading.current_thread()
+            return True
+
+        def on_pool(records):
+            threads["pool"] = threading.current_thread()
+            return True
+
+        steps = [
+            installer.InstallStep("pool", on_pool),
+            installer.InstallStep("main", on_main, inline=True)]
+        self._scheduler(steps, []).run()
+
+        self.assertIs(threads["main"], threading.current_thread())
+        self.assertIsNot(threads["pool"], threading.current_thread())
+
+    def test_step_exception_propagates(self):
+        """Test an exception raised inside a step reaches the caller"""
+        def broken(records):
+            raise RuntimeError("boom")
+
+        steps = [installer.InstallStep("broken", broken)]
+        with self.assertRaises(RuntimeError):
+            self._scheduler(steps, []).run()
+
+    def test_on_commit_called_once_per_step(self):
+        """Test the commit hook runs once for each declared step"""
+        on_commit = MagicMock()
+        steps = [
+            installer.InstallStep("ok", lambda records: True),
+            installer.InstallStep("skipped", lambda records: True, ("missing",))]
+
+        installer.StepScheduler(steps, self._run_captured, lambda records: None, on_commit=on_commit).run()
+        self.assertEqual(on_commit.call_count, 2)
+
 
 class TestLogMessageSlicing(unittest.TestCase):
     """Tests for _log message[4:] slicing behavior"""
@@ -1191,6 +1784,8 @@ class TestLogMessageSlicing(unittest.TestCase):
             self_inst.HYPERLINK_COLOR = "#60a5fa"
 
         with patch('Installer.ToolInstaller._build_ui'), \
+             patch('pathlib.Path.mkdir'), \
+             patch('pathlib.Path.touch'), \
              patch('Installer.ToolInstaller._configure_styles', fake_configure_styles), \
              patch('Installer.get_app_path', return_value=Path("C:\\Tools\\SyncAndBuild")), \
              patch('Installer.get_project_path', return_value=Path("C:\\Project")), \
@@ -1215,39 +1810,40 @@ class TestLogMessageSlicing(unittest.TestCase):
         ]
 
         for log_fn, log_type, msg in test_cases:
-            ti._buffered_log = ""
+            ti._log_buffer = []
             log_fn(msg)
             self.assertEqual(
-                ti._buffered_log,
+                "".join(ti._log_buffer),
                 f"{log_type}: {msg}\n",
-                f"Failed for {log_type}: expected clean message, got: {ti._buffered_log!r}"
+                f"Failed for {log_type}: expected clean message, got: {''.join(ti._log_buffer)!r}"
             )
 
     def test_log_with_empty_string(self):
         """Test _log with empty string (used by separators in _finish)"""
         ti = self._create_tool_installer()
-        ti._buffered_log = ""
+        ti._log_buffer = []
 
         ti._log("", log_type=installer.LogType.INFO)
 
         # message[4:] of "" is still "", so buffer gets "INFO: \n"
-        self.assertEqual(ti._buffered_log, "INFO: \n")
+        self.assertEqual("".join(ti._log_buffer), "INFO: \n")
 
     def test_log_with_separator(self):
         """Test _log with separator string loses first 4 chars"""
         ti = self._create_tool_installer()
-        ti._buffered_log = ""
+        ti._log_buffer = []
 
         separator = "=" * 48
         ti._log(separator, log_type=installer.LogType.INFO)
 
         # message[4:] removes first 4 '=' signs
-        self.assertEqual(ti._buffered_log, f"INFO: {'=' * 44}\n")
+        self.assertEqual("".join(ti._log_buffer), f"INFO: {'=' * 44}\n")
 
     def test_log_calls_see_end(self):
         """Test _log calls status_text.see(END) for auto-scroll"""
         ti = self._create_tool_installer()
         ti._log("  → Test", log_type=installer.LogType.INFO)
+        ti._pump_ui_queue()
         ti.status_text.see.assert_called_with('end')
 
 
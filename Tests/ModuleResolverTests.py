@@ -0,0 +1,153 @@
+import unittest
+import os
+import sys
+import json
+import io
+import tempfile
+from contextlib import redirect_stdout
+
+# Add the Source directory to path to import the module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'Source')))
+import module_resolver
+from module_resolver import ModuleResolver, classify
+from p4_session import FakeP4Runner, P4Session
+
+PROJECT_FILES = (
+    "MyGame.uproject",
+    "Source/MyGame.Target.cs",
+    "Source/MyGame/MyGame.Build.cs",
+    "Source/MyGame/Private/Player.cpp",
+    "Source/MyGame/Public/Player.h",
+    "Plugins/Inventory/Inventory.uplugin",
+    "Plugins/Inventory/Source/Inventory/Inventory.Build.cs",
+    "Plugins/Inventory/Source/Inventory/Private/Bag.cpp",
+    "Plugins/Inventory/Source/InventoryEditor/InventoryEditor.Build.cs",
+    "Plugins/Inventory/Source/InventoryEditor/Private/BagDetails.cpp",
+    "Config/DefaultGame.ini",
+    "Content/Python/init_unreal.py",
+)
+
+
+def fake_where(root: str)-> FakeP4Runner:
+    """Runner mapping //depot/<path> to <root>/<path>, anything under //other is unmapped"""
+
+    def where(args, lines):
+        records = []
+        for depot_file in lines:
+            if depot_file.startswith("//other/"):
+                records.append({"code": "stat", "depotFile": depot_file, "unmap": "", "path": "x"})
+                continue
+            relative = depot_file[len("//depot/"):]
+            records.append({"code": "stat", "depotFile": depot_file, "clientFile": f"//ws/{relative}",
+                            "path": os.path.join(root, *relative.split("/"))})
+        return records
+
+    return FakeP4Runner({"where": where})
+
+
+class TestModuleResolver(unittest.TestCase):
+    """Tests for mapping changed files to modules"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = self.temp_dir.name
+        for relative in PROJECT_FILES:
+            path = os.path.join(self.root, *relative.split("/"))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as file:
+                file.write("")
+        self.runner = fake_where(self.root)
+        self.resolver = ModuleResolver(P4Session(runner=self.runner), self.root)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_classify_by_extension(self):
+        """Test compile, config, script and other categories"""
+        self.assertEqual(classify("//depot/Source/Game/Game.Build.cs"), "compile")
+        self.assertEqual(classify("//depot/Source/Game/Private/A.CPP"), "compile")
+        self.assertEqual(classify("//depot/Config/DefaultEngine.ini"), "config")
+        self.assertEqual(classify("//depot/Content/Python/tool.py"), "script")
+        self.assertEqual(classify("//depot/Content/Maps/Main.umap"), "other")
+
+    def test_maps_files_to_nearest_module_and_plugin(self):
+        """Test the nearest Build.cs owns the file and the nearest .uplugin names the plugin"""
+        result = self.resolver.resolve([
+            "//depot/Source/MyGame/Private/Player.cpp",
+            "//depot/Source/MyGame/Public/Player.h",
+            "//depot/Plugins/Inventory/Source/Inventory/Private/Bag.cpp",
+        ])
+
+        self.assertTrue(result["build"])
+        self.assertEqual([(module["name"], module["plugin"], module["files"]) for module in result["modules"]],
+                         [("Inventory", "Inventory", 1), ("MyGame", None, 2)])
+        self.assertEqual(result["plugins"], ["Inventory"])
+        self.assertEqual(result["unowned"], [])
+
+    def test_config_and_script_changes_do_not_build(self):
+        """Test .ini and .py changes alone skip the build without asking p4"""
+        result = self.resolver.resolve(["//depot/Config/DefaultGame.ini", "//depot/Content/Python/init_unreal.py"])
+
+        self.assertFalse(result["build"])
+        self.assertEqual(result["categories"], {"compile": 0, "config": 1, "script": 1, "other": 0})
+        self.assertEqual(self.runner.calls, [])
+
+    def test_files_outside_modules_still_build(self):
+        """Test target rules, descriptors and unmapped files are kept as unowned"""
+        result = self.resolver.resolve([
+            "//depot/Source/MyGame.Target.cs",
+            "//depot/MyGame.uproject",
+            "//other/Shared/Header.h",
+        ])
+
+        self.assertTrue(result["build"])
+        self.assertEqual(result["modules"], [])
+        self.assertEqual(len(result["unowned"]), 3)
+
+    def test_deleted_folders_resolve_from_parents(self):
+        """Test a file in a folder that no longer exists still finds its module"""
+        result = self.resolver.resolve(["//depot/Source/MyGame/Private/Removed/Old.cpp"])
+
+        self.assertEqual([module["name"] for module in result["modules"]], ["MyGame"])
+
+    def test_one_where_for_all_files(self):
+        """Test every compile-affecting file goes through a single batched p4 where"""
+        self.resolver.resolve([
+            "//depot/Source/MyGame/Private/Player.cpp",
+            "//depot/Plugins/Inventory/Source/InventoryEditor/Private/BagDetails.cpp",
+            "//depot/Config/DefaultGame.ini",
+        ])
+
+        self.assertEqual(len(self.runner.calls), 1)
+        self.assertIn("-x", self.runner.calls[0])
+
+    def test_local_paths_resolve_without_p4(self):
+        """Test workspace paths, relative to the root or absolute, are owned without a p4 where"""
+        result = self.resolver.resolve([
+            "Source/MyGame/Private/Player.cpp",
+            os.path.join(self.root, "Plugins", "Inventory", "Source", "Inventory", "Private", "Bag.cpp"),
+            "Config/DefaultGame.ini",
+        ], local=True)
+
+        self.assertEqual([module["name"] for module in result["modules"]], ["Inventory", "MyGame"])
+        self.assertEqual(result["categories"]["config"], 1)
+        self.assertEqual(self.runner.calls, [])
+
+    def test_main_reads_files_from_list(self):
+        """Test --files-from and the JSON printed for the sync script"""
+        list_path = os.path.join(self.root, "changed.txt")
+        with open(list_path, "w", encoding="utf-8-sig") as files:
+            files.write("//depot/Plugins/Inventory/Source/InventoryEditor/Private/BagDetails.cpp\n\n")
+
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            code = module_resolver.main(["--root", self.root, "--files-from", list_path],
+                                        session=P4Session(runner=self.runner))
+
+        self.assertEqual(code, 0)
+        output = json.loads(stdout.getvalue())
+        self.assertEqual(output["modules"][0]["name"], "InventoryEditor")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,240 @@
+import unittest
+import os
+import sys
+import marshal
+import threading
+from unittest.mock import patch, MagicMock
+
+# Add the Source directory to path to import the module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'Source')))
+import p4_session
+from p4_session import FakeP4Runner, P4Error, P4Result, P4Session
+
+
+class TestParse(unittest.TestCase):
+    """Tests for reading -G output"""
+
+    def test_parse_multiple_records(self):
+        """Test every marshalled record is decoded to strings"""
+        stdout = marshal.dumps({b"code": b"stat", b"change": b"12"}) + marshal.dumps({b"code": b"stat", b"change": b"13"})
+        records = P4Session.parse(stdout)
+        self.assertEqual(records, [{"code": "stat", "change": "12"}, {"code": "stat", "change": "13"}])
+
+    def test_parse_empty(self):
+        """Test empty output gives no records"""
+        self.assertEqual(P4Session.parse(b""), [])
+
+    def test_parse_keeps_non_text_values(self):
+        """Test integer values are left alone"""
+        records = P4Session.parse(marshal.dumps({b"code": b"error", b"severity": 3}))
+        self.assertEqual(records[0]["severity"], 3)
+
+    def test_parse_set_output_strips_origin(self):
+        """Test the (set) and (config) suffixes are dropped"""
+        variables = P4Session.parse_set_output(
+            "P4CLIENT=my_ws (config 'C:\\Project\\.p4config')\nP4PORT=ssl:server:1666 (set)\nP4USER=user\nbroken line\n")
+        self.assertEqual(variables, {"P4CLIENT": "my_ws", "P4PORT": "ssl:server:1666", "P4USER": "user"})
+
+
+class TestP4Result(unittest.TestCase):
+    """Tests for P4Result"""
+
+    def test_ok_and_errors(self):
+        """Test error records make the result fail"""
+        result = P4Result([{"code": "stat"}, {"code": "error", "data": "no such file(s).\n"}], 0)
+        self.assertFalse(result.ok)
+        self.assertEqual(result.errors, ["no such file(s)."])
+
+    def test_values(self):
+        """Test values collects one field from the records that have it"""
+        result = P4Result([{"change": "1"}, {"other": "x"}, {"change": "2"}])
+        self.assertEqual(result.values("change"), ["1", "2"])
+
+
+class TestP4Session(unittest.TestCase):
+    """Tests for P4Session"""
+
+    def test_command_line_has_globals(self):
+        """Test -G and the connection settings come before the command"""
+        runner = FakeP4Runner({"info": [{"code": "stat"}]})
+        P4Session("ssl:server:1666", "user", "ws", runner=runner).run("info")
+        self.assertEqual(runner.calls[0], ["p4", "-G", "-p", "ssl:server:1666", "-u", "user", "-c", "ws", "info"])
+
+    def test_command_line_skips_empty_settings(self):
+        """Test unset settings are left to p4 to resolve"""
+        runner = FakeP4Runner({"info": [{"code": "stat"}]})
+        P4Session(runner=runner).run("info")
+        self.assertEqual(runner.calls[0], ["p4", "-G", "info"])
+
+    def test_read_only_query_is_memoized(self):
+        """Test a read-only query only starts one process"""
+        runner = FakeP4Runner({"changes": [{"code": "stat", "change": "42"}]})
+        session = P4Session(runner=runner)
+        first = session.run("changes", "-m1", "//depot/...")
+        second = session.run("changes", "-m1", "//depot/...")
+        self.assertIs(first, second)
+        self.assertEqual(len(runner.calls), 1)
+
+    def test_different_arguments_are_not_shared(self):
+        """Test the memo is keyed by the whole command"""
+        runner = FakeP4Runner({"changes": [{"code": "stat"}]})
+        session = P4Session(runner=runner)
+        session.run("changes", "-m1")
+        session.run("changes", "-m2")
+        self.assertEqual(len(runner.calls), 2)
+
+    def test_write_command_is_not_memoized(self):
+        """Test commands that change state run every time"""
+        runner = FakeP4Runner({"sync": [{"code": "stat"}]})
+        session = P4Session(runner=runner)
+        session.run("sync")
+        session.run("sync")
+        self.assertEqual(len(runner.calls), 2)
+
+    def test_spec_output_is_read_only(self):
+        """Test client -o is memoized but client -d is not"""
+        self.assertTrue(P4Session.is_read_only(("client", "-o")))
+        self.assertFalse(P4Session.is_read_only(("client", "-d", "ws")))
+        self.assertFalse(P4Session.is_read_only(()))
+
+    def test_failed_query_is_not_memoized(self):
+        """Test an error is asked again next time"""
+        runner = FakeP4Runner({"info": [{"code": "error", "data": "Connect to server failed"}]})
+        session = P4Session(runner=runner)
+        self.assertFalse(session.run("info").ok)
+        session.run("info")
+        self.assertEqual(len(runner.calls), 2)
+
+    def test_clear_forgets_answers(self):
+        """Test clear makes the next query hit the server"""
+        runner = FakeP4Runner({"info": [{"code": "stat"}]})
+        session = P4Session(runner=runner)
+        session.run("info")
+        session.clear()
+        session.run("info")
+        self.assertEqual(len(runner.calls), 2)
+
+    def test_run_batch_sends_arguments_on_stdin(self):
+        """Test the arguments go through -x - in one process"""
+        seen = []
+        def describe(args, lines):
+            seen.append((args, lines))
+            return [{"code": "stat", "change": line} for line in lines]
+
+        runner = FakeP4Runner({"describe": describe})
+        result = P4Session(runner=runner).run_batch(("describe", "-s"), ["10", "11", "12"])
+
+        self.assertEqual(len(runner.calls), 1)
+        self.assertEqual(runner.calls[0][:4], ["p4", "-G", "-x", "-"])
+        self.assertEqual(seen, [(["describe", "-s"], ["10", "11", "12"])])
+        self.assertEqual(result.values("change"), ["10", "11", "12"])
+
+    def test_run_batch_chunks(self):
+        """Test long argument lists are split across processes"""
+        runner = FakeP4Runner({"where": lambda args, lines: [{"code": "stat", "path": line} for line in lines]})
+        result = P4Session(runner=runner).run_batch(("where",), [str(n) for n in range(5)], batch_size=2)
+        self.assertEqual(len(runner.calls), 3)
+        self.assertEqual(len(result.records), 5)
+
+    def test_run_batch_empty(self):
+        """Test no arguments means no process"""
+        runner = FakeP4Runner()
+        result = P4Session(runner=runner).run_batch(("files",), [])
+        self.assertTrue(result.ok)
+        self.assertEqual(runner.calls, [])
+
+    def test_get_env_vars_single_process(self):
+        """Test all settings come from one p4 set"""
+        runner = FakeP4Runner(env={"P4USER": "user", "P4PORT": "ssl:server:1666"})
+        session = P4Session(runner=runner)
+        self.assertEqual(session.get_env_vars(), {"P4USER": "user", "P4PORT": "ssl:server:1666"})
+        session.get_env_vars()
+        self.assertEqual(len(runner.calls), 1)
+
+    def test_check_connection(self):
+        """Test check_connection follows the client -o answer"""
+        good = P4Session("port", "user", "ws", runner=FakeP4Runner({"client": [{"code": "stat"}]}))
+        bad = P4Session("port", "user", "ws", runner=FakeP4Runner({"client": [{"code": "error", "data": "bad"}]}))
+        self.assertTrue(good.check_connection())
+        self.assertFalse(bad.check_connection())
+
+    def test_check_connection_timeout(self):
+        """Test a timeout is reported as no connection"""
+        session = P4Session(timeout=0.01, runner=FakeP4Runner({"client": [{"code": "stat"}]}, delay=1))
+        self.assertFalse(session.check_connection())
+
+    def test_cancel_stops_running_command(self):
+        """Test cancel ends a command that is waiting on the server"""
+        session = P4Session(runner=FakeP4Runner({"info": [{"code": "stat"}]}, delay=5))
+        errors = []
+
+        def run():
+            try:
+                session.run("info")
+            except P4Error as error:
+                errors.append(error)
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        session.cancel()
+        thread.join(2)
+
+        self.assertFalse(thread.is_alive())
+        self.assertTrue(errors[0].cancelled)
+
+    def test_from_credentials(self):
+        """Test the session takes the .p4config style names"""
+        session = P4Session.from_credentials({"P4PORT": "port", "P4USER": "user", "P4CLIENT": "ws"})
+        self.assertEqual((session.port, session.user, session.client), ("port", "user", "ws"))
+
+
+class TestSubprocessRunner(unittest.TestCase):
+    """Tests for SubprocessRunner"""
+
+    @patch('p4_session.subprocess.Popen')
+    def test_run_returns_output(self, mock_popen):
+        """Test the exit code and stdout are returned"""
+        process = MagicMock()
+        process.communicate.return_value = (b"data", b"")
+        process.returncode = 0
+        mock_popen.return_value = process
+
+        self.assertEqual(p4_session.SubprocessRunner().run(["p4", "info"], None, 5), (0, b"data"))
+
+    @patch('p4_session.subprocess.Popen')
+    def test_run_timeout_kills_process(self, mock_popen):
+        """Test a timeout kills p4 and raises P4Error"""
+        process = MagicMock()
+        process.communicate.side_effect = [p4_session.subprocess.TimeoutExpired("p4", 5), (b"", b"")]
+        mock_popen.return_value = process
+
+        with self.assertRaises(P4Error) as context:
+            p4_session.SubprocessRunner().run(["p4", "info"], None, 5)
+        self.assertTrue(context.exception.timed_out)
+        process.kill.assert_called_once()
+
+    @patch('p4_session.subprocess.Popen')
+    def test_run_missing_executable(self, mock_popen):
+        """Test a missing p4 is a P4Error"""
+        mock_popen.side_effect = FileNotFoundError("p4")
+
+        with self.assertRaises(P4Error):
+            p4_session.SubprocessRunner().run(["p4", "info"], None, 5)
+
+    @patch('p4_session.subprocess.Popen')
+    def test_cancel_before_start_kills_process(self, mock_popen):
+        """Test a runner cancelled before the process starts still kills it"""
+        process = MagicMock()
+        process.communicate.return_value = (b"", b"")
+        mock_popen.return_value = process
+        runner = p4_session.SubprocessRunner()
+        runner.cancel()
+
+        with self.assertRaises(P4Error) as context:
+            runner.run(["p4", "info"], None, 5)
+        self.assertTrue(context.exception.cancelled)
+        process.kill.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
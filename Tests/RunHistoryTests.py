@@ -0,0 +1,137 @@
+import unittest
+import os
+import sys
+import json
+import io
+import tempfile
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+
+# Add the Source directory to path to import the module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'Source')))
+import run_history
+from run_history import load_runs, percentile, summarize
+
+NOW = datetime(2024, 12, 31, 12, 0, tzinfo=timezone.utc)
+
+
+def run_record(day: int, sync=None, build=None, succeeded=True, **fields)-> dict:
+    record = {
+        "timestamp": f"2024-12-{day:02d}T10:00:00+00:00",
+        "succeeded": succeeded,
+        "syncSeconds": sync,
+        "codeCheckSeconds": 0.5,
+        "buildRan": build is not None,
+        "buildSeconds": build,
+        "editorReadySeconds": None,
+        "totalSeconds": (sync or 0) + (build or 0) + 1,
+        "filesSynced": 10,
+        "bytesSynced": 1048576,
+    }
+    record.update(fields)
+    return record
+
+
+class TestRunHistory(unittest.TestCase):
+    """Tests for reading and summarizing the run history"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "run_history.jsonl")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _write(self, *lines):
+        with open(self.path, "w", encoding="utf-8-sig") as history:
+            for line in lines:
+                history.write((line if isinstance(line, str) else json.dumps(line)) + "\n")
+
+    def test_percentile_nearest_rank(self):
+        """Test p50 and p95 pick an actual sample"""
+        values = list(range(1, 21))
+        self.assertEqual(percentile(values, 0.50), 10)
+        self.assertEqual(percentile(values, 0.95), 19)
+        self.assertEqual(percentile([7], 0.95), 7)
+        self.assertIsNone(percentile([], 0.5))
+
+    def test_load_skips_broken_lines(self):
+        """Test a truncated or foreign line does not stop the report"""
+        self._write(run_record(30, sync=5), "{not json", '{"no": "timestamp"}', run_record(29, sync=6))
+        self.assertEqual(len(load_runs(self.path)), 2)
+
+    def test_load_filters_by_date(self):
+        """Test runs before since are left out"""
+        self._write(run_record(1, sync=5), run_record(30, sync=6))
+        runs = load_runs(self.path, since=datetime(2024, 12, 15, tzinfo=timezone.utc))
+        self.assertEqual([run["syncSeconds"] for run in runs], [6])
+
+    def test_load_missing_file(self):
+        """Test a project without history has no runs"""
+        self.assertEqual(load_runs(os.path.join(self.temp_dir.name, "missing.jsonl")), [])
+
+    def test_summarize_ignores_phases_that_did_not_run(self):
+        """Test null timings are not counted as zero"""
+        runs = [run_record(1, sync=10, build=300), run_record(2, sync=20), run_record(3, sync=30, succeeded=False)]
+        summary = summarize(runs)
+
+        self.assertEqual(summary["phases"]["build"], {"runs": 1, "p50": 300.0, "p95": 300.0, "max": 300.0})
+        self.assertEqual(summary["phases"]["sync"]["p50"], 20.0)
+        self.assertEqual(summary["phases"]["editor ready"]["runs"], 0)
+        self.assertEqual((summary["runs"], summary["failed"], summary["builds"]), (3, 1, 1))
+        self.assertEqual(summary["bytesSynced"], 3 * 1048576)
+
+    def test_content_sync_is_its_own_phase(self):
+        """Test a code-first run reports the content sync apart and counts both syncs"""
+        runs = [run_record(1, sync=10, contentSyncSeconds=120.0, filesContentSynced=5, bytesContentSynced=1048576),
+                run_record(2, sync=20)]
+        summary = summarize(runs)
+
+        self.assertEqual(summary["phases"]["content sync"], {"runs": 1, "p50": 120.0, "p95": 120.0, "max": 120.0})
+        self.assertEqual(summary["phases"]["sync"]["runs"], 2)
+        self.assertEqual((summary["filesSynced"], summary["bytesSynced"]), (25, 3 * 1048576))
+
+    def test_editor_ready_with_and_without_prefill(self):
+        """Test editor ready times are split by whether a DDC prefill ran before them"""
+        synced = {"fromCL": 100, "toCL": 120}
+        runs = [run_record(1, editorReadySeconds=20.0, ddcPrefillSeconds=300.0, **synced),
+                run_record(2, editorReadySeconds=90.0, **synced),
+                run_record(3, editorReadySeconds=110.0, **synced),
+                run_record(4, ddcPrefillSeconds=200.0, **synced),
+                run_record(5, **synced),
+                run_record(6, editorReadySeconds=15.0, fromCL=120, toCL=120)]
+        summary = summarize(runs)
+
+        self.assertEqual(summary["phases"]["ddc prefill"]["max"], 300.0)
+        self.assertEqual(summary["editorReady"]["withPrefill"], {"runs": 1, "p50": 20.0, "p95": 20.0, "max": 20.0})
+        self.assertEqual(summary["editorReady"]["withoutPrefill"]["runs"], 2)
+        self.assertEqual(summary["editorReady"]["withoutPrefill"]["p50"], 90.0)
+        self.assertIn("20.0s after a DDC prefill (1 run(s)), 90.0s after a sync without one (2 run(s))",
+                      run_history.format_report(summary, 7))
+
+    def test_main_text_report(self):
+        """Test the text report has one row per phase"""
+        self._write(run_record(30, sync=12.5, build=600))
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            code = run_history.main(["--history", self.path, "--days", "7"], now=NOW)
+
+        output = stdout.getvalue()
+        self.assertEqual(code, 0)
+        self.assertIn("Runs in the last 7 day(s): 1", output)
+        self.assertRegex(output, r"build\s+1\s+600\.0s\s+600\.0s\s+600\.0s")
+
+    def test_main_json(self):
+        """Test --json prints the summary"""
+        self._write(run_record(30, sync=12.5), run_record(1, sync=99))
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            run_history.main(["--history", self.path, "--days", "7", "--json"], now=NOW)
+
+        summary = json.loads(stdout.getvalue())
+        self.assertEqual(summary["runs"], 1)
+        self.assertEqual(summary["phases"]["sync"]["max"], 12.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
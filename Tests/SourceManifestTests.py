@@ -0,0 +1,164 @@
+import unittest
+import os
+import sys
+import json
+import io
+import tempfile
+from contextlib import redirect_stdout
+
+# Add the Source directory to path to import the module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'Source')))
+import source_manifest
+from source_manifest import diff, load_manifest, save, scan
+
+SOURCE_FILES = {
+    "Source/MyGame/MyGame.Build.cs": "public class MyGame : ModuleRules {}",
+    "Source/MyGame/Private/Player.cpp": "void Jump() {}",
+    "Source/MyGame/Public/Player.h": "#pragma once",
+    "Plugins/Inventory/Inventory.uplugin": "{}",
+    "Plugins/Inventory/Source/Inventory/Private/Bag.cpp": "void Add() {}",
+}
+
+OTHER_FILES = (
+    "Source/MyGame/Notes.txt",
+    "Config/DefaultGame.ini",
+    "Plugins/Inventory/Intermediate/Build/Win64/Module.Inventory.cpp",
+    "Plugins/Inventory/Binaries/Win64/UnrealEditor-Inventory.dll",
+)
+
+
+class TestSourceManifest(unittest.TestCase):
+    """Tests for the source manifest diff"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = self.temp_dir.name
+        self.manifest_path = os.path.join(self.root, "source_manifest.json")
+        for relative, content in SOURCE_FILES.items():
+            self._write(relative, content)
+        for relative in OTHER_FILES:
+            self._write(relative, "x")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _path(self, relative: str)-> str:
+        return os.path.join(self.root, *relative.split("/"))
+
+    def _write(self, relative: str, content: str, mtime_ns: int | None=None):
+        path = self._path(relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(content)
+        if mtime_ns is not None:
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+
+    def _touch(self, relative: str, offset_ns: int=5_000_000_000):
+        stat = os.stat(self._path(relative))
+        os.utime(self._path(relative), ns=(stat.st_atime_ns, stat.st_mtime_ns + offset_ns))
+
+    def _saved(self)-> dict:
+        save(self.root, self.manifest_path)
+        return load_manifest(self.manifest_path)
+
+    def test_scan_only_compiled_sources(self):
+        """Test only compile-affecting files under Source and Plugins are tracked"""
+        self.assertEqual(sorted(scan(self.root)), sorted(SOURCE_FILES))
+
+    def test_unchanged_tree_has_no_changes(self):
+        """Test a tree that matches the manifest hashes nothing"""
+        result = diff(self.root, self._saved())
+
+        self.assertEqual((result["changed"], result["added"], result["removed"]), ([], [], []))
+        self.assertEqual(result["hashed"], 0)
+        self.assertEqual(result["scanned"], len(SOURCE_FILES))
+
+    def test_touched_file_with_same_content_is_not_a_change(self):
+        """Test a new mtime alone is checked by hash and ignored"""
+        manifest = self._saved()
+        self._touch("Source/MyGame/Private/Player.cpp")
+
+        result = diff(self.root, manifest)
+
+        self.assertEqual(result["changed"], [])
+        self.assertEqual(result["hashed"], 1)
+
+    def test_touched_files_are_not_hashed_again(self):
+        """Test diff writes back the new mtime of a touched but identical file"""
+        self._saved()
+        self._touch("Source/MyGame/Private/Player.cpp")
+        arguments = ["--root", self.root, "--manifest", self.manifest_path, "diff"]
+
+        outputs = []
+        for _ in range(2):
+            stdout = io.StringIO()
+            with redirect_stdout(stdout):
+                source_manifest.main(arguments)
+            outputs.append(json.loads(stdout.getvalue()))
+
+        self.assertEqual((outputs[0]["hashed"], outputs[0]["refreshed"]), (1, 1))
+        self.assertEqual((outputs[1]["hashed"], outputs[1]["refreshed"]), (0, 0))
+        self.assertEqual(outputs[1]["changed"], [])
+
+    def test_edits_additions_and_removals(self):
+        """Test local edits, new files and deleted files are reported"""
+        manifest = self._saved()
+        stat = os.stat(self._path("Source/MyGame/Public/Player.h"))
+        self._write("Source/MyGame/Public/Player.h", "#pragma twice", mtime_ns=stat.st_mtime_ns + 5_000_000_000)
+        self._write("Source/MyGame/Private/Player.cpp", "void Jump() { Fly(); }")
+        self._write("Plugins/Inventory/Source/Inventory/Private/Slot.cpp", "")
+        os.remove(self._path("Plugins/Inventory/Source/Inventory/Private/Bag.cpp"))
+
+        result = diff(self.root, manifest)
+
+        self.assertEqual(result["changed"], ["Source/MyGame/Private/Player.cpp", "Source/MyGame/Public/Player.h"])
+        self.assertEqual(result["added"], ["Plugins/Inventory/Source/Inventory/Private/Slot.cpp"])
+        self.assertEqual(result["removed"], ["Plugins/Inventory/Source/Inventory/Private/Bag.cpp"])
+
+    def test_save_reuses_hashes_of_unchanged_files(self):
+        """Test saving again only hashes files whose stat changed"""
+        manifest = self._saved()
+        self._write("Source/MyGame/Private/Player.cpp", "void Jump() { Fly(); }")
+
+        result = save(self.root, self.manifest_path, manifest)
+
+        self.assertEqual(result["hashed"], 1)
+        self.assertEqual(result["files"], len(SOURCE_FILES))
+
+    def test_save_leaves_out_files_edited_during_the_build(self):
+        """Test files newer than the build start show up as added next time"""
+        build_start = min(mtime for _, mtime in scan(self.root).values()) + 1_000_000_000
+        self._touch("Source/MyGame/Private/Player.cpp", offset_ns=10_000_000_000)
+
+        result = save(self.root, self.manifest_path, not_after_ns=build_start)
+
+        self.assertEqual(result["skipped"], 1)
+        self.assertIn("Source/MyGame/Private/Player.cpp", diff(self.root, load_manifest(self.manifest_path))["added"])
+
+    def test_main_diff_without_manifest(self):
+        """Test diff says so when there is no manifest yet"""
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            code = source_manifest.main(["--root", self.root, "--manifest", self.manifest_path, "diff"])
+
+        self.assertEqual(code, 0)
+        self.assertEqual(json.loads(stdout.getvalue()), {"manifest": False})
+
+    def test_main_save_then_diff(self):
+        """Test the save and diff commands print JSON for the sync script"""
+        arguments = ["--root", self.root, "--manifest", self.manifest_path]
+        with redirect_stdout(io.StringIO()):
+            source_manifest.main(arguments + ["save"])
+
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            source_manifest.main(arguments + ["diff"])
+
+        output = json.loads(stdout.getvalue())
+        self.assertTrue(output["manifest"])
+        self.assertEqual(output["changed"], [])
+        self.assertFalse(os.path.exists(self.manifest_path + ".tmp"))
+
+
+if __name__ == '__main__':
+    unittest.main()
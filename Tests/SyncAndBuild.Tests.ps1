@@ -40,31 +40,27 @@ Describe "Write-Log" -Tag "Logging"{
     BeforeEach {
         $testLogFile = "TestDrive:\testLog.log"
         $script:logFile = $testLogFile
+        $script:logVerbose = $null
+        $script:logFlushTimer.Restart()
         Mock Get-Date { return "2024-12-31 23:59:59"}
     }
 
+    AfterEach {
+        Close-Log
+    }
+
     Context "Escritura de logs" {
 
         It "Escribe mensaje en archivo de log" {
             Mock Write-Host { }
-            Mock Add-Content { 
-                param(
-                    $Path,
-                    $Value,
-                    $Encoding
-                )
-                
-                $Path | Should -Be $testLogFile
-                $Value | Should -Match "\[2024-12-31 23:59:59\] \[INFO\] This is a test log message."
-                $Encoding | Should -Be "UTF8"
-            }
 
             $message = "This is a test log message."
             $level = "INFO"
             
             Write-Log -Message $message -Level $level
+            Close-Log
             
-            Assert-MockCalled Add-Content -Times 1
+            Get-Content $testLogFile | Should -Be "[2024-12-31 23:59:59] [INFO] This is a test log message."
         }
 
         It "Escribe todos los niveles de log correctamente" {
@@ -72,8 +68,6 @@ Describe "Write-Log" -Tag "Logging"{
                 return $true
             }
 
-            Mock Add-Content { }
-
             $testCases = @(
                 @{ Level = "INFO";    Prefix = "[INFO]";    Color = "Cyan" }
                 @{ Level = "SUCCESS"; Prefix = "[OK]";      Color = "Green" }
@@ -122,7 +116,6 @@ Describe "Write-Log" -Tag "Logging"{
         }
 
         It "Escribe solo el mesaje cuando el nivel es desconocido" {
-            Mock Add-Content { }
             Mock Write-Host {
                 param($Object, $ForegroundColor)
                 $script:capturedMessage = $Object
@@ -136,8 +129,53 @@ Describe "Write-Log" -Tag "Logging"{
         }
         
     }
-}
 
+    Context "Buffer del archivo de log" {
+
+        BeforeEach {
+            Mock Write-Host { }
+            Mock Get-ConfigValue { return $false }
+            Remove-Item $testLogFile -ErrorAction SilentlyContinue
+        }
+
+        It "Guarda las líneas en memoria hasta cerrar el log" {
+            1..5 | ForEach-Object { Write-Log -Message "Line $_" -Level "INFO" }
+
+            Test-Path $testLogFile | Should -Be $false
+
+            Close-Log
+
+            (Get-Content $testLogFile).Count | Should -Be 5
+        }
+
+        It "Escribe al momento los mensajes ERROR" {
+            Write-Log -Message "Something failed" -Level "ERROR"
+
+            Get-Content $testLogFile | Should -Be "[2024-12-31 23:59:59] [ERROR] Something failed"
+        }
+
+        It "Escribe el buffer cuando se llena" {
+            1..$script:CONSTANTS.LogBufferLines | ForEach-Object { Write-Log -Message "Line $_" -Level "VERBOSE" }
+
+            (Get-Content $testLogFile).Count | Should -Be $script:CONSTANTS.LogBufferLines
+        }
+
+        It "Lee logging.verbose una sola vez" {
+            1..3 | ForEach-Object { Write-Log -Message "Detail $_" -Level "VERBOSE" }
+
+            Should -Invoke Get-ConfigValue -Times 1 -Exactly
+        }
+
+        It "Initialize-Log vuelve a leer logging.verbose" {
+            Mock Out-File { }
+            $script:logVerbose = $true
+
+            Initialize-Log
+
+            $script:logVerbose | Should -BeNullOrEmpty
+        }
+    }
+}
 # =============================================================================
 
 Describe "Write-Header" -Tag "Logging"{
@@ -223,6 +261,137 @@ Describe "Write-DetailedError" -Tag "Logging"{
     }
 }
 
+# =============================================================================
+
+Describe "Save-LogCopy" -Tag "Logging" {
+
+    BeforeEach {
+        $script:logStamp = "20241225_103000"
+        Mock Write-Host { }
+    }
+
+    It "Copia el log con la marca de tiempo de la ejecución" {
+        Set-Content -Path "TestDrive:\last_run.log" -Value "contenido"
+
+        Save-LogCopy -Path "TestDrive:\last_run.log" -Kind "run"
+
+        Get-Content "TestDrive:\run_20241225_103000.log" | Should -Be "contenido"
+        Test-Path "TestDrive:\last_run.log" | Should -Be $true
+    }
+
+    It "No hace nada si el log no existe" {
+        Save-LogCopy -Path "TestDrive:\last_build.log" -Kind "build"
+
+        Test-Path "TestDrive:\build_20241225_103000.log" | Should -Be $false
+    }
+}
+
+# =============================================================================
+
+Describe "Get-LogRetentionPlan" -Tag "Logging" {
+
+    BeforeEach {
+        $logDir = Join-Path $TestDrive "plan"
+        New-Item -ItemType Directory -Path $logDir -Force | Out-Null
+        Get-ChildItem $logDir | Remove-Item -Force
+
+        foreach ($day in 1..6) {
+            Set-Content -Path (Join-Path $logDir "run_2024120$($day)_080000.log") -Value "run $day"
+        }
+        Set-Content -Path (Join-Path $logDir "build_20241201_080000.log.gz") -Value "gz"
+        Set-Content -Path (Join-Path $logDir "last_run.log") -Value "actual"
+    }
+
+    It "Deja los más recientes, comprime los siguientes y borra el resto" {
+        $plan = Get-LogRetentionPlan -Directory $logDir -KeepLogs 4
+
+        ($plan.Compress | Split-Path -Leaf) | Should -Be @("run_20241204_080000.log", "run_20241203_080000.log")
+        ($plan.Delete | Split-Path -Leaf) | Should -Be @("run_20241202_080000.log", "run_20241201_080000.log")
+    }
+
+    It "No toca los logs ya comprimidos dentro del límite ni last_*.log" {
+        $plan = Get-LogRetentionPlan -Directory $logDir -KeepLogs 10
+
+        $plan.Compress | Should -Not -Contain (Join-Path $logDir "build_20241201_080000.log.gz")
+        ($plan.Compress + $plan.Delete) | Where-Object { $_ -match "last_run" } | Should -BeNullOrEmpty
+        $plan.Delete.Count | Should -Be 0
+    }
+
+    It "Cuenta los logs de DDC prefill de una ejecución como uno solo" {
+        foreach ($day in 1..3) {
+            foreach ($batch in 1..2) {
+                Set-Content -Path (Join-Path $logDir "ddc_prefill_2024120$($day)_090000_$batch.log") -Value "ddc $day $batch"
+            }
+        }
+
+        $plan = Get-LogRetentionPlan -Directory $logDir -KeepLogs 2
+
+        ($plan.Delete | Split-Path -Leaf | Where-Object { $_ -like "ddc_prefill_*" } | Sort-Object) | Should -Be @("ddc_prefill_20241201_090000_1.log", "ddc_prefill_20241201_090000_2.log")
+        ($plan.Compress | Split-Path -Leaf | Where-Object { $_ -like "ddc_prefill_*" }) | Should -BeNullOrEmpty
+    }
+
+    It "Conserva todo cuando keepLogs es 0" {
+        $plan = Get-LogRetentionPlan -Directory $logDir -KeepLogs 0
+
+        $plan.Compress.Count | Should -Be 0
+        $plan.Delete.Count | Should -Be 0
+    }
+}
+
+# =============================================================================
+
+Describe "Start-LogRetention" -Tag "Logging" {
+
+    BeforeEach {
+        $logDir = Join-Path $TestDrive "retention"
+        New-Item -ItemType Directory -Path $logDir -Force | Out-Null
+        Get-ChildItem $logDir | Remove-Item -Force
+
+        foreach ($day in 1..4) {
+            Set-Content -Path (Join-Path $logDir "build_2024120$($day)_080000.log") -Value ("línea de build $day" * 100)
+        }
+
+        Mock Write-Log { }
+        Mock Get-ConfigValue { return 3 }
+    }
+
+    It "Comprime y borra en segundo plano y Wait-LogRetention espera al final" {
+        Start-LogRetention -Directory $logDir
+        Wait-LogRetention
+
+        $names = (Get-ChildItem $logDir).Name | Sort-Object
+        $names | Should -Be @(
+            "build_20241202_080000.log.gz",
+            "build_20241203_080000.log",
+            "build_20241204_080000.log"
+        )
+        $script:logRetention | Should -BeNullOrEmpty
+    }
+
+    It "El gzip conserva el contenido" {
+        Start-LogRetention -Directory $logDir
+        Wait-LogRetention
+
+        $file = [System.IO.File]::OpenRead((Join-Path $logDir "build_20241202_080000.log.gz"))
+        $gzip = [System.IO.Compression.GZipStream]::new($file, [System.IO.Compression.CompressionMode]::Decompress)
+        $reader = [System.IO.StreamReader]::new($gzip)
+        try {
+            $reader.ReadToEnd() | Should -Match "línea de build 2"
+        } finally {
+            $reader.Dispose()
+        }
+    }
+
+    It "No arranca nada cuando no hay trabajo" {
+        Mock Get-ConfigValue { return 10 }
+
+        Start-LogRetention -Directory $logDir
+
+        $script:logRetention | Should -BeNullOrEmpty
+        Should -Invoke Write-Log -Times 0
+    }
+}
+
 # =============================================================================
 # TESTS DE CONFIGURACIÓN
 # =============================================================================
@@ -768,6 +937,29 @@ Describe "Initialize-Project" -Tag "IniciacionProyecto" {
             }
         }
     }
+
+    Context "Archivo de proyecto dado (modo batch)" {
+
+        It "Usa el archivo de proyecto dado sin detectar" {
+            Mock Test-Path { return $true }
+            Mock Get-ConfigValue { return "OtherProject" }
+            Mock Find-UnrealProject { }
+
+            Initialize-ProjectPaths -ProjectFile "D:\Work\GameA\GameA\GameA.uproject"
+
+            $script:projectFile | Should -Be "D:\Work\GameA\GameA\GameA.uproject"
+            $script:projectName | Should -Be "GameA"
+            $script:projectRoot | Should -Be "D:\Work\GameA"
+            Should -Invoke Get-ConfigValue -Times 0
+            Should -Invoke Find-UnrealProject -Times 0
+        }
+
+        It "Lanza excepción si el archivo dado no existe" {
+            Mock Test-Path { return $false }
+
+            { Initialize-ProjectPaths -ProjectFile "D:\Work\Missing\Missing.uproject" } | Should -Throw "Project file not found: D:\Work\Missing\Missing.uproject"
+        }
+    }
 }
 
 # =============================================================================
@@ -1035,11 +1227,28 @@ Describe "Sync-FromPerforce" -Tag "Perforce" {
 
     BeforeAll {
         . "$PSScriptRoot\..\Source\sync_and_build.ps1"
+
+        # Lines p4 -ztag sync prints for one file
+        function New-SyncRecord {
+            param([string]$DepotFile, [string]$Action = "updated", [int]$Rev = 1, [long]$FileSize = 1024, [int]$Change = 0)
+
+            "... depotFile $DepotFile"
+            "... clientFile C:\TestProject$($DepotFile.Substring(7).Replace('/', '\'))"
+            "... rev $Rev"
+            "... action $Action"
+            if ($Action -ne "deleted") {
+                "... fileSize $FileSize"
+            }
+            if ($Change -gt 0) {
+                "... change $Change"
+            }
+        }
     }
 
     BeforeEach {
         $script:projectRoot = "C:\TestProject"
         $script:callCount = 0
+        $script:runState = @{}
 
         if (-not $script:CONSTANTS) {
             $script:CONSTANTS = @{
@@ -1054,6 +1263,8 @@ Describe "Sync-FromPerforce" -Tag "Perforce" {
         Mock Push-Location { }
         Mock Pop-Location { }
         Mock Write-DetailedError { }
+        Mock Invoke-ChangelistIndex { return $null }
+        Mock Get-SyncPreview { return $null }
     }
 
     Context "Caso: SkipSync flag" {
@@ -1095,9 +1306,25 @@ Describe "Sync-FromPerforce" -Tag "Perforce" {
 
             Sync-FromPerforce -SkipSync:$false
 
+            $script:capturedArgs | Should -Contain "-ztag"
             $script:capturedArgs | Should -Contain "sync"
             $script:capturedArgs | Should -Contain "..."
         }
+
+        It "Escribe el log pendiente antes de lanzar p4 sync" {
+            Mock Get-LatestHaveChangelist { return 12345 }
+            $script:order = @()
+            Mock Write-LogBuffer { $script:order += "flush" }
+            Mock p4 {
+                $script:order += "sync"
+                Write-Error "file(s) up-to-date."
+                $global:LASTEXITCODE = 0
+            }
+
+            Sync-FromPerforce -SkipSync:$false | Out-Null
+
+            $script:order[0..1] | Should -Be @("flush", "sync")
+        }
     }
 
     Context "Caso: Sincronización exitosa con cambios" {
@@ -1113,16 +1340,40 @@ Describe "Sync-FromPerforce" -Tag "Perforce" {
 
             Mock p4 {
                 $global:LASTEXITCODE = 0
-                return @(
-                    "//depot/Source/Player.cpp#5 - updating C:\Project\Source\Player.cpp",
-                    "//depot/Source/Game.h#3 - updating C:\Project\Source\Game.h"
-                )
+                New-SyncRecord "//depot/Source/Player.cpp" -Rev 5
+                New-SyncRecord "//depot/Source/Game.h" -Rev 3
             }
 
             $result = Sync-FromPerforce -SkipSync:$false
 
             $result | Should -Be $true
         }
+
+        It "Muestra el resumen de changelists del índice local" {
+            Mock Get-LatestHaveChangelist {
+                if ($script:callCount -eq 0) {
+                    $script:callCount = 1
+                    return 12340
+                }
+                return 12345
+            }
+
+            Mock p4 {
+                $global:LASTEXITCODE = 0
+                New-SyncRecord "//depot/Source/Player.cpp" -Rev 5
+            }
+
+            Mock Invoke-ChangelistIndex {
+                return [PSCustomObject]@{ changelists = 5; users = 2; files = 9 }
+            }
+
+            Sync-FromPerforce -SkipSync:$false
+
+            Should -Invoke Invoke-ChangelistIndex -Times 1 -Exactly -ParameterFilter {
+                $Command -eq "summary" -and $FromCL -eq 12340 -and $ToCL -eq 12345
+            }
+            Should -Invoke Write-Host -ParameterFilter { $Object -match "Changelists synced: 5 by 2 user" }
+        }
     }
 
     Context "Caso: Errores de conexión y permisos" {
@@ -1318,7 +1569,7 @@ Describe "Sync-FromPerforce" -Tag "Perforce" {
             Sync-FromPerforce -SkipSync:$false
 
             Should -Invoke Write-Log -ParameterFilter {
-                $Message -match "Executing: p4 sync" -and $Level -eq "VERBOSE"
+                $Message -match "Executing: p4 -ztag sync" -and $Level -eq "VERBOSE"
             }
         }
     }
@@ -1336,7 +1587,7 @@ Describe "Sync-FromPerforce" -Tag "Perforce" {
 
             Mock p4 {
                 $global:LASTEXITCODE = 0
-                return @("//depot/file.cpp - updating C:\file.cpp")
+                New-SyncRecord "//depot/file.cpp"
             }
 
             $result = Sync-FromPerforce -SkipSync:$false
@@ -1355,7 +1606,7 @@ Describe "Sync-FromPerforce" -Tag "Perforce" {
 
             Mock p4 {
                 $global:LASTEXITCODE = 0
-                return @("//depot/newfile.cpp - added as C:\newfile.cpp")
+                New-SyncRecord "//depot/newfile.cpp" -Action added
             }
 
             $result = Sync-FromPerforce -SkipSync:$false
@@ -1374,7 +1625,7 @@ Describe "Sync-FromPerforce" -Tag "Perforce" {
 
             Mock p4 {
                 $global:LASTEXITCODE = 0
-                return @("//depot/oldfile.cpp - deleted as C:\oldfile.cpp")
+                New-SyncRecord "//depot/oldfile.cpp" -Action deleted
             }
 
             $result = Sync-FromPerforce -SkipSync:$false
@@ -1393,18 +1644,76 @@ Describe "Sync-FromPerforce" -Tag "Perforce" {
 
             Mock p4 {
                 $global:LASTEXITCODE = 0
-                return @(
-                    "//depot/file1.cpp - updating",
-                    "//depot/file2.h - added",
-                    "//depot/file3.cpp - deleted",
-                    "//depot/file4.uasset - updating"
-                )
+                New-SyncRecord "//depot/file1.cpp"
+                New-SyncRecord "//depot/file2.h" -Action added
+                New-SyncRecord "//depot/file3.cpp" -Action deleted
+                New-SyncRecord "//depot/file4.uasset"
             }
 
             $result = Sync-FromPerforce -SkipSync:$false
 
             $result | Should -Be $true
         }
+
+        It "Cuenta cada tipo de cambio sin guardar la salida completa" {
+            Mock Get-LatestHaveChangelist {
+                if ($script:callCount -eq 0) {
+                    $script:callCount = 1
+                    return 100
+                }
+                return 105
+            }
+
+            Mock p4 {
+                $global:LASTEXITCODE = 0
+                New-SyncRecord "//depot/file1.cpp" -Rev 2
+                New-SyncRecord "//depot/file2.h" -Action added -Rev 1
+                New-SyncRecord "//depot/file3.cpp" -Action deleted -Rev 3
+                New-SyncRecord "//depot/file4.uasset" -Action refreshed -Rev 7
+            }
+
+            Sync-FromPerforce -SkipSync:$false
+
+            Should -Invoke Write-Host -ParameterFilter {
+                $Object -match "Files changed: 4 \(2 updated, 1 added, 1 deleted\)"
+            }
+        }
+
+        It "No escribe una línea de consola por archivo" {
+            Mock Get-LatestHaveChangelist {
+                if ($script:callCount -eq 0) {
+                    $script:callCount = 1
+                    return 100
+                }
+                return 101
+            }
+
+            Mock p4 {
+                $global:LASTEXITCODE = 0
+                1..500 | ForEach-Object { New-SyncRecord "//depot/Content/Asset$_.uasset" -Action added -Rev 1 }
+            }
+
+            Sync-FromPerforce -SkipSync:$false
+
+            Should -Invoke Write-Host -Times 0 -ParameterFilter { $Object -match "Asset\d+\.uasset" }
+            Should -Invoke Write-Host -ParameterFilter { $Object -match "Files changed: 500" }
+        }
+
+        It "Limita los errores guardados pero los cuenta todos" {
+            Mock Get-LatestHaveChangelist { return 100 }
+
+            Mock p4 {
+                $global:LASTEXITCODE = 1
+                1..120 | ForEach-Object { Write-Error "//depot/File$_.cpp - can't clobber writable file" }
+            }
+
+            $result = Sync-FromPerforce -SkipSync:$false
+
+            $result | Should -Be $false
+            Should -Invoke Write-Log -ParameterFilter {
+                $Level -eq "ERROR" -and $Message -match "reported 120 error line" -and $Message -notmatch "File51\.cpp"
+            }
+        }
     }
 
     Context "Caso: Parámetro Verbose" {
@@ -1420,11 +1729,9 @@ Describe "Sync-FromPerforce" -Tag "Perforce" {
 
             Mock p4 {
                 $global:LASTEXITCODE = 0
-                return @(
-                    "//depot/Source/File1.cpp - updating C:\Project\Source\File1.cpp",
-                    "//depot/Source/File2.h - updating C:\Project\Source\File2.h",
-                    "//depot/Content/Asset.uasset - added as C:\Project\Content\Asset.uasset"
-                )
+                New-SyncRecord "//depot/Source/File1.cpp"
+                New-SyncRecord "//depot/Source/File2.h"
+                New-SyncRecord "//depot/Content/Asset.uasset" -Action added
             }
 
             Sync-FromPerforce -SkipSync:$false -Verbose:$true
@@ -1447,10 +1754,8 @@ Describe "Sync-FromPerforce" -Tag "Perforce" {
 
             Mock p4 {
                 $global:LASTEXITCODE = 0
-                return @(
-                    "//depot/Source/File1.cpp - updating C:\Project\Source\File1.cpp",
-                    "//depot/Source/File2.h - updating C:\Project\Source\File2.h"
-                )
+                New-SyncRecord "//depot/Source/File1.cpp"
+                New-SyncRecord "//depot/Source/File2.h"
             }
 
             # Capturar las llamadas a Write-Host
@@ -1484,7 +1789,7 @@ Describe "Sync-FromPerforce" -Tag "Perforce" {
             # Crear array con 25 archivos
             $files = @()
             for ($i = 1; $i -le 25; $i++) {
-                $files += "//depot/Source/File$i.cpp - updating C:\Project\Source\File$i.cpp"
+                $files += New-SyncRecord "//depot/Source/File$i.cpp"
             }
 
             Mock p4 {
@@ -1541,7 +1846,7 @@ Describe "Sync-FromPerforce" -Tag "Perforce" {
             # Exactamente 20 archivos
             $files = @()
             for ($i = 1; $i -le 20; $i++) {
-                $files += "//depot/Source/File$i.cpp - updating"
+                $files += New-SyncRecord "//depot/Source/File$i.cpp"
             }
 
             Mock p4 {
@@ -1569,7 +1874,7 @@ Describe "Sync-FromPerforce" -Tag "Perforce" {
             # 21 archivos (uno más que el límite)
             $files = @()
             for ($i = 1; $i -le 21; $i++) {
-                $files += "//depot/Source/File$i.cpp - updating"
+                $files += New-SyncRecord "//depot/Source/File$i.cpp"
             }
 
             Mock p4 {
@@ -1596,1278 +1901,3631 @@ Describe "Sync-FromPerforce" -Tag "Perforce" {
             $detailCalls.Count | Should -Be 0
         }
     }
-}
-
-# =============================================================================
-# TESTS DE GET LATEST HAVE CHANGELIST
-# =============================================================================
-
-Describe "Get-LatestHaveChangelist" -Tag "Perforce" {
-
-    BeforeAll {
-        . "$PSScriptRoot\..\Source\sync_and_build.ps1"
-    }
-
-    BeforeEach {
-        $script:projectRoot = "C:\TestProject"
 
-        Mock Write-Log { }
-        Mock Push-Location { }
-        Mock Pop-Location { }
-    }
+    Context "Caso: Sync paralelo" {
 
-    Context "Caso: Changelist válido retornado" {
+        BeforeEach {
+            Mock Get-LatestHaveChangelist {
+                if ($script:callCount -eq 0) {
+                    $script:callCount = 1
+                    return 12340
+                }
+                return 12345
+            }
 
-        It "Retorna el número de changelist cuando p4 changes tiene éxito" {
             Mock p4 {
                 param([Parameter(ValueFromRemainingArguments)]$Arguments)
                 $global:LASTEXITCODE = 0
-                return "Change 12345 on 2024/12/25 by user@workspace"
+                $script:syncArguments = $Arguments
+                New-SyncRecord "//depot/Content/Map.umap" -Rev 5
             }
 
-            $result = Get-LatestHaveChangelist
-
-            $result | Should -Be 12345
+            Mock Get-SyncPreview { return [PSCustomObject]@{ Files = 500; Deleted = 0; Bytes = 500MB } }
         }
 
-        It "Extrae correctamente el changelist de diferentes formatos" {
-            $testCases = @(
-                @{ Output = "Change 100 on 2024/01/01 by user@ws"; Expected = 100 }
-                @{ Output = "Change 999999 on 2024/12/31 by admin@main"; Expected = 999999 }
-                @{ Output = "Change 1 on 2024/01/01 by test@test"; Expected = 1 }
-                @{ Output = "Change 54321 by user"; Expected = 54321 }
-            )
-
-            foreach ($case in $testCases) {
-                Mock p4 {
-                    $global:LASTEXITCODE = 0
-                    return $case.Output
-                }
+        It "Usa --parallel cuando perforce.parallelSync está activo" {
+            Mock Get-ConfigValue {
+                param($Path, $DefaultValue)
+                if ($Path -eq "perforce.parallelSync") { return $true }
+                return $DefaultValue
+            }
+            Mock Get-ParallelSyncSettings { return @{ Threads = 4; Batch = 32; BatchSize = 33554432 } }
 
-                $result = Get-LatestHaveChangelist
+            Sync-FromPerforce -SkipSync:$false | Should -Be $true
 
-                $result | Should -Be $case.Expected
-            }
+            $script:syncArguments | Should -Contain "--parallel=threads=4,batch=32,batchsize=33554432"
+            Should -Invoke Write-Log -ParameterFilter { $Message -match "Parallel sync settings: threads=4" }
         }
 
-        It "Escribe log con el changelist encontrado" {
-            Mock p4 {
-                $global:LASTEXITCODE = 0
-                return "Change 12345 on 2024/12/25 by user@workspace"
+        It "Sincroniza en serie cuando el sync es pequeño" {
+            Mock Get-ConfigValue {
+                param($Path, $DefaultValue)
+                if ($Path -eq "perforce.parallelSync") { return $true }
+                return $DefaultValue
             }
+            Mock Get-ParallelSyncSettings { return $null }
 
-            Get-LatestHaveChangelist
+            Sync-FromPerforce -SkipSync:$false
 
-            Should -Invoke Write-Log -ParameterFilter {
-                $Message -match "Latest have changelist: 12345" -and $Level -eq "VERBOSE"
-            }
+            ($script:syncArguments -join " ") | Should -Not -Match "--parallel"
         }
-    }
 
-    Context "Caso: No se puede determinar changelist - lanza excepción" {
+        It "Pide la vista previa aunque el sync paralelo esté desactivado" {
+            Mock Get-ConfigValue { param($Path, $DefaultValue) return $DefaultValue }
+            Mock Get-ParallelSyncSettings { return $null }
 
-        It "Lanza excepción cuando LASTEXITCODE no es 0" {
-            Mock p4 {
-                $global:LASTEXITCODE = 1
-                return "error: Connection failed"
-            }
+            Sync-FromPerforce -SkipSync:$false
 
-            { Get-LatestHaveChangelist } | Should -Throw
+            Should -Invoke Get-SyncPreview -Times 1 -Exactly
+            Should -Invoke Get-ParallelSyncSettings -Times 0
+            ($script:syncArguments -join " ") | Should -Not -Match "--parallel"
         }
 
-        It "Lanza excepción cuando la salida no contiene patrón 'Change'" {
-            Mock p4 {
-                $global:LASTEXITCODE = 0
-                return "No files to sync"
-            }
+        It "Registra el rendimiento del sync" {
+            Mock Get-ConfigValue { param($Path, $DefaultValue) return $DefaultValue }
 
-            { Get-LatestHaveChangelist } | Should -Throw
+            Sync-FromPerforce -SkipSync:$false
+
+            Should -Invoke Write-Log -ParameterFilter { $Message -match "Synced 1 file\(s\) in .*files/s" -and $Level -eq "INFO" }
+        }
+    }
+
+    Context "Caso: Vista previa y bytes transferidos" {
+
+        BeforeEach {
+            Mock Get-LatestHaveChangelist {
+                if ($script:callCount -eq 0) {
+                    $script:callCount = 1
+                    return 100
+                }
+                return 101
+            }
+            $script:runState = @{}
         }
 
-        It "Lanza excepción cuando la salida no contiene número" {
+        It "Muestra los archivos y megas pendientes antes de sincronizar" {
+            Mock Get-SyncPreview { return [PSCustomObject]@{ Files = 40; Deleted = 3; Bytes = 40GB } }
             Mock p4 {
                 $global:LASTEXITCODE = 0
-                return "Change ABC on 2024/12/25"
+                New-SyncRecord "//depot/Content/Map.umap"
             }
 
-            { Get-LatestHaveChangelist } | Should -Throw
+            Sync-FromPerforce -SkipSync:$false
+
+            Should -Invoke Write-Host -ParameterFilter { $Object -match "Pending: 40 file\(s\), 40960 MB to transfer, 3 to delete" }
         }
 
-        It "Escribe log verbose cuando no puede determinar changelist antes de lanzar excepción" {
+        It "Guarda la vista previa y los bytes en las estadísticas de la ejecución" {
+            Mock Get-SyncPreview { return [PSCustomObject]@{ Files = 2; Deleted = 1; Bytes = 3MB } }
             Mock p4 {
                 $global:LASTEXITCODE = 0
-                return "No changes found"
+                New-SyncRecord "//depot/Content/A.uasset" -FileSize 1MB
+                New-SyncRecord "//depot/Content/B.uasset" -Action added -FileSize 2MB
+                New-SyncRecord "//depot/Content/C.uasset" -Action deleted
             }
 
-            try {
-                Get-LatestHaveChangelist
-            } catch { }
+            Sync-FromPerforce -SkipSync:$false | Should -Be $true
 
-            Should -Invoke Write-Log -ParameterFilter {
-                $Message -match "Could not determine changelist" -and $Level -eq "VERBOSE"
-            }
+            $script:runState.SyncPreview.Bytes | Should -Be 3MB
+            $script:runState.Sync.Files | Should -Be 3
+            $script:runState.Sync.Bytes | Should -Be 3MB
+            Should -Invoke Write-Log -ParameterFilter { $Message -match "Synced 3 file\(s\) in .*, 3 MB, .* MB/s" }
         }
 
-        It "Lanza excepción cuando p4 retorna salida vacía" {
+        It "Cuenta el último registro aunque no lo siga otro" {
             Mock p4 {
                 $global:LASTEXITCODE = 0
-                return ""
+                New-SyncRecord "//depot/Source/Only.cpp" -Action added
             }
 
-            { Get-LatestHaveChangelist } | Should -Throw
+            Sync-FromPerforce -SkipSync:$false
+
+            Should -Invoke Write-Host -ParameterFilter { $Object -match "Files changed: 1 \(0 updated, 1 added, 0 deleted\)" }
         }
     }
 
-    Context "Caso: BuildException cuando hay errores" {
+    Context "Caso: Changelist del workspace una sola vez" {
 
-        It "BuildException contiene mensaje original cuando p4 falla" {
+        It "Saca el CL final de los registros del sync sin volver a consultar" {
+            Mock Get-LatestHaveChangelist { return 100 }
             Mock p4 {
-                throw "Connection timeout"
-            }
-
-            try {
-                Get-LatestHaveChangelist
-                throw "Test should have thrown"
-            } catch [BuildException] {
-                $_.Exception.Message | Should -Match "Could not get changelist info"
-                $_.Exception.Message | Should -Match "Connection timeout"
+                $global:LASTEXITCODE = 0
+                New-SyncRecord "//depot/Source/A.cpp" -Change 104
+                New-SyncRecord "//depot/Source/B.cpp" -Change 107
             }
-        }
 
-        It "BuildException tiene Category 'Perforce'" {
-            Mock p4 {
-                throw "Network error"
-            }
+            Sync-FromPerforce -SkipSync:$false
 
-            try {
-                Get-LatestHaveChangelist
-                throw "Test should have thrown"
-            } catch {
-                $_.Exception.Category | Should -Be "Perforce"
-                $_.Exception.Suggestion | Should -Be "Check your Perforce connection and workspace"
-            }
+            Should -Invoke Get-LatestHaveChangelist -Times 1 -Exactly
+            $script:runState.HaveCLBefore | Should -Be 100
+            $script:runState.HaveCL | Should -Be 107
+            Should -Invoke Write-Host -ParameterFilter { $Object -match "from CL 100 to CL 107" }
         }
 
-        It "Escribe log de warning cuando hay excepción antes de lanzar BuildException" {
+        It "No vuelve a consultar cuando el workspace ya estaba al día" {
+            Mock Get-LatestHaveChangelist { return 100 }
             Mock p4 {
-                throw "Connection timeout"
+                $global:LASTEXITCODE = 0
+                Write-Error "file(s) up-to-date."
             }
 
-            try {
-                Get-LatestHaveChangelist
-            } catch { }
+            Sync-FromPerforce -SkipSync:$false
 
-            Should -Invoke Write-Log -ParameterFilter {
-                $Message -match "Could not get changelist info" -and
-                $Message -match "Connection timeout" -and
-                $Level -eq "WARNING"
-            }
+            Should -Invoke Get-LatestHaveChangelist -Times 1 -Exactly
+            $script:runState.HaveCL | Should -Be 100
         }
-    }
-
-    Context "Caso: Gestión de ubicación (Push/Pop-Location)" {
 
-        It "Ejecuta Push-Location al project root antes de p4" {
+        It "Usa el CL ya conocido en la ejecución" {
+            $script:runState.HaveCL = 90
+            Mock Get-LatestHaveChangelist { throw "No debería llamarse" }
             Mock p4 {
                 $global:LASTEXITCODE = 0
-                return "Change 12345 on 2024/12/25 by user@workspace"
+                Write-Error "file(s) up-to-date."
             }
 
-            Get-LatestHaveChangelist
+            Sync-FromPerforce -SkipSync:$false | Should -Be $true
 
-            Should -Invoke Push-Location -ParameterFilter {
-                $Path -eq "C:\TestProject"
-            }
+            Should -Invoke Write-Host -ParameterFilter { $Object -match "Current changelist: 90" }
         }
+    }
 
-        It "Ejecuta Pop-Location después de éxito" {
+    Context "Caso: Rutas de sync (code-first)" {
+
+        It "Sincroniza y estima solo las rutas pedidas" {
+            Mock Get-LatestHaveChangelist { return 90 }
             Mock p4 {
+                param([Parameter(ValueFromRemainingArguments)]$Arguments)
+                $script:capturedArgs = $Arguments
                 $global:LASTEXITCODE = 0
-                return "Change 12345 on 2024/12/25 by user@workspace"
+                New-SyncRecord -DepotFile "//depot/Source/Game/Player.cpp" -Change 95
             }
 
-            Get-LatestHaveChangelist
+            Sync-FromPerforce -Paths @("Source/...@95", "*.uproject@95") | Should -Be $true
 
-            Should -Invoke Pop-Location -Times 1
+            $script:capturedArgs | Should -Contain "Source/...@95"
+            $script:capturedArgs | Should -Contain "*.uproject@95"
+            $script:capturedArgs | Should -Not -Contain "..."
+            Should -Invoke Get-SyncPreview -Times 1 -Exactly -ParameterFilter { $Paths -contains "Source/...@95" }
         }
 
-        It "Ejecuta Pop-Location después de throw de string (finally block)" {
+        It "Una ruta sin archivos no cuenta como error" {
+            Mock Get-LatestHaveChangelist { return 90 }
             Mock p4 {
                 $global:LASTEXITCODE = 1
-                return "error"
+                New-SyncRecord -DepotFile "//depot/Source/Game/Player.cpp" -Change 95
+                Write-Error "Plugins/.../Source/...@95 - no such file(s)."
             }
 
-            try {
-                Get-LatestHaveChangelist
-            } catch { }
+            Sync-FromPerforce -Paths @("Source/...@95", "Plugins/.../Source/...@95") | Should -Be $true
 
-            Should -Invoke Pop-Location -Times 1
+            Should -Invoke Write-DetailedError -Times 0
         }
+    }
+}
 
-        It "Ejecuta Pop-Location después de BuildException (finally block)" {
-            Mock p4 {
-                throw "Error"
-            }
+# =============================================================================
+# TESTS DE PARALLEL SYNC
+# =============================================================================
 
-            try {
-                Get-LatestHaveChangelist
-            } catch { }
+Describe "Write-SyncProgress" -Tag "Perforce" {
 
-            Should -Invoke Pop-Location -Times 1
+    It "Muestra los contadores en la barra de progreso" {
+        Mock Write-Progress {}
+
+        $stats = @{ Updated = 10; Added = 5; Deleted = 2; Other = 0; Errors = 1; UpToDate = $false }
+        Write-SyncProgress -Stats $stats -Elapsed ([TimeSpan]::FromSeconds(12))
+
+        Should -Invoke Write-Progress -ParameterFilter {
+            $Status -match "17 file\(s\): 10 updated, 5 added, 2 deleted, 1 error\(s\) - 12s"
         }
     }
 
-    Context "Caso: Comando p4 correcto" {
-
-        It "Ejecuta p4 changes con argumentos correctos" {
-            $capturedArgs = $null
-            Mock p4 {
-                param([Parameter(ValueFromRemainingArguments)]$Arguments)
-                $script:capturedArgs = $Arguments
-                $global:LASTEXITCODE = 0
-                return "Change 12345 on 2024/12/25 by user@workspace"
-            }
+    It "Muestra porcentaje, MB/s y tiempo restante cuando conoce el total de bytes" {
+        Mock Write-Progress {}
 
-            Get-LatestHaveChangelist
+        $stats = @{ Updated = 4; Added = 0; Deleted = 0; Other = 0; Errors = 0; UpToDate = $false; Bytes = 100MB; TotalBytes = 400MB }
+        Write-SyncProgress -Stats $stats -Elapsed ([TimeSpan]::FromSeconds(10))
 
-            $script:capturedArgs | Should -Contain "changes"
-            $script:capturedArgs | Should -Contain "-m1"
-            $script:capturedArgs | Should -Contain "...#have"
+        Should -Invoke Write-Progress -ParameterFilter {
+            $PercentComplete -eq 25 -and $SecondsRemaining -eq 30 -and $Status -match "100 of 400 MB at 10 MB/s"
         }
+    }
 
-        It "Escribe log verbose del comando ejecutado" {
-            Mock p4 {
-                $global:LASTEXITCODE = 0
-                return "Change 12345 on 2024/12/25 by user@workspace"
-            }
+    It "No muestra tiempo restante sin total de bytes" {
+        Mock Write-Progress {}
 
-            Get-LatestHaveChangelist
+        $stats = @{ Updated = 4; Added = 0; Deleted = 0; Other = 0; Errors = 0; UpToDate = $false; Bytes = 100MB; TotalBytes = 0 }
+        Write-SyncProgress -Stats $stats -Elapsed ([TimeSpan]::FromSeconds(10))
 
-            Should -Invoke Write-Log -ParameterFilter {
-                $Message -match 'Executing: p4 changes -m1 "\.\.\.#have"' -and $Level -eq "VERBOSE"
-            }
-        }
+        Should -Invoke Write-Progress -ParameterFilter { -not $PSBoundParameters.ContainsKey("SecondsRemaining") -and $Status -notmatch "MB/s" }
     }
+}
 
-    Context "Caso: Edge cases con regex" {
-
-        It "Extrae el primer número cuando hay múltiples" {
-            Mock p4 {
-                $global:LASTEXITCODE = 0
-                return "Change 12345 and 67890 on 2024/12/25"
-            }
+Describe "Add-SyncRecord" -Tag "Perforce" {
 
-            $result = Get-LatestHaveChangelist
+    BeforeAll {
+        . "$PSScriptRoot\..\Source\sync_and_build.ps1"
+    }
 
-            $result | Should -Be 12345
-        }
+    BeforeEach {
+        $stats = @{ Updated = 0; Added = 0; Deleted = 0; Other = 0; Errors = 0; UpToDate = $false; Bytes = [long]0; TotalBytes = [long]500 }
+        $changedLines = [System.Collections.Generic.List[string]]::new()
+    }
 
-        It "Maneja números muy grandes" {
-            Mock p4 {
-                $global:LASTEXITCODE = 0
-                return "Change 2147483647 on 2024/12/25"
-            }
+    It "Suma el tamaño y cuenta la acción" {
+        Add-SyncRecord -Record @{ depotFile = "//depot/A.cpp"; rev = "3"; action = "refreshed"; fileSize = "120" } -Stats $stats -ChangedLines $changedLines
 
-            $result = Get-LatestHaveChangelist
+        $stats.Updated | Should -Be 1
+        $stats.Bytes | Should -Be 120
+        $changedLines[0] | Should -Be "//depot/A.cpp#3 - refreshed"
+    }
 
-            $result | Should -Be 2147483647
-        }
+    It "Usa el total del primer registro en lugar de la vista previa" {
+        Add-SyncRecord -Record @{ depotFile = "//depot/A.cpp"; rev = "1"; action = "added"; fileSize = "10"; totalFileSize = "900"; totalFileCount = "4" } -Stats $stats -ChangedLines $changedLines
 
-        It "Ignora texto antes y después del patrón" {
-            Mock p4 {
-                $global:LASTEXITCODE = 0
-                return "Some text before Change 999 on 2024/12/25 and text after"
-            }
+        $stats.TotalBytes | Should -Be 900
+        $stats.Added | Should -Be 1
+    }
 
-            $result = Get-LatestHaveChangelist
+    It "Cuenta acciones desconocidas como otras sin listarlas" {
+        Add-SyncRecord -Record @{ depotFile = "//depot/A.cpp"; rev = "1"; action = "moved" } -Stats $stats -ChangedLines $changedLines
 
-            $result | Should -Be 999
-        }
+        $stats.Other | Should -Be 1
+        $changedLines.Count | Should -Be 0
     }
 }
 
-# =============================================================================
-# TESTS DE DETECCIÓN DE CAMBIOS DE CÓDIGO
 # =============================================================================
 
-Describe "Test-CodeChanges" -Tag "FuncionesTests" {
-    
-    BeforeEach {
-        # Mock config con extensiones de código
-        Mock Get-ConfigValue {
-            param($Path, $DefaultValue)
 
-            if ($Path -eq "CodeExtensions") {
-                return @('.cpp', '.h', '.build.cs', '.cs')
-            }
-            return $DefaultValue
-        }
+Describe "Get-SyncedChangelist" -Tag "Perforce" {
 
-        Mock Write-Log {}
-        Mock Push-Location {}
-        Mock Pop-Location {}
-        Mock Write-Host {}
+    BeforeAll {
+        . "$PSScriptRoot\..\Source\sync_and_build.ps1"
+    }
 
-        Mock p4 {
-            param([Parameter(ValueFromRemainingArguments)]$Arguments)
+    BeforeEach {
+        Mock Write-Log { }
+        Mock Get-LatestHaveChangelist { return 999 }
+    }
 
-            $cmd = $Arguments[0]
+    It "Devuelve el CL anterior si no se sincronizó nada" {
+        $stats = @{ Updated = 0; Added = 0; Deleted = 0; Other = 0; HighestChange = 0 }
 
-            switch ($cmd) {
-                'describe' {
-                    $clNum = $Arguments[2]
-                    $global:LASTEXITCODE = 0
+        Get-SyncedChangelist -BeforeCL 120 -Stats $stats | Should -Be 120
+        Should -Invoke Get-LatestHaveChangelist -Times 0
+    }
 
-                    switch ($clNum)
-                    {
-                        12340 {
-                            return @(
-                               "Change 12343 on 2024/12/20 by user@workspace
+    It "Nunca retrocede por debajo del CL anterior" {
+        $stats = @{ Updated = 1; Added = 0; Deleted = 0; Other = 0; HighestChange = 80 }
 
-                                Fixed player movement bug
+        Get-SyncedChangelist -BeforeCL 120 -Stats $stats | Should -Be 120
+    }
 
-                            Affected files ...
+    It "Consulta el servidor cuando los registros no traen changelist" {
+        $stats = @{ Updated = 3; Added = 0; Deleted = 0; Other = 0; HighestChange = 0 }
 
-                            ... //depot/Source/MyGame/Player.uasset#5 edit
-                            ... //depot/Source/MyGame/PlayerController.uasset#3 edit")
-                        }
-                        12341 {
-                            return @("Change 12344 on 2024/12/21 by user@workspace")
-                        }
-                        12345 {
-                            return @("
-                            Change 12345 on 2024/12/25 by user@workspace
+        Get-SyncedChangelist -BeforeCL 120 -Stats $stats | Should -Be 999
+        Should -Invoke Get-LatestHaveChangelist -Times 1 -Exactly
+    }
+}
 
-                                Fixed player movement bug
+Describe "Get-HaveChangelist" -Tag "Perforce" {
 
-                            Affected files ...
+    BeforeAll {
+        . "$PSScriptRoot\..\Source\sync_and_build.ps1"
+    }
 
-                            ... //depot/Source/MyGame/Player.cpp#5 edit
-                            ... //depot/Source/MyGame/PlayerController.h#3 edit")
-                        }
-                        12346 {
-                            return @("
-                            Change 12346 by user@workspace
+    BeforeEach {
+        $script:runState = @{}
+        Mock Get-LatestHaveChangelist { return 321 }
+    }
 
-                            Updated UI textures
+    It "Consulta una sola vez por ejecución" {
+        Get-HaveChangelist | Should -Be 321
+        Get-HaveChangelist | Should -Be 321
 
-                        Affected files ...
+        Should -Invoke Get-LatestHaveChangelist -Times 1 -Exactly
+    }
 
-                        ... //depot/Content/UI/MainMenu.uasset#2 edit
-                        ... //depot/Content/Textures/Logo.png#1 add
-                            ")
-                        }
-                        default {
-                            $global:LASTEXITCODE = 1
-                            return "Change $clNum by user"
-                        }
-                    }
-                }
+    It "Devuelve el CL guardado por el sync" {
+        $script:runState.HaveCL = 400
 
-                'changes' {
-                    $global:LASTEXITCODE = 0
+        Get-HaveChangelist | Should -Be 400
+        Should -Invoke Get-LatestHaveChangelist -Times 0
+    }
+}
 
-                    # New format: p4 changes -m 100 "//...@>FromCL,@<=ToCL"
-                    # Arguments will be: ['changes', '-m', '100', '//...@>12340,@<=12341']
-                    $pathSpec = if ($Arguments.Count -ge 4) { $Arguments[3] } else { $Arguments[1] }
+Describe "Get-SyncPreview" -Tag "Perforce" {
 
-                    # Handle new depot syntax //...@>X,@<=Y
-                    if ($pathSpec -match "//\.\.\.@>(\d+),@<=(\d+)") {
-                        $fromCL = [int]$Matches[1]
-                        $toCL = [int]$Matches[2]
+    BeforeEach {
+        Mock Write-Log {}
+    }
 
-                        # Return only CLs in range (excluding fromCL)
-                        if ($fromCL -eq 12340 -and $toCL -eq 12341) {
-                            return @("Change 12341 on 2024/12/21 by user@workspace")
-                        }
-                        elseif ($fromCL -eq 12343 -and $toCL -eq 12345) {
-                            return @(
-                                "Change 12345 on 2024/12/25 by user@workspace",
-                                "Change 12344 on 2024/12/24 by user@workspace"
-                            )
-                        }
-                    }
-                    # Handle old syntax for backward compatibility
-                    elseif ($pathSpec -eq "...@12340,12341") {
-                        return @(
-                            "Change 12341 on 2024/12/21 by user@workspace",
-                            "Change 12340 on 2024/12/20 by user@workspace"
-                        )
-                    }
+    It "Lee la estimación del servidor" {
+        Mock p4 {
+            $global:LASTEXITCODE = 0
+            return "Server network estimates: files added/updated/deleted=120/30/5, bytes added/updated=1048576/2097152"
+        }
 
-                    # Default fallback
-                    return @(
-                        "Change 12345 on 2024/12/25 by user@workspace",
-                        "Change 12344 on 2024/12/24 by user@workspace",
-                        "Change 12343 on 2024/12/23 by user@workspace"
-                    )
-                }
+        $preview = Get-SyncPreview
 
-                default {
-                    $global:LASTEXITCODE = 0
-                    return @()
-                }
-            }
+        $preview.Files | Should -Be 150
+        $preview.Deleted | Should -Be 5
+        $preview.Bytes | Should -Be 3145728
+    }
+
+    It "Retorna cero archivos cuando está al día" {
+        Mock p4 {
+            $global:LASTEXITCODE = 1
+            return "... - file(s) up-to-date."
         }
 
+        (Get-SyncPreview).Files | Should -Be 0
     }
-    
-    Context "Caso: Changelist único con código" {
-        
-        It "Detecta cambios cuando hay archivos .cpp" {
-            $result = Test-CodeChanges -Changelist 12345
-            
-            $result | Should -Be $true
+
+    It "Retorna null cuando no entiende la salida" {
+        Mock p4 {
+            $global:LASTEXITCODE = 1
+            return "Connect to server failed"
         }
-        
-        It "No detecta cambios cuando solo hay assets" {
-            $result = Test-CodeChanges -Changelist 12346
-            
-            $result | Should -Be $false
-        }
-    }
-    
-    Context "Caso: Rango de changelists (FromCL)" {
-        
-        It "Detecta cambios en rango de CLs" {
-            $result = Test-CodeChanges -Changelist 12345 -FromCL 12343
-            
-            $result | Should -Be $true
-        }
-        
-        It "No detecta cambios cuando rango solo tiene assets" {
-            $result = Test-CodeChanges -Changelist 12341 -FromCL 12340
-            
-            $result | Should -Be $false
-        }
-    }
-    
-    Context "Extracción de números de changelist" {
-
-        It "Extrae correctamente de formato 'Change 12345'" {
-            $cl = "Change 12345 on 2024/12/25 by user@workspace"
 
-            $clNum = $null
-            if ($cl -match "Change (\d+)") {
-                $clNum = [int]$Matches[1]
-            }
-
-            $clNum | Should -Be 12345
-            $clNum | Should -BeOfType [int]
-        }
-
-        It "Maneja int directo sin conversión" {
-            $cl = 67890
-            $clNum = $cl
-
-            $clNum | Should -Be 67890
-        }
+        Get-SyncPreview | Should -BeNullOrEmpty
     }
+}
 
-    Context "Caso: Manejo de excepciones" {
-
-        It "Retorna true cuando p4 changes lanza excepción" {
-            Mock p4 {
-                throw "Network timeout"
-            }
-
-            $result = Test-CodeChanges -Changelist 12345 -FromCL 12340
+# =============================================================================
 
-            $result | Should -Be $true
-        }
+Describe "Get-ParallelSyncSettings" -Tag "Perforce" {
 
-        It "Retorna true cuando p4 describe lanza excepción" {
-            Mock p4 {
-                param([Parameter(ValueFromRemainingArguments)]$Arguments)
+    BeforeEach {
+        Mock Get-ConfigValue { param($Path, $DefaultValue) return $DefaultValue }
+    }
 
-                $cmd = $Arguments[0]
+    It "Retorna null para syncs pequeños" {
+        Get-ParallelSyncSettings -Preview ([PSCustomObject]@{ Files = 10; Bytes = 1MB }) | Should -BeNullOrEmpty
+    }
 
-                if ($cmd -eq 'describe') {
-                    throw "Connection lost"
-                } else {
-                    $global:LASTEXITCODE = 0
-                    return @("Change 12345 on 2024/12/25")
-                }
-            }
+    It "Retorna null sin vista previa" {
+        Get-ParallelSyncSettings -Preview $null | Should -BeNullOrEmpty
+    }
 
-            $result = Test-CodeChanges -Changelist 12345
+    It "Elige valores dentro de los límites" {
+        $settings = Get-ParallelSyncSettings -Preview ([PSCustomObject]@{ Files = 5000; Bytes = 10GB })
 
-            $result | Should -Be $true
-        }
+        $settings.Threads | Should -BeGreaterOrEqual 2
+        $settings.Threads | Should -BeLessOrEqual 8
+        $settings.Batch | Should -BeGreaterOrEqual 8
+        $settings.Batch | Should -BeLessOrEqual 64
+        $settings.BatchSize | Should -BeLessOrEqual 536870912
+    }
 
-        It "Escribe log WARNING cuando hay excepción" {
-            Mock p4 {
-                throw "Access denied"
-            }
+    It "Usa más hilos para syncs grandes" {
+        $small = Get-ParallelSyncSettings -Preview ([PSCustomObject]@{ Files = 100; Bytes = 100MB })
+        $large = Get-ParallelSyncSettings -Preview ([PSCustomObject]@{ Files = 5000; Bytes = 100MB })
 
-            Test-CodeChanges -Changelist 12345 -FromCL 12340
+        $large.Threads | Should -BeGreaterOrEqual $small.Threads
+        $large.Batch | Should -BeGreaterOrEqual $small.Batch
+    }
 
-            Should -Invoke Write-Log -ParameterFilter {
-                $Message -match "Could not check for code changes" -and
-                $Message -match "Access denied" -and
-                $Level -eq "WARNING"
+    It "Respeta los valores configurados" {
+        Mock Get-ConfigValue {
+            param($Path, $DefaultValue)
+            switch ($Path) {
+                "perforce.parallelThreads" { return 6 }
+                "perforce.parallelBatch" { return 20 }
+                "perforce.parallelBatchSize" { return 1048576 }
+                default { return $DefaultValue }
             }
         }
 
-        It "Retorna true en caso de error (fail-safe behavior)" {
-            Mock p4 {
-                throw "Critical error"
-            }
-
-            $result = Test-CodeChanges -Changelist 999
+        $settings = Get-ParallelSyncSettings -Preview ([PSCustomObject]@{ Files = 100; Bytes = 100MB })
 
-            $result | Should -Be $true
-        }
+        $settings.Threads | Should -Be 6
+        $settings.Batch | Should -Be 20
+        $settings.BatchSize | Should -Be 1048576
     }
 }
 
-Describe "Test-ProjectBinariesExist" -Tag "FuncionesTests" {
+# =============================================================================
+# TESTS DE GET LATEST HAVE CHANGELIST
+# =============================================================================
+
+Describe "Get-LatestHaveChangelist" -Tag "Perforce" {
 
     BeforeAll {
         . "$PSScriptRoot\..\Source\sync_and_build.ps1"
     }
 
     BeforeEach {
-        $script:projectRoot = "C:\MyProject"
-        $script:projectName = "MyGame"
+        $script:projectRoot = "C:\TestProject"
 
         Mock Write-Log { }
+        Mock Push-Location { }
+        Mock Pop-Location { }
     }
 
-    Context "Caso: Binarios existen" {
+    Context "Caso: Changelist válido retornado" {
 
-        It "Retorna true cuando el archivo DLL existe" {
-            Mock Test-Path {
-                param($Path)
-                if ($Path -match "UnrealEditor-MyGame\.dll") {
-                    return $true
-                }
-                return $false
+        It "Retorna el número de changelist cuando p4 changes tiene éxito" {
+            Mock p4 {
+                param([Parameter(ValueFromRemainingArguments)]$Arguments)
+                $global:LASTEXITCODE = 0
+                return "Change 12345 on 2024/12/25 by user@workspace"
             }
 
-            $result = Test-ProjectBinariesExist
+            $result = Get-LatestHaveChangelist
 
-            $result | Should -Be $true
+            $result | Should -Be 12345
         }
 
-        It "Construye la ruta correcta del binario" {
-            $capturedPath = $null
-            Mock Test-Path {
-                param($Path)
-                $script:capturedPath = $Path
-                return $true
-            }
+        It "Extrae correctamente el changelist de diferentes formatos" {
+            $testCases = @(
+                @{ Output = "Change 100 on 2024/01/01 by user@ws"; Expected = 100 }
+                @{ Output = "Change 999999 on 2024/12/31 by admin@main"; Expected = 999999 }
+                @{ Output = "Change 1 on 2024/01/01 by test@test"; Expected = 1 }
+                @{ Output = "Change 54321 by user"; Expected = 54321 }
+            )
 
-            Test-ProjectBinariesExist
+            foreach ($case in $testCases) {
+                Mock p4 {
+                    $global:LASTEXITCODE = 0
+                    return $case.Output
+                }
 
-            $script:capturedPath | Should -Be "C:\MyProject\MyGame\Binaries\Win64\UnrealEditor-MyGame.dll"
+                $result = Get-LatestHaveChangelist
+
+                $result | Should -Be $case.Expected
+            }
         }
 
-        It "Escribe log VERBOSE cuando binario existe" {
-            Mock Test-Path { return $true }
+        It "Escribe log con el changelist encontrado" {
+            Mock p4 {
+                $global:LASTEXITCODE = 0
+                return "Change 12345 on 2024/12/25 by user@workspace"
+            }
 
-            Test-ProjectBinariesExist
+            Get-LatestHaveChangelist
 
             Should -Invoke Write-Log -ParameterFilter {
-                $Message -match "Checking for project binary" -and
-                $Message -match "UnrealEditor-MyGame\.dll" -and
-                $Message -match "Exists: True" -and
-                $Level -eq "VERBOSE"
+                $Message -match "Latest have changelist: 12345" -and $Level -eq "VERBOSE"
             }
         }
     }
 
-    Context "Caso: Binarios no existen" {
-
-        It "Retorna false cuando el archivo DLL no existe" {
-            Mock Test-Path { return $false }
+    Context "Caso: No se puede determinar changelist - lanza excepción" {
 
-            $result = Test-ProjectBinariesExist
+        It "Lanza excepción cuando LASTEXITCODE no es 0" {
+            Mock p4 {
+                $global:LASTEXITCODE = 1
+                return "error: Connection failed"
+            }
 
-            $result | Should -Be $false
+            { Get-LatestHaveChangelist } | Should -Throw
         }
 
-        It "Escribe log VERBOSE cuando binario no existe" {
-            Mock Test-Path { return $false }
-
-            Test-ProjectBinariesExist
-
-            Should -Invoke Write-Log -ParameterFilter {
-                $Message -match "Checking for project binary" -and
-                $Message -match "UnrealEditor-MyGame\.dll" -and
-                $Message -match "Exists: False" -and
-                $Level -eq "VERBOSE"
+        It "Lanza excepción cuando la salida no contiene patrón 'Change'" {
+            Mock p4 {
+                $global:LASTEXITCODE = 0
+                return "No files to sync"
             }
-        }
-    }
 
-    Context "Caso: Diferentes nombres de proyecto" {
+            { Get-LatestHaveChangelist } | Should -Throw
+        }
 
-        It "Construye ruta correcta con nombre simple" {
-            $script:projectName = "TestGame"
-            $capturedPath = $null
-            Mock Test-Path {
-                param($Path)
-                $script:capturedPath = $Path
-                return $true
+        It "Lanza excepción cuando la salida no contiene número" {
+            Mock p4 {
+                $global:LASTEXITCODE = 0
+                return "Change ABC on 2024/12/25"
             }
 
-            Test-ProjectBinariesExist
-
-            $script:capturedPath | Should -Match "UnrealEditor-TestGame\.dll"
+            { Get-LatestHaveChangelist } | Should -Throw
         }
 
-        It "Construye ruta correcta con nombre complejo" {
-            $script:projectName = "MyAwesomeGame"
-            $capturedPath = $null
-            Mock Test-Path {
-                param($Path)
-                $script:capturedPath = $Path
-                return $true
+        It "Escribe log verbose cuando no puede determinar changelist antes de lanzar excepción" {
+            Mock p4 {
+                $global:LASTEXITCODE = 0
+                return "No changes found"
             }
 
-            Test-ProjectBinariesExist
+            try {
+                Get-LatestHaveChangelist
+            } catch { }
 
-            $script:capturedPath | Should -Match "UnrealEditor-MyAwesomeGame\.dll"
+            Should -Invoke Write-Log -ParameterFilter {
+                $Message -match "Could not determine changelist" -and $Level -eq "VERBOSE"
+            }
         }
 
-        It "Usa el projectRoot configurado" {
-            $script:projectRoot = "C:\Projects\GameDev"
-            $capturedPath = $null
-            Mock Test-Path {
-                param($Path)
-                $script:capturedPath = $Path
-                return $true
+        It "Lanza excepción cuando p4 retorna salida vacía" {
+            Mock p4 {
+                $global:LASTEXITCODE = 0
+                return ""
             }
 
-            Test-ProjectBinariesExist
-
-            $script:capturedPath | Should -Match "^C:\\Projects\\GameDev\\"
+            { Get-LatestHaveChangelist } | Should -Throw
         }
     }
 
-    Context "Caso: Verificación de estructura de ruta" {
+    Context "Caso: BuildException cuando hay errores" {
 
-        It "Incluye carpeta Binaries en la ruta" {
-            $capturedPath = $null
-            Mock Test-Path {
-                param($Path)
-                $script:capturedPath = $Path
-                return $true
+        It "BuildException contiene mensaje original cuando p4 falla" {
+            Mock p4 {
+                throw "Connection timeout"
             }
 
-            Test-ProjectBinariesExist
-
-            $script:capturedPath | Should -Match "\\Binaries\\"
+            try {
+                Get-LatestHaveChangelist
+                throw "Test should have thrown"
+            } catch [BuildException] {
+                $_.Exception.Message | Should -Match "Could not get changelist info"
+                $_.Exception.Message | Should -Match "Connection timeout"
+            }
         }
 
-        It "Incluye carpeta Win64 en la ruta" {
-            $capturedPath = $null
-            Mock Test-Path {
-                param($Path)
-                $script:capturedPath = $Path
-                return $true
+        It "BuildException tiene Category 'Perforce'" {
+            Mock p4 {
+                throw "Network error"
             }
 
-            Test-ProjectBinariesExist
-
-            $script:capturedPath | Should -Match "\\Win64\\"
+            try {
+                Get-LatestHaveChangelist
+                throw "Test should have thrown"
+            } catch {
+                $_.Exception.Category | Should -Be "Perforce"
+                $_.Exception.Suggestion | Should -Be "Check your Perforce connection and workspace"
+            }
         }
 
-        It "Usa formato UnrealEditor-[ProjectName].dll" {
-            $capturedPath = $null
-            Mock Test-Path {
-                param($Path)
-                $script:capturedPath = $Path
-                return $true
+        It "Escribe log de warning cuando hay excepción antes de lanzar BuildException" {
+            Mock p4 {
+                throw "Connection timeout"
             }
 
-            Test-ProjectBinariesExist
+            try {
+                Get-LatestHaveChangelist
+            } catch { }
 
-            $script:capturedPath | Should -Match "UnrealEditor-.*\.dll$"
+            Should -Invoke Write-Log -ParameterFilter {
+                $Message -match "Could not get changelist info" -and
+                $Message -match "Connection timeout" -and
+                $Level -eq "WARNING"
+            }
         }
     }
-}
 
-# =============================================================================
-# TESTS DE UNREAL ENGINE
-# =============================================================================
+    Context "Caso: Gestión de ubicación (Push/Pop-Location)" {
 
-Describe "Find-UnrealEngine" -Tag "UnrealEngine" {
-    
-    BeforeAll {
-        . "$PSScriptRoot\..\Source\sync_and_build.ps1"
-    }
-    
-    BeforeEach {
-        $script:CONSTANTS = @{
-            Paths = @{
-                UnrealBuildBat = "Engine\Build\BatchFiles\Build.bat"
+        It "Ejecuta Push-Location al project root antes de p4" {
+            Mock p4 {
+                $global:LASTEXITCODE = 0
+                return "Change 12345 on 2024/12/25 by user@workspace"
             }
-        }
-        
-        Mock Write-Host { }
-        Mock Write-Log { }
-    }
-    
-    Context "Caso: No encuentra instalaciones" {
-        
-        It "Muestra mensaje cuando no hay instalaciones en rutas comunes" {
-            
-            Mock Test-Path { return $false }
-            Mock Get-ChildItem { return @() }
-            
-            Mock Read-Host { return "B" }
-            
-            Mock New-Object {
-                param($TypeName)
-                
-                if ($TypeName -eq "System.Windows.Forms.Form") {
-                    $form = [PSCustomObject]@{
-                        TopMost = $true
-                        WindowState = $null
-                        ShowInTaskbar = $null
-                    }
-                    
-                    $form | Add-Member -MemberType ScriptMethod -Name "Dispose" -Value { }
-                    return $form
-                }
-                
-                if ($TypeName -eq "System.Windows.Forms.FolderBrowserDialog") {
-                    $dialogForm = [PSCustomObject]@{
-                        Description = $null
-                        RootFolder = $null
-                        SelectedPath = ""
-                    }
 
-                    $dialogForm | Add-Member -MemberType ScriptMethod -Name "ShowDialog" -Value { return "Cancel" }
-                    return $dialogForm
-                }
-            }
-            
-            $result = Find-UnrealEngine
-            
-            $result | Should -Be $null
-            
-            Should -Invoke Write-Host -ParameterFilter {
-                $Object -match "No Unreal Engine installations found"
+            Get-LatestHaveChangelist
+
+            Should -Invoke Push-Location -ParameterFilter {
+                $Path -eq "C:\TestProject"
             }
         }
-    }
-    
-    Context "Caso: Encuentra una instalación" {
-        
-        It "Retorna la ruta cuando encuentra una sola instalación" {
-            Mock Test-Path {
-                param($Path)
-                
-                if ($Path -eq "C:\Program Files\Epic Games") {
-                    return $true
-                }
-                
-                if ($Path -match "Build\.bat") {
-                    return $true
-                }
-                
-                return $false
-            }
-            
-            Mock Get-ChildItem {
-                return @(
-                    [PSCustomObject]@{
-                        Name = "UE_5.3"
-                        FullName = "C:\Program Files\Epic Games\UE_5.3"
-                    }
-                )
+
+        It "Ejecuta Pop-Location después de éxito" {
+            Mock p4 {
+                $global:LASTEXITCODE = 0
+                return "Change 12345 on 2024/12/25 by user@workspace"
             }
-            
-            Mock Read-Host { return "1" }
-            
-            $result = Find-UnrealEngine
-            
-            $result | Should -Be "C:\Program Files\Epic Games\UE_5.3"
+
+            Get-LatestHaveChangelist
+
+            Should -Invoke Pop-Location -Times 1
         }
-        
-        It "Extrae versión correctamente del nombre del directorio" {
-            Mock Test-Path {
-                param($Path)
-                
-                if ($Path -eq "C:\UE") {
-                    return $true
-                }
-                
-                if ($Path -match "Build\.bat") {
-                    return $true
-                }
-                
-                return $false
+
+        It "Ejecuta Pop-Location después de throw de string (finally block)" {
+            Mock p4 {
+                $global:LASTEXITCODE = 1
+                return "error"
             }
-            
-            Mock Get-ChildItem -ParameterFilter {$Directory} {
-                return @(
-                    [PSCustomObject]@{
-                        Name = "UE_5.3"
-                        FullName = "C:\UE\UE_5.3"
-                    }
-                )
+
+            try {
+                Get-LatestHaveChangelist
+            } catch { }
+
+            Should -Invoke Pop-Location -Times 1
+        }
+
+        It "Ejecuta Pop-Location después de BuildException (finally block)" {
+            Mock p4 {
+                throw "Error"
             }
-            
-            Mock Read-Host { return "1" }
-            $cmd = Get-Command Get-ChildItem | Format-List *
-            $cmd | Should -Not -BeNullOrEmpty
-            $result = Find-UnrealEngine
-            
-            $result | Should -Be "C:\UE\UE_5.3"
+
+            try {
+                Get-LatestHaveChangelist
+            } catch { }
+
+            Should -Invoke Pop-Location -Times 1
         }
     }
-    
-    Context "Caso: Encuentra múltiples instalaciones" {
-        
-        It "Permite seleccionar entre múltiples instalaciones" {
-            Mock Test-Path { 
-                param($Path)
-                
-                if ($Path -eq "C:\Epic Games") {
-                    return $true
-                }
-                
-                if ($Path -match "Build\.bat") {
-                    return $true
-                }
-                
-                return $false
+
+    Context "Caso: Comando p4 correcto" {
+
+        It "Ejecuta p4 changes con argumentos correctos" {
+            $capturedArgs = $null
+            Mock p4 {
+                param([Parameter(ValueFromRemainingArguments)]$Arguments)
+                $script:capturedArgs = $Arguments
+                $global:LASTEXITCODE = 0
+                return "Change 12345 on 2024/12/25 by user@workspace"
             }
-            
-            Mock Get-ChildItem {
-                return @(
-                    [PSCustomObject]@{
-                        Name = "UE_5.3"
-                        FullName = "C:\Epic Games\UE_5.3"
-                    },
-                    [PSCustomObject]@{
-                        Name = "UE_5.4"
-                        FullName = "C:\Epic Games\UE_5.4"
-                    },
-                    [PSCustomObject]@{
-                        Name = "UnrealEngine-5.5"
-                        FullName = "C:\Epic Games\UnrealEngine-5.5"
-                    }
-                )
+
+            Get-LatestHaveChangelist
+
+            $script:capturedArgs | Should -Contain "changes"
+            $script:capturedArgs | Should -Contain "-m1"
+            $script:capturedArgs | Should -Contain "...#have"
+        }
+
+        It "Escribe log verbose del comando ejecutado" {
+            Mock p4 {
+                $global:LASTEXITCODE = 0
+                return "Change 12345 on 2024/12/25 by user@workspace"
             }
-            
-            Mock Read-Host { return "2" }
-            
-            $result = Find-UnrealEngine
-            
-            $result | Should -Be "C:\Epic Games\UE_5.4"
-            
-            Should -Invoke Write-Host -ParameterFilter {
-                $Object -match "Found 3 installation\(s\)"
+
+            Get-LatestHaveChangelist
+
+            Should -Invoke Write-Log -ParameterFilter {
+                $Message -match 'Executing: p4 changes -m1 "\.\.\.#have"' -and $Level -eq "VERBOSE"
             }
         }
-        
+    }
+
+    Context "Caso: Edge cases con regex" {
+
+        It "Extrae el primer número cuando hay múltiples" {
+            Mock p4 {
+                $global:LASTEXITCODE = 0
+                return "Change 12345 and 67890 on 2024/12/25"
+            }
+
+            $result = Get-LatestHaveChangelist
+
+            $result | Should -Be 12345
+        }
+
+        It "Maneja números muy grandes" {
+            Mock p4 {
+                $global:LASTEXITCODE = 0
+                return "Change 2147483647 on 2024/12/25"
+            }
+
+            $result = Get-LatestHaveChangelist
+
+            $result | Should -Be 2147483647
+        }
+
+        It "Ignora texto antes y después del patrón" {
+            Mock p4 {
+                $global:LASTEXITCODE = 0
+                return "Some text before Change 999 on 2024/12/25 and text after"
+            }
+
+            $result = Get-LatestHaveChangelist
+
+            $result | Should -Be 999
+        }
+    }
+}
+
+Describe "Get-HeadChangelist" -Tag "Perforce" {
+
+    BeforeEach {
+        $script:projectRoot = "C:\TestProject"
+        Mock Write-Log {}
+        Mock Push-Location {}
+        Mock Pop-Location {}
+    }
+
+    It "Devuelve el último changelist enviado de la vista del workspace" {
+        Mock p4 {
+            param([Parameter(ValueFromRemainingArguments)]$Arguments)
+            $script:capturedArgs = $Arguments
+            $global:LASTEXITCODE = 0
+            return "Change 500 on 2024/12/25 by ana@ws 'Nuevo arma'"
+        }
+
+        Get-HeadChangelist | Should -Be 500
+        $script:capturedArgs | Should -Contain "submitted"
+        $script:capturedArgs | Should -Contain "...#head"
+    }
+
+    It "Devuelve null cuando p4 falla" {
+        Mock p4 {
+            $global:LASTEXITCODE = 1
+            Write-Error "Connect to server failed"
+        }
+
+        Get-HeadChangelist | Should -BeNullOrEmpty
+        Should -Invoke Pop-Location -Times 1
+    }
+}
+
+Describe "Start-ContentSync" -Tag "Perforce" {
+
+    BeforeAll {
+        . "$PSScriptRoot\..\Source\sync_and_build.ps1"
+    }
+
+    BeforeEach {
+        Mock Write-Log {}
+        Mock Push-Location {}
+        Mock Pop-Location {}
+        Mock Start-TraceSpan { return $null }
+        Mock Get-SyncPreview { return [PSCustomObject]@{ Files = 5000; Deleted = 0; Bytes = [long]5GB } }
+        Mock Get-ParallelSyncSettings { return @{ Threads = 8; Batch = 32; BatchSize = 65536 } }
+    }
+
+    AfterEach {
+        if ($script:contentSync) {
+            $script:contentSync.PowerShell.Stop()
+            $script:contentSync.PowerShell.Dispose()
+            $script:contentSync = $null
+        }
+    }
+
+    It "Usa la misma configuración de sync paralelo que el sync de código" {
+        Mock Get-ConfigValue { return $true } -ParameterFilter { $Path -eq "perforce.parallelSync" }
+
+        Start-ContentSync -Changelist 500 -Directory $TestDrive
+
+        Should -Invoke Get-SyncPreview -ParameterFilter { $Paths -contains "...@500" }
+        Should -Invoke Write-Log -ParameterFilter { $Message -match "p4 -ztag sync --parallel=threads=8,batch=32,batchsize=65536 \.\.\.@500" }
+        $script:contentSync.Progress.TotalFiles | Should -Be 5000
+        $script:contentSync.Progress.TotalBytes | Should -Be 5GB
+    }
+
+    It "Sincroniza sin --parallel cuando perforce.parallelSync está apagado" {
+        Mock Get-ConfigValue { return $false } -ParameterFilter { $Path -eq "perforce.parallelSync" }
+
+        Start-ContentSync -Changelist 500 -Directory $TestDrive
+
+        Should -Invoke Get-ParallelSyncSettings -Times 0
+        Should -Invoke Write-Log -ParameterFilter { $Message -match "p4 -ztag sync \.\.\.@500$" }
+    }
+}
+
+Describe "Wait-ContentSync" -Tag "Perforce" {
+
+    BeforeAll {
+        . "$PSScriptRoot\..\Source\sync_and_build.ps1"
+
+        # Stand-in for the runspace of Start-ContentSync
+        function New-ContentSync {
+            param([hashtable]$Result, [bool]$Completed = $true, [int]$PendingWaits = 0)
+
+            $powershell = [PSCustomObject]@{ Result = $Result; Disposed = $false }
+            $powershell | Add-Member -MemberType ScriptMethod -Name EndInvoke -Value { param($handle) return ,$this.Result }
+            $powershell | Add-Member -MemberType ScriptMethod -Name Dispose -Value { $this.Disposed = $true }
+
+            # WaitOne times out PendingWaits times before the sync ends
+            $waitHandle = [PSCustomObject]@{ PendingWaits = $PendingWaits }
+            $waitHandle | Add-Member -MemberType ScriptMethod -Name WaitOne -Value {
+                param($milliseconds)
+                $this.PendingWaits--
+                return $this.PendingWaits -lt 0
+            }
+
+            return @{
+                PowerShell = $powershell
+                Handle = [PSCustomObject]@{ IsCompleted = $Completed; AsyncWaitHandle = $waitHandle }
+                Progress = @{ Files = 3; Bytes = [long]1048576; ErrorCount = 0; TotalFiles = 10; TotalBytes = [long]4194304 }
+                Timer = [System.Diagnostics.Stopwatch]::StartNew()
+                Span = $null
+            }
+        }
+    }
+
+    BeforeEach {
+        $script:runState = @{}
+        Mock Write-Host {}
+        Mock Write-Log {}
+        Mock Write-LogBuffer {}
+        Mock Write-DetailedError {}
+    }
+
+    AfterEach {
+        $script:contentSync = $null
+    }
+
+    It "No hace nada cuando no hay sync de contenido en marcha" {
+        $script:contentSync = $null
+
+        Wait-ContentSync | Should -Be $true
+        Should -Invoke Write-Host -Times 0
+    }
+
+    It "Guarda los archivos, bytes y tiempo del sync de contenido" {
+        $script:contentSync = New-ContentSync -Result @{ Files = 40; Bytes = [long]2097152; Errors = @(); ErrorCount = 0; UpToDate = $false; ExitCode = 0 }
+        $handle = $script:contentSync
+
+        Wait-ContentSync | Should -Be $true
+
+        $script:runState.ContentSync.Files | Should -Be 40
+        $script:runState.ContentSync.Bytes | Should -Be 2097152
+        $script:runState.ContentSync.Seconds | Should -BeGreaterOrEqual 0
+        $handle.PowerShell.Disposed | Should -Be $true
+        $script:contentSync | Should -BeNullOrEmpty
+    }
+
+    It "Avisa que espera cuando el sync todavía no terminó" {
+        $script:contentSync = New-ContentSync -Completed $false -Result @{ Files = 1; Bytes = [long]1; Errors = @(); ErrorCount = 0; UpToDate = $false; ExitCode = 0 }
+
+        Wait-ContentSync | Out-Null
+
+        Should -Invoke Write-Host -ParameterFilter { $Object -match "Waiting for the content sync" }
+    }
+
+    It "Registra el progreso en el log mientras espera el sync" {
+        $script:contentSync = New-ContentSync -Completed $false -PendingWaits 2 -Result @{ Files = 10; Bytes = [long]4194304; Errors = @(); ErrorCount = 0; UpToDate = $false; ExitCode = 0 }
+
+        Wait-ContentSync | Should -Be $true
+
+        # Una línea al empezar a esperar y otra por cada intervalo sin terminar
+        Should -Invoke Write-LogBuffer -Times 1 -Exactly
+        Should -Invoke Write-Log -Times 3 -Exactly -ParameterFilter { $Message -match "Content sync: 3 of 10 file\(s\), 1(\.0+)? of 4(\.0+)? MB, 0 error" }
+    }
+
+    It "Avisa en el log de los errores de un sync que terminó bien" {
+        $script:contentSync = New-ContentSync -Result @{ Files = 9; Bytes = [long]1; Errors = @("can't clobber writable file"); ErrorCount = 1; UpToDate = $false; ExitCode = 0 }
+
+        Wait-ContentSync | Should -Be $true
+
+        Should -Invoke Write-Log -ParameterFilter { $Message -match "1 error line\(s\), first: can't clobber" -and $Level -eq "WARNING" }
+    }
+
+    It "Retorna false y muestra el error cuando el sync falla" {
+        $script:contentSync = New-ContentSync -Result @{ Files = 0; Bytes = [long]0; Errors = @("Connect to server failed"); ErrorCount = 1; UpToDate = $false; ExitCode = 1 }
+
+        Wait-ContentSync | Should -Be $false
+
+        Should -Invoke Write-DetailedError -ParameterFilter { $Suggestion -match "Connect to server failed" }
+        $script:runState.ContentSync | Should -BeNullOrEmpty
+    }
+}
+
+Describe "Stop-ContentSync" -Tag "Perforce" {
+
+    BeforeAll {
+        . "$PSScriptRoot\..\Source\sync_and_build.ps1"
+
+        function New-RunningContentSync {
+            param([bool]$Completed = $false)
+
+            $powershell = [PSCustomObject]@{ Stopped = $false; Disposed = $false }
+            $powershell | Add-Member -MemberType ScriptMethod -Name Stop -Value { $this.Stopped = $true }
+            $powershell | Add-Member -MemberType ScriptMethod -Name Dispose -Value { $this.Disposed = $true }
+
+            return @{
+                PowerShell = $powershell
+                Handle = [PSCustomObject]@{ IsCompleted = $Completed }
+                Progress = @{ Files = 5; Bytes = [long]0; ErrorCount = 2; TotalFiles = 0; TotalBytes = [long]0 }
+                Timer = [System.Diagnostics.Stopwatch]::StartNew()
+                Span = $null
+            }
+        }
+    }
+
+    BeforeEach {
+        Mock Write-Host {}
+        Mock Write-Log {}
+    }
+
+    It "Detiene el runspace que sigue sincronizando" {
+        $script:contentSync = New-RunningContentSync
+        $handle = $script:contentSync
+
+        Stop-ContentSync
+
+        $handle.PowerShell.Stopped | Should -Be $true
+        $handle.PowerShell.Disposed | Should -Be $true
+        $script:contentSync | Should -BeNullOrEmpty
+        Should -Invoke Write-Log -ParameterFilter { $Message -match "stopping the content sync" -and $Level -eq "WARNING" }
+        Should -Invoke Write-Log -ParameterFilter { $Message -match "Content sync: 5 file\(s\), .* 2 error\(s\)" }
+    }
+
+    It "Solo libera el runspace cuando el sync ya terminó" {
+        $script:contentSync = New-RunningContentSync -Completed $true
+        $handle = $script:contentSync
+
+        Stop-ContentSync
+
+        $handle.PowerShell.Stopped | Should -Be $false
+        $handle.PowerShell.Disposed | Should -Be $true
+    }
+}
+
+# =============================================================================
+# TESTS DE DETECCIÓN DE CAMBIOS DE CÓDIGO
+# =============================================================================
+
+Describe "Invoke-PythonTool" -Tag "Perforce" {
+
+    BeforeEach {
+        Mock Write-Log {}
+        $script:pythonCommand = $null
+    }
+
+    AfterEach {
+        $script:pythonCommand = $null
+    }
+
+    It "Retorna null cuando Python no está instalado" {
+        Mock Get-Command { return $null }
+
+        $result = Invoke-PythonTool -Script "changelist_index.py" -Arguments @("summary")
+
+        $result | Should -BeNullOrEmpty
+        Should -Invoke Write-Log -ParameterFilter { $Message -match "Python not found" }
+    }
+
+    It "Convierte la salida JSON" {
+        $script:pythonCommand = [PSCustomObject]@{ Source = "python-mock" }
+        function python-mock { $global:LASTEXITCODE = 0; '{"changelists": 3, "users": 1}' }
+
+        $result = Invoke-PythonTool -Script "changelist_index.py" -Arguments @("summary")
+
+        $result.changelists | Should -Be 3
+    }
+
+    It "Mantiene un arreglo vacío distinto de null" {
+        $script:pythonCommand = [PSCustomObject]@{ Source = "python-mock" }
+        function python-mock { $global:LASTEXITCODE = 0; '[]' }
+
+        $result = Invoke-PythonTool -Script "changelist_index.py"
+
+        $null -eq $result | Should -Be $false
+        @($result).Count | Should -Be 0
+    }
+
+    It "Retorna null cuando el script falla" {
+        $script:pythonCommand = [PSCustomObject]@{ Source = "python-mock" }
+        function python-mock { $global:LASTEXITCODE = 1; '' }
+
+        $result = Invoke-PythonTool -Script "changelist_index.py"
+
+        $result | Should -BeNullOrEmpty
+        Should -Invoke Write-Log -ParameterFilter { $Message -match "failed \(Exit code: 1\)" }
+    }
+}
+
+# =============================================================================
+
+Describe "Invoke-ChangelistIndex" -Tag "Perforce" {
+
+    BeforeEach {
+        $script:projectRoot = "C:\TestProject"
+        Mock Invoke-PythonTool {
+            param($Script, $Arguments)
+            $script:indexArgs = $Arguments
+            return ,@()
+        }
+    }
+
+    It "Pasa la base de datos, el rango y las extensiones" {
+        Mock Get-ConfigValue { param($Path, $DefaultValue) return $DefaultValue }
+
+        Invoke-ChangelistIndex -Command "files" -FromCL 100 -ToCL 200 -Extensions @(".cpp", ".h")
+
+        Should -Invoke Invoke-PythonTool -ParameterFilter { $Script -eq "changelist_index.py" }
+        ($script:indexArgs -join " ") | Should -Match "changelists\.db"
+        ($script:indexArgs -join " ") | Should -Match "files --from 100 --to 200 --update --ext \.cpp \.h"
+    }
+
+    It "No pasa extensiones al resumen" {
+        Mock Get-ConfigValue { param($Path, $DefaultValue) return $DefaultValue }
+
+        Invoke-ChangelistIndex -Command "summary" -FromCL 100 -ToCL 200 -Extensions @(".cpp")
+
+        $script:indexArgs | Should -Not -Contain "--ext"
+    }
+
+    It "No hace nada cuando el índice está desactivado" {
+        Mock Get-ConfigValue { return $false }
+
+        $result = Invoke-ChangelistIndex -Command "files" -FromCL 100 -ToCL 200
+
+        $result | Should -BeNullOrEmpty
+        Should -Invoke Invoke-PythonTool -Times 0
+    }
+
+    It "Devuelve null y no @(`$null) cuando el script de Python falla" {
+        Mock Get-ConfigValue { param($Path, $DefaultValue) return $DefaultValue }
+        Mock Invoke-PythonTool { return $null }
+
+        $result = Invoke-ChangelistIndex -Command "files" -FromCL 100 -ToCL 200
+
+        ($null -eq $result) | Should -BeTrue
+    }
+}
+
+# =============================================================================
+
+Describe "Get-ChangedFiles" -Tag "FuncionesTests" {
+
+    BeforeEach {
+        Mock Write-Log {}
+        Mock Invoke-ChangelistIndex { return $null }
+
+        Mock p4 {
+            param([Parameter(ValueFromRemainingArguments)]$Arguments)
+
+            $global:LASTEXITCODE = 0
+            $script:p4FilesArgs = $Arguments
+
+            return @(
+                "//depot/Source/MyGame/Player.cpp#5 - edit change 12345 (text)",
+                "//depot/Source/MyGame/Old.h#3 - delete change 12344 (text)"
+            )
+        }
+    }
+
+    Context "Caso: Construcción de filespecs" {
+
+        It "Hace una sola llamada a p4 files con un filespec por extensión" {
+            Get-ChangedFiles -ToCL 12345 -FromCL 12340 -Extensions @(".cpp", ".h")
+
+            Should -Invoke p4 -Times 1 -Exactly
+            $script:p4FilesArgs[0] | Should -Be "files"
+            $script:p4FilesArgs | Should -Contain "....cpp@12341,@12345"
+            $script:p4FilesArgs | Should -Contain "....h@12341,@12345"
+        }
+
+        It "Usa @= cuando no hay FromCL" {
+            Get-ChangedFiles -ToCL 12345 -Extensions @(".cpp")
+
+            $script:p4FilesArgs | Should -Contain "....cpp@=12345"
+        }
+
+        It "No tiene límite de changelists en el rango" {
+            Get-ChangedFiles -ToCL 20000 -FromCL 12000 -Extensions @(".cpp")
+
+            $script:p4FilesArgs | Should -Not -Contain "-m"
+            $script:p4FilesArgs | Should -Contain "....cpp@12001,@20000"
+        }
+    }
+
+    Context "Caso: Lectura de la salida" {
+
+        It "Devuelve archivo, revisión, acción y changelist" {
+            $files = @(Get-ChangedFiles -ToCL 12345 -FromCL 12340 -Extensions @(".cpp", ".h"))
+
+            $files.Count | Should -Be 2
+            $files[0].DepotFile | Should -Be "//depot/Source/MyGame/Player.cpp"
+            $files[0].Revision | Should -Be 5
+            $files[0].Action | Should -Be "edit"
+            $files[0].Change | Should -Be 12345
+            $files[1].Action | Should -Be "delete"
+        }
+
+        It "Trata 'no such file(s)' como sin coincidencias" {
+            Mock p4 {
+                $global:LASTEXITCODE = 1
+                return @("....cpp@12341,@12345 - no such file(s).")
+            }
+
+            $files = @(Get-ChangedFiles -ToCL 12345 -FromCL 12340 -Extensions @(".cpp"))
+
+            $files.Count | Should -Be 0
+        }
+
+        It "Mezcla coincidencias y extensiones sin archivos" {
+            Mock p4 {
+                $global:LASTEXITCODE = 1
+                return @(
+                    "//depot/Source/MyGame/Player.cpp#5 - edit change 12345 (text)",
+                    "....h@12341,@12345 - no such file(s)."
+                )
+            }
+
+            $files = @(Get-ChangedFiles -ToCL 12345 -FromCL 12340 -Extensions @(".cpp", ".h"))
+
+            $files.Count | Should -Be 1
+        }
+
+        It "Usa el índice local cuando está disponible" {
+            Mock Invoke-ChangelistIndex {
+                return ,@([PSCustomObject]@{ depotFile = "//depot/Source/MyGame/Player.cpp"; revision = 5; action = "edit"; change = 12345; user = "ana"; description = "Fix" })
+            }
+
+            $files = @(Get-ChangedFiles -ToCL 12345 -FromCL 12340 -Extensions @(".cpp"))
+
+            $files.Count | Should -Be 1
+            $files[0].DepotFile | Should -Be "//depot/Source/MyGame/Player.cpp"
+            Should -Invoke p4 -Times 0
+            Should -Invoke Invoke-ChangelistIndex -ParameterFilter { $Command -eq "files" -and $FromCL -eq 12340 -and $ToCL -eq 12345 }
+        }
+
+        It "Acepta una respuesta vacía del índice sin llamar a p4" {
+            Mock Invoke-ChangelistIndex { return ,@() }
+
+            $files = @(Get-ChangedFiles -ToCL 12345 -FromCL 12340 -Extensions @(".cpp"))
+
+            $files.Count | Should -Be 0
+            Should -Invoke p4 -Times 0
+        }
+
+        It "Consulta el índice por el changelist anterior cuando no hay FromCL" {
+            Get-ChangedFiles -ToCL 12345 -Extensions @(".cpp")
+
+            Should -Invoke Invoke-ChangelistIndex -ParameterFilter { $FromCL -eq 12344 -and $ToCL -eq 12345 }
+        }
+
+        It "Lanza excepción ante errores desconocidos" {
+            Mock p4 {
+                $global:LASTEXITCODE = 1
+                return @("Perforce client error: Connect to server failed")
+            }
+
+            { Get-ChangedFiles -ToCL 12345 -FromCL 12340 -Extensions @(".cpp") } | Should -Throw "*Connect to server failed*"
+        }
+    }
+}
+
+Describe "Get-ChangedFiles sin Python" -Tag "FuncionesTests" {
+
+    BeforeEach {
+        $script:projectRoot = "C:\TestProject"
+        $script:pythonCommand = $null
+        Mock Write-Log {}
+        Mock Get-ConfigValue { param($Path, $DefaultValue) return $DefaultValue }
+        Mock Get-Command { return $null }
+
+        Mock p4 {
+            $global:LASTEXITCODE = 0
+            return @(
+                "//depot/Source/MyGame/Player.cpp#5 - edit change 12345 (text)",
+                "//depot/Source/MyGame/Old.h#3 - delete change 12344 (text)"
+            )
+        }
+    }
+
+    It "Vuelve a p4 files cuando el índice no puede ejecutarse" {
+        $files = @(Get-ChangedFiles -ToCL 12345 -FromCL 12340 -Extensions @(".cpp", ".h"))
+
+        $files.Count | Should -Be 2
+        $files[0].DepotFile | Should -Be "//depot/Source/MyGame/Player.cpp"
+        Should -Invoke p4 -Times 1 -Exactly
+        Should -Invoke Write-Log -ParameterFilter { $Message -match "Python not found" }
+    }
+}
+
+# =============================================================================
+
+Describe "Test-CodeChanges" -Tag "FuncionesTests" {
+    
+    BeforeEach {
+        Mock Get-ConfigValue {
+            param($Path, $DefaultValue)
+
+            if ($Path -eq "perforce.fileExtensions") {
+                return @('.cpp', '.h', '.build.cs', '.cs')
+            }
+            return $DefaultValue
+        }
+
+        Mock Write-Log {}
+        Mock Push-Location {}
+        Mock Pop-Location {}
+        Mock Write-Host {}
+        Mock Get-BuildDecision { return $null }
+        $script:runState = @{}
+
+        Mock Get-ChangedFiles {
+            param($ToCL, $FromCL, $Extensions)
+
+            switch ($ToCL) {
+                12345 {
+                    return @(
+                        [PSCustomObject]@{ DepotFile = "//depot/Source/MyGame/Player.cpp"; Revision = 5; Action = "edit"; Change = 12345 },
+                        [PSCustomObject]@{ DepotFile = "//depot/Source/MyGame/PlayerController.h"; Revision = 3; Action = "edit"; Change = 12344 }
+                    )
+                }
+                default { return @() }
+            }
+        }
+    }
+    
+    Context "Caso: Changelist único con código" {
+        
+        It "Detecta cambios cuando hay archivos .cpp" {
+            $result = Test-CodeChanges -Changelist 12345
+            
+            $result | Should -Be $true
+        }
+        
+        It "No detecta cambios cuando solo hay assets" {
+            $result = Test-CodeChanges -Changelist 12346
+            
+            $result | Should -Be $false
+        }
+    }
+    
+    Context "Caso: Rango de changelists (FromCL)" {
+        
+        It "Detecta cambios en rango de CLs" {
+            $result = Test-CodeChanges -Changelist 12345 -FromCL 12343
+            
+            $result | Should -Be $true
+        }
+        
+        It "No detecta cambios cuando rango solo tiene assets" {
+            $result = Test-CodeChanges -Changelist 12341 -FromCL 12340
+            
+            $result | Should -Be $false
+        }
+
+        It "Pasa el rango y las extensiones configuradas" {
+            Test-CodeChanges -Changelist 12345 -FromCL 12343
+
+            Should -Invoke Get-ChangedFiles -Times 1 -Exactly -ParameterFilter {
+                $ToCL -eq 12345 -and $FromCL -eq 12343 -and ($Extensions -contains '.build.cs')
+            }
+        }
+    }
+
+    Context "Caso: Lista de archivos" {
+
+        It "Muestra los archivos que provocan el build" {
+            Test-CodeChanges -Changelist 12345 -FromCL 12343
+
+            Should -Invoke Write-Host -ParameterFilter { $Object -match "Player\.cpp#5" }
+            Should -Invoke Write-Host -ParameterFilter { $Object -match "Code files changed: 2 in 2 changelist" }
+        }
+
+        It "Muestra los changelists que provocan el build con autor" {
+            Mock Get-ChangedFiles {
+                return @(
+                    [PSCustomObject]@{ DepotFile = "//depot/Source/A.cpp"; Revision = 2; Action = "edit"; Change = 12344; User = "ana"; Description = "Fix jump" },
+                    [PSCustomObject]@{ DepotFile = "//depot/Source/B.cpp"; Revision = 4; Action = "edit"; Change = 12345; User = "luis"; Description = "New weapon" }
+                )
+            }
+
+            Test-CodeChanges -Changelist 12345 -FromCL 12343
+
+            Should -Invoke Write-Host -ParameterFilter { $Object -match "CL 12345 by luis: New weapon \(1 file" }
+            Should -Invoke Write-Host -ParameterFilter { $Object -match "CL 12344 by ana: Fix jump" }
+        }
+
+        It "Limita la consola y escribe todos en el log" {
+            Mock Get-ChangedFiles {
+                return @(1..30 | ForEach-Object {
+                    [PSCustomObject]@{ DepotFile = "//depot/Source/File$_.cpp"; Revision = 1; Action = "add"; Change = 12345 }
+                })
+            }
+
+            Test-CodeChanges -Changelist 12345 -FromCL 12343
+
+            Should -Invoke Write-Host -Times 20 -Exactly -ParameterFilter { $Object -match "^  //depot/Source/File" }
+            Should -Invoke Write-Host -ParameterFilter { $Object -match "and 10 more" }
+            Should -Invoke Write-Log -ParameterFilter { $Message -match "File1\.cpp" -and $Message -match "File30\.cpp" }
+        }
+    }
+
+    Context "Caso: Decisión por módulos" {
+
+        It "No construye cuando solo cambian archivos de configuración o scripts" {
+            Mock Get-BuildDecision {
+                return [PSCustomObject]@{
+                    build = $false
+                    categories = [PSCustomObject]@{ compile = 0; config = 1; script = 1; other = 0 }
+                    modules = @()
+                    plugins = @()
+                    unowned = @()
+                }
+            }
+
+            $result = Test-CodeChanges -Changelist 12345 -FromCL 12343
+
+            $result | Should -Be $false
+            Should -Invoke Write-Host -ParameterFilter { $Object -match "Only config/script files changed \(1 config, 1 script" }
+        }
+
+        It "Muestra y guarda los módulos afectados" {
+            Mock Get-BuildDecision {
+                return [PSCustomObject]@{
+                    build = $true
+                    categories = [PSCustomObject]@{ compile = 2; config = 0; script = 0; other = 0 }
+                    modules = @(
+                        [PSCustomObject]@{ name = "Inventory"; plugin = "Inventory"; files = 1 },
+                        [PSCustomObject]@{ name = "MyGame"; plugin = $null; files = 1 }
+                    )
+                    plugins = @("Inventory")
+                    unowned = @()
+                }
+            }
+
+            $result = Test-CodeChanges -Changelist 12345 -FromCL 12343
+
+            $result | Should -Be $true
+            $script:runState.AffectedModules | Should -Be @("Inventory", "MyGame")
+            Should -Invoke Write-Host -ParameterFilter { $Object -match "Affected modules: Inventory, MyGame" }
+        }
+
+        It "Construye como antes cuando el resolver no está disponible" {
+            $result = Test-CodeChanges -Changelist 12345 -FromCL 12343
+
+            $result | Should -Be $true
+            Should -Invoke Get-BuildDecision -Times 1 -Exactly
+        }
+    }
+
+    Context "Caso: Manejo de excepciones" {
+
+        It "Retorna true cuando p4 files lanza excepción" {
+            Mock Get-ChangedFiles {
+                throw "Network timeout"
+            }
+
+            $result = Test-CodeChanges -Changelist 12345 -FromCL 12340
+
+            $result | Should -Be $true
+        }
+
+        It "Escribe log WARNING cuando hay excepción" {
+            Mock Get-ChangedFiles {
+                throw "Access denied"
+            }
+
+            Test-CodeChanges -Changelist 12345 -FromCL 12340
+
+            Should -Invoke Write-Log -ParameterFilter {
+                $Message -match "Could not check for code changes" -and
+                $Message -match "Access denied" -and
+                $Level -eq "WARNING"
+            }
+        }
+
+        It "Retorna true en caso de error (fail-safe behavior)" {
+            Mock Get-ChangedFiles {
+                throw "Critical error"
+            }
+
+            $result = Test-CodeChanges -Changelist 999
+
+            $result | Should -Be $true
+        }
+
+        It "Siempre restaura la ubicación" {
+            Mock Get-ChangedFiles {
+                throw "Critical error"
+            }
+
+            Test-CodeChanges -Changelist 999
+
+            Should -Invoke Pop-Location -Times 1 -Exactly
+        }
+    }
+}
+
+Describe "Get-BuildDecision" -Tag "FuncionesTests" {
+
+    BeforeEach {
+        $script:projectRoot = "C:\MyProject"
+        $files = @(
+            [PSCustomObject]@{ DepotFile = "//depot/Source/MyGame/Player.cpp"; Revision = 5; Action = "edit"; Change = 12345 },
+            [PSCustomObject]@{ DepotFile = "//depot/Config/DefaultGame.ini"; Revision = 2; Action = "edit"; Change = 12345 }
+        )
+
+        Mock Write-Log {}
+        Mock Invoke-PythonTool {
+            param($Script, $Arguments)
+            $script:listedFiles = Get-Content -Path $Arguments[3]
+            return [PSCustomObject]@{ build = $true; modules = @([PSCustomObject]@{ name = "MyGame" }); plugins = @(); unowned = @() }
+        }
+    }
+
+    It "Pasa los archivos al resolver en un archivo de lista" {
+        $decision = Get-BuildDecision -Files $files
+
+        $decision.build | Should -Be $true
+        $script:listedFiles | Should -Be @("//depot/Source/MyGame/Player.cpp", "//depot/Config/DefaultGame.ini")
+        Should -Invoke Invoke-PythonTool -Times 1 -Exactly -ParameterFilter {
+            $Script -eq "module_resolver.py" -and $Arguments[0] -eq "--root" -and $Arguments[1] -eq "C:\MyProject" -and $Arguments[2] -eq "--files-from"
+        }
+    }
+
+    It "Borra el archivo de lista al terminar" {
+        Get-BuildDecision -Files $files
+
+        Test-Path (Join-Path ([System.IO.Path]::GetTempPath()) "sync_and_build_changed_$PID.txt") | Should -Be $false
+    }
+
+    It "Devuelve null cuando el resolver no puede ejecutarse" {
+        Mock Invoke-PythonTool { return $null }
+
+        Get-BuildDecision -Files $files | Should -BeNullOrEmpty
+    }
+
+    It "Con -Local pasa rutas del workspace sin p4 where" {
+        Get-BuildDecision -Files @("Source/MyGame/Private/Player.cpp") -Local | Out-Null
+
+        $script:listedFiles | Should -Be @("Source/MyGame/Private/Player.cpp")
+        Should -Invoke Invoke-PythonTool -Times 1 -Exactly -ParameterFilter { $Arguments -contains "--local" }
+    }
+}
+
+Describe "Get-SourceChanges" -Tag "FuncionesTests" {
+
+    BeforeEach {
+        $script:projectRoot = "C:\MyProject"
+        Mock Write-Log {}
+        Mock Get-ConfigValue {
+            param($Path, $DefaultValue)
+            return $DefaultValue
+        }
+    }
+
+    It "Devuelve los archivos editados, añadidos y borrados" {
+        Mock Invoke-PythonTool {
+            return [PSCustomObject]@{
+                manifest = $true
+                changed = @("Source/MyGame/Private/Player.cpp")
+                added = @("Source/MyGame/Private/Enemy.cpp", "Source/MyGame/Public/Enemy.h")
+                removed = @()
+                scanned = 120
+                hashed = 3
+            }
+        }
+
+        $changes = Get-SourceChanges
+
+        $changes.Count | Should -Be 3
+        $changes.Added.Count | Should -Be 2
+        $changes.Removed.Count | Should -Be 0
+        Should -Invoke Invoke-PythonTool -ParameterFilter {
+            $Script -eq "source_manifest.py" -and $Arguments[1] -eq "C:\MyProject" -and $Arguments[-1] -eq "diff"
+        }
+    }
+
+    It "Devuelve null cuando todavía no hay manifiesto" {
+        Mock Invoke-PythonTool { return [PSCustomObject]@{ manifest = $false } }
+
+        Get-SourceChanges | Should -BeNullOrEmpty
+    }
+
+    It "Devuelve null sin consultar cuando build.useSourceManifest está apagado" {
+        Mock Get-ConfigValue { return $false }
+        Mock Invoke-PythonTool { }
+
+        Get-SourceChanges | Should -BeNullOrEmpty
+        Should -Invoke Invoke-PythonTool -Times 0
+    }
+}
+
+Describe "Test-SourceChangesNeedBuild" -Tag "FuncionesTests" {
+
+    BeforeEach {
+        $script:runState = @{ AffectedModules = @("Inventory") }
+        Mock Write-Host {}
+        Mock Write-Log {}
+        Mock Get-BuildDecision {
+            return [PSCustomObject]@{ build = $true; modules = @([PSCustomObject]@{ name = "MyGame" }); plugins = @(); unowned = @() }
+        }
+    }
+
+    It "Construye con cambios locales y suma sus módulos a los del changelist" {
+        $changes = [PSCustomObject]@{ Changed = @("Source/MyGame/Private/Player.cpp"); Added = @(); Removed = @(); Count = 1 }
+
+        Test-SourceChangesNeedBuild -SourceChanges $changes -SyncedCodeChanges $false | Should -Be $true
+
+        Should -Invoke Get-BuildDecision -Times 1 -Exactly -ParameterFilter { $Local -and $Files -contains "Source/MyGame/Private/Player.cpp" }
+        $script:runState.AffectedModules | Should -Be @("Inventory", "MyGame")
+    }
+
+    It "No construye cuando el código sincronizado coincide con el último build" {
+        $changes = [PSCustomObject]@{ Changed = @(); Added = @(); Removed = @(); Count = 0 }
+
+        Test-SourceChangesNeedBuild -SourceChanges $changes -SyncedCodeChanges $true | Should -Be $false
+
+        Should -Invoke Get-BuildDecision -Times 0
+        $script:runState.AffectedModules.Count | Should -Be 0
+        Should -Invoke Write-Host -ParameterFilter { $Object -match "Synced code files match the last build" }
+    }
+}
+
+Describe "Save-SourceManifest" -Tag "FuncionesTests" {
+
+    BeforeEach {
+        $script:projectRoot = "C:\MyProject"
+        Mock Write-Log {}
+        Mock Get-ConfigValue {
+            param($Path, $DefaultValue)
+            return $DefaultValue
+        }
+        Mock Invoke-PythonTool { return [PSCustomObject]@{ files = 10; hashed = 10; skipped = 0 } }
+    }
+
+    It "Pasa el inicio del build como --not-after en segundos Unix" {
+        Save-SourceManifest -BuildStart ([DateTimeOffset]::FromUnixTimeSeconds(1735120000).UtcDateTime)
+
+        Should -Invoke Invoke-PythonTool -Times 1 -Exactly -ParameterFilter {
+            $Script -eq "source_manifest.py" -and ($Arguments -join " ") -match "save --not-after 1735120000$"
+        }
+    }
+}
+
+Describe "Test-ProjectBinariesExist" -Tag "FuncionesTests" {
+
+    BeforeAll {
+        . "$PSScriptRoot\..\Source\sync_and_build.ps1"
+    }
+
+    BeforeEach {
+        $script:projectRoot = "C:\MyProject"
+        $script:projectName = "MyGame"
+
+        Mock Write-Log { }
+    }
+
+    Context "Caso: Binarios existen" {
+
+        It "Retorna true cuando el archivo DLL existe" {
+            Mock Test-Path {
+                param($Path)
+                if ($Path -match "UnrealEditor-MyGame\.dll") {
+                    return $true
+                }
+                return $false
+            }
+
+            $result = Test-ProjectBinariesExist
+
+            $result | Should -Be $true
+        }
+
+        It "Construye la ruta correcta del binario" {
+            $capturedPath = $null
+            Mock Test-Path {
+                param($Path)
+                $script:capturedPath = $Path
+                return $true
+            }
+
+            Test-ProjectBinariesExist
+
+            $script:capturedPath | Should -Be "C:\MyProject\MyGame\Binaries\Win64\UnrealEditor-MyGame.dll"
+        }
+
+        It "Escribe log VERBOSE cuando binario existe" {
+            Mock Test-Path { return $true }
+
+            Test-ProjectBinariesExist
+
+            Should -Invoke Write-Log -ParameterFilter {
+                $Message -match "Checking for project binary" -and
+                $Message -match "UnrealEditor-MyGame\.dll" -and
+                $Message -match "Exists: True" -and
+                $Level -eq "VERBOSE"
+            }
+        }
+    }
+
+    Context "Caso: Binarios no existen" {
+
+        It "Retorna false cuando el archivo DLL no existe" {
+            Mock Test-Path { return $false }
+
+            $result = Test-ProjectBinariesExist
+
+            $result | Should -Be $false
+        }
+
+        It "Escribe log VERBOSE cuando binario no existe" {
+            Mock Test-Path { return $false }
+
+            Test-ProjectBinariesExist
+
+            Should -Invoke Write-Log -ParameterFilter {
+                $Message -match "Checking for project binary" -and
+                $Message -match "UnrealEditor-MyGame\.dll" -and
+                $Message -match "Exists: False" -and
+                $Level -eq "VERBOSE"
+            }
+        }
+    }
+
+    Context "Caso: Diferentes nombres de proyecto" {
+
+        It "Construye ruta correcta con nombre simple" {
+            $script:projectName = "TestGame"
+            $capturedPath = $null
+            Mock Test-Path {
+                param($Path)
+                $script:capturedPath = $Path
+                return $true
+            }
+
+            Test-ProjectBinariesExist
+
+            $script:capturedPath | Should -Match "UnrealEditor-TestGame\.dll"
+        }
+
+        It "Construye ruta correcta con nombre complejo" {
+            $script:projectName = "MyAwesomeGame"
+            $capturedPath = $null
+            Mock Test-Path {
+                param($Path)
+                $script:capturedPath = $Path
+                return $true
+            }
+
+            Test-ProjectBinariesExist
+
+            $script:capturedPath | Should -Match "UnrealEditor-MyAwesomeGame\.dll"
+        }
+
+        It "Usa el projectRoot configurado" {
+            $script:projectRoot = "C:\Projects\GameDev"
+            $capturedPath = $null
+            Mock Test-Path {
+                param($Path)
+                $script:capturedPath = $Path
+                return $true
+            }
+
+            Test-ProjectBinariesExist
+
+            $script:capturedPath | Should -Match "^C:\\Projects\\GameDev\\"
+        }
+    }
+
+    Context "Caso: Verificación de estructura de ruta" {
+
+        It "Incluye carpeta Binaries en la ruta" {
+            $capturedPath = $null
+            Mock Test-Path {
+                param($Path)
+                $script:capturedPath = $Path
+                return $true
+            }
+
+            Test-ProjectBinariesExist
+
+            $script:capturedPath | Should -Match "\\Binaries\\"
+        }
+
+        It "Incluye carpeta Win64 en la ruta" {
+            $capturedPath = $null
+            Mock Test-Path {
+                param($Path)
+                $script:capturedPath = $Path
+                return $true
+            }
+
+            Test-ProjectBinariesExist
+
+            $script:capturedPath | Should -Match "\\Win64\\"
+        }
+
+        It "Usa formato UnrealEditor-[ProjectName].dll" {
+            $capturedPath = $null
+            Mock Test-Path {
+                param($Path)
+                $script:capturedPath = $Path
+                return $true
+            }
+
+            Test-ProjectBinariesExist
+
+            $script:capturedPath | Should -Match "UnrealEditor-.*\.dll$"
+        }
+    }
+}
+
+# =============================================================================
+# TESTS DE UNREAL ENGINE
+# =============================================================================
+
+Describe "Find-UnrealEngine" -Tag "UnrealEngine" {
+    
+    BeforeAll {
+        . "$PSScriptRoot\..\Source\sync_and_build.ps1"
+    }
+    
+    BeforeEach {
+        $script:CONSTANTS = @{
+            Paths = @{
+                UnrealBuildBat = "Engine\Build\BatchFiles\Build.bat"
+            }
+            EngineSearchRoots = @(
+                "C:\Program Files\Epic Games",
+                "C:\Epic Games",
+                "C:\Apps\UE_Engines",
+                "C:\UE"
+            )
+        }
+        
+        Mock Write-Host { }
+        Mock Write-Log { }
+    }
+    
+    Context "Caso: No encuentra instalaciones" {
+        
+        It "Muestra mensaje cuando no hay instalaciones en rutas comunes" {
+            
+            Mock Test-Path { return $false }
+            Mock Get-ChildItem { return @() }
+            
+            Mock Read-Host { return "B" }
+            
+            Mock New-Object {
+                param($TypeName)
+                
+                if ($TypeName -eq "System.Windows.Forms.Form") {
+                    $form = [PSCustomObject]@{
+                        TopMost = $true
+                        WindowState = $null
+                        ShowInTaskbar = $null
+                    }
+                    
+                    $form | Add-Member -MemberType ScriptMethod -Name "Dispose" -Value { }
+                    return $form
+                }
+                
+                if ($TypeName -eq "System.Windows.Forms.FolderBrowserDialog") {
+                    $dialogForm = [PSCustomObject]@{
+                        Description = $null
+                        RootFolder = $null
+                        SelectedPath = ""
+                    }
+
+                    $dialogForm | Add-Member -MemberType ScriptMethod -Name "ShowDialog" -Value { return "Cancel" }
+                    return $dialogForm
+                }
+            }
+            
+            $result = Find-UnrealEngine
+            
+            $result | Should -Be $null
+            
+            Should -Invoke Write-Host -ParameterFilter {
+                $Object -match "No Unreal Engine installations found"
+            }
+        }
+    }
+    
+    Context "Caso: Encuentra una instalación" {
+        
+        It "Retorna la ruta cuando encuentra una sola instalación" {
+            Mock Test-Path {
+                param($Path)
+                
+                if ($Path -eq "C:\Program Files\Epic Games") {
+                    return $true
+                }
+                
+                if ($Path -match "Build\.bat") {
+                    return $true
+                }
+                
+                return $false
+            }
+            
+            Mock Get-ChildItem {
+                return @(
+                    [PSCustomObject]@{
+                        Name = "UE_5.3"
+                        FullName = "C:\Program Files\Epic Games\UE_5.3"
+                    }
+                )
+            }
+            
+            Mock Read-Host { return "1" }
+            
+            $result = Find-UnrealEngine
+            
+            $result | Should -Be "C:\Program Files\Epic Games\UE_5.3"
+        }
+        
+        It "Extrae versión correctamente del nombre del directorio" {
+            Mock Test-Path {
+                param($Path)
+                
+                if ($Path -eq "C:\UE") {
+                    return $true
+                }
+                
+                if ($Path -match "Build\.bat") {
+                    return $true
+                }
+                
+                return $false
+            }
+            
+            Mock Get-ChildItem -ParameterFilter {$Directory} {
+                return @(
+                    [PSCustomObject]@{
+                        Name = "UE_5.3"
+                        FullName = "C:\UE\UE_5.3"
+                    }
+                )
+            }
+            
+            Mock Read-Host { return "1" }
+            $cmd = Get-Command Get-ChildItem | Format-List *
+            $cmd | Should -Not -BeNullOrEmpty
+            $result = Find-UnrealEngine
+            
+            $result | Should -Be "C:\UE\UE_5.3"
+        }
+    }
+    
+    Context "Caso: Encuentra múltiples instalaciones" {
+        
+        It "Permite seleccionar entre múltiples instalaciones" {
+            Mock Test-Path { 
+                param($Path)
+                
+                if ($Path -eq "C:\Epic Games") {
+                    return $true
+                }
+                
+                if ($Path -match "Build\.bat") {
+                    return $true
+                }
+                
+                return $false
+            }
+            
+            Mock Get-ChildItem {
+                return @(
+                    [PSCustomObject]@{
+                        Name = "UE_5.3"
+                        FullName = "C:\Epic Games\UE_5.3"
+                    },
+                    [PSCustomObject]@{
+                        Name = "UE_5.4"
+                        FullName = "C:\Epic Games\UE_5.4"
+                    },
+                    [PSCustomObject]@{
+                        Name = "UnrealEngine-5.5"
+                        FullName = "C:\Epic Games\UnrealEngine-5.5"
+                    }
+                )
+            }
+            
+            Mock Read-Host { return "2" }
+            
+            $result = Find-UnrealEngine
+            
+            $result | Should -Be "C:\Epic Games\UE_5.4"
+            
+            Should -Invoke Write-Host -ParameterFilter {
+                $Object -match "Found 3 installation\(s\)"
+            }
+        }
+        
         It "Rechaza selección inválida y pide de nuevo" {
             Mock Test-Path { 
                 param($Path)
-                
-                if ($Path -eq "C:\UE") {
+                
+                if ($Path -eq "C:\UE") {
+                    return $true
+                }
+                
+                if ($Path -match "Build\.bat") {
+                    return $true
+                }
+                
+                return $false
+            }
+            
+            Mock Get-ChildItem {
+                return @(
+                    [PSCustomObject]@{
+                        Name = "UE_5.3"
+                        FullName = "C:\UE\UE_5.3"
+                    }
+                )
+            }
+            
+            $script:callCount = 0
+            
+            # Primera llamada: selección inválida
+            # Segunda llamada: selección válida
+            Mock Read-Host {
+                $script:callCount++
+                if ($script:callCount -eq 1) {
+                    return "99"  # Inválido
+                }
+                return "1"  # Válido
+            }
+            
+            $result = Find-UnrealEngine
+            
+            $result | Should -Be "C:\UE\UE_5.3"
+            
+            # Verificar que pidió dos veces
+            Should -Invoke Read-Host -Times 2
+            
+            # Verificar que mostró mensaje de error
+            Should -Invoke Write-Host -ParameterFilter {
+                $Object -match "Invalid choice"
+            }
+        }
+    }
+    
+    Context "Caso: Browse (selección manual)" {
+        
+        It "Permite navegar a ubicación personalizada" {
+            Mock Test-Path {
+                param($Path)
+                
+                if ($Path -match "Program Files|Epic Games|Apps") {
+                    return $false
+                }
+                
+                if ($Path -match "CustomPath.*Build\.bat") {
+                    return $true
+                }
+                
+                return $false
+            }
+            
+            Mock Get-ChildItem { return @() }
+            
+            Mock Read-Host { return "B" }
+
+            Mock Join-Path {
+                param($Path, $ChildPath)
+                return "$Path\$ChildPath"
+            }
+            
+            Mock New-Object {
+                param($TypeName)
+                
+                if ($TypeName -eq "System.Windows.Forms.Form") {
+                    $form = [PSCustomObject]@{
+                        TopMost = $null
+                        WindowState = $null
+                        ShowInTaskbar = $null
+                    }
+
+                    $form | Add-Member -MemberType ScriptMethod -Name "Dispose" -Value { }
+                    return $form
+                }
+                
+                if ($TypeName -eq "System.Windows.Forms.FolderBrowserDialog") {
+                    $form = [PSCustomObject]@{
+                        Description = $null
+                        RootFolder = $null
+                        SelectedPath = "D:\CustomPath\UE_5.6"
+                    }
+                    $form | Add-Member -MemberType ScriptMethod -Name "ShowDialog" -Value { return "OK" }
+                    return $form
+                }
+            }
+            
+            $result = Find-UnrealEngine
+            
+            $result | Should -Be "D:\CustomPath\UE_5.6"
+        }
+        
+        It "Valida que la ruta seleccionada tenga Build.bat" {
+            Mock Test-Path {
+                param($Path)
+
+                if ($Path -match "Build\.bat") {
+                    if ($script:validateCount -eq 0) {
+                        $script:validateCount = 1
+                        return $false
+                    }
+                    return $true
+                }
+                
+                return $false
+            }
+            
+            Mock Get-ChildItem { return @() }
+            
+            $script:validateCount = 0
+            
+            Mock Read-Host {
+                return "B"
+            }
+            
+            Mock New-Object {
+                param($TypeName)
+                    
+                if ($TypeName -eq "System.Windows.Forms.Form") {
+                        $form = [PSCustomObject]@{
+                            TopMost = $null
+                            WindowState = $null
+                            ShowInTaskbar = $null
+                        }
+                        $form | Add-Member -MemberType ScriptMethod -Name "Dispose" -Value { }
+                        return $form
+                }
+                
+                if ($TypeName -eq "System.Windows.Forms.FolderBrowserDialog") {
+                    $script:dialogCount++
+                    
+                    # Primera vez: ruta inválida
+                    if ($script:dialogCount -eq 1) {
+                        $form = [PSCustomObject]@{
+                            Description = $null
+                            RootFolder = $null
+                            SelectedPath = "C:\InvalidPath"
+                        }
+                        $form | Add-Member -MemberType ScriptMethod -Name "ShowDialog" -Value { return "OK" }
+                        return $form
+                    }
+                }
+                        
+                # Segunda vez: ruta válida
+                $form = [PSCustomObject]@{
+                    Description = $null
+                    RootFolder = $null
+                    SelectedPath = "C:\ValidPath\UE_5.3"
+                }
+                $form | Add-Member -MemberType ScriptMethod -Name "ShowDialog" -Value { return "OK" }
+                return $form
+            }
+            
+            
+            $script:dialogCount = 0
+            
+            Find-UnrealEngine
+            
+            Should -Invoke Write-Host -ParameterFilter {
+                $Object -match "Invalid Unreal Engine installation"
+            }
+            
+            # Verificar que pidió dos veces
+            $script:dialogCount | Should -Be 2
+        }
+        
+        It "Retorna null si usuario cancela el browse" {
+            Mock Test-Path { return $false }
+            Mock Get-ChildItem { return @() }
+            Mock Read-Host { return "B" }
+            
+            Mock New-Object {
+                param($TypeName)
+                
+                if ($TypeName -eq "System.Windows.Forms.Form") {
+                    $form = [PSCustomObject]@{
+                        TopMost = $null
+                        WindowState = $null
+                        ShowInTaskbar = $null
+                    }
+                    $form | Add-Member -MemberType ScriptMethod -Name "Dispose" -Value { }
+                    return $form
+                }
+                
+                if ($TypeName -eq "System.Windows.Forms.FolderBrowserDialog") {
+                    $form = [PSCustomObject]@{
+                        Description = $null
+                        RootFolder = $null
+                        SelectedPath = ""
+                    }
+                    $form | Add-Member -MemberType ScriptMethod -Name "ShowDialog" -Value { return "Cancel" }
+                    return $form
+                }
+            }
+            
+            Find-UnrealEngine
+            
+            Should -Invoke Write-Host -ParameterFilter {
+                $Object -match "Selection cancelled"
+            }
+        }
+    }
+    
+    Context "Caso: Patrones de nombres de directorios" {
+        
+        It "Reconoce formato UE_X.X" {
+            Mock Test-Path { return $true }
+            Mock Read-Host { return "1" }
+            
+            Mock Get-ChildItem {
+                return @(
+                    [PSCustomObject]@{
+                        Name = "UE_5.3"
+                        FullName = "C:\UE\UE_5.3"
+                    }
+                )
+            }
+            
+            $result = Find-UnrealEngine
+            
+            $result | Should -Not -BeNullOrEmpty
+        }
+        
+        It "Reconoce formato UnrealEngine-X.X" {
+            Mock Test-Path { 
+                if ($Path -eq "C:\UE") {
+                    return $true
+                }
+                
+                if ($Path -match "Build\.bat") {
+                    return $true
+                }
+                
+                return $false
+            }
+
+            Mock Read-Host { return "1" }
+            
+            Mock Get-ChildItem {
+                return @(
+                    [PSCustomObject]@{
+                        Name = "UnrealEngine-5.3"
+                        FullName = "C:\UE\UnrealEngine-5.3"
+                    }
+                )
+            }
+            
+            $result = Find-UnrealEngine
+            
+            $result | Should -Not -BeNullOrEmpty
+        }
+        
+        It "Reconoce formato UE5.3 (sin guión bajo)" {
+            Mock Test-Path { return $true }
+            Mock Read-Host { return "1" }
+            
+            Mock Get-ChildItem {
+                return @(
+                    [PSCustomObject]@{
+                        Name = "UE5.3"
+                        FullName = "C:\UE\UE5.3"
+                    }
+                )
+            }
+            
+            $result = Find-UnrealEngine
+            
+            $result | Should -Not -BeNullOrEmpty
+        }
+        
+        It "Ignora directorios que no coinciden con el patrón" {
+            Mock Test-Path { return $true }
+            
+            Mock Get-ChildItem {
+                return @(
+                    [PSCustomObject]@{
+                        Name = "SomeOtherFolder"
+                        FullName = "C:\Epic Games\SomeOtherFolder"
+                    },
+                    [PSCustomObject]@{
+                        Name = "UE_5.3"
+                        FullName = "C:\Epic Games\UE_5.3"
+                    }
+                )
+            }
+            
+            Mock Read-Host { return "1" }
+            
+            Find-UnrealEngine
+            
+            Should -Invoke Write-Host -ParameterFilter {
+                $Object -match "Found 1 installation"
+            }
+        }
+    }
+    
+    Context "Caso: Búsqueda en múltiples rutas" {
+        
+        It "Busca en todas las rutas predefinidas" {
+            $script:pathsChecked = @()
+            
+            Mock Test-Path {
+                param($Path)
+                
+                if ($Path -notmatch "Build\.bat") {
+                    $script:pathsChecked += $Path
+                }
+                
+                return $false
+            }
+            
+            Mock Get-ChildItem { return @() }
+            Mock Read-Host { return "B" }
+            
+            Mock New-Object {
+                if ($TypeName -eq "System.Windows.Forms.FolderBrowserDialog") {
+                    $form = [PSCustomObject]@{
+                        RootFolder = $null
+                        Description = $null
+                        SelectedPath = $null
+                    }
+                    $form | Add-Member -MemberType ScriptMethod -Name "ShowDialog" -Value { return "Cancel" }
+                    return $form
+                }
+
+                $form = [PSCustomObject]@{
+                    TopMost = $null
+                    WindowState = $null
+                    ShowInTaskbar = $null
+                }
+                $form | Add-Member -MemberType ScriptMethod -Name "Dispose" -Value { }
+                return $form
+            }
+            
+            Find-UnrealEngine
+            
+            $script:pathsChecked | Should -Contain "C:\Program Files\Epic Games"
+            $script:pathsChecked | Should -Contain "C:\Epic Games"
+            $script:pathsChecked | Should -Contain "C:\UE"
+        }
+    }
+    
+    Context "Caso: Form TopMost" {
+        
+        It "Crea Form con TopMost para que el diálogo aparezca al frente" {
+            Mock Test-Path { return $false }
+            Mock Get-ChildItem { return @() }
+            Mock Read-Host { return "B" }
+            
+            $script:formCreated = $null
+            
+            Mock New-Object {
+                param($TypeName)
+                
+                if ($TypeName -eq "System.Windows.Forms.Form") {
+                    $form = [PSCustomObject]@{
+                        TopMost = $null
+                        WindowState = $null
+                        ShowInTaskbar = $null
+                    }
+                    $form | Add-Member -MemberType ScriptMethod -Name "Dispose" -Value { }
+                    $script:formCreated = $form
+                    return $form
+                }
+                
+                if ($TypeName -eq "System.Windows.Forms.FolderBrowserDialog") {
+                    $form = [PSCustomObject]@{
+                        Description = $null
+                        RootFolder = $null
+                        SelectedPath = ""
+                    }
+                    $form | Add-Member -MemberType ScriptMethod -Name "ShowDialog" -Value { return "Cancel" }
+                    return $form
+                }
+            }
+            
+            Find-UnrealEngine
+            
+            $script:formCreated | Should -Not -BeNullOrEmpty
+            
+            # Verificar que se configuró TopMost
+            # (Nota: Esto verifica que se ASIGNÓ, no el valor específico)
+            $script:formCreated.PSObject.Properties.Name | Should -Contain "TopMost"
+        }
+    }
+}
+
+Describe "Get-UnrealEngineRoot" -Tag "UnrealEngine" {
+
+    BeforeAll {
+        . "$PSScriptRoot\..\Source\sync_and_build.ps1"
+    }
+
+    BeforeEach {
+        $script:CONSTANTS = @{
+            ConfigKeys = @{
+                EnginePath = "UnrealEnginePath"
+                EngineVersion = "UnrealEngineVersion"
+            }
+            Paths = @{
+                UnrealBuildBat = "Engine\Build\BatchFiles\Build.bat"
+            }
+        }
+
+        Mock Write-Host { }
+        Mock Write-Log { }
+        Mock Write-Header { }
+        Mock Find-EngineFromIndex { return $null }
+    }
+
+    Context "Caso: Ruta guardada válida en config" {
+
+        It "Retorna ruta guardada cuando existe y es válida" {
+            $script:validPath = "C:\UE_5.3"
+
+            Mock Get-ConfigValue {
+                param($Key)
+                return $script:validPath
+            }
+
+            Mock Test-Path {
+                param($Path)
+                return $true
+            }
+
+            $result = Get-UnrealEngineRoot
+
+            $result | Should -Be $validPath
+
+            Should -Invoke Write-Log -ParameterFilter {
+                $Message -match "Using UE installation" -and $Level -eq "VERBOSE"
+            }
+        }
+
+        It "No llama a Find-UnrealEngine cuando la ruta guardada es válida" {
+            Mock Get-ConfigValue { return "C:\UE_5.3" }
+            Mock Test-Path { return $true }
+            Mock Find-UnrealEngine { }
+
+            Get-UnrealEngineRoot
+
+            Should -Not -Invoke Find-UnrealEngine
+        }
+    }
+
+    Context "Caso: Ruta guardada inválida o no existe" {
+
+        It "Solicita nueva selección cuando Build.bat no existe en ruta guardada" {
+            $script:invalidPath = "C:\InvalidUE"
+            $script:newValidPath = "C:\UE_5.4"
+
+            Mock Get-ConfigValue {
+                param($Key)
+                return $script:invalidPath
+            }
+
+            Mock Test-Path {
+                param($Path)
+
+                if ($Path -match "InvalidUE.*Build\.bat") {
+                    return $false
+                }
+                return $true
+            }
+
+            Mock Find-UnrealEngine { return $script:newValidPath }
+            Mock Set-ConfigValue { }
+
+            $result = Get-UnrealEngineRoot
+
+            $result | Should -Be $script:newValidPath
+
+            Should -Invoke Find-UnrealEngine -Times 1
+
+            Should -Invoke Write-Log -ParameterFilter {
+                $Message -match "Saved UE path is invalid" -and $Level -eq "WARNING"
+            }
+        }
+    }
+
+    Context "Caso: Configuración de nueva instalación" {
+
+        It "Guarda la nueva ruta en config cuando se selecciona" {
+            $script:selectedPath = "C:\UE_5.3"
+
+            Mock Get-ConfigValue { return $null }
+            Mock Find-UnrealEngine { return $script:selectedPath }
+
+            $script:capturedVersion = $null
+            $script:capturedPath = $null
+            
+            Mock Set-ConfigValue {
+                param($Path, $Value)
+                if ($Path -eq $script:CONSTANTS.ConfigKeys.EnginePath) {
+                    $script:capturedPath = $Value
+                }
+                elseif ($Path -eq $script:CONSTANTS.ConfigKeys.EngineVersion) {
+                    $script:capturedVersion = $Value
+                }
+            }
+
+            $result = Get-UnrealEngineRoot
+
+            $result | Should -Be $script:selectedPath
+
+            Should -Invoke Write-Log -ParameterFilter {
+                $Message -match "UE path saved to config" -and $Level -eq "INFO"
+            }
+
+            Should -Invoke Write-Log -ParameterFilter {
+                $Message -match "Detected UE version: 5\.3"
+            }
+
+            $script:capturedPath | Should -Be $script:selectedPath
+
+            $script:capturedVersion | Should -Be "5.3"
+        }
+
+        It "Detecta versiones con diferentes formatos" {
+            $testCases = @(
+                @{ Path = "C:\UE_5.4.1"; ExpectedVersion = "5.4.1" }
+                @{ Path = "C:\UnrealEngine-5.3"; ExpectedVersion = "5.3" }
+                @{ Path = "C:\Epic Games\UE 5.2"; ExpectedVersion = "5.2" }
+                @{ Path = "C:\Apps\UE_Engines\5.1.0"; ExpectedVersion = "5.1.0" }
+            )
+
+            foreach ($case in $testCases) {
+                Mock Get-ConfigValue { return $null }
+                Mock Find-UnrealEngine { return $case.Path }
+
+                $capturedVersion = $null
+                Mock Set-ConfigValue {
+                    param($Path, $Value)
+                    if ($Path -eq $script:CONSTANTS.ConfigKeys.EngineVersion) {
+                        $script:capturedVersion = $Value
+                    }
+                }
+
+                Get-UnrealEngineRoot
+
+                $script:capturedVersion | Should -Be $case.ExpectedVersion
+            }
+        }
+    }
+
+    Context "Caso: Usuario cancela selección" {
+
+        It "Lanza BuildException con detalles correctos" {
+            Mock Get-ConfigValue { return $null }
+            Mock Find-UnrealEngine { return $null }
+
+            try {
+                Get-UnrealEngineRoot
+                Should -Fail "Excepcion esperada no fue lanzada"
+            }
+            catch{
+                $_.Exception.Message | Should -Match "Setup cancelled or no valid Unreal Engine found"
+                $_.Exception.Category | Should -Be "Configuration"
+                $_.Exception.Suggestion | Should -Match "Install Unreal Engine and run the script again"
+            }
+        }
+    }
+
+    Context "Caso: Sin nadie en la consola" {
+
+        AfterEach {
+            $script:unattended = $false
+        }
+
+        It "Falla con un mensaje claro en lugar de preguntar" {
+            $script:unattended = $true
+            Mock Get-ConfigValue { return $null }
+            Mock Find-UnrealEngine { }
+
+            { Get-UnrealEngineRoot } | Should -Throw "*cannot ask for one*"
+
+            Should -Not -Invoke Find-UnrealEngine
+            Should -Not -Invoke Write-Header
+        }
+    }
+
+    Context "Caso: El índice de engines encuentra el EngineAssociation" {
+
+        BeforeEach {
+            $script:savedValues = @{}
+            Mock Set-ConfigValue {
+                param($Path, $Value)
+                $script:savedValues[$Path] = $Value
+            }
+            Mock Test-Path { return $true }
+            Mock Find-UnrealEngine { }
+        }
+
+        It "Usa y guarda el engine del índice sin preguntar" {
+            Mock Get-ConfigValue { return $null }
+            Mock Find-EngineFromIndex {
+                return [PSCustomObject]@{
+                    association = "5.4"
+                    match = [PSCustomObject]@{ path = "D:\Epic\UE_5.4"; version = "5.4.2"; reason = "EngineAssociation 5.4" }
+                    engines = @()
+                }
+            }
+
+            $result = Get-UnrealEngineRoot
+
+            $result | Should -Be "D:\Epic\UE_5.4"
+            $script:savedValues["UnrealEnginePath"] | Should -Be "D:\Epic\UE_5.4"
+            $script:savedValues["UnrealEngineVersion"] | Should -Be "5.4.2"
+            Should -Not -Invoke Find-UnrealEngine
+            Should -Not -Invoke Write-Header
+        }
+
+        It "Cambia la ruta guardada cuando el proyecto pide otro engine" {
+            Mock Get-ConfigValue {
+                param($Path)
+                if ($Path -eq "UnrealEnginePath") { return "C:\UE_5.3" }
+                return "5.3.2"
+            }
+            Mock Find-EngineFromIndex {
+                return [PSCustomObject]@{
+                    match = [PSCustomObject]@{ path = "C:\UE_5.4"; version = "5.4.0"; reason = "EngineAssociation 5.4" }
+                    engines = @()
+                }
+            }
+
+            Get-UnrealEngineRoot | Should -Be "C:\UE_5.4"
+
+            Should -Invoke Find-EngineFromIndex -ParameterFilter { $PreferredPath -eq "C:\UE_5.3" }
+            Should -Invoke Write-Log -ParameterFilter { $Message -match "Using UE 5\.4\.0 for the project" -and $Level -eq "INFO" }
+            $script:savedValues["UnrealEnginePath"] | Should -Be "C:\UE_5.4"
+        }
+
+        It "Lista los engines del índice cuando ninguno coincide" {
+            Mock Get-ConfigValue { return $null }
+            Mock Find-EngineFromIndex {
+                return [PSCustomObject]@{
+                    match = $null
+                    engines = @([PSCustomObject]@{ path = "C:\Source\UnrealEngine"; version = "5.5.0" })
+                }
+            }
+            Mock Find-UnrealEngine { return "C:\Source\UnrealEngine" }
+
+            Get-UnrealEngineRoot | Should -Be "C:\Source\UnrealEngine"
+
+            Should -Invoke Find-UnrealEngine -ParameterFilter { $Indexed.Count -eq 1 -and $Indexed[0].version -eq "5.5.0" }
+            $script:savedValues["UnrealEngineVersion"] | Should -Be "5.5.0"
+        }
+    }
+}
+
+Describe "Find-EngineFromIndex" -Tag "UnrealEngine" {
+
+    BeforeAll {
+        . "$PSScriptRoot\..\Source\sync_and_build.ps1"
+    }
+
+    BeforeEach {
+        $script:projectFile = "C:\MyProject\MyGame\MyGame.uproject"
+        Mock Write-Log { }
+        Mock Get-ConfigValue {
+            param($Path, $DefaultValue)
+            return $DefaultValue
+        }
+        Mock Get-ItemProperty { return $null }
+        Mock Invoke-PythonTool {
+            return [PSCustomObject]@{ engines = @(); association = "5.4"; match = $null; cached = $true }
+        }
+    }
+
+    It "Pasa el proyecto, las raíces de búsqueda y el engine guardado" {
+        Find-EngineFromIndex -PreferredPath "C:\UE_5.3" | Should -Not -BeNullOrEmpty
+
+        Should -Invoke Invoke-PythonTool -Times 1 -Exactly -ParameterFilter {
+            $joined = $Arguments -join " "
+            $Script -eq "engine_index.py" -and
+            $joined -match "--project C:\\MyProject\\MyGame\\MyGame\.uproject" -and
+            $joined -match "--search-root C:\\Program Files\\Epic Games" -and
+            $joined -match "--preferred C:\\UE_5\.3$"
+        }
+    }
+
+    It "Pasa las builds registradas en el registro como ID=ruta" {
+        Mock Get-ItemProperty {
+            return [PSCustomObject]@{
+                "{4C5E2D1A-0000-4B3C-9D2E-6F7A8B9C0D1E}" = "D:\Source\UnrealEngine"
+                PSPath = "Microsoft.PowerShell.Core\Registry::HKEY_CURRENT_USER\Software\Epic Games\Unreal Engine\Builds"
+            }
+        }
+
+        Find-EngineFromIndex
+
+        Should -Invoke Invoke-PythonTool -ParameterFilter {
+            $registered = @($Arguments | Where-Object { $_ -like "*=*" })
+            $registered.Count -eq 1 -and $registered[0] -eq "{4C5E2D1A-0000-4B3C-9D2E-6F7A8B9C0D1E}=D:\Source\UnrealEngine"
+        }
+    }
+
+    It "Devuelve null sin consultar cuando unrealEngine.useIndex está apagado" {
+        Mock Get-ConfigValue { return $false }
+
+        Find-EngineFromIndex | Should -BeNullOrEmpty
+        Should -Invoke Invoke-PythonTool -Times 0
+    }
+}
+
+Describe "Test-UnrealEngineValid" -Tag "UnrealEngine" {
+
+    BeforeAll {
+        . "$PSScriptRoot\..\Source\sync_and_build.ps1"
+    }
+
+    BeforeEach {
+        $script:CONSTANTS = @{
+            Paths = @{
+                UnrealBuildBat = "Engine\Build\BatchFiles\Build.bat"
+                UnrealEditorExe = "Engine\Binaries\Win64\UnrealEditor.exe"
+            }
+        }
+    }
+
+    Context "Caso: Instalación válida de Unreal Engine" {
+
+        It "Retorna true cuando Build.bat y UnrealEditor.exe existen" {
+            $ueRoot = "C:\UE_5.3"
+
+            Mock Test-Path {
+                param($Path)
+                if ($Path -match "Build\.bat$" -or $Path -match "UnrealEditor\.exe$") {
+                    return $true
+                }
+                return $false
+            }
+
+            $result = Test-UnrealEngineValid -UERoot $ueRoot
+
+            $result | Should -Be $true
+        }
+
+        It "Valida las rutas correctas construidas con Join-Path" {
+            $ueRoot = "C:\Epic Games\UE_5.4"
+            $expectedBuildBat = "C:\Epic Games\UE_5.4\Engine\Build\BatchFiles\Build.bat"
+            $expectedEditorExe = "C:\Epic Games\UE_5.4\Engine\Binaries\Win64\UnrealEditor.exe"
+
+            $capturedPaths = @()
+            Mock Test-Path {
+                param($Path)
+                $script:capturedPaths += $Path
+                return $true
+            }
+
+            Test-UnrealEngineValid -UERoot $ueRoot
+
+            $script:capturedPaths | Should -Contain $expectedBuildBat
+            $script:capturedPaths | Should -Contain $expectedEditorExe
+        }
+    }
+
+    Context "Caso: Build.bat no existe" {
+
+        It "Lanza BuildException con mensaje específico para Build.bat" {
+            Mock Test-Path {
+                param($Path)
+                if ($Path -match "Build\.bat$") {
+                    return $false
+                }
+                return $true
+            }
+
+            try {
+                Test-UnrealEngineValid -UERoot "C:\UE"
+                Should -Fail "Excepcion esperada no fue lanzada"
+            }
+            catch{
+                $_.Exception.Message | Should -Match "Build\.bat not found in UE installation"
+                $_.Exception.Category | Should -Be "Unreal Engine"
+                $_.Exception.Suggestion | Should -Match "Ensure you selected a valid UE installation folder"
+            }
+        }
+    }
+
+    Context "Caso: UnrealEditor.exe no existe" {
+
+        It "Lanza BuildException con mensaje específico para UnrealEditor.exe" {
+            Mock Test-Path {
+                param($Path)
+                if ($Path -match "Build\.bat$") {
+                    return $true
+                }
+                return $false
+            }
+
+            try {
+                Test-UnrealEngineValid -UERoot "C:\UE"
+                Should -Fail "Excepcion esperada no fue lanzada"
+            }
+            catch{
+                $_.Exception.Message | Should -Match "UnrealEditor\.exe not found"
+                $_.Exception.Category | Should -Be "Unreal Engine"
+                $_.Exception.Suggestion | Should -Match "Ensure you compile the Engine"
+            }
+        }
+    }
+
+    Context "Caso: Diferentes rutas de UERoot" {
+
+        It "Funciona con rutas que contienen espacios" {
+            $ueRoot = "C:\Program Files\Epic Games\UE_5.3"
+
+            Mock Test-Path { return $true }
+
+            $result = Test-UnrealEngineValid -UERoot $ueRoot
+
+            $result | Should -Be $true
+        }
+
+        It "Funciona con rutas sin espacios" {
+            $ueRoot = "C:\UE_5.3"
+
+            Mock Test-Path { return $true }
+
+            $result = Test-UnrealEngineValid -UERoot $ueRoot
+
+            $result | Should -Be $true
+        }
+
+        It "Funciona con rutas en diferentes unidades" {
+            $testCases = @(
+                "D:\UnrealEngine\UE_5.3",
+                "E:\Development\UE_5.4",
+                "C:\Apps\UE_Engines\5.1"
+            )
+
+            Mock Join-Path {
+                param($Path, $ChildPath)
+                return "$Path\$ChildPath"
+            }
+
+            Mock Test-Path { return $true }
+
+            foreach ($ueRoot in $testCases) {
+
+                $result = Test-UnrealEngineValid -UERoot $ueRoot
+
+                $result | Should -Be $true
+            }
+        }
+    }
+}
+
+Describe "Find-UnrealProject" -Tag "UnrealEngine"{
+
+    BeforeAll {
+        . "$PSScriptRoot\..\Source\sync_and_build.ps1"
+    }
+
+    BeforeEach{
+        Mock Write-Host { }
+        Mock Write-Log { }
+    }
+
+    Context "Caso: Encuentra el archivo .uproject" {
+
+        It "Retorna la ruta del archivo .uproject si existe" {
+            Mock Get-ChildItem { 
+                param()
+                return @(
+                    [PSCustomObject]@{
+                        Name = "myproject.uproject"
+                        FullName = "C:\MyProject\UnrealProject\ExtraFolder\myproject.uproject"
+                    }
+                )
+            }
+
+            $result = Find-UnrealProject -SearchPath "C:\MyProject"
+            
+            $result.FullName | Should -Be "C:\MyProject\UnrealProject\ExtraFolder\myproject.uproject"
+        }
+
+        It "Encuentra multiples archivos .uproject y permite seleccionar" {
+            Mock Get-ChildItem {
+                param()
+                return @(
+                    [PSCustomObject]@{
+                        Name = "ProjectA.uproject"
+                        FullName = "C:\MyProject\ProjectA.uproject"
+                    },
+                    [PSCustomObject]@{
+                        Name = "ProjectB.uproject"
+                        FullName = "C:\MyProject\ProjectB.uproject"
+                    }
+                )
+            }
+            
+            Mock Read-Host { return "2" }
+            
+            $result = Find-UnrealProject -SearchPath "C:\MyProject"
+            
+            $result.FullName | Should -Be "C:\MyProject\ProjectB.uproject"
+        }
+
+        It "Maneja selección inválida y pide de nuevo" {
+            Mock Test-Path { return $false }
+            
+            Mock Get-ChildItem {
+                param()
+                return @(
+                    [PSCustomObject]@{
+                        Name = "ProjectA.uproject"
+                        FullName = "C:\MyProject\ProjectA.uproject"
+                    },
+                    [PSCustomObject]@{
+                        Name = "ProjectB.uproject"
+                        FullName = "C:\MyProject\ProjectB.uproject"
+                    }
+                )
+            }
+            
+            $script:callCount = 0
+            
+            Mock Read-Host {
+                $script:callCount++
+                if ($script:callCount -eq 1) {
+                    return "99"  # Inválido
+                }
+                return "1"  # Válido
+            }
+            
+            $result = Find-UnrealProject -SearchPath "C:\MyProject"
+            
+            $result.FullName | Should -Be "C:\MyProject\ProjectA.uproject"
+            
+            Should -Invoke Read-Host -Times 2
+            
+            Should -Invoke Write-Host -ParameterFilter {
+                $Object -match "Invalid choice"
+            }
+        }
+    }
+
+    Context "Caso: Todos los proyectos (-All)" {
+
+        It "Devuelve todos los proyectos sin preguntar" {
+            Mock Get-ChildItem {
+                return @(
+                    [PSCustomObject]@{ Name = "ProjectA.uproject"; FullName = "C:\MyProject\ProjectA.uproject" },
+                    [PSCustomObject]@{ Name = "ProjectB.uproject"; FullName = "C:\MyProject\ProjectB.uproject" }
+                )
+            }
+            Mock Read-Host { return "1" }
+
+            $result = Find-UnrealProject -SearchPath "C:\MyProject" -All
+
+            $result.Count | Should -Be 2
+            Should -Invoke Read-Host -Times 0
+        }
+    }
+
+    Context "Caso: No encuentra el archivo .uproject" {
+
+        It "lanza excepción si no encuentra archivo .uproject" {
+            Mock Get-ChildItem { 
+                param()
+                return @() 
+            }
+
+            try {
+                $result = Find-UnrealProject -SearchPath "C:\MyProject"
+            
+                $result | Should -Be $null
+            }
+            catch {
+                $_.Exception.Message | Should -Be "No Unreal project (.uproject) found in: C:\MyProject"
+                $_.Exception.Category | Should -Be "Project Detection"
+                $_.Exception.Suggestion | Should -Be "Ensure there is a .uproject in the search path"
+            }
+        }
+    }
+}
+
+# =============================================================================
+# TESTS DE BUILD
+# =============================================================================
+
+Describe "Invoke-ProjectBuild" -Tag "Build" {
+
+    BeforeAll {
+        . "$PSScriptRoot\..\Source\sync_and_build.ps1"
+    }
+
+    BeforeEach {
+        $script:CONSTANTS = @{
+            Paths = @{
+                UnrealBuildBat = "Engine\Build\BatchFiles\Build.bat"
+            }
+            ConfigKeys = @{
+                UseUBTLogging = "UseUBTLogging"
+            }
+            FileNames = @{
+                BuildLogFileName = "Build.log"
+            }
+        }
+
+        $script:projectName = "MyGame"
+        $script:projectFile = "C:\MyProject\MyGame.uproject"
+        $script:logsDir = "C:\Logs"
+
+        Mock Write-Header { }
+        Mock Write-Host { }
+        Mock Write-Log { }
+        Mock Invoke-BuildLogAnalysis { }
+        Mock Save-SourceManifest { }
+        Mock Enter-BuildSlot { return $null }
+        Mock Exit-BuildSlot { }
+        Mock Get-ConfigValue {
+            param($Path, $DefaultValue)
+            return $DefaultValue
+        }
+    }
+
+    Context "Caso: Slots de build (modo batch)" {
+
+        It "Toma un slot antes de compilar y lo devuelve" {
+            Mock Enter-BuildSlot { return @{ Held = $true } }
+            Mock Start-Process { return [PSCustomObject]@{ ExitCode = 0 } }
+
+            Invoke-ProjectBuild -UERoot "C:\UE_5.3" | Should -Be $true
+
+            Should -Invoke Enter-BuildSlot -Times 1 -Exactly
+            Should -Invoke Exit-BuildSlot -ParameterFilter { $Slot.Held }
+        }
+
+        It "Escribe el log pendiente antes de esperar al build" {
+            $script:order = @()
+            Mock Write-LogBuffer { $script:order += "flush" }
+            Mock Start-Process { $script:order += "build"; return [PSCustomObject]@{ ExitCode = 0 } }
+
+            Invoke-ProjectBuild -UERoot "C:\UE_5.3" | Out-Null
+
+            $script:order[0..1] | Should -Be @("flush", "build")
+        }
+
+        It "Devuelve el slot aunque el build falle" {
+            Mock Start-Process { throw "Build.bat not found" }
+            Mock Write-DetailedError { }
+
+            Invoke-ProjectBuild -UERoot "C:\UE_5.3" | Should -Be $false
+
+            Should -Invoke Exit-BuildSlot -Times 1
+        }
+    }
+
+    Context "Caso: Build exitoso (incremental)" {
+
+        It "Retorna true cuando el build termina con ExitCode 0" {
+            Mock Start-Process {
+                return [PSCustomObject]@{
+                    ExitCode = 0
+                }
+            }
+
+            $result = Invoke-ProjectBuild -UERoot "C:\UE_5.3" -CleanBuild:$false
+
+            $result | Should -Be $true
+        }
+
+        It "Guarda la duración y el código de salida para el historial" {
+            $script:runState = @{}
+            Mock Start-Process { return [PSCustomObject]@{ ExitCode = 0 } }
+
+            Invoke-ProjectBuild -UERoot "C:\UE_5.3" -CleanBuild:$false
+
+            $script:runState.Build.ExitCode | Should -Be 0
+            $script:runState.Build.Seconds | Should -BeGreaterOrEqual 0
+            $script:runState.Build.Clean | Should -Be $false
+        }
+
+        It "Construye la ruta correcta del Build.bat" {
+            $capturedFilePath = $null
+            Mock Start-Process {
+                param($FilePath, $ArgumentList, $NoNewWindow, $Wait, $PassThru)
+                $script:capturedFilePath = $FilePath
+                return [PSCustomObject]@{ ExitCode = 0 }
+            }
+
+            Invoke-ProjectBuild -UERoot "C:\UE_5.3"
+
+            $script:capturedFilePath | Should -Be "C:\UE_5.3\Engine\Build\BatchFiles\Build.bat"
+        }
+
+        It "Pasa argumentos correctos sin -Clean" {
+            $capturedArgs = $null
+            Mock Start-Process {
+                param($FilePath, $ArgumentList, $NoNewWindow, $Wait, $PassThru)
+                $script:capturedArgs = $ArgumentList
+                return [PSCustomObject]@{ ExitCode = 0 }
+            }
+
+            Invoke-ProjectBuild -UERoot "C:\UE_5.3"
+
+            $script:capturedArgs | Should -Contain "MyGameEditor"
+            $script:capturedArgs | Should -Contain "Win64"
+            $script:capturedArgs | Should -Contain "Development"
+            $script:capturedArgs | Should -Contain "`"C:\MyProject\MyGame.uproject`""
+            $script:capturedArgs | Should -Not -Contain "-Clean"
+        }
+
+        It "Ejecuta Start-Process con -Wait y -PassThru" {
+            $capturedWait = $null
+            $capturedPassThru = $null
+            Mock Start-Process {
+                param($FilePath, $ArgumentList, $NoNewWindow, $Wait, $PassThru)
+                $script:capturedWait = $Wait
+                $script:capturedPassThru = $PassThru
+                return [PSCustomObject]@{ ExitCode = 0 }
+            }
+
+            Invoke-ProjectBuild -UERoot "C:\UE_5.3"
+
+            $script:capturedWait | Should -Be $true
+            $script:capturedPassThru | Should -Be $true
+        }
+
+        It "Muestra mensaje de build incremental cuando no se usa -CleanBuild" {
+            Mock Start-Process {
+                return [PSCustomObject]@{ ExitCode = 0 }
+            }
+
+            Invoke-ProjectBuild -UERoot "C:\UE_5.3"
+
+            Should -Invoke Write-Host -ParameterFilter {
+                $Object -match "Performing incremental build"
+            }
+        }
+    }
+
+    Context "Caso: Build exitoso (clean build)" {
+
+        It "Agrega -Clean a los argumentos cuando se usa -CleanBuild" {
+            $capturedArgs = $null
+            Mock Start-Process {
+                param($FilePath, $ArgumentList, $NoNewWindow, $Wait, $PassThru)
+                $script:capturedArgs = $ArgumentList
+                return [PSCustomObject]@{ ExitCode = 0 }
+            }
+
+            Invoke-ProjectBuild -UERoot "C:\UE_5.3" -CleanBuild
+
+            $script:capturedArgs | Should -Contain "-Clean"
+        }
+
+        It "Muestra mensaje de clean build cuando se usa -CleanBuild" {
+            Mock Start-Process {
+                return [PSCustomObject]@{ ExitCode = 0 }
+            }
+
+            Invoke-ProjectBuild -UERoot "C:\UE_5.3" -CleanBuild
+
+            Should -Invoke Write-Host -ParameterFilter {
+                $Object -match "Clean build requested"
+            }
+        }
+
+        It "Retorna true cuando clean build exitoso" {
+            Mock Start-Process {
+                return [PSCustomObject]@{ ExitCode = 0 }
+            }
+
+            $result = Invoke-ProjectBuild -UERoot "C:\UE_5.3" -CleanBuild
+
+            $result | Should -Be $true
+        }
+    }
+
+    Context "Caso: Build con UBT logging habilitado" {
+
+        It "Agrega -Log cuando UseUBTLogging es true" {
+            Mock Get-ConfigValue {
+                param($Path, $DefaultValue)
+                if ($Path -eq "UseUBTLogging") {
                     return $true
                 }
-                
-                if ($Path -match "Build\.bat") {
+                return $DefaultValue
+            }
+
+            $capturedArgs = $null
+            Mock Start-Process {
+                param($FilePath, $ArgumentList, $NoNewWindow, $Wait, $PassThru)
+                $script:capturedArgs = $ArgumentList
+                return [PSCustomObject]@{ ExitCode = 0 }
+            }
+
+            Invoke-ProjectBuild -UERoot "C:\UE_5.3"
+
+            $logArg = $script:capturedArgs | Where-Object { $_ -match '^-Log=' }
+            $logArg | Should -Not -BeNullOrEmpty
+            $logArg | Should -Match 'Build\.log'
+        }
+
+        It "No agrega -Log cuando UseUBTLogging es false" {
+            Mock Get-ConfigValue {
+                param($Path, $DefaultValue)
+                if ($Path -eq "UseUBTLogging") {
+                    return $false
+                }
+                return $DefaultValue
+            }
+
+            $capturedArgs = $null
+            Mock Start-Process {
+                param($FilePath, $ArgumentList, $NoNewWindow, $Wait, $PassThru)
+                $script:capturedArgs = $ArgumentList
+                return [PSCustomObject]@{ ExitCode = 0 }
+            }
+
+            Invoke-ProjectBuild -UERoot "C:\UE_5.3"
+
+            $logArg = $script:capturedArgs | Where-Object { $_ -match '^-Log=' }
+            $logArg | Should -BeNullOrEmpty
+        }
+
+        It "Escribe log VERBOSE con ruta del build log cuando UBT logging habilitado" {
+            Mock Get-ConfigValue {
+                param($Path, $DefaultValue)
+                if ($Path -eq "UseUBTLogging") {
                     return $true
                 }
-                
-                return $false
+                return $DefaultValue
             }
-            
-            Mock Get-ChildItem {
-                return @(
-                    [PSCustomObject]@{
-                        Name = "UE_5.3"
-                        FullName = "C:\UE\UE_5.3"
-                    }
-                )
+
+            Mock Start-Process {
+                return [PSCustomObject]@{ ExitCode = 0 }
+            }
+
+            Invoke-ProjectBuild -UERoot "C:\UE_5.3"
+
+            Should -Invoke Write-Log -ParameterFilter {
+                $Message -match "Build log will be saved to" -and $Level -eq "VERBOSE"
+            }
+        }
+
+        It "Guarda el manifiesto de fuentes solo cuando el build termina bien" {
+            Mock Start-Process { return [PSCustomObject]@{ ExitCode = 0 } }
+            Invoke-ProjectBuild -UERoot "C:\UE_5.3"
+
+            Mock Start-Process { return [PSCustomObject]@{ ExitCode = 6 } }
+            Invoke-ProjectBuild -UERoot "C:\UE_5.3"
+
+            Should -Invoke Save-SourceManifest -Times 1 -Exactly -ParameterFilter { $null -ne $BuildStart }
+        }
+
+        It "Analiza el build log al terminar cuando UBT logging habilitado" {
+            Mock Start-Process { return [PSCustomObject]@{ ExitCode = 2 } }
+
+            Invoke-ProjectBuild -UERoot "C:\UE_5.3"
+
+            Should -Invoke Invoke-BuildLogAnalysis -Times 1 -Exactly -ParameterFilter { $LogFile -match 'Build\.log$' }
+        }
+
+        It "No analiza nada cuando UBT logging deshabilitado" {
+            Mock Get-ConfigValue {
+                param($Path, $DefaultValue)
+                if ($Path -eq "UseUBTLogging") {
+                    return $false
+                }
+                return $DefaultValue
+            }
+            Mock Start-Process { return [PSCustomObject]@{ ExitCode = 0 } }
+
+            Invoke-ProjectBuild -UERoot "C:\UE_5.3"
+
+            Should -Invoke Invoke-BuildLogAnalysis -Times 0
+        }
+    }
+
+    Context "Caso: Build fallido" {
+
+        It "Retorna false cuando ExitCode no es 0" {
+            Mock Start-Process {
+                return [PSCustomObject]@{ ExitCode = 1 }
+            }
+
+            $result = Invoke-ProjectBuild -UERoot "C:\UE_5.3"
+
+            $result | Should -Be $false
+        }
+
+        It "Escribe log ERROR cuando build falla" {
+            Mock Start-Process {
+                return [PSCustomObject]@{ ExitCode = 5 }
             }
-            
-            $script:callCount = 0
-            
-            # Primera llamada: selección inválida
-            # Segunda llamada: selección válida
-            Mock Read-Host {
-                $script:callCount++
-                if ($script:callCount -eq 1) {
-                    return "99"  # Inválido
-                }
-                return "1"  # Válido
+
+            Invoke-ProjectBuild -UERoot "C:\UE_5.3"
+
+            Should -Invoke Write-Log -ParameterFilter {
+                $Message -match "Build failed" -and
+                $Message -match "Exit code: 5" -and
+                $Level -eq "ERROR"
             }
-            
-            $result = Find-UnrealEngine
-            
-            $result | Should -Be "C:\UE\UE_5.3"
-            
-            # Verificar que pidió dos veces
-            Should -Invoke Read-Host -Times 2
-            
-            # Verificar que mostró mensaje de error
+        }
+
+        It "Muestra mensaje BUILD FAILED cuando falla" {
+            Mock Start-Process {
+                return [PSCustomObject]@{ ExitCode = 1 }
+            }
+
+            Invoke-ProjectBuild -UERoot "C:\UE_5.3"
+
             Should -Invoke Write-Host -ParameterFilter {
-                $Object -match "Invalid choice"
+                $Object -match "BUILD FAILED"
             }
         }
-    }
-    
-    Context "Caso: Browse (selección manual)" {
-        
-        It "Permite navegar a ubicación personalizada" {
-            Mock Test-Path {
-                param($Path)
-                
-                if ($Path -match "Program Files|Epic Games|Apps") {
-                    return $false
-                }
-                
-                if ($Path -match "CustomPath.*Build\.bat") {
+
+        It "Muestra mensaje con ruta del log cuando UBT logging habilitado y build falla" {
+            Mock Get-ConfigValue {
+                param($Path, $DefaultValue)
+                if ($Path -eq "UseUBTLogging") {
                     return $true
                 }
-                
-                return $false
+                return $DefaultValue
             }
-            
-            Mock Get-ChildItem { return @() }
-            
-            Mock Read-Host { return "B" }
 
-            Mock Join-Path {
-                param($Path, $ChildPath)
-                return "$Path\$ChildPath"
+            Mock Start-Process {
+                return [PSCustomObject]@{ ExitCode = 1 }
             }
-            
-            Mock New-Object {
-                param($TypeName)
-                
-                if ($TypeName -eq "System.Windows.Forms.Form") {
-                    $form = [PSCustomObject]@{
-                        TopMost = $null
-                        WindowState = $null
-                        ShowInTaskbar = $null
-                    }
 
-                    $form | Add-Member -MemberType ScriptMethod -Name "Dispose" -Value { }
-                    return $form
-                }
-                
-                if ($TypeName -eq "System.Windows.Forms.FolderBrowserDialog") {
-                    $form = [PSCustomObject]@{
-                        Description = $null
-                        RootFolder = $null
-                        SelectedPath = "D:\CustomPath\UE_5.6"
-                    }
-                    $form | Add-Member -MemberType ScriptMethod -Name "ShowDialog" -Value { return "OK" }
-                    return $form
-                }
+            Invoke-ProjectBuild -UERoot "C:\UE_5.3"
+
+            Should -Invoke Write-Host -ParameterFilter {
+                $Object -match "Check the build log for details"
             }
-            
-            $result = Find-UnrealEngine
-            
-            $result | Should -Be "D:\CustomPath\UE_5.6"
         }
-        
-        It "Valida que la ruta seleccionada tenga Build.bat" {
-            Mock Test-Path {
-                param($Path)
 
-                if ($Path -match "Build\.bat") {
-                    if ($script:validateCount -eq 0) {
-                        $script:validateCount = 1
-                        return $false
-                    }
-                    return $true
+        It "Retorna false para diferentes códigos de error" {
+            $errorCodes = @(1, 2, 5, 10, 127, 255)
+
+            foreach ($code in $errorCodes) {
+                Mock Start-Process {
+                    return [PSCustomObject]@{ ExitCode = $code }
                 }
-                
-                return $false
+
+                $result = Invoke-ProjectBuild -UERoot "C:\UE_5.3"
+
+                $result | Should -Be $false
             }
-            
-            Mock Get-ChildItem { return @() }
-            
-            $script:validateCount = 0
-            
-            Mock Read-Host {
-                return "B"
+        }
+    }
+
+    Context "Caso: Excepciones durante el build" {
+
+        It "Retorna false cuando Start-Process lanza excepción" {
+            Mock Start-Process {
+                throw "Process failed to start"
             }
-            
-            Mock New-Object {
-                param($TypeName)
-                    
-                if ($TypeName -eq "System.Windows.Forms.Form") {
-                        $form = [PSCustomObject]@{
-                            TopMost = $null
-                            WindowState = $null
-                            ShowInTaskbar = $null
-                        }
-                        $form | Add-Member -MemberType ScriptMethod -Name "Dispose" -Value { }
-                        return $form
-                }
-                
-                if ($TypeName -eq "System.Windows.Forms.FolderBrowserDialog") {
-                    $script:dialogCount++
-                    
-                    # Primera vez: ruta inválida
-                    if ($script:dialogCount -eq 1) {
-                        $form = [PSCustomObject]@{
-                            Description = $null
-                            RootFolder = $null
-                            SelectedPath = "C:\InvalidPath"
-                        }
-                        $form | Add-Member -MemberType ScriptMethod -Name "ShowDialog" -Value { return "OK" }
-                        return $form
-                    }
-                }
-                        
-                # Segunda vez: ruta válida
-                $form = [PSCustomObject]@{
-                    Description = $null
-                    RootFolder = $null
-                    SelectedPath = "C:\ValidPath\UE_5.3"
-                }
-                $form | Add-Member -MemberType ScriptMethod -Name "ShowDialog" -Value { return "OK" }
-                return $form
+
+            $result = Invoke-ProjectBuild -UERoot "C:\UE_5.3"
+
+            $result | Should -Be $false
+        }
+
+        It "Escribe log ERROR cuando hay excepción" {
+            Mock Start-Process {
+                throw "Build.bat not found"
             }
-            
-            
-            $script:dialogCount = 0
-            
-            Find-UnrealEngine
-            
-            Should -Invoke Write-Host -ParameterFilter {
-                $Object -match "Invalid Unreal Engine installation"
+
+            Invoke-ProjectBuild -UERoot "C:\UE_5.3"
+
+            Should -Invoke Write-Log -ParameterFilter {
+                $Message -match "Build error" -and
+                $Message -match "Build.bat not found" -and
+                $Level -eq "ERROR"
             }
-            
-            # Verificar que pidió dos veces
-            $script:dialogCount | Should -Be 2
         }
-        
-        It "Retorna null si usuario cancela el browse" {
-            Mock Test-Path { return $false }
-            Mock Get-ChildItem { return @() }
-            Mock Read-Host { return "B" }
-            
-            Mock New-Object {
-                param($TypeName)
-                
-                if ($TypeName -eq "System.Windows.Forms.Form") {
-                    $form = [PSCustomObject]@{
-                        TopMost = $null
-                        WindowState = $null
-                        ShowInTaskbar = $null
-                    }
-                    $form | Add-Member -MemberType ScriptMethod -Name "Dispose" -Value { }
-                    return $form
-                }
-                
-                if ($TypeName -eq "System.Windows.Forms.FolderBrowserDialog") {
-                    $form = [PSCustomObject]@{
-                        Description = $null
-                        RootFolder = $null
-                        SelectedPath = ""
-                    }
-                    $form | Add-Member -MemberType ScriptMethod -Name "ShowDialog" -Value { return "Cancel" }
-                    return $form
-                }
+
+        It "Llama Write-DetailedError cuando hay excepción" {
+            Mock Start-Process {
+                throw "Access denied"
             }
-            
-            Find-UnrealEngine
-            
-            Should -Invoke Write-Host -ParameterFilter {
-                $Object -match "Selection cancelled"
+            Mock Write-DetailedError { }
+
+            Invoke-ProjectBuild -UERoot "C:\UE_5.3"
+
+            Should -Invoke Write-DetailedError -ParameterFilter {
+                $Message -match "Build process crashed" -and
+                $Message -match "Access denied" -and
+                $Category -eq "Build" -and
+                $Suggestion -match "Visual Studio Build Tools"
+            }
+        }
+
+        It "Maneja excepción con mensaje vacío" {
+            Mock Start-Process {
+                throw [System.Exception]::new()
             }
+
+            $result = Invoke-ProjectBuild -UERoot "C:\UE_5.3"
+
+            $result | Should -Be $false
         }
     }
-    
-    Context "Caso: Patrones de nombres de directorios" {
-        
-        It "Reconoce formato UE_X.X" {
-            Mock Test-Path { return $true }
-            Mock Read-Host { return "1" }
-            
-            Mock Get-ChildItem {
-                return @(
-                    [PSCustomObject]@{
-                        Name = "UE_5.3"
-                        FullName = "C:\UE\UE_5.3"
-                    }
-                )
+
+    Context "Caso: Mensajes informativos" {
+
+        It "Muestra header BUILDING PROJECT" {
+            Mock Start-Process {
+                return [PSCustomObject]@{ ExitCode = 0 }
+            }
+
+            Invoke-ProjectBuild -UERoot "C:\UE_5.3"
+
+            Should -Invoke Write-Header -ParameterFilter {
+                $Text -eq "BUILDING PROJECT"
             }
-            
-            $result = Find-UnrealEngine
-            
-            $result | Should -Not -BeNullOrEmpty
         }
-        
-        It "Reconoce formato UnrealEngine-X.X" {
-            Mock Test-Path { 
-                if ($Path -eq "C:\UE") {
-                    return $true
-                }
-                
-                if ($Path -match "Build\.bat") {
-                    return $true
-                }
-                
-                return $false
+
+        It "Muestra tiempo estimado de build" {
+            Mock Start-Process {
+                return [PSCustomObject]@{ ExitCode = 0 }
             }
 
-            Mock Read-Host { return "1" }
-            
-            Mock Get-ChildItem {
-                return @(
-                    [PSCustomObject]@{
-                        Name = "UnrealEngine-5.3"
-                        FullName = "C:\UE\UnrealEngine-5.3"
-                    }
-                )
+            Invoke-ProjectBuild -UERoot "C:\UE_5.3"
+
+            Should -Invoke Write-Host -ParameterFilter {
+                $Object -match "Estimated time: 5-15 minutes"
             }
-            
-            $result = Find-UnrealEngine
-            
-            $result | Should -Not -BeNullOrEmpty
         }
-        
-        It "Reconoce formato UE5.3 (sin guión bajo)" {
-            Mock Test-Path { return $true }
-            Mock Read-Host { return "1" }
-            
-            Mock Get-ChildItem {
-                return @(
-                    [PSCustomObject]@{
-                        Name = "UE5.3"
-                        FullName = "C:\UE\UE5.3"
-                    }
-                )
+
+        It "Escribe log VERBOSE con comando completo ejecutado" {
+            Mock Start-Process {
+                return [PSCustomObject]@{ ExitCode = 0 }
+            }
+
+            Invoke-ProjectBuild -UERoot "C:\UE_5.3"
+
+            Should -Invoke Write-Log -ParameterFilter {
+                $Message -match "Executing:.*Build\.bat" -and
+                $Message -match "MyGameEditor" -and
+                $Level -eq "VERBOSE"
             }
-            
-            $result = Find-UnrealEngine
-            
-            $result | Should -Not -BeNullOrEmpty
         }
-        
-        It "Ignora directorios que no coinciden con el patrón" {
-            Mock Test-Path { return $true }
-            
-            Mock Get-ChildItem {
-                return @(
-                    [PSCustomObject]@{
-                        Name = "SomeOtherFolder"
-                        FullName = "C:\Epic Games\SomeOtherFolder"
-                    },
-                    [PSCustomObject]@{
-                        Name = "UE_5.3"
-                        FullName = "C:\Epic Games\UE_5.3"
-                    }
-                )
+
+        It "Muestra BUILD SUCCESSFUL cuando exitoso" {
+            Mock Start-Process {
+                return [PSCustomObject]@{ ExitCode = 0 }
             }
-            
-            Mock Read-Host { return "1" }
-            
-            Find-UnrealEngine
-            
+
+            Invoke-ProjectBuild -UERoot "C:\UE_5.3"
+
             Should -Invoke Write-Host -ParameterFilter {
-                $Object -match "Found 1 installation"
+                $Object -match "BUILD SUCCESSFUL"
             }
         }
     }
-    
-    Context "Caso: Búsqueda en múltiples rutas" {
-        
-        It "Busca en todas las rutas predefinidas" {
-            $script:pathsChecked = @()
-            
-            Mock Test-Path {
-                param($Path)
-                
-                if ($Path -notmatch "Build\.bat") {
-                    $script:pathsChecked += $Path
-                }
-                
-                return $false
-            }
-            
-            Mock Get-ChildItem { return @() }
-            Mock Read-Host { return "B" }
-            
-            Mock New-Object {
-                if ($TypeName -eq "System.Windows.Forms.FolderBrowserDialog") {
-                    $form = [PSCustomObject]@{
-                        RootFolder = $null
-                        Description = $null
-                        SelectedPath = $null
-                    }
-                    $form | Add-Member -MemberType ScriptMethod -Name "ShowDialog" -Value { return "Cancel" }
-                    return $form
-                }
+}
 
-                $form = [PSCustomObject]@{
-                    TopMost = $null
-                    WindowState = $null
-                    ShowInTaskbar = $null
-                }
-                $form | Add-Member -MemberType ScriptMethod -Name "Dispose" -Value { }
-                return $form
+Describe "Invoke-BuildLogAnalysis" -Tag "Build" {
+
+    BeforeAll {
+        . "$PSScriptRoot\..\Source\sync_and_build.ps1"
+    }
+
+    BeforeEach {
+        $logFile = Join-Path $TestDrive "last_build.log"
+        Set-Content -Path $logFile -Value "[1/1] Compile [x64] Module.MyGame.cpp"
+        $script:runState = @{ Build = @{ Seconds = 10; ExitCode = 0; Clean = $false } }
+
+        Mock Write-Host { }
+        Mock Write-Log { }
+        Mock Invoke-PythonTool {
+            return [PSCustomObject]@{
+                actions = [PSCustomObject]@{ total = 1; timed = 0 }
+                warnings = 3
+                errors = 0
+                modules = @(
+                    [PSCustomObject]@{ module = "MyGame"; compiles = 1; seconds = 0 },
+                    [PSCustomObject]@{ module = "Inventory"; compiles = 0; seconds = 0 }
+                )
             }
-            
-            Find-UnrealEngine
-            
-            $script:pathsChecked | Should -Contain "C:\Program Files\Epic Games"
-            $script:pathsChecked | Should -Contain "C:\Epic Games"
-            $script:pathsChecked | Should -Contain "C:\UE"
         }
     }
-    
-    Context "Caso: Form TopMost" {
-        
-        It "Crea Form con TopMost para que el diálogo aparezca al frente" {
-            Mock Test-Path { return $false }
-            Mock Get-ChildItem { return @() }
-            Mock Read-Host { return "B" }
-            
-            $script:formCreated = $null
-            
-            Mock New-Object {
-                param($TypeName)
-                
-                if ($TypeName -eq "System.Windows.Forms.Form") {
-                    $form = [PSCustomObject]@{
-                        TopMost = $null
-                        WindowState = $null
-                        ShowInTaskbar = $null
-                    }
-                    $form | Add-Member -MemberType ScriptMethod -Name "Dispose" -Value { }
-                    $script:formCreated = $form
-                    return $form
-                }
-                
-                if ($TypeName -eq "System.Windows.Forms.FolderBrowserDialog") {
-                    $form = [PSCustomObject]@{
-                        Description = $null
-                        RootFolder = $null
-                        SelectedPath = ""
-                    }
-                    $form | Add-Member -MemberType ScriptMethod -Name "ShowDialog" -Value { return "Cancel" }
-                    return $form
-                }
+
+    It "Pasa el log y los archivos de reporte al analizador" {
+        Invoke-BuildLogAnalysis -LogFile $logFile
+
+        Should -Invoke Invoke-PythonTool -Times 1 -Exactly -ParameterFilter {
+            $Script -eq "ubt_log_analyzer.py" -and
+            ($Arguments -join " ") -match "--log .*last_build\.log --output .*last_build_report\.json --summary .*last_build_report\.txt"
+        }
+    }
+
+    It "Muestra solo los módulos con compilaciones y guarda los warnings del build" {
+        Invoke-BuildLogAnalysis -LogFile $logFile
+
+        Should -Invoke Write-Host -ParameterFilter { $Object -match "MyGame: 1 compile action" }
+        Should -Invoke Write-Host -Times 0 -ParameterFilter { $Object -match "Inventory" }
+        $script:runState.Build.Warnings | Should -Be 3
+    }
+
+    It "No hace nada si el log no existe" {
+        Invoke-BuildLogAnalysis -LogFile (Join-Path $TestDrive "missing.log")
+
+        Should -Invoke Invoke-PythonTool -Times 0
+    }
+
+    It "No falla cuando Python no está disponible" {
+        Mock Invoke-PythonTool { return $null }
+
+        { Invoke-BuildLogAnalysis -LogFile $logFile } | Should -Not -Throw
+        Should -Invoke Write-Host -Times 0
+    }
+}
+
+# =============================================================================
+# TESTS DE EDITOR
+# =============================================================================
+
+Describe "Get-DdcPrefillBatches" -Tag "Editor" {
+
+    BeforeAll {
+        . "$PSScriptRoot\..\Source\sync_and_build.ps1"
+    }
+
+    It "Reparte los paquetes entre los procesos" {
+        $batches = Get-DdcPrefillBatches -Packages @("A.uasset", "B.uasset", "C.uasset", "D.umap", "E.uasset") -Processes 2
+
+        $batches.Count | Should -Be 2
+        $batches[0] | Should -Be @("A.uasset", "B.uasset", "C.uasset")
+        $batches[1] | Should -Be @("D.umap", "E.uasset")
+    }
+
+    It "Corta un lote que no cabe en una línea de comandos" {
+        $script:CONSTANTS.DdcPrefill.MaxCommandLine = 30
+        try {
+            $batches = Get-DdcPrefillBatches -Packages @("Rock_01.uasset", "Rock_02.uasset", "Rock_03.uasset") -Processes 1
+        } finally {
+            $script:CONSTANTS.DdcPrefill.MaxCommandLine = 30000
+        }
+
+        $batches.Count | Should -Be 3
+        @($batches[0]).Count | Should -Be 1
+    }
+}
+
+Describe "Invoke-DdcPrefill" -Tag "Editor" {
+
+    BeforeAll {
+        . "$PSScriptRoot\..\Source\sync_and_build.ps1"
+    }
+
+    BeforeEach {
+        $script:projectRoot = "C:\TestProject"
+        $script:projectFile = "C:\TestProject\MyGame\MyGame.uproject"
+        $script:runState = @{ HaveCLBefore = 100; HaveCL = 120 }
+        $script:started = @()
+
+        Mock Write-Header { }
+        Mock Write-Host { }
+        Mock Write-Log { }
+        Mock Push-Location { }
+        Mock Pop-Location { }
+        Mock Start-Sleep { }
+        Mock Stop-Process { }
+        Mock Test-Path { return $true }
+        Mock Get-ConfigValue {
+            param($Path, $DefaultValue)
+            switch ($Path) {
+                "editor.ddcPrefill" { return $true }
+                "editor.ddcPrefillMinPackages" { return 2 }
+                "editor.ddcPrefillProcesses" { return 2 }
+                default { return $DefaultValue }
+            }
+        }
+        Mock Get-ChangedFiles {
+            return @(
+                [PSCustomObject]@{ DepotFile = "//depot/MyGame/Content/Maps/Main.umap"; Revision = 3; Action = "edit"; Change = 110 },
+                [PSCustomObject]@{ DepotFile = "//depot/MyGame/Content/Props/Rock.uasset"; Revision = 1; Action = "add"; Change = 115 },
+                [PSCustomObject]@{ DepotFile = "//depot/Plugins/Trees/Content/Oak.uasset"; Revision = 2; Action = "edit"; Change = 118 },
+                [PSCustomObject]@{ DepotFile = "//depot/MyGame/Content/Old.uasset"; Revision = 4; Action = "delete"; Change = 119 }
+            )
+        }
+        Mock Start-Process {
+            param($FilePath, $ArgumentList)
+            $script:started += ,@($ArgumentList)
+            return [PSCustomObject]@{ Id = 1000 + $script:started.Count; HasExited = $true; ExitCode = 0; Handle = 1 }
+        }
+        Mock Enter-BuildSlot { return $null }
+        Mock Exit-BuildSlot { }
+    }
+
+    It "No hace nada cuando está desactivado" {
+        Mock Get-ConfigValue { param($Path, $DefaultValue) return $DefaultValue }
+
+        Invoke-DdcPrefill -UERoot "C:\UE_5.3"
+
+        Should -Invoke Get-ChangedFiles -Times 0
+        Should -Invoke Start-Process -Times 0
+    }
+
+    It "Ejecuta el commandlet con los paquetes cambiados en el rango sincronizado" {
+        Invoke-DdcPrefill -UERoot "C:\UE_5.3"
+
+        Should -Invoke Get-ChangedFiles -Times 1 -Exactly -ParameterFilter {
+            $FromCL -eq 100 -and $ToCL -eq 120 -and ($Extensions -contains ".umap")
+        }
+        Should -Invoke Start-Process -Times 2 -Exactly -ParameterFilter { $FilePath -match "UnrealEditor-Cmd\.exe$" }
+        $arguments = $script:started | ForEach-Object { $_ }
+        $arguments | Should -Contain "-run=DerivedDataCache"
+        $arguments | Should -Contain '"Main.umap"'
+        $arguments | Should -Contain '"Oak.uasset"'
+        $arguments | Should -Not -Contain '"Old.uasset"'
+    }
+
+    It "Nombra los logs de los commandlets con la marca de tiempo de la ejecución" {
+        $script:logStamp = "20241225_103000"
+
+        Invoke-DdcPrefill -UERoot "C:\UE_5.3"
+
+        $arguments = $script:started | ForEach-Object { $_ }
+        $arguments | Where-Object { $_ -match 'ddc_prefill_20241225_103000_1\.log"$' } | Should -Not -BeNullOrEmpty
+        $arguments | Where-Object { $_ -match 'ddc_prefill_20241225_103000_2\.log"$' } | Should -Not -BeNullOrEmpty
+        $script:logStamp = $null
+    }
+
+    It "Guarda la duración y los paquetes en el estado de la ejecución" {
+        Invoke-DdcPrefill -UERoot "C:\UE_5.3"
+
+        $script:runState.DdcPrefill.Packages | Should -Be 3
+        $script:runState.DdcPrefill.Processes | Should -Be 2
+        $script:runState.DdcPrefill.TimedOut | Should -Be $false
+        $script:runState.DdcPrefill.Seconds | Should -BeGreaterOrEqual 0
+    }
+
+    It "Toma un slot de build mientras corren los commandlets" {
+        $script:slotWhileStarting = $null
+        Mock Enter-BuildSlot { $script:slot = @{ Held = $true }; return $script:slot }
+        Mock Start-Process {
+            $script:slotWhileStarting = $script:slot.Held
+            return [PSCustomObject]@{ Id = 1; HasExited = $true; ExitCode = 0; Handle = 1 }
+        }
+        Mock Exit-BuildSlot { param($Slot) $Slot.Held = $false }
+
+        Invoke-DdcPrefill -UERoot "C:\UE_5.3"
+
+        Should -Invoke Enter-BuildSlot -Times 1 -Exactly
+        $script:slotWhileStarting | Should -Be $true
+        $script:slot.Held | Should -Be $false
+    }
+
+    It "Se salta con menos paquetes que el mínimo" {
+        Mock Get-ConfigValue {
+            param($Path, $DefaultValue)
+            if ($Path -eq "editor.ddcPrefill") { return $true }
+            if ($Path -eq "editor.ddcPrefillMinPackages") { return 10 }
+            return $DefaultValue
+        }
+
+        Invoke-DdcPrefill -UERoot "C:\UE_5.3"
+
+        Should -Invoke Start-Process -Times 0
+        Should -Invoke Enter-BuildSlot -Times 0
+        $script:runState.DdcPrefill | Should -BeNullOrEmpty
+    }
+
+    It "Se salta cuando el sync no trajo changelists nuevos" {
+        $script:runState = @{ HaveCLBefore = 120; HaveCL = 120 }
+
+        Invoke-DdcPrefill -UERoot "C:\UE_5.3"
+
+        Should -Invoke Get-ChangedFiles -Times 0
+    }
+
+    It "Detiene los commandlets al llegar al límite de tiempo" {
+        Mock Get-ConfigValue {
+            param($Path, $DefaultValue)
+            switch ($Path) {
+                "editor.ddcPrefill" { return $true }
+                "editor.ddcPrefillMinPackages" { return 1 }
+                "editor.ddcPrefillProcesses" { return 1 }
+                "editor.ddcPrefillTimeoutMinutes" { return 0 }
+                default { return $DefaultValue }
             }
-            
-            Find-UnrealEngine
-            
-            $script:formCreated | Should -Not -BeNullOrEmpty
-            
-            # Verificar que se configuró TopMost
-            # (Nota: Esto verifica que se ASIGNÓ, no el valor específico)
-            $script:formCreated.PSObject.Properties.Name | Should -Contain "TopMost"
         }
+        Mock Start-Process { return [PSCustomObject]@{ Id = 4242; HasExited = $false; ExitCode = $null; Handle = 1 } }
+
+        Invoke-DdcPrefill -UERoot "C:\UE_5.3"
+
+        Should -Invoke Stop-Process -Times 1 -Exactly -ParameterFilter { $Id -eq 4242 }
+        $script:runState.DdcPrefill.TimedOut | Should -Be $true
+        Should -Invoke Write-Log -ParameterFilter { $Level -eq "WARNING" -and $Message -match "stopped after" }
+    }
+
+    It "No detiene la ejecución si el commandlet falla" {
+        Mock Start-Process { return [PSCustomObject]@{ Id = 1; HasExited = $true; ExitCode = 3; Handle = 1 } }
+
+        { Invoke-DdcPrefill -UERoot "C:\UE_5.3" } | Should -Not -Throw
+
+        $script:runState.DdcPrefill.Failed | Should -Be 2
+        Should -Invoke Write-Log -ParameterFilter { $Level -eq "WARNING" -and $Message -match "exited with code 3" }
+    }
+
+    It "No detiene la ejecución si no puede listar los archivos" {
+        Mock Get-ChangedFiles { throw "p4 files failed" }
+
+        { Invoke-DdcPrefill -UERoot "C:\UE_5.3" } | Should -Not -Throw
+
+        Should -Invoke Write-Log -ParameterFilter { $Level -eq "WARNING" -and $Message -match "DDC prefill failed" }
     }
 }
 
-Describe "Get-UnrealEngineRoot" -Tag "UnrealEngine" {
+Describe "Start-UnrealEditor" -Tag "Editor" {
 
     BeforeAll {
         . "$PSScriptRoot\..\Source\sync_and_build.ps1"
@@ -2875,1470 +5533,1658 @@ Describe "Get-UnrealEngineRoot" -Tag "UnrealEngine" {
 
     BeforeEach {
         $script:CONSTANTS = @{
-            ConfigKeys = @{
-                EnginePath = "UnrealEnginePath"
-                EngineVersion = "UnrealEngineVersion"
-            }
             Paths = @{
-                UnrealBuildBat = "Engine\Build\BatchFiles\Build.bat"
+                UnrealEditorExe = "Engine\Binaries\Win64\UnrealEditor.exe"
+            }
+            ConfigKeys = @{
+                EditorAutoLaunch = "EditorAutoLaunch"
             }
         }
 
+        $script:projectFile = "C:\MyProject\MyGame.uproject"
+        $script:NoPrompt = $false
+
+        Mock Write-Header { }
         Mock Write-Host { }
         Mock Write-Log { }
-        Mock Write-Header { }
+        Mock Get-ConfigValue {
+            param($Path, $DefaultValue)
+            return $DefaultValue
+        }
+        Mock Set-ConfigValue { }
+        Mock Wait-EditorReady { return $null }
     }
 
-    Context "Caso: Ruta guardada válida en config" {
+    Context "Caso: Editor no existe" {
 
-        It "Retorna ruta guardada cuando existe y es válida" {
-            $script:validPath = "C:\UE_5.3"
+        It "Retorna false cuando UnrealEditor.exe no existe" {
+            Mock Test-Path { return $false }
 
-            Mock Get-ConfigValue {
-                param($Key)
-                return $script:validPath
+            $result = Start-UnrealEditor -UERoot "C:\UE_5.3"
+
+            $result | Should -Be $false
+        }
+
+        It "Escribe log WARNING cuando editor no existe" {
+            Mock Test-Path { return $false }
+
+            Start-UnrealEditor -UERoot "C:\UE_5.3"
+
+            Should -Invoke Write-Log -ParameterFilter {
+                $Message -match "Editor executable not found" -and
+                $Level -eq "WARNING"
+            }
+        }
+
+        It "Muestra mensaje de advertencia cuando editor no existe" {
+            Mock Test-Path { return $false }
+
+            Start-UnrealEditor -UERoot "C:\UE_5.3"
+
+            Should -Invoke Write-Host -ParameterFilter {
+                $Object -match "UnrealEditor.exe not found"
             }
+        }
 
+        It "Verifica la ruta correcta del ejecutable" {
+            $capturedPath = $null
             Mock Test-Path {
                 param($Path)
-                return $true
+                $script:capturedPath = $Path
+                return $false
             }
 
-            $result = Get-UnrealEngineRoot
+            Start-UnrealEditor -UERoot "C:\UE_5.3"
 
-            $result | Should -Be $validPath
+            $script:capturedPath | Should -Be "C:\UE_5.3\Engine\Binaries\Win64\UnrealEditor.exe"
+        }
+    }
 
-            Should -Invoke Write-Log -ParameterFilter {
-                $Message -match "Using UE installation" -and $Level -eq "VERBOSE"
+    Context "Caso: Usuario acepta lanzar editor (prompt manual)" {
+
+        It "Retorna true cuando usuario responde Y y lanzamiento exitoso" {
+            Mock Test-Path { return $true }
+            Mock Read-Host {
+                # Primera llamada: Launch? -> Y
+                # Segunda llamada: Save? -> N
+                if ($script:readHostCallCount -eq $null) { $script:readHostCallCount = 0 }
+                $script:readHostCallCount++
+                if ($script:readHostCallCount -eq 1) { return "Y" }
+                return "N"
             }
+            Mock Start-Process { }
+
+            $result = Start-UnrealEditor -UERoot "C:\UE_5.3"
+
+            $result | Should -Be $true
         }
 
-        It "No llama a Find-UnrealEngine cuando la ruta guardada es válida" {
-            Mock Get-ConfigValue { return "C:\UE_5.3" }
+        It "Lanza el editor con la ruta correcta cuando usuario acepta" {
             Mock Test-Path { return $true }
-            Mock Find-UnrealEngine { }
+            $script:readHostCallCount = 0
+            Mock Read-Host {
+                $script:readHostCallCount++
+                if ($script:readHostCallCount -eq 1) { return "Y" }
+                return "N"
+            }
+            Mock Join-Path {
+                param($Path, $ChildPath)
+                return "$Path\$ChildPath"
+            }
+            $capturedFilePath = $null
+            Mock Start-Process {
+                param($FilePath, $ArgumentList)
+                $script:capturedFilePath = $FilePath
+            }
 
-            Get-UnrealEngineRoot
+            $result = Start-UnrealEditor -UERoot "C:\UE_5.3"
 
-            Should -Not -Invoke Find-UnrealEngine
+            $result | Should -Be $true
+
+            Should -Invoke Start-Process -Times 1
+
+            $script:capturedFilePath | Should -Be "C:\UE_5.3\Engine\Binaries\Win64\UnrealEditor.exe"
+        }
+
+        It "Pasa el archivo de proyecto como argumento cuando lanza editor" {
+            Mock Test-Path { return $true }
+            $script:readHostCallCount = 0
+            Mock Read-Host {
+                $script:readHostCallCount++
+                if ($script:readHostCallCount -eq 1) { return "Y" }
+                return "N"
+            }
+            $capturedArgs = $null
+            Mock Start-Process {
+                param($FilePath, $ArgumentList)
+                $script:capturedArgs = $ArgumentList
+            }
+
+            Start-UnrealEditor -UERoot "C:\UE_5.3"
+
+            $script:capturedArgs | Should -Match "MyGame\.uproject"
+        }
+
+        It "Acepta respuesta en minúscula (y)" {
+            Mock Test-Path { return $true }
+            $script:readHostCallCount = 0
+            Mock Read-Host {
+                $script:readHostCallCount++
+                if ($script:readHostCallCount -eq 1) { return "y" }
+                return "n"
+            }
+            Mock Start-Process { }
+
+            $result = Start-UnrealEditor -UERoot "C:\UE_5.3"
+
+            $result | Should -Be $true
+            Should -Invoke Start-Process -Times 1
         }
     }
 
-    Context "Caso: Ruta guardada inválida o no existe" {
+    Context "Caso: Usuario rechaza lanzar editor" {
 
-        It "Solicita nueva selección cuando Build.bat no existe en ruta guardada" {
-            $script:invalidPath = "C:\InvalidUE"
-            $script:newValidPath = "C:\UE_5.4"
+        It "Retorna true cuando usuario responde N (no es error)" {
+            Mock Test-Path { return $true }
+            Mock Read-Host { return "N" }
 
-            Mock Get-ConfigValue {
-                param($Key)
-                return $script:invalidPath
+            $result = Start-UnrealEditor -UERoot "C:\UE_5.3"
+
+            $result | Should -Be $true
+        }
+
+        It "No lanza el editor cuando usuario responde N" {
+            Mock Test-Path { return $true }
+            Mock Read-Host { return "N" }
+            Mock Start-Process { }
+
+            Start-UnrealEditor -UERoot "C:\UE_5.3"
+
+            Should -Invoke Start-Process -Times 0
+        }
+
+        It "Escribe log INFO cuando usuario rechaza lanzar" {
+            Mock Test-Path { return $true }
+            Mock Read-Host { return "N" }
+
+            Start-UnrealEditor -UERoot "C:\UE_5.3"
+
+            Should -Invoke Write-Log -ParameterFilter {
+                $Message -match "User chose not to launch editor" -and
+                $Level -eq "INFO"
             }
+        }
 
-            Mock Test-Path {
-                param($Path)
+        It "Acepta respuesta en minúscula (n)" {
+            Mock Test-Path { return $true }
+            Mock Read-Host { return "n" }
+            Mock Start-Process { }
 
-                if ($Path -match "InvalidUE.*Build\.bat") {
-                    return $false
+            Start-UnrealEditor -UERoot "C:\UE_5.3"
+
+            Should -Invoke Start-Process -Times 0
+        }
+    }
+
+    Context "Caso: AutoLaunch habilitado" {
+
+        It "Lanza automáticamente cuando EditorAutoLaunch es true" {
+            Mock Test-Path { return $true }
+            Mock Get-ConfigValue {
+                param($Path, $DefaultValue)
+                if ($Path -eq "EditorAutoLaunch") {
+                    return $true
                 }
-                return $true
+                return $DefaultValue
             }
+            Mock Read-Host { return "N" }  # Save response
+            Mock Start-Process { }
 
-            Mock Find-UnrealEngine { return $script:newValidPath }
-            Mock Set-ConfigValue { }
+            Start-UnrealEditor -UERoot "C:\UE_5.3"
 
-            $result = Get-UnrealEngineRoot
+            Should -Invoke Start-Process -Times 1
+        }
 
-            $result | Should -Be $script:newValidPath
+        It "No pregunta 'Launch Editor?' cuando autoLaunch habilitado" {
+            Mock Test-Path { return $true }
+            Mock Get-ConfigValue {
+                param($Path, $DefaultValue)
+                if ($Path -eq "EditorAutoLaunch") {
+                    return $true
+                }
+                return $DefaultValue
+            }
+            Mock Read-Host { return "N" }
+            Mock Start-Process { }
 
-            Should -Invoke Find-UnrealEngine -Times 1
+            Start-UnrealEditor -UERoot "C:\UE_5.3"
 
-            Should -Invoke Write-Log -ParameterFilter {
-                $Message -match "Saved UE path is invalid" -and $Level -eq "WARNING"
-            }
+            # No debe preguntar nada cuando autoLaunch está habilitado
+            Should -Invoke Read-Host -Times 0
         }
     }
 
-    Context "Caso: Configuración de nueva instalación" {
-
-        It "Guarda la nueva ruta en config cuando se selecciona" {
-            $script:selectedPath = "C:\UE_5.3"
-
-            Mock Get-ConfigValue { return $null }
-            Mock Find-UnrealEngine { return $script:selectedPath }
+    Context "Caso: Guardar preferencia de usuario" {
 
-            $script:capturedVersion = $null
-            $script:capturedPath = $null
-            
-            Mock Set-ConfigValue {
-                param($Path, $Value)
-                if ($Path -eq $script:CONSTANTS.ConfigKeys.EnginePath) {
-                    $script:capturedPath = $Value
-                }
-                elseif ($Path -eq $script:CONSTANTS.ConfigKeys.EngineVersion) {
-                    $script:capturedVersion = $Value
-                }
+        It "Guarda EditorAutoLaunch cuando usuario responde Y a 'Save Response'" {
+            Mock Test-Path { return $true }
+            Mock Read-Host {
+                if ($script:readHostCallCount -eq $null) { $script:readHostCallCount = 0 }
+                $script:readHostCallCount++
+                if ($script:readHostCallCount -eq 1) { return "Y" }  # Launch
+                return "Y"  # Save
             }
+            Mock Start-Process { }
 
-            $result = Get-UnrealEngineRoot
-
-            $result | Should -Be $script:selectedPath
+            Start-UnrealEditor -UERoot "C:\UE_5.3"
 
-            Should -Invoke Write-Log -ParameterFilter {
-                $Message -match "UE path saved to config" -and $Level -eq "INFO"
+            Should -Invoke Set-ConfigValue -ParameterFilter {
+                $Path -eq "EditorAutoLaunch" -and $Value -eq $true
             }
+        }
 
-            Should -Invoke Write-Log -ParameterFilter {
-                $Message -match "Detected UE version: 5\.3"
+        It "No guarda preferencia cuando usuario responde N a 'Save Response'" {
+            Mock Test-Path { return $true }
+            Mock Read-Host {
+                if ($script:readHostCallCount -eq $null) { $script:readHostCallCount = 0 }
+                $script:readHostCallCount++
+                if ($script:readHostCallCount -eq 1) { return "Y" }  # Launch
+                return "N"  # Don't save
             }
+            Mock Start-Process { }
 
-            $script:capturedPath | Should -Be $script:selectedPath
+            Start-UnrealEditor -UERoot "C:\UE_5.3"
 
-            $script:capturedVersion | Should -Be "5.3"
+            Should -Invoke Set-ConfigValue -Times 0
         }
 
-        It "Detecta versiones con diferentes formatos" {
-            $testCases = @(
-                @{ Path = "C:\UE_5.4.1"; ExpectedVersion = "5.4.1" }
-                @{ Path = "C:\UnrealEngine-5.3"; ExpectedVersion = "5.3" }
-                @{ Path = "C:\Epic Games\UE 5.2"; ExpectedVersion = "5.2" }
-                @{ Path = "C:\Apps\UE_Engines\5.1.0"; ExpectedVersion = "5.1.0" }
-            )
+        It "Acepta respuesta en minúscula (y) para guardar" {
+            Mock Test-Path { return $true }
+            Mock Read-Host {
+                if ($script:readHostCallCount -eq $null) { $script:readHostCallCount = 0 }
+                $script:readHostCallCount++
+                if ($script:readHostCallCount -eq 1) { return "Y" }  # Launch
+                return "y"  # Save (lowercase)
+            }
+            Mock Start-Process { }
 
-            foreach ($case in $testCases) {
-                Mock Get-ConfigValue { return $null }
-                Mock Find-UnrealEngine { return $case.Path }
+            Start-UnrealEditor -UERoot "C:\UE_5.3"
 
-                $capturedVersion = $null
-                Mock Set-ConfigValue {
-                    param($Path, $Value)
-                    if ($Path -eq $script:CONSTANTS.ConfigKeys.EngineVersion) {
-                        $script:capturedVersion = $Value
-                    }
-                }
+            Should -Invoke Set-ConfigValue -Times 1
+        }
+    }
 
-                Get-UnrealEngineRoot
+    Context "Caso: Excepción al lanzar editor" {
 
-                $script:capturedVersion | Should -Be $case.ExpectedVersion
+        It "Retorna false cuando Start-Process lanza excepción" {
+            Mock Test-Path { return $true }
+            $script:readHostCallCount = 0
+            Mock Read-Host {
+                $script:readHostCallCount++
+                if ($script:readHostCallCount -eq 1) { return "Y" }
+                return "N"
+            }
+            Mock Start-Process {
+                throw "File not found"
             }
-        }
-    }
 
-    Context "Caso: Usuario cancela selección" {
+            $result = Start-UnrealEditor -UERoot "C:\UE_5.3"
 
-        It "Lanza BuildException con detalles correctos" {
-            Mock Get-ConfigValue { return $null }
-            Mock Find-UnrealEngine { return $null }
+            $result | Should -Be $false
+        }
 
-            try {
-                Get-UnrealEngineRoot
-                Should -Fail "Excepcion esperada no fue lanzada"
+        It "Escribe log ERROR cuando falla el lanzamiento" {
+            Mock Test-Path { return $true }
+            $script:readHostCallCount = 0
+            Mock Read-Host {
+                $script:readHostCallCount++
+                if ($script:readHostCallCount -eq 1) { return "Y" }
+                return "N"
             }
-            catch{
-                $_.Exception.Message | Should -Match "Setup cancelled or no valid Unreal Engine found"
-                $_.Exception.Category | Should -Be "Configuration"
-                $_.Exception.Suggestion | Should -Match "Install Unreal Engine and run the script again"
+            Mock Start-Process {
+                throw "Access denied"
+            }
+
+            Start-UnrealEditor -UERoot "C:\UE_5.3"
+
+            Should -Invoke Write-Log -ParameterFilter {
+                $Message -match "Failed to launch editor" -and
+                $Message -match "Access denied" -and
+                $Level -eq "ERROR"
             }
         }
-    }
-}
 
-Describe "Test-UnrealEngineValid" -Tag "UnrealEngine" {
+        It "Muestra mensaje de error cuando falla el lanzamiento" {
+            Mock Test-Path { return $true }
+            $script:readHostCallCount = 0
+            Mock Read-Host {
+                $script:readHostCallCount++
+                if ($script:readHostCallCount -eq 1) { return "Y" }
+                return "N"
+            }
+            Mock Start-Process {
+                throw "Process error"
+            }
 
-    BeforeAll {
-        . "$PSScriptRoot\..\Source\sync_and_build.ps1"
-    }
+            Start-UnrealEditor -UERoot "C:\UE_5.3"
 
-    BeforeEach {
-        $script:CONSTANTS = @{
-            Paths = @{
-                UnrealBuildBat = "Engine\Build\BatchFiles\Build.bat"
-                UnrealEditorExe = "Engine\Binaries\Win64\UnrealEditor.exe"
+            Should -Invoke Write-Host -ParameterFilter {
+                $Object -match "Failed to launch editor" -and
+                $Object -match "Process error"
             }
         }
     }
 
-    Context "Caso: Instalación válida de Unreal Engine" {
-
-        It "Retorna true cuando Build.bat y UnrealEditor.exe existen" {
-            $ueRoot = "C:\UE_5.3"
+    Context "Caso: Mensajes informativos" {
 
-            Mock Test-Path {
-                param($Path)
-                if ($Path -match "Build\.bat$" -or $Path -match "UnrealEditor\.exe$") {
-                    return $true
-                }
-                return $false
-            }
+        It "Muestra header READY TO LAUNCH" {
+            Mock Test-Path { return $false }
 
-            $result = Test-UnrealEngineValid -UERoot $ueRoot
+            Start-UnrealEditor -UERoot "C:\UE_5.3"
 
-            $result | Should -Be $true
+            Should -Invoke Write-Header -ParameterFilter {
+                $Text -eq "READY TO LAUNCH"
+            }
         }
 
-        It "Valida las rutas correctas construidas con Join-Path" {
-            $ueRoot = "C:\Epic Games\UE_5.4"
-            $expectedBuildBat = "C:\Epic Games\UE_5.4\Engine\Build\BatchFiles\Build.bat"
-            $expectedEditorExe = "C:\Epic Games\UE_5.4\Engine\Binaries\Win64\UnrealEditor.exe"
+        It "Muestra mensaje de éxito cuando lanza" {
+            Mock Test-Path { return $true }
+            $script:readHostCallCount = 0
+            Mock Read-Host {
+                $script:readHostCallCount++
+                if ($script:readHostCallCount -eq 1) { return "Y" }
+                return "N"
+            }
+            Mock Start-Process { }
 
-            $capturedPaths = @()
-            Mock Test-Path {
-                param($Path)
-                $script:capturedPaths += $Path
-                return $true
+            Start-UnrealEditor -UERoot "C:\UE_5.3"
+
+            Should -Invoke Write-Host -ParameterFilter {
+                $Object -match "Editor launched successfully"
             }
+        }
 
-            Test-UnrealEngineValid -UERoot $ueRoot
+        It "Muestra mensaje 'Skipping editor launch' cuando usuario rechaza" {
+            Mock Test-Path { return $true }
+            Mock Read-Host { return "N" }
 
-            $script:capturedPaths | Should -Contain $expectedBuildBat
-            $script:capturedPaths | Should -Contain $expectedEditorExe
+            Start-UnrealEditor -UERoot "C:\UE_5.3"
+
+            Should -Invoke Write-Host -ParameterFilter {
+                $Object -match "Skipping editor launch"
+            }
         }
     }
 
-    Context "Caso: Build.bat no existe" {
+    Context "Caso: Tiempo hasta que el editor está listo" {
 
-        It "Lanza BuildException con mensaje específico para Build.bat" {
-            Mock Test-Path {
-                param($Path)
-                if ($Path -match "Build\.bat$") {
-                    return $false
-                }
-                return $true
-            }
+        BeforeEach {
+            $script:runState = @{}
+            Mock Test-Path { return $true }
+            Mock Get-ConfigValue { return $true }
+            Mock Start-Process { return [PSCustomObject]@{ Id = 1234 } }
+        }
 
-            try {
-                Test-UnrealEngineValid -UERoot "C:\UE"
-                Should -Fail "Excepcion esperada no fue lanzada"
-            }
-            catch{
-                $_.Exception.Message | Should -Match "Build\.bat not found in UE installation"
-                $_.Exception.Category | Should -Be "Unreal Engine"
-                $_.Exception.Suggestion | Should -Match "Ensure you selected a valid UE installation folder"
-            }
+        It "Guarda en el historial el tiempo hasta la ventana principal" {
+            Mock Wait-EditorReady { return 42.5 }
+
+            Start-UnrealEditor -UERoot "C:\UE_5.3" | Should -Be $true
+
+            $script:runState.EditorReadySeconds | Should -Be 42.5
+            Should -Invoke Start-Process -ParameterFilter { $PassThru }
+            Should -Invoke Wait-EditorReady -ParameterFilter { $Process.Id -eq 1234 }
+        }
+
+        It "No guarda tiempo cuando el editor no llega a abrirse" {
+            Start-UnrealEditor -UERoot "C:\UE_5.3" | Should -Be $true
+
+            $script:runState.ContainsKey("EditorReadySeconds") | Should -Be $false
         }
     }
+}
 
-    Context "Caso: UnrealEditor.exe no existe" {
+Describe "Wait-EditorReady" -Tag "Editor" {
 
-        It "Lanza BuildException con mensaje específico para UnrealEditor.exe" {
-            Mock Test-Path {
-                param($Path)
-                if ($Path -match "Build\.bat$") {
-                    return $true
-                }
-                return $false
-            }
+    BeforeAll {
+        . "$PSScriptRoot\..\Source\sync_and_build.ps1"
+    }
 
-            try {
-                Test-UnrealEngineValid -UERoot "C:\UE"
-                Should -Fail "Excepcion esperada no fue lanzada"
-            }
-            catch{
-                $_.Exception.Message | Should -Match "UnrealEditor\.exe not found"
-                $_.Exception.Category | Should -Be "Unreal Engine"
-                $_.Exception.Suggestion | Should -Match "Ensure you compile the Engine"
+    BeforeEach {
+        $script:projectName = "MyGame"
+        $script:CONSTANTS = @{
+            ConfigKeys = @{ EditorReadyTimeoutMinutes = "editor.readyTimeoutMinutes" }
+            EditorReady = @{ TimeoutMinutes = 1; PollIntervalMs = 1; ProgressIntervalSeconds = 30 }
+        }
+        Mock Write-Log { }
+        Mock Write-Host { }
+        Mock Start-Sleep { }
+        Mock Test-KeyPressed { return $false }
+        Mock Get-ConfigValue {
+            param($Path, $DefaultValue)
+            return $DefaultValue
+        }
+
+        # Process whose states are returned one per Refresh(), the last one repeats
+        $script:NewEditorProcess = {
+            param([object[]]$States)
+            $process = [PSCustomObject]@{ HasExited = $false; MainWindowHandle = [IntPtr]::Zero; MainWindowTitle = ""; States = $States; Refreshes = 0 }
+            $process | Add-Member -MemberType ScriptMethod -Name "Refresh" -Value {
+                $state = $this.States[[math]::Min($this.Refreshes, $this.States.Count - 1)]
+                $this.Refreshes++
+                $this.HasExited = $state.HasExited
+                $this.MainWindowHandle = $state.MainWindowHandle
+                $this.MainWindowTitle = $state.MainWindowTitle
             }
+            return $process
         }
     }
 
-    Context "Caso: Diferentes rutas de UERoot" {
+    It "Espera a la ventana principal con el nombre del proyecto, no al splash" {
+        $process = & $script:NewEditorProcess @(
+            @{ HasExited = $false; MainWindowHandle = [IntPtr]::Zero; MainWindowTitle = "" },
+            @{ HasExited = $false; MainWindowHandle = [IntPtr]5; MainWindowTitle = "" },
+            @{ HasExited = $false; MainWindowHandle = [IntPtr]7; MainWindowTitle = "MyGame - Unreal Editor" }
+        )
 
-        It "Funciona con rutas que contienen espacios" {
-            $ueRoot = "C:\Program Files\Epic Games\UE_5.3"
+        $seconds = Wait-EditorReady -Process $process -Timer ([System.Diagnostics.Stopwatch]::StartNew())
 
-            Mock Test-Path { return $true }
+        $seconds | Should -BeOfType [double]
+        $process.Refreshes | Should -Be 3
+    }
 
-            $result = Test-UnrealEngineValid -UERoot $ueRoot
+    It "Devuelve null cuando el editor se cierra antes de abrirse" {
+        $process = & $script:NewEditorProcess @(@{ HasExited = $true; MainWindowHandle = [IntPtr]::Zero; MainWindowTitle = "" })
 
-            $result | Should -Be $true
-        }
+        Wait-EditorReady -Process $process -Timer ([System.Diagnostics.Stopwatch]::StartNew()) | Should -BeNullOrEmpty
 
-        It "Funciona con rutas sin espacios" {
-            $ueRoot = "C:\UE_5.3"
+        Should -Invoke Write-Log -ParameterFilter { $Message -match "exited before" -and $Level -eq "WARNING" }
+    }
 
-            Mock Test-Path { return $true }
+    It "Escribe el log pendiente antes de esperar al editor" {
+        Mock Write-LogBuffer { }
+        $process = & $script:NewEditorProcess @(@{ HasExited = $true; MainWindowHandle = [IntPtr]::Zero; MainWindowTitle = "" })
 
-            $result = Test-UnrealEngineValid -UERoot $ueRoot
+        Wait-EditorReady -Process $process -Timer ([System.Diagnostics.Stopwatch]::StartNew()) | Out-Null
 
-            $result | Should -Be $true
-        }
+        Should -Invoke Write-LogBuffer -Times 1 -Exactly
+    }
 
-        It "Funciona con rutas en diferentes unidades" {
-            $testCases = @(
-                "D:\UnrealEngine\UE_5.3",
-                "E:\Development\UE_5.4",
-                "C:\Apps\UE_Engines\5.1"
-            )
+    It "Usa el tiempo de espera de editor.readyTimeoutMinutes" {
+        # 0.0001 minutos son 6 ms
+        Mock Get-ConfigValue { return 0.0001 } -ParameterFilter { $Path -eq "editor.readyTimeoutMinutes" }
+        $process = & $script:NewEditorProcess @(@{ HasExited = $false; MainWindowHandle = [IntPtr]::Zero; MainWindowTitle = "" })
 
-            Mock Join-Path {
-                param($Path, $ChildPath)
-                return "$Path\$ChildPath"
-            }
+        Wait-EditorReady -Process $process -Timer ([System.Diagnostics.Stopwatch]::StartNew()) | Should -BeNullOrEmpty
 
-            Mock Test-Path { return $true }
+        Should -Invoke Write-Log -ParameterFilter { $Message -match "within 0\.0001 minute" }
+    }
 
-            foreach ($ueRoot in $testCases) {
+    It "No espera cuando editor.readyTimeoutMinutes es 0" {
+        Mock Get-ConfigValue { return 0 } -ParameterFilter { $Path -eq "editor.readyTimeoutMinutes" }
+        $process = & $script:NewEditorProcess @(@{ HasExited = $false; MainWindowHandle = [IntPtr]::Zero; MainWindowTitle = "" })
 
-                $result = Test-UnrealEngineValid -UERoot $ueRoot
+        Wait-EditorReady -Process $process -Timer ([System.Diagnostics.Stopwatch]::StartNew()) | Should -BeNullOrEmpty
 
-                $result | Should -Be $true
-            }
-        }
+        $process.Refreshes | Should -Be 0
     }
-}
 
-Describe "Find-UnrealProject" -Tag "UnrealEngine"{
+    It "Deja de esperar cuando se pulsa una tecla" {
+        Mock Test-KeyPressed { return $true }
+        $process = & $script:NewEditorProcess @(@{ HasExited = $false; MainWindowHandle = [IntPtr]::Zero; MainWindowTitle = "" })
 
-    BeforeAll {
-        . "$PSScriptRoot\..\Source\sync_and_build.ps1"
+        Wait-EditorReady -Process $process -Timer ([System.Diagnostics.Stopwatch]::StartNew()) | Should -BeNullOrEmpty
+
+        $process.Refreshes | Should -Be 1
+        Should -Invoke Write-Log -ParameterFilter { $Message -match "Stopped waiting for the editor" }
     }
 
-    BeforeEach{
-        Mock Write-Host { }
-        Mock Write-Log { }
+    It "Muestra el progreso mientras el editor sigue cargando" {
+        $script:CONSTANTS.EditorReady.ProgressIntervalSeconds = 0
+        $process = & $script:NewEditorProcess @(
+            @{ HasExited = $false; MainWindowHandle = [IntPtr]::Zero; MainWindowTitle = "" },
+            @{ HasExited = $false; MainWindowHandle = [IntPtr]7; MainWindowTitle = "MyGame - Unreal Editor" }
+        )
+
+        Wait-EditorReady -Process $process -Timer ([System.Diagnostics.Stopwatch]::StartNew()) | Out-Null
+
+        Should -Invoke Write-Host -Times 1 -Exactly -ParameterFilter { $Object -match "Still waiting for the editor window" }
     }
 
-    Context "Caso: Encuentra el archivo .uproject" {
+    It "Devuelve null sin proceso" {
+        Wait-EditorReady -Process $null -Timer ([System.Diagnostics.Stopwatch]::StartNew()) | Should -BeNullOrEmpty
+    }
+}
 
-        It "Retorna la ruta del archivo .uproject si existe" {
-            Mock Get-ChildItem { 
-                param()
-                return @(
-                    [PSCustomObject]@{
-                        Name = "myproject.uproject"
-                        FullName = "C:\MyProject\UnrealProject\ExtraFolder\myproject.uproject"
-                    }
-                )
-            }
+# =============================================================================
+# TESTS DE REGEX DE EXTENSIONES
+# =============================================================================
 
-            $result = Find-UnrealProject -SearchPath "C:\MyProject"
+Describe "Detección de extensiones de código" -Tag "Helpers" {
+    
+    Context "Regex patterns" {
+        
+        It "Detecta .cpp con formato Perforce (file.cpp#5)" {
+            $description = "... //depot/Source/Player.cpp#5 edit"
+            $ext = ".cpp"
+            $pattern = [regex]::Escape($ext) + '#\d+'
             
-            $result.FullName | Should -Be "C:\MyProject\UnrealProject\ExtraFolder\myproject.uproject"
+            $description -match $pattern | Should -Be $true
         }
-
-        It "Encuentra multiples archivos .uproject y permite seleccionar" {
-            Mock Get-ChildItem {
-                param()
-                return @(
-                    [PSCustomObject]@{
-                        Name = "ProjectA.uproject"
-                        FullName = "C:\MyProject\ProjectA.uproject"
-                    },
-                    [PSCustomObject]@{
-                        Name = "ProjectB.uproject"
-                        FullName = "C:\MyProject\ProjectB.uproject"
-                    }
-                )
-            }
+        
+        It "NO hace false positive con 'cpp' en texto" {
+            $description = "See cppreference.com for C++ documentation"
+            $ext = ".cpp"
+            $pattern = [regex]::Escape($ext) + '#\d+'
             
-            Mock Read-Host { return "2" }
+            $description -match $pattern | Should -Be $false
+        }
+        
+        It "Detecta múltiples extensiones en mismo changelist" {
+            $description = @"
+... //depot/Source/Player.cpp#5 edit
+... //depot/Source/Game.h#3 edit
+... //depot/Source/Build.cs#2 edit
+... //depot/Content/UI.uasset#1 add
+"@
             
-            $result = Find-UnrealProject -SearchPath "C:\MyProject"
+            $codeExtensions = @('.cpp', '.h', '.cs')
+            $foundExtensions = @()
             
-            $result.FullName | Should -Be "C:\MyProject\ProjectB.uproject"
+            foreach ($ext in $codeExtensions) {
+                $pattern = [regex]::Escape($ext) + '#\d+'
+                if ($description -match $pattern) {
+                    $foundExtensions += $ext
+                }
+            }
+            
+            $foundExtensions.Count | Should -Be 3
+            $foundExtensions | Should -Contain '.cpp'
+            $foundExtensions | Should -Contain '.h'
+            $foundExtensions | Should -Contain '.cs'
         }
-
-        It "Maneja selección inválida y pide de nuevo" {
-            Mock Test-Path { return $false }
+        
+        It "Distingue entre .cs y .build.cs" {
+            $description = "... //depot/Source/MyGame.build.cs#1 edit"
             
-            Mock Get-ChildItem {
-                param()
-                return @(
-                    [PSCustomObject]@{
-                        Name = "ProjectA.uproject"
-                        FullName = "C:\MyProject\ProjectA.uproject"
-                    },
-                    [PSCustomObject]@{
-                        Name = "ProjectB.uproject"
-                        FullName = "C:\MyProject\ProjectB.uproject"
-                    }
-                )
-            }
+            $pattern1 = [regex]::Escape('.cs') + '#\d+'
+            $pattern2 = [regex]::Escape('.build.cs') + '#\d+'
             
-            $script:callCount = 0
+            # Ambos deberían hacer match (build.cs contiene .cs)
+            $description -match $pattern1 | Should -Be $true
+            $description -match $pattern2 | Should -Be $true
+        }
+    }
+    
+    Context "Edge cases" {
+        
+        It "Maneja descripción vacía sin error" {
+            $description = ""
+            $ext = ".cpp"
+            $pattern = [regex]::Escape($ext) + '#\d+'
             
-            Mock Read-Host {
-                $script:callCount++
-                if ($script:callCount -eq 1) {
-                    return "99"  # Inválido
-                }
-                return "1"  # Válido
-            }
+            $description -match $pattern | Should -Be $false
+        }
+        
+        It "Maneja descripción con caracteres especiales" {
+            $description = "... //depot/Source/My$pecial.cpp#5 edit"
+            $ext = ".cpp"
+            $pattern = [regex]::Escape($ext) + '#\d+'
             
-            $result = Find-UnrealProject -SearchPath "C:\MyProject"
+            $description -match $pattern | Should -Be $true
+        }
+    }
+}
+
+# =============================================================================
+# TESTS DE UTILIDADES
+# =============================================================================
+
+Describe "Split-Path para project root" -Tag "Helpers" {
+    
+    It "Sube un nivel desde script directory" {
+        $scriptDir = "C:\MyProject\src\scripts"
+        $projectRoot = Split-Path $scriptDir -Parent
+        
+        $projectRoot | Should -Be "C:\MyProject\src"
+    }
+    
+    It "Sube dos niveles correctamente" {
+        $scriptDir = "C:\MyProject\src\scripts"
+        $parent1 = Split-Path $scriptDir -Parent  # C:\MyProject\src
+        $parent2 = Split-Path $parent1 -Parent    # C:\MyProject
+        
+        $parent2 | Should -Be "C:\MyProject"
+    }
+}
+
+Describe "Array handling" -Tag "Helpers" {
+    
+    Context "Conversión a array con @()" {
+        
+        It "Convierte int único a array de 1 elemento" {
+            $changelist = 12345
+            $changes = @($changelist)
             
-            $result.FullName | Should -Be "C:\MyProject\ProjectA.uproject"
+            $changes -is [array] | Should -Be $true
+            $changes.Count | Should -Be 1
+            $changes[0] | Should -Be 12345
+        }
+        
+        It "Mantiene array como array" {
+            $changelist = @(111, 222, 333)
+            $changes = @($changelist)
             
-            Should -Invoke Read-Host -Times 2
+            $changes.Count | Should -Be 3
+        }
+        
+        It "Convierte $null a array vacío" {
+            $changelist = $null
+            $changes = @($changelist)
             
-            Should -Invoke Write-Host -ParameterFilter {
-                $Object -match "Invalid choice"
-            }
+            $changes.Count | Should -Be 1
         }
     }
-
-    Context "Caso: No encuentra el archivo .uproject" {
-
-        It "lanza excepción si no encuentra archivo .uproject" {
-            Mock Get-ChildItem { 
-                param()
-                return @() 
-            }
-
-            try {
-                $result = Find-UnrealProject -SearchPath "C:\MyProject"
+    
+    Context "Empty arrays en if" {
+        
+        It "Array vacío se evalúa como false" {
+            $emptyArray = @()
             
-                $result | Should -Be $null
+            if ($emptyArray) {
+                $result = "not empty"
+            } else {
+                $result = "empty"
             }
-            catch {
-                $_.Exception.Message | Should -Be "No Unreal project (.uproject) found in: C:\MyProject"
-                $_.Exception.Category | Should -Be "Project Detection"
-                $_.Exception.Suggestion | Should -Be "Ensure there is a .uproject in the search path"
+            
+            $result | Should -Be "empty"
+        }
+        
+        It "Array con elementos se evalúa como true" {
+            $arrayWithItems = @(1, 2, 3)
+            
+            if ($arrayWithItems) {
+                $result = "not empty"
+            } else {
+                $result = "empty"
             }
+            
+            $result | Should -Be "not empty"
         }
     }
 }
 
 # =============================================================================
-# TESTS DE BUILD
+# TESTS DE INTEGRACIÓN
 # =============================================================================
 
-Describe "Invoke-ProjectBuild" -Tag "Build" {
+Describe "Workflow completo" -Tag "Integration" {
 
     BeforeAll {
         . "$PSScriptRoot\..\Source\sync_and_build.ps1"
     }
 
     BeforeEach {
-        $script:CONSTANTS = @{
-            Paths = @{
-                UnrealBuildBat = "Engine\Build\BatchFiles\Build.bat"
-            }
-            ConfigKeys = @{
-                UseUBTLogging = "UseUBTLogging"
-            }
-            FileNames = @{
-                BuildLogFileName = "Build.log"
+        $script:projectRoot = "C:\TestProject"
+        
+        if (-not $script:CONSTANTS) {
+            $script:CONSTANTS = @{
+                PerforceUpToDate = "file\(s\) up-to-date\."
             }
         }
 
-        $script:projectName = "MyGame"
-        $script:projectFile = "C:\MyProject\MyGame.uproject"
-        $script:logsDir = "C:\Logs"
-
-        Mock Write-Header { }
-        Mock Write-Host { }
-        Mock Write-Log { }
         Mock Get-ConfigValue {
             param($Path, $DefaultValue)
+            
+            if ($Path -eq "CodeExtensions") {
+                return @('.cpp', '.h', '.build.cs', '.cs')
+            }
             return $DefaultValue
         }
     }
-
-    Context "Caso: Build exitoso (incremental)" {
-
-        It "Retorna true cuando el build termina con ExitCode 0" {
-            Mock Start-Process {
-                return [PSCustomObject]@{
-                    ExitCode = 0
+    
+    It "Flujo: Sync, Detecta cambios, Build" {
+        Mock Invoke-ChangelistIndex { return $null }
+        Mock Get-BuildDecision { return $null }
+        Mock Test-PerforceEnvironment { return "test-workspace" }
+        Mock Get-LatestHaveChangelist { 
+                if ($script:callCount -eq 0) {
+                    $script:callCount = 1
+                    return 12340
                 }
+                
+                return 12345
             }
-
-            $result = Invoke-ProjectBuild -UERoot "C:\UE_5.3" -CleanBuild:$false
-
-            $result | Should -Be $true
-        }
-
-        It "Construye la ruta correcta del Build.bat" {
-            $capturedFilePath = $null
-            Mock Start-Process {
-                param($FilePath, $ArgumentList, $NoNewWindow, $Wait, $PassThru)
-                $script:capturedFilePath = $FilePath
-                return [PSCustomObject]@{ ExitCode = 0 }
-            }
-
-            Invoke-ProjectBuild -UERoot "C:\UE_5.3"
-
-            $script:capturedFilePath | Should -Be "C:\UE_5.3\Engine\Build\BatchFiles\Build.bat"
-        }
-
-        It "Pasa argumentos correctos sin -Clean" {
-            $capturedArgs = $null
-            Mock Start-Process {
-                param($FilePath, $ArgumentList, $NoNewWindow, $Wait, $PassThru)
-                $script:capturedArgs = $ArgumentList
-                return [PSCustomObject]@{ ExitCode = 0 }
-            }
-
-            Invoke-ProjectBuild -UERoot "C:\UE_5.3"
-
-            $script:capturedArgs | Should -Contain "MyGameEditor"
-            $script:capturedArgs | Should -Contain "Win64"
-            $script:capturedArgs | Should -Contain "Development"
-            $script:capturedArgs | Should -Contain "`"C:\MyProject\MyGame.uproject`""
-            $script:capturedArgs | Should -Not -Contain "-Clean"
-        }
-
-        It "Ejecuta Start-Process con -Wait y -PassThru" {
-            $capturedWait = $null
-            $capturedPassThru = $null
-            Mock Start-Process {
-                param($FilePath, $ArgumentList, $NoNewWindow, $Wait, $PassThru)
-                $script:capturedWait = $Wait
-                $script:capturedPassThru = $PassThru
-                return [PSCustomObject]@{ ExitCode = 0 }
-            }
-
-            Invoke-ProjectBuild -UERoot "C:\UE_5.3"
-
-            $script:capturedWait | Should -Be $true
-            $script:capturedPassThru | Should -Be $true
-        }
-
-        It "Muestra mensaje de build incremental cuando no se usa -CleanBuild" {
-            Mock Start-Process {
-                return [PSCustomObject]@{ ExitCode = 0 }
-            }
-
-            Invoke-ProjectBuild -UERoot "C:\UE_5.3"
-
-            Should -Invoke Write-Host -ParameterFilter {
-                $Object -match "Performing incremental build"
-            }
-        }
-    }
-
-    Context "Caso: Build exitoso (clean build)" {
-
-        It "Agrega -Clean a los argumentos cuando se usa -CleanBuild" {
-            $capturedArgs = $null
-            Mock Start-Process {
-                param($FilePath, $ArgumentList, $NoNewWindow, $Wait, $PassThru)
-                $script:capturedArgs = $ArgumentList
-                return [PSCustomObject]@{ ExitCode = 0 }
-            }
-
-            Invoke-ProjectBuild -UERoot "C:\UE_5.3" -CleanBuild
-
-            $script:capturedArgs | Should -Contain "-Clean"
-        }
-
-        It "Muestra mensaje de clean build cuando se usa -CleanBuild" {
-            Mock Start-Process {
-                return [PSCustomObject]@{ ExitCode = 0 }
-            }
-
-            Invoke-ProjectBuild -UERoot "C:\UE_5.3" -CleanBuild
-
-            Should -Invoke Write-Host -ParameterFilter {
-                $Object -match "Clean build requested"
-            }
-        }
-
-        It "Retorna true cuando clean build exitoso" {
-            Mock Start-Process {
-                return [PSCustomObject]@{ ExitCode = 0 }
-            }
-
-            $result = Invoke-ProjectBuild -UERoot "C:\UE_5.3" -CleanBuild
-
-            $result | Should -Be $true
-        }
-    }
-
-    Context "Caso: Build con UBT logging habilitado" {
-
-        It "Agrega -Log cuando UseUBTLogging es true" {
-            Mock Get-ConfigValue {
-                param($Path, $DefaultValue)
-                if ($Path -eq "UseUBTLogging") {
-                    return $true
+        Mock Push-Location { }
+        Mock Pop-Location { }
+        Mock Write-Host { }
+        Mock Write-Log { }
+        Mock Write-Header { }
+        
+        Mock p4 {
+            param([Parameter(ValueFromRemainingArguments)]$Arguments)
+            
+            $cmd = $Arguments | Where-Object { $_ -ne '-ztag' } | Select-Object -First 1
+            
+            $global:LASTEXITCODE = 0
+            
+            switch ($cmd) {
+                'sync' {
+                    if ($Arguments -contains '-N') {
+                        return "Server network estimates: files added/updated/deleted=0/2/0, bytes added/updated=0/4096"
+                    }
+                    "... depotFile //depot/Source/Player.cpp", "... rev 5", "... action updated", "... fileSize 2048"
+                    "... depotFile //depot/Source/Game.h", "... rev 3", "... action updated", "... fileSize 2048"
                 }
-                return $DefaultValue
-            }
-
-            $capturedArgs = $null
-            Mock Start-Process {
-                param($FilePath, $ArgumentList, $NoNewWindow, $Wait, $PassThru)
-                $script:capturedArgs = $ArgumentList
-                return [PSCustomObject]@{ ExitCode = 0 }
-            }
-
-            Invoke-ProjectBuild -UERoot "C:\UE_5.3"
-
-            $logArg = $script:capturedArgs | Where-Object { $_ -match '^-Log=' }
-            $logArg | Should -Not -BeNullOrEmpty
-            $logArg | Should -Match 'Build\.log'
-        }
-
-        It "No agrega -Log cuando UseUBTLogging es false" {
-            Mock Get-ConfigValue {
-                param($Path, $DefaultValue)
-                if ($Path -eq "UseUBTLogging") {
-                    return $false
+                
+                'files' {
+                    return @(
+                        "//depot/Source/MyGame/Player.cpp#5 - edit change 12345 (text)",
+                        "//depot/Source/MyGame/PlayerController.h#3 - edit change 12345 (text)"
+                    )
                 }
-                return $DefaultValue
-            }
-
-            $capturedArgs = $null
-            Mock Start-Process {
-                param($FilePath, $ArgumentList, $NoNewWindow, $Wait, $PassThru)
-                $script:capturedArgs = $ArgumentList
-                return [PSCustomObject]@{ ExitCode = 0 }
-            }
-
-            Invoke-ProjectBuild -UERoot "C:\UE_5.3"
-
-            $logArg = $script:capturedArgs | Where-Object { $_ -match '^-Log=' }
-            $logArg | Should -BeNullOrEmpty
-        }
-
-        It "Escribe log VERBOSE con ruta del build log cuando UBT logging habilitado" {
-            Mock Get-ConfigValue {
-                param($Path, $DefaultValue)
-                if ($Path -eq "UseUBTLogging") {
-                    return $true
+                
+                'changes' {
+                    return "Change 12345 on 2024/12/25 by user@workspace"
+                }
+                
+                default {
+                    Write-Warning "Mock p4: comando desconocido: $cmd"
+                    return @()
                 }
-                return $DefaultValue
-            }
-
-            Mock Start-Process {
-                return [PSCustomObject]@{ ExitCode = 0 }
-            }
-
-            Invoke-ProjectBuild -UERoot "C:\UE_5.3"
-
-            Should -Invoke Write-Log -ParameterFilter {
-                $Message -match "Build log will be saved to" -and $Level -eq "VERBOSE"
             }
         }
+        
+        
+        $syncResult = Sync-FromPerforce -SkipSync:$false
+        $hasCodeChanges = Test-CodeChanges -Changelist 12345
+        
+        
+        $syncResult | Should -Be $true
+        $hasCodeChanges | Should -Be $true
     }
+}
 
-    Context "Caso: Build fallido" {
-
-        It "Retorna false cuando ExitCode no es 0" {
-            Mock Start-Process {
-                return [PSCustomObject]@{ ExitCode = 1 }
-            }
+# =============================================================================
+# TESTS DE TRAZAS
+# =============================================================================
 
-            $result = Invoke-ProjectBuild -UERoot "C:\UE_5.3"
+Describe "Trazas" -Tag "Tracing" {
 
-            $result | Should -Be $false
-        }
+    BeforeAll {
+        . "$PSScriptRoot\..\Source\sync_and_build.ps1"
+    }
 
-        It "Escribe log ERROR cuando build falla" {
-            Mock Start-Process {
-                return [PSCustomObject]@{ ExitCode = 5 }
-            }
+    BeforeEach {
+        $traceFile = Join-Path $TestDrive "trace.json"
+        Remove-Item $traceFile -ErrorAction SilentlyContinue
+        $script:projectName = "MyGame"
+        $script:trace = $null
+        Mock Write-Log { }
+    }
 
-            Invoke-ProjectBuild -UERoot "C:\UE_5.3"
+    Context "Trazas desactivadas" {
 
-            Should -Invoke Write-Log -ParameterFilter {
-                $Message -match "Build failed" -and
-                $Message -match "Exit code: 5" -and
-                $Level -eq "ERROR"
-            }
-        }
+        It "No guarda nada cuando tracing.enabled está apagado" {
+            Mock Get-ConfigValue { return $false }
 
-        It "Muestra mensaje BUILD FAILED cuando falla" {
-            Mock Start-Process {
-                return [PSCustomObject]@{ ExitCode = 1 }
-            }
+            Start-Trace
+            Invoke-TraceSpan "Sync-FromPerforce" { $true } | Out-Null
+            Save-Trace -Path $traceFile
 
-            Invoke-ProjectBuild -UERoot "C:\UE_5.3"
+            $script:trace | Should -BeNullOrEmpty
+            Test-Path $traceFile | Should -Be $false
+        }
 
-            Should -Invoke Write-Host -ParameterFilter {
-                $Object -match "BUILD FAILED"
-            }
+        It "Start-TraceSpan devuelve null" {
+            Start-TraceSpan -Name "p4 info" | Should -BeNullOrEmpty
         }
+    }
 
-        It "Muestra mensaje con ruta del log cuando UBT logging habilitado y build falla" {
+    Context "Trazas activadas" {
+
+        BeforeEach {
             Mock Get-ConfigValue {
                 param($Path, $DefaultValue)
-                if ($Path -eq "UseUBTLogging") {
-                    return $true
-                }
+                if ($Path -eq "tracing.enabled") { return $true }
                 return $DefaultValue
             }
-
-            Mock Start-Process {
-                return [PSCustomObject]@{ ExitCode = 1 }
-            }
-
-            Invoke-ProjectBuild -UERoot "C:\UE_5.3"
-
-            Should -Invoke Write-Host -ParameterFilter {
-                $Object -match "Check the build log for details"
-            }
         }
 
-        It "Retorna false para diferentes códigos de error" {
-            $errorCodes = @(1, 2, 5, 10, 127, 255)
-
-            foreach ($code in $errorCodes) {
-                Mock Start-Process {
-                    return [PSCustomObject]@{ ExitCode = $code }
-                }
-
-                $result = Invoke-ProjectBuild -UERoot "C:\UE_5.3"
-
-                $result | Should -Be $false
-            }
-        }
-    }
-
-    Context "Caso: Excepciones durante el build" {
-
-        It "Retorna false cuando Start-Process lanza excepción" {
-            Mock Start-Process {
-                throw "Process failed to start"
-            }
-
-            $result = Invoke-ProjectBuild -UERoot "C:\UE_5.3"
+        It "Devuelve la salida del bloque" {
+            Start-Trace
 
-            $result | Should -Be $false
+            Invoke-TraceSpan "Get-UnrealEngineRoot" { "C:\UE_5.3" } | Should -Be "C:\UE_5.3"
         }
 
-        It "Escribe log ERROR cuando hay excepción" {
-            Mock Start-Process {
-                throw "Build.bat not found"
-            }
+        It "Cierra el span aunque el bloque falle" {
+            Start-Trace
 
-            Invoke-ProjectBuild -UERoot "C:\UE_5.3"
-
-            Should -Invoke Write-Log -ParameterFilter {
-                $Message -match "Build error" -and
-                $Message -match "Build.bat not found" -and
-                $Level -eq "ERROR"
-            }
+            { Invoke-TraceSpan "Initialize-ProjectPaths" { throw "Project not found" } } | Should -Throw
+            $script:trace.Events.Count | Should -Be 1
         }
 
-        It "Llama Write-DetailedError cuando hay excepción" {
-            Mock Start-Process {
-                throw "Access denied"
+        It "Escribe un archivo de Chrome trace con spans anidados" {
+            Start-Trace
+            $main = Start-TraceSpan -Name "Main"
+            Invoke-TraceSpan "Sync-FromPerforce" {
+                $span = Start-TraceSpan -Name "p4 sync" -Category "p4"
+                Stop-TraceSpan -Span $span -Arguments @{ exitCode = 0 }
             }
-            Mock Write-DetailedError { }
+            Stop-TraceSpan -Span $main
+            Save-Trace -Path $traceFile
 
-            Invoke-ProjectBuild -UERoot "C:\UE_5.3"
+            $document = Get-Content $traceFile -Raw | ConvertFrom-Json
+            $document.displayTimeUnit | Should -Be "ms"
+            $document.otherData.project | Should -Be "MyGame"
+            $document.traceEvents.name | Should -Be @("p4 sync", "Sync-FromPerforce", "Main")
+            $document.traceEvents | ForEach-Object { $_.ph | Should -Be "X" }
 
-            Should -Invoke Write-DetailedError -ParameterFilter {
-                $Message -match "Build process crashed" -and
-                $Message -match "Access denied" -and
-                $Category -eq "Build" -and
-                $Suggestion -match "Visual Studio Build Tools"
-            }
+            $p4, $phase, $root = $document.traceEvents
+            $p4.cat | Should -Be "p4"
+            $p4.args.exitCode | Should -Be 0
+            $p4.ts | Should -BeGreaterOrEqual $phase.ts
+            ($p4.ts + $p4.dur) | Should -BeLessOrEqual ($phase.ts + $phase.dur)
+            $phase.ts | Should -BeGreaterOrEqual $root.ts
+            $script:trace | Should -BeNullOrEmpty
         }
 
-        It "Maneja excepción con mensaje vacío" {
-            Mock Start-Process {
-                throw [System.Exception]::new()
-            }
-
-            $result = Invoke-ProjectBuild -UERoot "C:\UE_5.3"
+        It "No detiene el script si no puede escribir" {
+            Mock Set-Content { throw "Access denied" }
+            Start-Trace
 
-            $result | Should -Be $false
+            { Save-Trace -Path $traceFile } | Should -Not -Throw
+            Should -Invoke Write-Log -ParameterFilter { $Level -eq "WARNING" }
         }
     }
+}
 
-    Context "Caso: Mensajes informativos" {
+# =============================================================================
+# TESTS DE HISTORIAL DE EJECUCIONES
+# =============================================================================
 
-        It "Muestra header BUILDING PROJECT" {
-            Mock Start-Process {
-                return [PSCustomObject]@{ ExitCode = 0 }
-            }
+Describe "Add-RunHistory" -Tag "RunHistory" {
 
-            Invoke-ProjectBuild -UERoot "C:\UE_5.3"
+    BeforeAll {
+        . "$PSScriptRoot\..\Source\sync_and_build.ps1"
+    }
 
-            Should -Invoke Write-Header -ParameterFilter {
-                $Text -eq "BUILDING PROJECT"
-            }
+    BeforeEach {
+        $historyFile = Join-Path $TestDrive "run_history.jsonl"
+        Remove-Item $historyFile -ErrorAction SilentlyContinue
+        $script:projectName = "MyGame"
+        $script:runState = @{
+            HaveCLBefore = 100
+            HaveCL = 120
+            SyncPreview = [PSCustomObject]@{ Files = 12; Deleted = 0; Bytes = 4096 }
+            Sync = @{ Files = 12; Bytes = 4096; Seconds = 3.5; Parallel = $false }
+            ContentSync = @{ Files = 30; Bytes = 65536; Seconds = 40.2 }
+            DdcPrefill = @{ Packages = 80; Processes = 2; Seconds = 95.5; TimedOut = $false; Failed = 0 }
+            CodeCheckSeconds = 0.25
+            AffectedModules = @("Inventory", "MyGame")
+            Build = @{ Seconds = 245.1; ExitCode = 0; Clean = $false; Warnings = 7 }
         }
+        Mock Write-Log { }
+    }
 
-        It "Muestra tiempo estimado de build" {
-            Mock Start-Process {
-                return [PSCustomObject]@{ ExitCode = 0 }
-            }
+    It "Añade una línea JSON con los changelists, el sync y los tiempos" {
+        Add-RunHistory -Succeeded -TotalSeconds 260.4 -Path $historyFile
 
-            Invoke-ProjectBuild -UERoot "C:\UE_5.3"
+        $record = Get-Content $historyFile | ConvertFrom-Json
+        $record.project | Should -Be "MyGame"
+        $record.succeeded | Should -Be $true
+        $record.fromCL | Should -Be 100
+        $record.toCL | Should -Be 120
+        $record.bytesSynced | Should -Be 4096
+        $record.syncSeconds | Should -Be 3.5
+        $record.contentSyncSeconds | Should -Be 40.2
+        $record.filesContentSynced | Should -Be 30
+        $record.bytesContentSynced | Should -Be 65536
+        $record.codeCheckSeconds | Should -Be 0.25
+        $record.buildRan | Should -Be $true
+        $record.buildSeconds | Should -Be 245.1
+        $record.buildExitCode | Should -Be 0
+        $record.buildWarnings | Should -Be 7
+        $record.ddcPrefillSeconds | Should -Be 95.5
+        $record.ddcPrefillPackages | Should -Be 80
+        $record.ddcPrefillTimedOut | Should -Be $false
+        $record.affectedModules | Should -Be @("Inventory", "MyGame")
+        $record.totalSeconds | Should -Be 260.4
+    }
 
-            Should -Invoke Write-Host -ParameterFilter {
-                $Object -match "Estimated time: 5-15 minutes"
-            }
-        }
+    It "Deja en null las fases que no se ejecutaron" {
+        $script:runState = @{}
 
-        It "Escribe log VERBOSE con comando completo ejecutado" {
-            Mock Start-Process {
-                return [PSCustomObject]@{ ExitCode = 0 }
-            }
+        Add-RunHistory -TotalSeconds 1 -Path $historyFile
 
-            Invoke-ProjectBuild -UERoot "C:\UE_5.3"
+        $record = Get-Content $historyFile | ConvertFrom-Json
+        $record.succeeded | Should -Be $false
+        $record.buildRan | Should -Be $false
+        $record.syncSeconds | Should -BeNullOrEmpty
+        $record.editorReadySeconds | Should -BeNullOrEmpty
+    }
 
-            Should -Invoke Write-Log -ParameterFilter {
-                $Message -match "Executing:.*Build\.bat" -and
-                $Message -match "MyGameEditor" -and
-                $Level -eq "VERBOSE"
-            }
-        }
+    It "Agrega una línea por ejecución" {
+        Add-RunHistory -Succeeded -TotalSeconds 1 -Path $historyFile
+        Add-RunHistory -Succeeded -TotalSeconds 2 -Path $historyFile
 
-        It "Muestra BUILD SUCCESSFUL cuando exitoso" {
-            Mock Start-Process {
-                return [PSCustomObject]@{ ExitCode = 0 }
-            }
+        (Get-Content $historyFile).Count | Should -Be 2
+    }
 
-            Invoke-ProjectBuild -UERoot "C:\UE_5.3"
+    It "No detiene el script si no puede escribir" {
+        Mock Add-Content { throw "Access denied" }
 
-            Should -Invoke Write-Host -ParameterFilter {
-                $Object -match "BUILD SUCCESSFUL"
-            }
-        }
+        { Add-RunHistory -TotalSeconds 1 -Path $historyFile } | Should -Not -Throw
+        Should -Invoke Write-Log -ParameterFilter { $Level -eq "WARNING" -and $Message -match "run history" }
     }
 }
 
 # =============================================================================
-# TESTS DE EDITOR
+# TESTS DE MODO WATCH
 # =============================================================================
 
-Describe "Start-UnrealEditor" -Tag "Editor" {
+Describe "Get-WatchBusyReason" -Tag "Watch" {
 
     BeforeAll {
         . "$PSScriptRoot\..\Source\sync_and_build.ps1"
     }
 
     BeforeEach {
-        $script:CONSTANTS = @{
-            Paths = @{
-                UnrealEditorExe = "Engine\Binaries\Win64\UnrealEditor.exe"
-            }
-            ConfigKeys = @{
-                EditorAutoLaunch = "EditorAutoLaunch"
-            }
-        }
+        Mock Write-Log { }
+        Mock Get-ConfigValue { param($Path, $DefaultValue) return $DefaultValue }
+        Mock Get-Process { return @() }
+        Mock Get-CimInstance { return @([PSCustomObject]@{ LoadPercentage = 10 }) }
+    }
 
-        $script:projectFile = "C:\MyProject\MyGame.uproject"
-        $script:NoPrompt = $false
+    It "Está libre sin editor abierto y con la CPU tranquila" {
+        Get-WatchBusyReason | Should -BeNullOrEmpty
+    }
 
-        Mock Write-Header { }
-        Mock Write-Host { }
-        Mock Write-Log { }
+    It "Está ocupado mientras el editor está abierto" {
+        Mock Get-Process { return @([PSCustomObject]@{ ProcessName = "UnrealEditor" }) }
+
+        Get-WatchBusyReason | Should -Match "UnrealEditor is running"
+        Should -Invoke Get-CimInstance -Times 0
+    }
+
+    It "Está ocupado con la CPU por encima del límite" {
+        Mock Get-CimInstance { return @([PSCustomObject]@{ LoadPercentage = 90 }, [PSCustomObject]@{ LoadPercentage = 70 }) }
+
+        Get-WatchBusyReason | Should -Match "CPU load is 80%"
+    }
+
+    It "Usa el límite de CPU de la configuración" {
         Mock Get-ConfigValue {
             param($Path, $DefaultValue)
+            if ($Path -eq "watch.maxCpuPercent") { return 5 }
             return $DefaultValue
         }
-        Mock Set-ConfigValue { }
-    }
 
-    Context "Caso: Editor no existe" {
+        Get-WatchBusyReason | Should -Match "limit 5%"
+    }
 
-        It "Retorna false cuando UnrealEditor.exe no existe" {
-            Mock Test-Path { return $false }
+    It "No bloquea cuando no puede leer la carga de CPU" {
+        Mock Get-CimInstance { throw "WMI not available" }
 
-            $result = Start-UnrealEditor -UERoot "C:\UE_5.3"
+        Get-WatchBusyReason | Should -BeNullOrEmpty
+    }
+}
 
-            $result | Should -Be $false
-        }
+Describe "Lock del proyecto" -Tag "Watch" {
 
-        It "Escribe log WARNING cuando editor no existe" {
-            Mock Test-Path { return $false }
+    BeforeAll {
+        . "$PSScriptRoot\..\Source\sync_and_build.ps1"
+    }
 
-            Start-UnrealEditor -UERoot "C:\UE_5.3"
+    It "Otra ejecución no toma el lock mientras está tomado y el mismo hilo sí" {
+        $lock = Enter-ProjectLock -TimeoutSeconds 0
+        $other = [powershell]::Create().AddScript(". '$PSScriptRoot\..\Source\sync_and_build.ps1' | Out-Null; `$null -eq (Enter-ProjectLock -TimeoutSeconds 0)")
+        try {
+            $lock.Held | Should -Be $true
+            $other.Invoke() | Select-Object -Last 1 | Should -Be $true
 
-            Should -Invoke Write-Log -ParameterFilter {
-                $Message -match "Editor executable not found" -and
-                $Level -eq "WARNING"
-            }
+            $again = Enter-ProjectLock -TimeoutSeconds 0
+            $again.Held | Should -Be $true
+            Exit-ProjectLock -Lock $again
+        } finally {
+            Exit-ProjectLock -Lock $lock
+            Exit-ProjectLock -Lock $lock
+            $other.Dispose()
         }
 
-        It "Muestra mensaje de advertencia cuando editor no existe" {
-            Mock Test-Path { return $false }
-
-            Start-UnrealEditor -UERoot "C:\UE_5.3"
+        $lock.Held | Should -Be $false
+    }
+}
 
-            Should -Invoke Write-Host -ParameterFilter {
-                $Object -match "UnrealEditor.exe not found"
-            }
-        }
+Describe "Start-WatchMode" -Tag "Watch" {
 
-        It "Verifica la ruta correcta del ejecutable" {
-            $capturedPath = $null
-            Mock Test-Path {
-                param($Path)
-                $script:capturedPath = $Path
-                return $false
-            }
+    BeforeAll {
+        . "$PSScriptRoot\..\Source\sync_and_build.ps1"
+    }
 
-            Start-UnrealEditor -UERoot "C:\UE_5.3"
+    BeforeEach {
+        $script:projectName = "MyGame"
+        $script:runState = @{}
+        $script:sleeps = @()
+        $script:lastBuiltCL = 100
 
-            $script:capturedPath | Should -Be "C:\UE_5.3\Engine\Binaries\Win64\UnrealEditor.exe"
+        Mock Initialize-Log { }
+        Mock Close-Log { }
+        Mock Write-Header { }
+        Mock Write-Host { }
+        Mock Write-Log { }
+        Mock Initialize-ProjectPaths { }
+        Mock Get-ConfigValue {
+            param($Path, $DefaultValue)
+            if ($Path -eq "build.lastBuiltCL") { return $script:lastBuiltCL }
+            return $DefaultValue
         }
+        Mock Start-Sleep { param($Seconds) $script:sleeps += $Seconds }
+        Mock Get-HeadChangelist { return 100 }
+        Mock Get-WatchBusyReason { return $null }
+        Mock Get-UnrealEngineRoot { return "C:\UE_5.3" }
+        Mock Main { return $true }
+        Mock Enter-ProjectLock { return @{ Held = $true } }
+        Mock Exit-ProjectLock { }
     }
 
-    Context "Caso: Usuario acepta lanzar editor (prompt manual)" {
+    It "Resuelve proyecto y engine una vez, sin preguntas, y pasa el proyecto a Main" {
+        Mock Initialize-ProjectPaths {
+            $script:projectFile = "C:\MyProject\MyGame\MyGame.uproject"
+            $script:unattendedWhileResolving = $script:unattended
+        }
+        Mock Get-HeadChangelist { return 105 }
 
-        It "Retorna true cuando usuario responde Y y lanzamiento exitoso" {
-            Mock Test-Path { return $true }
-            Mock Read-Host {
-                # Primera llamada: Launch? -> Y
-                # Segunda llamada: Save? -> N
-                if ($script:readHostCallCount -eq $null) { $script:readHostCallCount = 0 }
-                $script:readHostCallCount++
-                if ($script:readHostCallCount -eq 1) { return "Y" }
-                return "N"
-            }
-            Mock Start-Process { }
+        Start-WatchMode -MaxPolls 2
 
-            $result = Start-UnrealEditor -UERoot "C:\UE_5.3"
+        Should -Invoke Initialize-ProjectPaths -Times 1 -Exactly
+        Should -Invoke Get-UnrealEngineRoot -Times 1 -Exactly
+        $script:unattendedWhileResolving | Should -Be $true
+        Should -Invoke Main -ParameterFilter { $NoEditor -and $ProjectFile -eq "C:\MyProject\MyGame\MyGame.uproject" }
+        $script:unattended | Should -Be $false
+    }
 
-            $result | Should -Be $true
+    It "No arranca cuando el engine necesitaría una selección" {
+        Mock Get-UnrealEngineRoot {
+            throw [BuildException]::new("No valid Unreal Engine configured for MyGame, cannot ask for one", "Configuration", "Set unrealEngine.path")
         }
 
-        It "Lanza el editor con la ruta correcta cuando usuario acepta" {
-            Mock Test-Path { return $true }
-            $script:readHostCallCount = 0
-            Mock Read-Host {
-                $script:readHostCallCount++
-                if ($script:readHostCallCount -eq 1) { return "Y" }
-                return "N"
-            }
-            Mock Join-Path {
-                param($Path, $ChildPath)
-                return "$Path\$ChildPath"
-            }
-            $capturedFilePath = $null
-            Mock Start-Process {
-                param($FilePath, $ArgumentList)
-                $script:capturedFilePath = $FilePath
-            }
+        Start-WatchMode -MaxPolls 3 | Should -Be $false
 
-            $result = Start-UnrealEditor -UERoot "C:\UE_5.3"
+        Should -Invoke Get-HeadChangelist -Times 0
+        Should -Invoke Main -Times 0
+        Should -Invoke Write-Host -ParameterFilter { $Object -match "Watch mode cannot start: No valid Unreal Engine" }
+        $script:unattended | Should -Be $false
+    }
 
-            $result | Should -Be $true
+    It "Duplica la espera mientras no hay changelists nuevos" {
+        Start-WatchMode -MaxPolls 6
 
-            Should -Invoke Start-Process -Times 1
+        Should -Invoke Get-HeadChangelist -Times 6 -Exactly
+        Should -Invoke Main -Times 0
+        $script:sleeps | Should -Be @(120, 240, 480, 600, 600)
+    }
 
-            $script:capturedFilePath | Should -Be "C:\UE_5.3\Engine\Binaries\Win64\UnrealEditor.exe"
+    It "Sincroniza y construye sin editor cuando llega un changelist nuevo" {
+        Mock Get-HeadChangelist { return 105 }
+        Mock Main {
+            $script:lastBuiltCL = 105
+            $script:runState = @{ HaveCL = 105 }
+            return $true
         }
 
-        It "Pasa el archivo de proyecto como argumento cuando lanza editor" {
-            Mock Test-Path { return $true }
-            $script:readHostCallCount = 0
-            Mock Read-Host {
-                $script:readHostCallCount++
-                if ($script:readHostCallCount -eq 1) { return "Y" }
-                return "N"
-            }
-            $capturedArgs = $null
-            Mock Start-Process {
-                param($FilePath, $ArgumentList)
-                $script:capturedArgs = $ArgumentList
-            }
+        Start-WatchMode -MaxPolls 2
 
-            Start-UnrealEditor -UERoot "C:\UE_5.3"
+        Should -Invoke Main -Times 1 -Exactly -ParameterFilter { $NoEditor -and -not $Watch }
+        $script:sleeps | Should -Be @(60)
+    }
 
-            $script:capturedArgs | Should -Match "MyGame\.uproject"
+    It "No repite un changelist que ya dejó listo aunque lastBuiltCL no cambie" {
+        Mock Get-HeadChangelist { return 105 }
+        Mock Main {
+            $script:runState = @{ HaveCL = 106 }
+            return $true
         }
 
-        It "Acepta respuesta en minúscula (y)" {
-            Mock Test-Path { return $true }
-            $script:readHostCallCount = 0
-            Mock Read-Host {
-                $script:readHostCallCount++
-                if ($script:readHostCallCount -eq 1) { return "y" }
-                return "n"
-            }
-            Mock Start-Process { }
+        Start-WatchMode -MaxPolls 3
 
-            $result = Start-UnrealEditor -UERoot "C:\UE_5.3"
+        Should -Invoke Main -Times 1 -Exactly
+    }
 
-            $result | Should -Be $true
-            Should -Invoke Start-Process -Times 1
-        }
+    It "Espera a que la máquina esté libre" {
+        Mock Get-HeadChangelist { return 105 }
+        Mock Get-WatchBusyReason { return "UnrealEditor is running" }
+
+        Start-WatchMode -MaxPolls 3
+
+        Should -Invoke Main -Times 0
+        Should -Invoke Get-HeadChangelist -Times 1 -Exactly
+        Should -Invoke Write-Log -Times 1 -Exactly -ParameterFilter { $Message -match "waits for an idle machine: UnrealEditor is running" }
+        $script:sleeps | Should -Be @(60, 60)
     }
 
-    Context "Caso: Usuario rechaza lanzar editor" {
+    It "Reintenta con espera creciente cuando el sync o el build fallan" {
+        Mock Get-HeadChangelist { return 105 }
+        Mock Main { return $false }
 
-        It "Retorna true cuando usuario responde N (no es error)" {
-            Mock Test-Path { return $true }
-            Mock Read-Host { return "N" }
+        Start-WatchMode -MaxPolls 3
 
-            $result = Start-UnrealEditor -UERoot "C:\UE_5.3"
+        Should -Invoke Main -Times 3 -Exactly
+        Should -Invoke Write-Log -ParameterFilter { $Level -eq "WARNING" -and $Message -match "retrying in 120s" }
+        $script:sleeps | Should -Be @(120, 240)
+    }
 
-            $result | Should -Be $true
-        }
+    It "Un Main fallido con otros valores en su salida cuenta como fallo" {
+        Mock Get-HeadChangelist { return 105 }
+        Mock Main { $true; return $false }
 
-        It "No lanza el editor cuando usuario responde N" {
-            Mock Test-Path { return $true }
-            Mock Read-Host { return "N" }
-            Mock Start-Process { }
+        Start-WatchMode -MaxPolls 2
 
-            Start-UnrealEditor -UERoot "C:\UE_5.3"
+        Should -Invoke Main -Times 2 -Exactly
+        Should -Invoke Write-Log -ParameterFilter { $Level -eq "WARNING" -and $Message -match "retrying in 120s" }
+        Should -Invoke Exit-ProjectLock -Times 2 -Exactly
+    }
 
-            Should -Invoke Start-Process -Times 0
-        }
+    It "Espera mientras otra ejecución del proyecto tiene el lock" {
+        Mock Get-HeadChangelist { return 105 }
+        Mock Enter-ProjectLock { return $null }
 
-        It "Escribe log INFO cuando usuario rechaza lanzar" {
-            Mock Test-Path { return $true }
-            Mock Read-Host { return "N" }
+        Start-WatchMode -MaxPolls 2
 
-            Start-UnrealEditor -UERoot "C:\UE_5.3"
+        Should -Invoke Main -Times 0
+        Should -Invoke Write-Log -Times 1 -Exactly -ParameterFilter { $Message -match "another run of MyGame is in progress" }
+    }
 
-            Should -Invoke Write-Log -ParameterFilter {
-                $Message -match "User chose not to launch editor" -and
-                $Level -eq "INFO"
-            }
-        }
+    It "Suelta el log antes de dormir" {
+        Start-WatchMode -MaxPolls 3
 
-        It "Acepta respuesta en minúscula (n)" {
-            Mock Test-Path { return $true }
-            Mock Read-Host { return "n" }
-            Mock Start-Process { }
+        Should -Invoke Close-Log -Times 3 -Exactly
+    }
 
-            Start-UnrealEditor -UERoot "C:\UE_5.3"
+    It "Aplica backoff cuando no puede leer el changelist de cabecera" {
+        Mock Get-HeadChangelist { return $null }
 
-            Should -Invoke Start-Process -Times 0
-        }
+        Start-WatchMode -MaxPolls 2
+
+        Should -Invoke Main -Times 0
+        Should -Invoke Write-Log -ParameterFilter { $Level -eq "WARNING" -and $Message -match "head changelist" }
+        $script:sleeps | Should -Be @(120)
     }
 
-    Context "Caso: AutoLaunch habilitado" {
+    It "Cierra el log al terminar" {
+        Start-WatchMode -MaxPolls 1
 
-        It "Lanza automáticamente cuando EditorAutoLaunch es true" {
-            Mock Test-Path { return $true }
-            Mock Get-ConfigValue {
-                param($Path, $DefaultValue)
-                if ($Path -eq "EditorAutoLaunch") {
-                    return $true
-                }
-                return $DefaultValue
-            }
-            Mock Read-Host { return "N" }  # Save response
-            Mock Start-Process { }
+        Should -Invoke Close-Log -Times 1
+        Should -Invoke Start-Sleep -Times 0
+    }
+}
 
-            Start-UnrealEditor -UERoot "C:\UE_5.3"
+# =============================================================================
+# TESTS DE MODO BATCH
+# =============================================================================
 
-            Should -Invoke Start-Process -Times 1
-        }
+Describe "Build slots" -Tag "Batch" {
 
-        It "No pregunta 'Launch Editor?' cuando autoLaunch habilitado" {
-            Mock Test-Path { return $true }
-            Mock Get-ConfigValue {
-                param($Path, $DefaultValue)
-                if ($Path -eq "EditorAutoLaunch") {
-                    return $true
-                }
-                return $DefaultValue
-            }
-            Mock Read-Host { return "N" }
-            Mock Start-Process { }
+    BeforeAll {
+        . "$PSScriptRoot\..\Source\sync_and_build.ps1"
+    }
 
-            Start-UnrealEditor -UERoot "C:\UE_5.3"
+    BeforeEach {
+        Mock Write-Host { }
+        Mock Write-Log { }
+        $script:slotsName = "SyncAndBuild_Test_$PID"
+    }
 
-            # No debe preguntar nada cuando autoLaunch está habilitado
-            Should -Invoke Read-Host -Times 0
-        }
+    AfterEach {
+        [Environment]::SetEnvironmentVariable($script:CONSTANTS.Batch.BuildSlotsVariable, $null)
     }
 
-    Context "Caso: Guardar preferencia de usuario" {
+    It "No espera fuera de un batch" {
+        Enter-BuildSlot | Should -BeNullOrEmpty
+        { Exit-BuildSlot -Slot $null } | Should -Not -Throw
+    }
 
-        It "Guarda EditorAutoLaunch cuando usuario responde Y a 'Save Response'" {
-            Mock Test-Path { return $true }
-            Mock Read-Host {
-                if ($script:readHostCallCount -eq $null) { $script:readHostCallCount = 0 }
-                $script:readHostCallCount++
-                if ($script:readHostCallCount -eq 1) { return "Y" }  # Launch
-                return "Y"  # Save
-            }
-            Mock Start-Process { }
+    It "Toma y devuelve un slot del semáforo del batch una sola vez" {
+        $semaphore = [System.Threading.Semaphore]::new(1, 1, $script:slotsName)
+        try {
+            [Environment]::SetEnvironmentVariable($script:CONSTANTS.Batch.BuildSlotsVariable, $script:slotsName)
 
-            Start-UnrealEditor -UERoot "C:\UE_5.3"
+            $slot = Enter-BuildSlot
+            $slot.Held | Should -Be $true
+            $semaphore.WaitOne(0) | Should -Be $false
 
-            Should -Invoke Set-ConfigValue -ParameterFilter {
-                $Path -eq "EditorAutoLaunch" -and $Value -eq $true
-            }
+            Exit-BuildSlot -Slot $slot
+            Exit-BuildSlot -Slot $slot
+            $semaphore.WaitOne(0) | Should -Be $true
+        } finally {
+            $semaphore.Dispose()
         }
+    }
 
-        It "No guarda preferencia cuando usuario responde N a 'Save Response'" {
-            Mock Test-Path { return $true }
-            Mock Read-Host {
-                if ($script:readHostCallCount -eq $null) { $script:readHostCallCount = 0 }
-                $script:readHostCallCount++
-                if ($script:readHostCallCount -eq 1) { return "Y" }  # Launch
-                return "N"  # Don't save
-            }
-            Mock Start-Process { }
+    It "Construye sin esperar si el semáforo ya no existe" {
+        [Environment]::SetEnvironmentVariable($script:CONSTANTS.Batch.BuildSlotsVariable, "SyncAndBuild_Missing_$PID")
 
-            Start-UnrealEditor -UERoot "C:\UE_5.3"
+        Enter-BuildSlot | Should -BeNullOrEmpty
+        Should -Invoke Write-Log -ParameterFilter { $Level -eq "WARNING" }
+    }
+}
 
-            Should -Invoke Set-ConfigValue -Times 0
-        }
+Describe "Get-BuildSlotCount" -Tag "Batch" {
 
-        It "Acepta respuesta en minúscula (y) para guardar" {
-            Mock Test-Path { return $true }
-            Mock Read-Host {
-                if ($script:readHostCallCount -eq $null) { $script:readHostCallCount = 0 }
-                $script:readHostCallCount++
-                if ($script:readHostCallCount -eq 1) { return "Y" }  # Launch
-                return "y"  # Save (lowercase)
-            }
-            Mock Start-Process { }
+    BeforeAll {
+        . "$PSScriptRoot\..\Source\sync_and_build.ps1"
+    }
 
-            Start-UnrealEditor -UERoot "C:\UE_5.3"
+    BeforeEach {
+        Mock Write-Log { }
+        Mock Get-ConfigValue { param($Path, $DefaultValue) return $DefaultValue }
+        $script:byCores = [math]::Max([math]::Floor([Environment]::ProcessorCount / $script:CONSTANTS.Batch.CoresPerBuild), 1)
+    }
 
-            Should -Invoke Set-ConfigValue -Times 1
+    It "Usa batch.maxConcurrentBuilds cuando está configurado" {
+        Mock Get-ConfigValue {
+            param($Path, $DefaultValue)
+            if ($Path -eq "batch.maxConcurrentBuilds") { return 3 }
+            return $DefaultValue
         }
+
+        Get-BuildSlotCount | Should -Be 3
+        Should -Invoke Get-CimInstance -Times 0
     }
 
-    Context "Caso: Excepción al lanzar editor" {
+    It "Reparte por núcleos cuando sobra memoria" {
+        Mock Get-CimInstance { return [PSCustomObject]@{ FreePhysicalMemory = 1024 * 1024 * 1024 } }
 
-        It "Retorna false cuando Start-Process lanza excepción" {
-            Mock Test-Path { return $true }
-            $script:readHostCallCount = 0
-            Mock Read-Host {
-                $script:readHostCallCount++
-                if ($script:readHostCallCount -eq 1) { return "Y" }
-                return "N"
-            }
-            Mock Start-Process {
-                throw "File not found"
-            }
+        Get-BuildSlotCount | Should -Be $script:byCores
+    }
 
-            $result = Start-UnrealEditor -UERoot "C:\UE_5.3"
+    It "Limita por memoria libre y deja al menos un build" {
+        Mock Get-CimInstance { return [PSCustomObject]@{ FreePhysicalMemory = 4 * 1024 * 1024 } }
 
-            $result | Should -Be $false
-        }
+        Get-BuildSlotCount | Should -Be 1
+    }
 
-        It "Escribe log ERROR cuando falla el lanzamiento" {
-            Mock Test-Path { return $true }
-            $script:readHostCallCount = 0
-            Mock Read-Host {
-                $script:readHostCallCount++
-                if ($script:readHostCallCount -eq 1) { return "Y" }
-                return "N"
-            }
-            Mock Start-Process {
-                throw "Access denied"
-            }
+    It "Reparte solo por núcleos si no puede leer la memoria" {
+        Mock Get-CimInstance { throw "WMI not available" }
 
-            Start-UnrealEditor -UERoot "C:\UE_5.3"
+        Get-BuildSlotCount | Should -Be $script:byCores
+    }
+}
 
-            Should -Invoke Write-Log -ParameterFilter {
-                $Message -match "Failed to launch editor" -and
-                $Message -match "Access denied" -and
-                $Level -eq "ERROR"
+Describe "Get-BatchProjects" -Tag "Batch" {
+
+    BeforeAll {
+        . "$PSScriptRoot\..\Source\sync_and_build.ps1"
+    }
+
+    BeforeEach {
+        $script:scriptRoot = "C:\Work\Tools\AutoSyncBuild\Source"
+        Mock Write-Log { }
+        Mock Get-ConfigValue { param($Path, $DefaultValue) return $DefaultValue }
+        Mock Find-UnrealProject { }
+    }
+
+    It "Usa las rutas dadas con una carpeta de estado por proyecto" {
+        $entries = Get-BatchProjects -Projects @("D:\GameA\GameA\GameA.uproject", "D:\GameB\GameB\GameB.uproject")
+
+        $entries.Count | Should -Be 2
+        $entries[0].Name | Should -Be "GameA"
+        $entries[0].ProjectFile | Should -Be "D:\GameA\GameA\GameA.uproject"
+        $entries[1].StateDir | Should -Match "Batch\\GameB$"
+        Should -Invoke Find-UnrealProject -Times 0
+    }
+
+    It "Lee batch.projects con workspace y motor" {
+        Mock Get-ConfigValue {
+            param($Path, $DefaultValue)
+            if ($Path -eq "batch.projects") {
+                return @(
+                    "D:\GameA\GameA\GameA.uproject",
+                    [PSCustomObject]@{ project = "D:\GameA2\GameA\GameA.uproject"; workspace = "ws_gamea_main"; engine = "D:\UE_5.4" }
+                )
             }
+            return $DefaultValue
         }
 
-        It "Muestra mensaje de error cuando falla el lanzamiento" {
-            Mock Test-Path { return $true }
-            $script:readHostCallCount = 0
-            Mock Read-Host {
-                $script:readHostCallCount++
-                if ($script:readHostCallCount -eq 1) { return "Y" }
-                return "N"
-            }
-            Mock Start-Process {
-                throw "Process error"
-            }
+        $entries = Get-BatchProjects
 
-            Start-UnrealEditor -UERoot "C:\UE_5.3"
+        $entries.Count | Should -Be 2
+        $entries[1].Name | Should -Be "GameA_ws_gamea_main"
+        $entries[1].Workspace | Should -Be "ws_gamea_main"
+        $entries[1].Engine | Should -Be "D:\UE_5.4"
+    }
 
-            Should -Invoke Write-Host -ParameterFilter {
-                $Object -match "Failed to launch editor" -and
-                $Object -match "Process error"
-            }
+    It "Usa todos los proyectos encontrados cuando no hay ninguno configurado" {
+        Mock Find-UnrealProject {
+            return ,@([PSCustomObject]@{ FullName = "C:\Work\GameC\GameC.uproject" }, [PSCustomObject]@{ FullName = "C:\Work\GameD\GameD.uproject" })
         }
-    }
 
-    Context "Caso: Mensajes informativos" {
+        $entries = Get-BatchProjects
 
-        It "Muestra header READY TO LAUNCH" {
-            Mock Test-Path { return $false }
+        $entries.Count | Should -Be 2
+        Should -Invoke Find-UnrealProject -Times 1 -Exactly -ParameterFilter { $All -and $SearchPath -eq "C:\Work" }
+    }
+}
 
-            Start-UnrealEditor -UERoot "C:\UE_5.3"
+Describe "Initialize-BatchState" -Tag "Batch" {
 
-            Should -Invoke Write-Header -ParameterFilter {
-                $Text -eq "READY TO LAUNCH"
+    BeforeAll {
+        . "$PSScriptRoot\..\Source\sync_and_build.ps1"
+    }
+
+    BeforeEach {
+        $script:engine = Join-Path $TestDrive "UE_5.3"
+        New-Item -ItemType Directory -Force -Path (Join-Path $script:engine "Engine\Build\BatchFiles") | Out-Null
+        Set-Content -Path (Join-Path $script:engine "Engine\Build\BatchFiles\Build.bat") -Value "@echo off"
+
+        $script:entry = @{ Name = "GameA"; ProjectFile = "D:\GameA\GameA\GameA.uproject"; Engine = $null; StateDir = (Join-Path $TestDrive "Batch\GameA") }
+        Remove-Item -Path $script:entry.StateDir -Recurse -Force -ErrorAction SilentlyContinue
+        Mock Get-Config {
+            return [PSCustomObject]@{
+                version = "2.0"
+                project = [PSCustomObject]@{ name = "ToolProject" }
+                unrealEngine = [PSCustomObject]@{ path = $script:engine }
+                build = [PSCustomObject]@{ lastBuiltCL = 555; useSourceManifest = $true }
             }
         }
+    }
 
-        It "Muestra mensaje de éxito cuando lanza" {
-            Mock Test-Path { return $true }
-            $script:readHostCallCount = 0
-            Mock Read-Host {
-                $script:readHostCallCount++
-                if ($script:readHostCallCount -eq 1) { return "Y" }
-                return "N"
-            }
-            Mock Start-Process { }
+    It "Crea la configuración del proyecto a partir de la de la herramienta" {
+        Initialize-BatchState -Entry $script:entry | Should -BeNullOrEmpty
 
-            Start-UnrealEditor -UERoot "C:\UE_5.3"
+        $config = Get-Content (Join-Path $script:entry.StateDir "Config\config.json") -Raw | ConvertFrom-Json
+        $config.build.lastBuiltCL | Should -Be 0
+        $config.build.useSourceManifest | Should -Be $true
+        $config.unrealEngine.path | Should -Be $script:engine
+        Test-Path (Join-Path $script:entry.StateDir "Logs") | Should -Be $true
+    }
 
-            Should -Invoke Write-Host -ParameterFilter {
-                $Object -match "Editor launched successfully"
-            }
-        }
+    It "Conserva la configuración de ejecuciones anteriores" {
+        Initialize-BatchState -Entry $script:entry | Out-Null
+        $configFile = Join-Path $script:entry.StateDir "Config\config.json"
+        $config = Get-Content $configFile -Raw | ConvertFrom-Json
+        $config.build.lastBuiltCL = 900
+        $config | ConvertTo-Json -Depth 10 | Out-File -FilePath $configFile -Encoding UTF8
 
-        It "Muestra mensaje 'Skipping editor launch' cuando usuario rechaza" {
-            Mock Test-Path { return $true }
-            Mock Read-Host { return "N" }
+        Initialize-BatchState -Entry $script:entry | Out-Null
 
-            Start-UnrealEditor -UERoot "C:\UE_5.3"
+        (Get-Content $configFile -Raw | ConvertFrom-Json).build.lastBuiltCL | Should -Be 900
+        Should -Invoke Get-Config -Times 1 -Exactly
+    }
 
-            Should -Invoke Write-Host -ParameterFilter {
-                $Object -match "Skipping editor launch"
+    It "Deja que el proyecto resuelva su motor con el índice" {
+        $script:entry.Engine = Join-Path $TestDrive "Missing_UE"
+
+        Initialize-BatchState -Entry $script:entry | Should -BeNullOrEmpty
+    }
+
+    It "No deja correr un proyecto sin motor válido ni índice de motores" {
+        Mock Get-Config {
+            return [PSCustomObject]@{
+                version = "2.0"
+                project = [PSCustomObject]@{ name = "ToolProject" }
+                unrealEngine = [PSCustomObject]@{ path = ""; useIndex = $false }
+                build = [PSCustomObject]@{ lastBuiltCL = 555 }
             }
         }
+
+        Initialize-BatchState -Entry $script:entry | Should -Match "Unreal Engine not found"
     }
 }
 
-# =============================================================================
-# TESTS DE REGEX DE EXTENSIONES
-# =============================================================================
+Describe "Start-BatchProject" -Tag "Batch" {
 
-Describe "Detección de extensiones de código" -Tag "Helpers" {
-    
-    Context "Regex patterns" {
-        
-        It "Detecta .cpp con formato Perforce (file.cpp#5)" {
-            $description = "... //depot/Source/Player.cpp#5 edit"
-            $ext = ".cpp"
-            $pattern = [regex]::Escape($ext) + '#\d+'
-            
-            $description -match $pattern | Should -Be $true
-        }
-        
-        It "NO hace false positive con 'cpp' en texto" {
-            $description = "See cppreference.com for C++ documentation"
-            $ext = ".cpp"
-            $pattern = [regex]::Escape($ext) + '#\d+'
-            
-            $description -match $pattern | Should -Be $false
-        }
-        
-        It "Detecta múltiples extensiones en mismo changelist" {
-            $description = @"
-... //depot/Source/Player.cpp#5 edit
-... //depot/Source/Game.h#3 edit
-... //depot/Source/Build.cs#2 edit
-... //depot/Content/UI.uasset#1 add
-"@
-            
-            $codeExtensions = @('.cpp', '.h', '.cs')
-            $foundExtensions = @()
-            
-            foreach ($ext in $codeExtensions) {
-                $pattern = [regex]::Escape($ext) + '#\d+'
-                if ($description -match $pattern) {
-                    $foundExtensions += $ext
-                }
+    BeforeAll {
+        . "$PSScriptRoot\..\Source\sync_and_build.ps1"
+    }
+
+    BeforeEach {
+        $script:scriptRoot = $TestDrive
+        Mock Write-Log {}
+        Mock Get-PerforceSettings { return @{ P4PORT = "ssl:perforce:1666"; P4USER = "ana"; P4CLIENT = "ana_config"; P4CONFIG = ".p4config" } }
+        Mock Start-Process {
+            $script:childEnvironment = @{
+                P4CLIENT = $env:P4CLIENT
+                P4CONFIG = $env:P4CONFIG
+                P4PORT = $env:P4PORT
+                P4USER = $env:P4USER
             }
-            
-            $foundExtensions.Count | Should -Be 3
-            $foundExtensions | Should -Contain '.cpp'
-            $foundExtensions | Should -Contain '.h'
-            $foundExtensions | Should -Contain '.cs'
-        }
-        
-        It "Distingue entre .cs y .build.cs" {
-            $description = "... //depot/Source/MyGame.build.cs#1 edit"
-            
-            $pattern1 = [regex]::Escape('.cs') + '#\d+'
-            $pattern2 = [regex]::Escape('.build.cs') + '#\d+'
-            
-            # Ambos deberían hacer match (build.cs contiene .cs)
-            $description -match $pattern1 | Should -Be $true
-            $description -match $pattern2 | Should -Be $true
+            return [PSCustomObject]@{ Handle = 1 }
         }
+        $script:previousP4 = @{ P4CLIENT = $env:P4CLIENT; P4CONFIG = $env:P4CONFIG; P4PORT = $env:P4PORT; P4USER = $env:P4USER }
+        $env:P4CONFIG = ".p4config"
     }
-    
-    Context "Edge cases" {
-        
-        It "Maneja descripción vacía sin error" {
-            $description = ""
-            $ext = ".cpp"
-            $pattern = [regex]::Escape($ext) + '#\d+'
-            
-            $description -match $pattern | Should -Be $false
-        }
-        
-        It "Maneja descripción con caracteres especiales" {
-            $description = "... //depot/Source/My$pecial.cpp#5 edit"
-            $ext = ".cpp"
-            $pattern = [regex]::Escape($ext) + '#\d+'
-            
-            $description -match $pattern | Should -Be $true
+
+    AfterEach {
+        foreach ($name in $script:previousP4.Keys) {
+            [Environment]::SetEnvironmentVariable($name, $script:previousP4[$name])
         }
     }
-}
 
-# =============================================================================
-# TESTS DE UTILIDADES
-# =============================================================================
+    It "Deja el workspace en P4CLIENT y desactiva P4CONFIG para el hijo" {
+        $entry = @{ Name = "Shooter"; ProjectFile = "D:\Shooter\Shooter.uproject"; StateDir = "$TestDrive\Shooter"; Workspace = "ana_shooter" }
 
-Describe "Split-Path para project root" -Tag "Helpers" {
-    
-    It "Sube un nivel desde script directory" {
-        $scriptDir = "C:\MyProject\src\scripts"
-        $projectRoot = Split-Path $scriptDir -Parent
-        
-        $projectRoot | Should -Be "C:\MyProject\src"
+        Start-BatchProject -Entry $entry -SlotsName "slots" | Out-Null
+
+        $script:childEnvironment.P4CLIENT | Should -Be "ana_shooter"
+        $script:childEnvironment.P4CONFIG | Should -Be "SyncAndBuild.nop4config"
+        # Lo que daba el archivo de configuración sigue llegando como variable
+        $script:childEnvironment.P4PORT | Should -Be "ssl:perforce:1666"
+        $script:childEnvironment.P4USER | Should -Be "ana"
+        Should -Invoke Get-PerforceSettings -ParameterFilter { $Directory -eq "D:\Shooter" }
     }
-    
-    It "Sube dos niveles correctamente" {
-        $scriptDir = "C:\MyProject\src\scripts"
-        $parent1 = Split-Path $scriptDir -Parent  # C:\MyProject\src
-        $parent2 = Split-Path $parent1 -Parent    # C:\MyProject
-        
-        $parent2 | Should -Be "C:\MyProject"
+
+    It "Restaura P4CONFIG y P4CLIENT después de lanzar el hijo" {
+        $env:P4CLIENT = "ana_main"
+        $entry = @{ Name = "Shooter"; ProjectFile = "D:\Shooter\Shooter.uproject"; StateDir = "$TestDrive\Shooter"; Workspace = "ana_shooter" }
+
+        Start-BatchProject -Entry $entry -SlotsName "slots" | Out-Null
+
+        $env:P4CONFIG | Should -Be ".p4config"
+        $env:P4CLIENT | Should -Be "ana_main"
+    }
+
+    It "No toca la configuración de Perforce sin workspace propio" {
+        $entry = @{ Name = "Shooter"; ProjectFile = "D:\Shooter\Shooter.uproject"; StateDir = "$TestDrive\Shooter"; Workspace = $null }
+
+        Start-BatchProject -Entry $entry -SlotsName "slots" | Out-Null
+
+        $script:childEnvironment.P4CONFIG | Should -Be ".p4config"
+        Should -Invoke Get-PerforceSettings -Times 0
     }
 }
 
-Describe "Array handling" -Tag "Helpers" {
-    
-    Context "Conversión a array con @()" {
-        
-        It "Convierte int único a array de 1 elemento" {
-            $changelist = 12345
-            $changes = @($changelist)
-            
-            $changes -is [array] | Should -Be $true
-            $changes.Count | Should -Be 1
-            $changes[0] | Should -Be 12345
-        }
-        
-        It "Mantiene array como array" {
-            $changelist = @(111, 222, 333)
-            $changes = @($changelist)
-            
-            $changes.Count | Should -Be 3
-        }
-        
-        It "Convierte $null a array vacío" {
-            $changelist = $null
-            $changes = @($changelist)
-            
-            $changes.Count | Should -Be 1
-        }
+Describe "Get-PerforceSettings" -Tag "Batch" {
+
+    BeforeAll {
+        . "$PSScriptRoot\..\Source\sync_and_build.ps1"
     }
-    
-    Context "Empty arrays en if" {
-        
-        It "Array vacío se evalúa como false" {
-            $emptyArray = @()
-            
-            if ($emptyArray) {
-                $result = "not empty"
-            } else {
-                $result = "empty"
-            }
-            
-            $result | Should -Be "empty"
+
+    BeforeEach {
+        Mock Write-Log {}
+        Mock Push-Location {}
+        Mock Pop-Location {}
+    }
+
+    It "Lee las variables que resuelve p4 set en la carpeta" {
+        Mock p4 {
+            $global:LASTEXITCODE = 0
+            return @("P4CLIENT=ana_config", "P4PORT=ssl:perforce:1666", "P4USER=ana")
         }
-        
-        It "Array con elementos se evalúa como true" {
-            $arrayWithItems = @(1, 2, 3)
-            
-            if ($arrayWithItems) {
-                $result = "not empty"
-            } else {
-                $result = "empty"
-            }
-            
-            $result | Should -Be "not empty"
+
+        $settings = Get-PerforceSettings -Directory "D:\Shooter"
+
+        $settings.P4PORT | Should -Be "ssl:perforce:1666"
+        $settings.P4USER | Should -Be "ana"
+        Should -Invoke Push-Location -ParameterFilter { $Path -eq "D:\Shooter" }
+    }
+
+    It "Devuelve una tabla vacía cuando p4 falla" {
+        Mock p4 {
+            $global:LASTEXITCODE = 1
+            return "p4 not found"
         }
+
+        (Get-PerforceSettings -Directory "D:\Shooter").Count | Should -Be 0
+        Should -Invoke Pop-Location -Times 1
+    }
+}
+
+Describe "Get-BatchResult" -Tag "Batch" {
+
+    BeforeAll {
+        . "$PSScriptRoot\..\Source\sync_and_build.ps1"
+    }
+
+    BeforeEach {
+        Mock Write-Log { }
+        $script:entry = @{ Name = "GameA"; StateDir = (Join-Path $TestDrive "GameA") }
+        Remove-Item -Path $script:entry.StateDir -Recurse -Force -ErrorAction SilentlyContinue
+        New-Item -ItemType Directory -Force -Path (Join-Path $script:entry.StateDir "Logs") | Out-Null
+    }
+
+    It "Toma los números de la línea que añadió la ejecución" {
+        $history = Join-Path $script:entry.StateDir "Logs\run_history.jsonl"
+        Set-Content -Path $history -Value '{"fromCL":90,"toCL":100,"syncSeconds":5,"buildSeconds":null,"totalSeconds":9}'
+        $historyLines = Get-BatchHistoryLineCount -Entry $script:entry
+        Add-Content -Path $history -Value '{"fromCL":100,"toCL":120,"syncSeconds":35.2,"buildSeconds":410,"totalSeconds":460.1}'
+
+        $result = Get-BatchResult -Entry $script:entry -Succeeded $true -HistoryLines $historyLines
+
+        $historyLines | Should -Be 1
+        $result.Project | Should -Be "GameA"
+        $result.FromCL | Should -Be 100
+        $result.ToCL | Should -Be 120
+        $result.BuildSeconds | Should -Be 410
+    }
+
+    It "No muestra los números de una ejecución anterior" {
+        $history = Join-Path $script:entry.StateDir "Logs\run_history.jsonl"
+        Set-Content -Path $history -Value '{"fromCL":90,"toCL":100,"syncSeconds":5,"buildSeconds":null,"totalSeconds":9}'
+
+        (Get-BatchResult -Entry $script:entry -Succeeded $false -HistoryLines (Get-BatchHistoryLineCount -Entry $script:entry)).ToCL | Should -BeNullOrEmpty
+        (Get-BatchResult -Entry $script:entry -Succeeded $false -Note "Unreal Engine not found").ToCL | Should -BeNullOrEmpty
+    }
+
+    It "Funciona sin historial" {
+        Get-BatchHistoryLineCount -Entry $script:entry | Should -Be 0
+
+        $result = Get-BatchResult -Entry $script:entry -Succeeded $false -Note "Unreal Engine not found" -HistoryLines 0
+
+        $result.Succeeded | Should -Be $false
+        $result.ToCL | Should -BeNullOrEmpty
+        $result.Note | Should -Be "Unreal Engine not found"
     }
 }
 
-# =============================================================================
-# TESTS DE INTEGRACIÓN
-# =============================================================================
+Describe "Write-BatchSummary" -Tag "Batch" {
 
-Describe "Workflow completo" -Tag "Integration" {
+    BeforeAll {
+        . "$PSScriptRoot\..\Source\sync_and_build.ps1"
+    }
+
+    BeforeEach {
+        $script:lines = @()
+        Mock Write-Header { }
+        Mock Write-Log { }
+        Mock Write-Host { param($Object) $script:lines += "$Object" }
+    }
+
+    It "Muestra una fila por proyecto con resultado, changelists y tiempos" {
+        Write-BatchSummary -Results @(
+            [PSCustomObject]@{ Project = "GameA"; Succeeded = $true; FromCL = 100; ToCL = 120; SyncSeconds = 35.24; BuildSeconds = 410; TotalSeconds = 460.1; Note = "" },
+            [PSCustomObject]@{ Project = "GameB"; Succeeded = $false; FromCL = $null; ToCL = $null; SyncSeconds = $null; BuildSeconds = $null; TotalSeconds = $null; Note = "Unreal Engine not found" }
+        )
+
+        $script:lines | Where-Object { $_ -match "^Project\s+Result\s+Changelists\s+Sync\s+Build\s+Total" } | Should -Not -BeNullOrEmpty
+        $script:lines | Where-Object { $_ -match "^GameA\s+OK\s+100 -> 120\s+35\.2s\s+410s\s+460\.1s" } | Should -Not -BeNullOrEmpty
+        $script:lines | Where-Object { $_ -match "^GameB\s+FAILED\s+-\s+-\s+-\s+-" } | Should -Not -BeNullOrEmpty
+        $script:lines | Should -Contain "  Unreal Engine not found"
+    }
+}
+
+Describe "Start-BatchMode" -Tag "Batch" {
 
     BeforeAll {
         . "$PSScriptRoot\..\Source\sync_and_build.ps1"
+
+        function New-BatchEntry {
+            param([string]$Name)
+            return @{ Name = $Name; ProjectFile = "D:\$Name\$Name\$Name.uproject"; Workspace = $null; Engine = $null; StateDir = "C:\Tools\Batch\$Name" }
+        }
     }
 
     BeforeEach {
-        $script:projectRoot = "C:\TestProject"
-        
-        if (-not $script:CONSTANTS) {
-            $script:CONSTANTS = @{
-                PerforceUpToDate = "file\(s\) up-to-date\."
-            }
+        $script:sleeps = 0
+        $script:startedAfterSleeps = @()
+        $script:exitCodes = @{}
+
+        Mock Initialize-Log { }
+        Mock Close-Log { }
+        Mock Write-Header { }
+        Mock Write-Host { }
+        Mock Write-Log { }
+        Mock Get-ConfigValue { param($Path, $DefaultValue) return $DefaultValue }
+        Mock Get-BatchProjects { return ,@((New-BatchEntry "GameA"), (New-BatchEntry "GameB"), (New-BatchEntry "GameC")) }
+        Mock Get-BuildSlotCount { return 1 }
+        Mock Initialize-BatchState { return $null }
+        Mock Get-BatchHistoryLineCount { return 3 }
+        Mock Start-Sleep { $script:sleeps++ }
+        Mock Write-BatchSummary { }
+        Mock Get-BatchResult {
+            param($Entry, $Succeeded, $Note, $HistoryLines)
+            return [PSCustomObject]@{ Project = $Entry.Name; Succeeded = $Succeeded; Note = $Note }
         }
+        # Each project is still running the first time it is checked
+        Mock Start-BatchProject {
+            param($Entry, $SlotsName)
+            $script:startedAfterSleeps += $script:sleeps
+            $exitCode = if ($script:exitCodes.ContainsKey($Entry.Name)) { $script:exitCodes[$Entry.Name] } else { 0 }
+            $process = [PSCustomObject]@{ Checks = 0; ExitCode = $exitCode }
+            $process | Add-Member -MemberType ScriptProperty -Name HasExited -Value { $this.Checks++; return $this.Checks -gt 1 }
+            return $process
+        }
+    }
 
+    It "Ejecuta todos los proyectos y muestra el resumen" {
+        Start-BatchMode | Should -Be $true
+
+        Should -Invoke Start-BatchProject -Times 3 -Exactly -ParameterFilter { $SlotsName -match "^SyncAndBuild_Builds_" }
+        Should -Invoke Write-BatchSummary -Times 1 -Exactly -ParameterFilter { $Results.Count -eq 3 }
+        Should -Invoke Get-BatchResult -Times 3 -Exactly -ParameterFilter { $HistoryLines -eq 3 }
+    }
+
+    It "Limita los proyectos que corren a la vez" {
         Mock Get-ConfigValue {
             param($Path, $DefaultValue)
-            
-            if ($Path -eq "CodeExtensions") {
-                return @('.cpp', '.h', '.build.cs', '.cs')
-            }
+            if ($Path -eq "batch.maxConcurrentProjects") { return 2 }
             return $DefaultValue
         }
+
+        Start-BatchMode | Out-Null
+
+        $script:startedAfterSleeps | Should -Be @(0, 0, 1)
     }
-    
-    It "Flujo: Sync, Detecta cambios, Build" {
-        Mock Test-PerforceEnvironment { return "test-workspace" }
-        Mock Get-LatestHaveChangelist { 
-                if ($script:callCount -eq 0) {
-                    $script:callCount = 1
-                    return 12340
-                }
-                
-                return 12345
-            }
-        Mock Push-Location { }
-        Mock Pop-Location { }
-        Mock Write-Host { }
-        Mock Write-Log { }
-        Mock Write-Header { }
-        
-        Mock p4 {
-            param([Parameter(ValueFromRemainingArguments)]$Arguments)
-            
-            $cmd = $Arguments[0]
-            
-            $global:LASTEXITCODE = 0
-            
-            switch ($cmd) {
-                'sync' {
-                    Write-Output "//depot/Source/Player.cpp#5 - updating C:\Project\Source\Player.cpp"
-                    Write-Output "//depot/Source/Game.h#3 - updating C:\Project\Source\Game.h"
-                }
-                
-                'describe' {
-                    $clNum = $Arguments[2]
-                    Write-Host "  Describing CL: $clNum" -ForegroundColor Yellow
-                    
-                    return @"
-Change $clNum by user@workspace on 2024/12/25
 
-    Fixed player movement bug
+    It "Retorna false si algún proyecto falla" {
+        $script:exitCodes = @{ GameB = 1 }
 
-Affected files ...
+        Start-BatchMode | Should -Be $false
 
-... //depot/Source/MyGame/Player.cpp#5 edit
-... //depot/Source/MyGame/PlayerController.h#3 edit
-"@
-                }
-                
-                'changes' {
-                    return "Change 12345 on 2024/12/25 by user@workspace"
-                }
-                
-                default {
-                    Write-Warning "Mock p4: comando desconocido: $cmd"
-                    return @()
-                }
-            }
+        Should -Invoke Get-BatchResult -ParameterFilter { $Entry.Name -eq "GameB" -and -not $Succeeded }
+        Should -Invoke Get-BatchResult -ParameterFilter { $Entry.Name -eq "GameA" -and $Succeeded }
+    }
+
+    It "No arranca un proyecto que no puede correr y sigue con los demás" {
+        Mock Initialize-BatchState {
+            param($Entry)
+            if ($Entry.Name -eq "GameA") { return "Unreal Engine not found" }
+            return $null
         }
-        
-        
-        $syncResult = Sync-FromPerforce -SkipSync:$false
-        $hasCodeChanges = Test-CodeChanges -Changelist 12345
-        
-        
-        $syncResult | Should -Be $true
-        $hasCodeChanges | Should -Be $true
+
+        Start-BatchMode | Should -Be $false
+
+        Should -Invoke Start-BatchProject -Times 2 -Exactly
+        Should -Invoke Get-BatchResult -ParameterFilter { $Entry.Name -eq "GameA" -and $Note -eq "Unreal Engine not found" -and $null -eq $HistoryLines }
     }
 }
 
@@ -4377,6 +7223,48 @@ Describe "Main" -Tag "MainFunc" {
         Mock Out-File { }
         Mock Get-Date { return [DateTime]::new(2024, 12, 25, 10, 30, 0) }
         Mock Write-DetailedError { }
+        Mock Add-RunHistory { }
+        Mock Start-LogRetention { }
+        Mock Get-SourceChanges { return $null }
+        Mock Start-ContentSync { }
+        Mock Wait-ContentSync { return $true }
+        Mock Stop-ContentSync { }
+        Mock Invoke-DdcPrefill { }
+        Mock Enter-ProjectLock { return @{ Held = $true } }
+        Mock Exit-ProjectLock { }
+    }
+
+    Context "Caso: Lock del proyecto" {
+
+        It "Toma el lock del proyecto y lo suelta al terminar" {
+            Main -NoEditor | Should -Be $true
+
+            Should -Invoke Enter-ProjectLock -Times 1 -Exactly
+            Should -Invoke Exit-ProjectLock -Times 1 -Exactly
+        }
+
+        It "Espera a que termine otra ejecución del proyecto" {
+            $script:lockAttempts = 0
+            Mock Enter-ProjectLock {
+                param($TimeoutSeconds)
+                $script:lockAttempts++
+                if ($TimeoutSeconds -eq 0) { return $null }
+                return @{ Held = $true }
+            }
+
+            Main -NoEditor | Should -Be $true
+
+            $script:lockAttempts | Should -Be 2
+            Should -Invoke Write-Host -ParameterFilter { $Object -match "Another run of this project" }
+        }
+
+        It "Suelta el lock cuando la ejecución falla" {
+            Mock Sync-FromPerforce { return $false }
+
+            Main -NoEditor | Should -Be $false
+
+            Should -Invoke Exit-ProjectLock -Times 1 -Exactly
+        }
     }
 
     Context "Caso: Flujo exitoso sin cambios de código" {
@@ -4440,6 +7328,43 @@ Describe "Main" -Tag "MainFunc" {
             Should -Invoke Sync-FromPerforce -ParameterFilter { -not $SkipSync } -Times 1
         }
 
+        It "Reutiliza el CL del sync en el paso 2 sin volver a consultar" {
+            Mock Sync-FromPerforce {
+                $script:runState.HaveCL = 12345
+                return $true
+            }
+
+            Main
+
+            Should -Invoke Get-LatestHaveChangelist -Times 0
+            Should -Invoke Write-Host -ParameterFilter { $Object -match "Current changelist: 12345" }
+        }
+
+        It "Consulta el CL una vez cuando se omite el sync" {
+            Main -SkipSync
+
+            Should -Invoke Get-LatestHaveChangelist -Times 1 -Exactly
+        }
+
+        It "Guarda la ejecución en el historial como exitosa" {
+            Main
+
+            Should -Invoke Add-RunHistory -Times 1 -Exactly -ParameterFilter { $Succeeded -eq $true -and $TotalSeconds -ge 0 }
+        }
+
+        It "Guarda el tiempo de la comprobación de código" {
+            Mock Get-ConfigValue {
+                param($Path, $DefaultValue)
+                if ($Path -eq "LastBuiltChangelist") { return 100 }
+                return $DefaultValue
+            }
+
+            Main
+
+            Should -Invoke Test-CodeChanges -Times 1
+            $script:runState.CodeCheckSeconds | Should -Not -BeNullOrEmpty
+        }
+
         It "No construye cuando CL actual ya fue construido" {
             Mock Get-ConfigValue {
                 param($Path, $DefaultValue)
@@ -4562,6 +7487,208 @@ Describe "Main" -Tag "MainFunc" {
         }
     }
 
+    Context "Caso: Manifiesto de fuentes" {
+
+        BeforeEach {
+            Mock Get-ConfigValue {
+                param($Path, $DefaultValue)
+                if ($Path -match "lastBuiltCL") { return 12345 }
+                return $DefaultValue
+            }
+            Mock Get-BuildDecision { return $null }
+        }
+
+        It "Construye con cambios locales aunque el CL ya fue construido" {
+            Mock Get-SourceChanges {
+                return [PSCustomObject]@{ Changed = @("Source/MyGame/Private/Player.cpp"); Added = @(); Removed = @(); Count = 1 }
+            }
+
+            Main
+
+            Should -Invoke Invoke-ProjectBuild -Times 1
+            Should -Invoke Test-CodeChanges -Times 0
+            Should -Invoke Write-Host -ParameterFilter { $Object -match "Source files changed since the last build: 1 edited" }
+        }
+
+        It "No construye cuando los archivos coinciden con el último build aunque el CL cambió" {
+            Mock Get-ConfigValue {
+                param($Path, $DefaultValue)
+                if ($Path -match "lastBuiltCL") { return 12340 }
+                return $DefaultValue
+            }
+            Mock Get-SourceChanges {
+                return [PSCustomObject]@{ Changed = @(); Added = @(); Removed = @(); Count = 0 }
+            }
+
+            Mock Test-CodeChanges { return $true }
+
+            Main
+
+            Should -Invoke Invoke-ProjectBuild -Times 0
+            Should -Invoke Test-CodeChanges -Times 1 -Exactly -ParameterFilter { $Changelist -eq 12345 -and $FromCL -eq 12340 }
+            Should -Invoke Set-ConfigValue -ParameterFilter { $Path -match "lastBuiltCL" -and $Value -eq 12345 }
+        }
+
+        It "Sigue consultando los cambios del servidor y construye con los que confirma el manifiesto" {
+            Mock Get-ConfigValue {
+                param($Path, $DefaultValue)
+                if ($Path -match "lastBuiltCL") { return 12340 }
+                return $DefaultValue
+            }
+            Mock Test-CodeChanges { $script:runState.AffectedModules = @("MyGame"); return $true }
+            Mock Get-SourceChanges {
+                return [PSCustomObject]@{ Changed = @("Source/MyGame/Private/Player.cpp"); Added = @(); Removed = @(); Count = 1 }
+            }
+
+            Main
+
+            Should -Invoke Test-CodeChanges -Times 1 -Exactly
+            Should -Invoke Invoke-ProjectBuild -Times 1 -Exactly
+            $script:runState.AffectedModules | Should -Be @("MyGame")
+        }
+
+        It "No compara el manifiesto cuando se usa -ForceBuild" {
+            Main -ForceBuild
+
+            Should -Invoke Get-SourceChanges -Times 0
+        }
+    }
+
+    Context "Caso: Modo batch" {
+
+        It "-Batch ejecuta el modo batch con los proyectos dados" {
+            Mock Start-BatchMode { return $false }
+
+            Main -Batch -Projects @("D:\GameA\GameA\GameA.uproject") | Should -Be $false
+
+            Should -Invoke Start-BatchMode -Times 1 -ParameterFilter { $Projects -contains "D:\GameA\GameA\GameA.uproject" }
+            Should -Invoke Sync-FromPerforce -Times 0
+        }
+
+        It "-ProjectFile se pasa a Initialize-ProjectPaths" {
+            Main -ProjectFile "D:\GameA\GameA\GameA.uproject" -NoEditor
+
+            Should -Invoke Initialize-ProjectPaths -Times 1 -ParameterFilter { $ProjectFile -eq "D:\GameA\GameA\GameA.uproject" }
+        }
+
+        It "-Unattended resuelve el motor sin preguntar y restaura el modo al terminar" {
+            $script:unattendedWhileResolving = $null
+            Mock Get-UnrealEngineRoot { $script:unattendedWhileResolving = $script:unattended; return "C:\UE_5.3" }
+
+            Main -ProjectFile "D:\GameA\GameA\GameA.uproject" -NoEditor -Unattended | Should -Be $true
+
+            $script:unattendedWhileResolving | Should -Be $true
+            $script:unattended | Should -Be $false
+        }
+
+        It "Un build fallido hace salir al proyecto del batch con código 1" {
+            Mock Test-UnrealEngineValid { return $true }
+            Mock Test-CodeChanges { return $true }
+            Mock Invoke-ProjectBuild { return $false }
+
+            $output = @(Main -ProjectFile "D:\GameA\GameA\GameA.uproject" -NoEditor -Unattended)
+
+            $output.Count | Should -Be 1
+            $output[0] | Should -Be $false
+            Invoke-BatchChild -ProjectFile "D:\GameA\GameA\GameA.uproject" | Should -Be 1
+        }
+
+        It "Un proyecto del batch que termina bien sale con código 0" {
+            Mock Test-UnrealEngineValid { return $true }
+
+            Invoke-BatchChild -ProjectFile "D:\GameA\GameA\GameA.uproject" | Should -Be 0
+        }
+    }
+
+    Context "Caso: Modo watch" {
+
+        It "-Watch entra en el modo watch sin ejecutar el flujo normal" {
+            Mock Start-WatchMode { }
+
+            Main -Watch | Should -Be $true
+
+            Should -Invoke Start-WatchMode -Times 1
+            Should -Invoke Sync-FromPerforce -Times 0
+        }
+
+        It "Rellena la DDC antes de abrir el editor" {
+            Main
+
+            Should -Invoke Invoke-DdcPrefill -Times 1 -Exactly -ParameterFilter { $UERoot -eq "C:\UE_5.3" }
+            Should -Invoke Start-UnrealEditor -Times 1
+        }
+
+        It "-NoEditor construye pero no abre el editor" {
+            Mock Test-CodeChanges { return $true }
+
+            Main -NoEditor | Should -Be $true
+
+            Should -Invoke Invoke-ProjectBuild -Times 1
+            Should -Invoke Start-UnrealEditor -Times 0
+        }
+    }
+
+    Context "Caso: Sync code-first" {
+
+        BeforeEach {
+            Mock Get-ConfigValue {
+                param($Path, $DefaultValue)
+                if ($Path -eq "perforce.codeFirstSync") { return $true }
+                if ($Path -match "lastBuiltCL") { return 400 }
+                return $DefaultValue
+            }
+            Mock Get-HeadChangelist { return 500 }
+            Mock Start-ContentSync { }
+            Mock Wait-ContentSync { return $true }
+            Mock Test-CodeChanges { return $true }
+        }
+
+        It "Sincroniza el código fijado al CL y arranca el contenido antes del build" {
+            Main
+
+            Should -Invoke Sync-FromPerforce -Times 1 -Exactly -ParameterFilter {
+                ($Paths -contains "Source/...@500") -and ($Paths -contains "Plugins/.../Source/...@500") -and -not ($Paths -contains "...")
+            }
+            Should -Invoke Start-ContentSync -Times 1 -Exactly -ParameterFilter { $Changelist -eq 500 }
+            Should -Invoke Test-CodeChanges -ParameterFilter { $Changelist -eq 500 -and $FromCL -eq 400 }
+            Should -Invoke Invoke-ProjectBuild -Times 1
+            Should -Invoke Wait-ContentSync
+        }
+
+        It "Falla cuando el sync de contenido falla" {
+            Mock Wait-ContentSync { return $false }
+
+            Main | Should -Be $false
+
+            Should -Invoke Start-UnrealEditor -Times 0
+        }
+
+        It "Detiene el sync de contenido sin esperarlo cuando el build falla" {
+            Mock Invoke-ProjectBuild { return $false }
+
+            Main | Should -Be $false
+
+            Should -Invoke Wait-ContentSync -Times 0
+            Should -Invoke Stop-ContentSync -Times 1
+        }
+
+        It "Sincroniza todo primero cuando no conoce el CL de cabecera" {
+            Mock Get-HeadChangelist { return $null }
+
+            Main
+
+            Should -Invoke Sync-FromPerforce -Times 1 -Exactly -ParameterFilter { -not ($Paths -contains "Source/...@500") }
+            Should -Invoke Start-ContentSync -Times 0
+        }
+
+        It "No usa code-first con -SkipSync" {
+            Main -SkipSync
+
+            Should -Invoke Get-HeadChangelist -Times 0
+            Should -Invoke Start-ContentSync -Times 0
+        }
+    }
+
     Context "Caso: Parámetro -ForceBuild" {
 
         It "Construye aunque no haya cambios cuando se usa -ForceBuild" {
@@ -4634,6 +7761,23 @@ Describe "Main" -Tag "MainFunc" {
 
     Context "Caso: Errores y manejo de excepciones" {
 
+        It "Guarda la ejecución fallida en el historial" {
+            Mock Initialize-ProjectPaths { throw "Project not found" }
+
+            Main
+
+            Should -Invoke Add-RunHistory -Times 1 -Exactly -ParameterFilter { $Succeeded -eq $false }
+        }
+
+        It "Guarda la traza también cuando falla" {
+            Mock Initialize-ProjectPaths { throw "Project not found" }
+            Mock Save-Trace { }
+
+            Main
+
+            Should -Invoke Save-Trace -Times 1 -Exactly
+        }
+
         It "Captura excepciones genéricas y muestra SCRIPT FAILED" {
             Mock Initialize-ProjectPaths {
                 throw "Generic error"
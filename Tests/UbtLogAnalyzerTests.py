@@ -0,0 +1,143 @@
+import unittest
+import os
+import sys
+import json
+import io
+import gzip
+import tempfile
+from contextlib import redirect_stdout
+
+# Add the Source directory to path to import the module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'Source')))
+import ubt_log_analyzer
+from ubt_log_analyzer import BuildLogReport, analyze, format_summary
+
+TIMED_LOG = r"""Log file: C:\Logs\last_build.log
+Building MyGameEditor...
+[1/7] Compile [x64] Module.MyGame.cpp (0:12.50 at +0:01)
+[2/7] Compile [x64] Module.MyGame.2.cpp (0:08.25 at +0:02)
+C:\P\MyGame\Source\MyGame\Private\Foo.cpp(12): warning C4996: 'X': was declared deprecated
+C:\P\Plugins\Inv\Source\Inventory\Private\Bag.cpp(3,5): warning C4996: 'X': was declared deprecated
+D:\UE\Engine\Source\Runtime\Engine\Public\A.h(1): warning C4668: 'X' is not defined
+[3/7] Compile [x64] SharedPCH.Engine.Cpp20.cpp (1:02.00 at +0:03)
+[4/7] Compile [x64] Bag.cpp (0:01.00 at +0:03)
+[5/7] Link [x64] UnrealEditor-MyGame.lib (0:00.50 at +1:05)
+[6/7] Link [x64] UnrealEditor-MyGame.dll (0:03.00 at +1:06)
+[7/7] WriteMetadata MyGameEditor.target (0:00.10 at +1:09)
+Total time in Parallel executor: 70.12 seconds
+Total execution time: 75.40 seconds
+Result: Succeeded
+"""
+
+
+def report_for(text: str, top: int=ubt_log_analyzer.DEFAULT_TOP)-> dict:
+    report = BuildLogReport(top)
+    for line in text.splitlines(keepends=True):
+        report.add_line(line)
+    return report.to_dict()
+
+
+class TestUbtLogAnalyzer(unittest.TestCase):
+    """Tests for the UBT log hotspot report"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.log_path = os.path.join(self.temp_dir.name, "last_build.log")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _write_log(self, text: str, path=None):
+        with open(path or self.log_path, "w", encoding="utf-8") as log:
+            log.write(text)
+
+    def test_counts_actions_and_totals(self):
+        """Test action counts by type and the totals UBT prints at the end"""
+        report = report_for(TIMED_LOG)
+
+        self.assertEqual(report["actions"]["total"], 7)
+        self.assertEqual(report["actions"]["byType"], {"Compile": 4, "Link": 2, "WriteMetadata": 1})
+        self.assertEqual(report["totalSeconds"], 75.4)
+        self.assertEqual(report["executorSeconds"], 70.12)
+        self.assertEqual(report["result"], "Succeeded")
+
+    def test_ranks_modules_by_time(self):
+        """Test modules are attributed from unity, PCH and binary names and ranked by seconds"""
+        modules = report_for(TIMED_LOG)["modules"]
+
+        self.assertEqual([module["module"] for module in modules[:2]], ["Engine", "MyGame"])
+        my_game = modules[1]
+        self.assertEqual((my_game["compiles"], my_game["unityFiles"], my_game["links"]), (2, 2, 2))
+        self.assertAlmostEqual(my_game["seconds"], 24.25)
+
+    def test_keeps_only_the_slowest_files(self):
+        """Test the file list is bounded by top and sorted slowest first"""
+        files = report_for(TIMED_LOG, top=2)["files"]
+
+        self.assertEqual([entry["file"] for entry in files], ["SharedPCH.Engine.Cpp20.cpp", "Module.MyGame.cpp"])
+        self.assertEqual(files[0]["seconds"], 62.0)
+
+    def test_counts_warnings_by_code_and_module(self):
+        """Test MSVC and clang warnings are counted by code and by source module"""
+        report = report_for(TIMED_LOG + "/p/Game/Source/Game/Private/B.cpp:4:2: warning: unused [-Wunused-variable]\n"
+                            "C:\\P\\Game\\Source\\Game\\X.cpp(9): error C2065: 'y': undeclared identifier\n")
+
+        self.assertEqual(report["warnings"], 4)
+        self.assertEqual(report["errors"], 1)
+        self.assertEqual(report["warningCodes"][0], {"code": "C4996", "count": 2})
+        self.assertIn({"code": "-Wunused-variable", "count": 1}, report["warningCodes"])
+        warnings = {module["module"]: module["warnings"] for module in report["modules"]}
+        self.assertEqual((warnings["Inventory"], warnings["Engine"], warnings["Game"]), (1, 1, 1))
+
+    def test_untimed_log_ranks_by_compiles(self):
+        """Test older logs without times and without verbs still produce a ranking"""
+        report = report_for("[1/3] Module.Core.cpp\n[2/3] Module.Core.2.cpp\n[3/3] Module.MyGame.cpp\n")
+
+        self.assertEqual(report["actions"]["timed"], 0)
+        self.assertEqual(report["actions"]["byType"], {"Compile": 3})
+        self.assertEqual(report["modules"][0]["module"], "Core")
+        self.assertEqual(report["files"], [])
+        self.assertIn("No per-action times", format_summary({**report, "log": "x"}))
+
+    def test_strips_line_timestamps(self):
+        """Test a leading time since start does not hide the action"""
+        report = report_for("[00:01:02.50] [1/1] Compile [x64] Module.Core.cpp (5.5s)\n")
+
+        self.assertEqual(report["actions"]["total"], 1)
+        self.assertEqual(report["files"][0]["seconds"], 5.5)
+
+    def test_analyze_reads_gzipped_logs(self):
+        """Test a retained build_*.log.gz can be analyzed directly"""
+        gz_path = self.log_path + ".gz"
+        with gzip.open(gz_path, "wt", encoding="utf-8") as log:
+            log.write(TIMED_LOG)
+
+        self.assertEqual(analyze(gz_path)["actions"]["total"], 7)
+
+    def test_main_writes_report_and_summary(self):
+        """Test --output and --summary files and the JSON printed for the sync script"""
+        self._write_log(TIMED_LOG)
+        output = os.path.join(self.temp_dir.name, "report.json")
+        summary = os.path.join(self.temp_dir.name, "report.txt")
+
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            code = ubt_log_analyzer.main(["--log", self.log_path, "--output", output, "--summary", summary])
+
+        self.assertEqual(code, 0)
+        printed = json.loads(stdout.getvalue())
+        self.assertEqual(printed["modules"][0]["module"], "Engine")
+        with open(output, encoding="utf-8") as report:
+            self.assertEqual(json.load(report), printed)
+        with open(summary, encoding="utf-8") as text:
+            self.assertRegex(text.read(), r"SharedPCH\.Engine\.Cpp20\.cpp\s+62\.0s")
+
+    def test_main_missing_log(self):
+        """Test a missing log is reported as a failure"""
+        with redirect_stdout(io.StringIO()):
+            code = ubt_log_analyzer.main(["--log", os.path.join(self.temp_dir.name, "missing.log")])
+        self.assertEqual(code, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()